@@ -0,0 +1,275 @@
+"""
+Analysis Result Cache
+=====================
+
+Bounded, thread-safe in-memory cache for analysis results.
+
+Every cached Analyzer B result is a DataFrame with around seventy indicator
+columns, so an unbounded dict grows until the instance runs out of memory.
+This cache enforces a byte budget and an entry limit with least-recently-used
+eviction. Entries expire after their TTL but can be kept for a further
+stale grace window, during which callers that accept stale data still get
+them (stale-while-revalidate). Hit, miss, eviction and expiration counters
+are kept for monitoring. All access goes through one
+lock so it is safe under threaded gunicorn workers.
+
+Configuration:
+
+    ANALYSIS_CACHE_MAX_MB       Byte budget in megabytes (default 128)
+    ANALYSIS_CACHE_MAX_ENTRIES  Maximum number of entries (default 500)
+    ANALYSIS_STALE_GRACE_SECONDS  Seconds expired entries stay servable as stale (default 600)
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_MAX_MB = float(os.getenv('ANALYSIS_CACHE_MAX_MB', '128'))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '500'))
+ANALYSIS_STALE_GRACE_SECONDS = float(os.getenv('ANALYSIS_STALE_GRACE_SECONDS', '600'))
+
+
+def estimate_size(value):
+    """
+    Estimate the memory footprint of a cached value in bytes
+
+    Args:
+        value: DataFrame, Series or any other object
+
+    Returns:
+        Size in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    return sys.getsizeof(value)
+
+
+class CacheEntry:
+    """A cached value with its size and lifetime"""
+
+    __slots__ = ('value', 'size', 'created_at', 'expires_at')
+
+    def __init__(self, value, size, created_at, expires_at):
+        self.value = value
+        self.size = size
+        self.created_at = created_at
+        self.expires_at = expires_at
+
+    def is_expired(self, now=None):
+        """Check whether the entry is past its TTL"""
+        return (time.time() if now is None else now) >= self.expires_at
+
+    def is_servable(self, grace, now=None):
+        """Check whether the entry is fresh or expired by less than ``grace`` seconds"""
+        return (time.time() if now is None else now) < self.expires_at + grace
+
+
+class AnalysisCache:
+    """
+    LRU + TTL cache with a byte budget
+    """
+
+    def __init__(self, name='analysis', default_ttl=300, max_bytes=None, max_entries=None, stale_grace=0):
+        """
+        Initialize the cache
+
+        Args:
+            name: Name used in logs and stats
+            default_ttl: TTL in seconds for entries stored without one
+            max_bytes: Byte budget (defaults to ANALYSIS_CACHE_MAX_MB)
+            max_entries: Entry limit (defaults to ANALYSIS_CACHE_MAX_ENTRIES)
+            stale_grace: Seconds past their TTL that entries can still be
+                served to callers accepting stale data (0 disables)
+        """
+        self.name = name
+        self.default_ttl = default_ttl
+        self.stale_grace = stale_grace
+        self.max_bytes = int(ANALYSIS_CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.max_entries = ANALYSIS_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.logger = logging.getLogger(__name__)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._counters = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'rejected': 0}
+
+    def _remove(self, key):
+        """Drop an entry and release its bytes (lock must be held)"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        return entry
+
+    def get(self, key):
+        """
+        Get a value if it is cached and not expired
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key, allow_stale=False):
+        """
+        Get a value together with its freshness
+
+        Args:
+            key: Cache key
+            allow_stale: Also return values expired by less than stale_grace
+
+        Returns:
+            Tuple of (value, stale) or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            if entry.is_expired(now):
+                if not entry.is_servable(self.stale_grace, now):
+                    self._remove(key)
+                    self._counters['expirations'] += 1
+                    self._counters['misses'] += 1
+                    return None
+                if not allow_stale:
+                    self._counters['misses'] += 1
+                    return None
+                self._entries.move_to_end(key)
+                self._counters['stale_hits'] += 1
+                return entry.value, True
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry.value, False
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value, evicting least recently used entries to stay in budget
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Lifetime in seconds (defaults to default_ttl)
+
+        Returns:
+            True if the value was stored, False if it alone exceeds the budget
+        """
+        size = estimate_size(value)
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            if size > self.max_bytes:
+                self._counters['rejected'] += 1
+                self.logger.warning(f"Not caching {key} in {self.name} cache: {size} bytes exceeds the budget")
+                return False
+
+            self._entries[key] = CacheEntry(value, size, now, now + ttl)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                evicted_key = next(iter(self._entries))
+                self._remove(evicted_key)
+                self._counters['evictions'] += 1
+                self.logger.info(f"Evicted {evicted_key} from {self.name} cache")
+            return True
+
+    def delete(self, key):
+        """Remove one entry, returning True if it existed"""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self):
+        """Remove all entries, returning how many were dropped"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return count
+
+    def purge_expired(self):
+        """Remove every entry past its TTL and stale grace, returning how many were dropped"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items()
+                       if not entry.is_servable(self.stale_grace, now)]
+            for key in expired:
+                self._remove(key)
+            self._counters['expirations'] += len(expired)
+            return len(expired)
+
+    def list_entries(self):
+        """
+        Describe every entry without touching LRU order or counters
+
+        Returns:
+            List of dicts with key, bytes, age_seconds, ttl_remaining and expired
+        """
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    'key': key,
+                    'bytes': entry.size,
+                    'age_seconds': round(now - entry.created_at, 1),
+                    'ttl_remaining': round(entry.expires_at - now, 1),
+                    'expired': entry.is_expired(now),
+                    'stale': entry.is_expired(now) and entry.is_servable(self.stale_grace, now)
+                }
+                for key, entry in self._entries.items()
+            ]
+
+    def keys(self):
+        """Get the cached keys from least to most recently used"""
+        with self._lock:
+            return list(self._entries)
+
+    def has(self, key, allow_stale=False):
+        """Check for a fresh (or, with allow_stale, servable) entry without counting a lookup"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            return entry.is_servable(self.stale_grace) if allow_stale else not entry.is_expired()
+
+    def __contains__(self, key):
+        return self.has(key)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self):
+        """Get size, usage and hit/miss/eviction counters of the cache"""
+        now = time.time()
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['stale_hits'] + self._counters['misses']
+            oldest = min((entry.created_at for entry in self._entries.values()), default=None)
+            return dict(
+                self._counters,
+                name=self.name,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                max_entries=self.max_entries,
+                stale_grace=self.stale_grace,
+                hit_ratio=round((self._counters['hits'] + self._counters['stale_hits']) / lookups, 4) if lookups else None,
+                oldest_age_seconds=round(now - oldest, 1) if oldest is not None else None
+            )
@@ -4,10 +4,11 @@ import yfinance as yf
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import json
-import traceback
 import logging
-from datetime import datetime, timedelta
 import concurrent.futures
+import fnmatch
+import re
+import threading
 import time
 import os
 
@@ -21,7 +22,8 @@ try:
         should_aggregate_interval, 
         get_base_interval_for_aggregation,
         get_extended_period_for_aggregation,
-        aggregate_timeframe
+        aggregate_timeframe,
+        get_cache_ttl
     )
     TIMEFRAME_AGGREGATION_AVAILABLE = True
     logger.info("Timeframe aggregation module loaded successfully")
@@ -43,13 +45,65 @@ except ImportError:
 
 # Import EOD API integration
 try:
-    from eod_api import fetch_stock_data_eod, get_eod_provider
+    from eod_api import fetch_stock_data_eod, fetch_stock_range_eod, get_eod_provider, ingest_bulk_last_day_eod
     EOD_AVAILABLE = True
     logger.info("EOD Historical Data API integration available")
 except ImportError as e:
     EOD_AVAILABLE = False
     logger.warning(f"EOD API not available: {e}")
 
+# Import persistent bar store
+try:
+    from bar_store import get_bar_store, slice_period, slice_range, period_start, to_utc
+    from bar_pyramid import get_bar_pyramid
+    BAR_STORE_AVAILABLE = True
+    logger.info("Persistent bar store available")
+except ImportError as e:
+    BAR_STORE_AVAILABLE = False
+    logger.warning(f"Bar store not available: {e}")
+
+# Single-pass compiled kernel for the core indicators
+from indicator_kernel import compute_core_indicators, warm_indicator_kernel, INDICATOR_KERNEL_AVAILABLE, CORE_COLUMNS
+
+# Declarative column dependencies, so requests compute only the fields they ask for
+from indicator_graph import IndicatorGraph, IndicatorNode
+
+# Per-(ticker, interval) indicator state advanced bar by bar
+from indicator_stream import get_indicator_streams
+
+# Per-provider request concurrency limits, circuit breakers and retries
+from provider_access import (
+    provider_call, retry_call, hedged_call, get_provider_limiter, CircuitOpenError, NonRetryableError,
+    MULTI_TICKER_WORKERS
+)
+
+# Short-TTL memory of unknown symbols and empty provider answers
+from negative_cache import get_negative_cache, classify_error, NO_DATA, INVALID_SYMBOL
+
+# Learned user symbol -> provider symbol mapping
+from symbol_resolver import get_symbol_resolver
+
+# Coalesce identical concurrent fetches and analyses
+from single_flight import get_single_flight
+
+# Long-TTL company name / industry cache
+from metadata_cache import get_metadata_cache, apply_company_info
+
+# Bounded LRU + TTL cache for analysis results
+from analysis_cache import AnalysisCache, ANALYSIS_STALE_GRACE_SECONDS
+
+# Scheduled warming of watchlist analyses
+from cache_warmer import get_cache_warmer, CACHE_WARMER_ENABLED
+
+# Offline record/replay stand-in for yfinance (benchmarks and load tests)
+from replay_provider import get_replay_provider, REPLAY_MODE
+
+if REPLAY_MODE:
+    # Every yfinance request below goes through the module-level yf
+    yf = get_replay_provider()
+    get_metadata_cache().fetcher = yf.metadata
+    logger.info(f"yfinance replaced by the replay provider in {REPLAY_MODE} mode ({yf.fixture_dir})")
+
 # Configuration - set which data provider to use
 USE_EOD_API = os.getenv('USE_EOD_API', 'false').lower() == 'true'
 EOD_API_KEY = os.getenv('EOD_API_KEY')
@@ -63,6 +117,20 @@ elif USE_EOD_API and not EOD_API_KEY:
 
 logger.info(f"Data provider: {'EOD Historical Data' if USE_EOD_API else 'Yahoo Finance (yfinance)'}")
 
+# Start yfinance alongside EOD when EOD is slower than its usual latency,
+# instead of only after it failed (see provider_access.hedged_call)
+HEDGE_REQUESTS = os.getenv('HEDGE_REQUESTS', 'false').lower() == 'true'
+
+# Serve provider bars through the incremental on-disk bar store
+USE_BAR_STORE = BAR_STORE_AVAILABLE and os.getenv('USE_BAR_STORE', 'true').lower() == 'true'
+
+# Compute the core indicators in the fused kernel instead of the pandas functions
+USE_INDICATOR_KERNEL = INDICATOR_KERNEL_AVAILABLE and os.getenv('USE_INDICATOR_KERNEL', 'true').lower() == 'true'
+
+if USE_INDICATOR_KERNEL:
+    # Compile (or load the cached build) off the request path
+    threading.Thread(target=warm_indicator_kernel, name='indicator-kernel-warmup', daemon=True).start()
+
 # Fix the NpEncoder to properly handle NaN, Infinity and -Infinity values
 class NpEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -101,11 +169,340 @@ INTERVAL_LIMITS = {
     '1wk': 'max'
 }
 
-# Simple cache implementation for ticker data to improve performance
-ticker_cache = {}  # Format: {ticker_period_interval: {'data': result_object, 'timestamp': datetime}}
+# Analysis result cache, bounded by ANALYSIS_CACHE_MAX_MB / ANALYSIS_CACHE_MAX_ENTRIES
 CACHE_TTL = 300  # Cache TTL in seconds (5 minutes)
+# Expired results stay servable for ANALYSIS_STALE_GRACE_SECONDS while they are recomputed in the background
+ticker_cache = AnalysisCache('analysis', default_ttl=CACHE_TTL, stale_grace=ANALYSIS_STALE_GRACE_SECONDS)  # Keys: ticker_period_interval
+REVALIDATE_WORKERS = int(os.getenv('REVALIDATE_WORKERS', '2'))
+_revalidate_executor = concurrent.futures.ThreadPoolExecutor(max_workers=REVALIDATE_WORKERS, thread_name_prefix='revalidate')
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+def _yfinance_history(stock, interval, period=None, start=None, end=None):
+    """Call yfinance history for either a whole period or everything from start (up to end)"""
+    if start is not None and end is not None:
+        return stock.history(start=start, end=end, interval=interval)
+    if start is not None:
+        return stock.history(start=start, interval=interval)
+    return stock.history(period=period, interval=interval)
+
+def resolve_fetch_parameters(period, interval):
+    """
+    Work out what to request from yfinance for a period/interval pair
+    
+    Handles the aggregated intervals (3h, 6h, 2d, 3d), interval period limits,
+    the intraday period extensions and the custom resampled intervals.
+    
+    Args:
+        period: Requested data period
+        interval: Requested data interval
+        
+    Returns:
+        Dictionary with fetch_period, fetch_interval, original_interval,
+        base_interval, needs_aggregation and custom_resampling
+    """
+    # Check if we need aggregation for yfinance
+    needs_aggregation = False
+    original_interval = interval
+    base_interval = interval
+    
+    if TIMEFRAME_AGGREGATION_AVAILABLE and should_aggregate_interval(interval):
+        needs_aggregation = True
+        base_interval = get_base_interval_for_aggregation(interval)
+        extended_period = get_extended_period_for_aggregation(period, interval)
+        
+        # Use extended period and base interval for fetching
+        fetch_period = extended_period
+        fetch_interval = base_interval
+    else:
+        fetch_period = period
+        fetch_interval = interval
+    
+    # Handle custom intervals (4h, 8h, 12h) with traditional resampling when the
+    # aggregator is unavailable; map them before the interval validation below
+    custom_resampling = None
+    
+    if fetch_interval == '4h':
+        # Use 1h data and resample
+        fetch_interval = '1h'
+        custom_resampling = '4h'
+    elif fetch_interval == '8h':
+        # Use 1h data and resample
+        fetch_interval = '1h'
+        custom_resampling = '8h'
+    elif fetch_interval == '12h':
+        # Use 1h data and resample
+        fetch_interval = '1h'
+        custom_resampling = '12h'
+    
+    # Validate interval - use base intervals for fetching
+    valid_base_intervals = ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo']
+    if fetch_interval not in valid_base_intervals:
+        logger.warning(f"Invalid fetch interval: {fetch_interval}, defaulting to 1d")
+        fetch_interval = '1d'
+        
+    # Validate period
+    if fetch_period not in VALID_PERIODS:
+        logger.warning(f"Invalid period: {fetch_period}, defaulting to 1y")
+        fetch_period = '1y'
+        
+    # Check if the requested period exceeds the limit for the interval
+    if fetch_interval in INTERVAL_LIMITS:
+        max_period = INTERVAL_LIMITS[fetch_interval]
+        if max_period in VALID_PERIODS and VALID_PERIODS.index(fetch_period) > VALID_PERIODS.index(max_period):
+            logger.warning(f"Period '{fetch_period}' exceeds limit for interval '{fetch_interval}', using {max_period} instead")
+            fetch_period = max_period
+
+    # For short timeframes, ensure we include the current day's data
+    # by using a slightly extended period for intraday data
+    if fetch_interval in ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h']:
+        # If requested period is 1d, use '2d' to ensure we get current day + previous day
+        # for better context
+        if fetch_period == '1d':
+            logger.info(f"Extending period from '1d' to '2d' for intraday data to include current day")
+            fetch_period = '2d'
+        # For 5d, extend to 7d to get full week + weekend
+        elif fetch_period == '5d':
+            logger.info(f"Extending period from '5d' to '7d' for intraday data to include full week")
+            fetch_period = '7d'
+    
+    return {
+        'fetch_period': fetch_period,
+        'fetch_interval': fetch_interval,
+        'original_interval': original_interval,
+        'base_interval': base_interval,
+        'needs_aggregation': needs_aggregation,
+        'custom_resampling': custom_resampling
+    }
+
+# Indicators are computed over this many times the longest lookback of the
+# interval before the requested window, then trimmed to it
+INDICATOR_WARMUP_FACTOR = 2
+# Periods analysis histories are fetched in, shortest first
+HISTORY_PERIODS = ['1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+TRADING_HOURS_PER_DAY = 6.5
+BAR_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'wk': 'weeks'}
+
+def get_bar_duration(interval):
+    """Get the length of one bar of an interval ('15m', '4h', '1wk', ...), one day if unknown"""
+    match = re.match(r'^(\d+)(m|h|d|wk)$', interval)
+    if not match:
+        return pd.Timedelta(days=1)
+    return pd.Timedelta(**{BAR_UNITS[match.group(2)]: int(match.group(1))})
+
+def get_warmup_span(interval):
+    """Get the calendar time the indicator warm-up bars of an interval cover"""
+    bars = INDICATOR_WARMUP_FACTOR * max(adjust_parameters_for_interval(interval).values())
+    duration = get_bar_duration(interval)
+    if duration < pd.Timedelta(days=1):
+        # Intraday bars only exist during the session, five sessions a week
+        sessions = bars * duration / pd.Timedelta(hours=TRADING_HOURS_PER_DAY)
+        return pd.Timedelta(days=sessions * 7 / 5)
+    if duration < pd.Timedelta(weeks=1):
+        return bars * duration * 7 / 5
+    return bars * duration
+
+def get_history_period(period, interval):
+    """
+    Get the period to fetch so the requested window gets its indicator warm-up bars
+    
+    Histories are fetched in a few standard lengths so the bar store ends up
+    holding one long series per (ticker, interval) that every shorter period
+    is sliced from. The provider limit of the interval is respected.
+    
+    Args:
+        period: Requested data period
+        interval: Requested data interval
+        
+    Returns:
+        Period string from HISTORY_PERIODS, or the requested period when no
+        longer history can be fetched
+    """
+    if not BAR_STORE_AVAILABLE or period == 'max':
+        return period
+    try:
+        needed = period_start(period) - get_warmup_span(interval)
+    except ValueError:
+        return period
+    
+    intraday = get_bar_duration(interval) < pd.Timedelta(days=1)
+    limit = INTERVAL_LIMITS.get(interval, INTERVAL_LIMITS['1h'] if intraday else 'max')
+    limit_start = period_start(limit)
+    
+    history_period = period
+    for candidate in HISTORY_PERIODS:
+        start = period_start(candidate)
+        if limit_start is not None and (start is None or start < limit_start):
+            break
+        history_period = candidate
+        if start is not None and start <= needed:
+            break
+    
+    # Never fetch less than was asked for
+    requested_start = period_start(period)
+    chosen_start = period_start(history_period)
+    if chosen_start is not None and chosen_start > requested_start:
+        return period
+    return history_period
+
+def get_window_period(period, interval):
+    """Get the period an analysis of (period, interval) covers after the warm-up is trimmed"""
+    return resolve_fetch_parameters(period, interval)['fetch_period']
+
+def trim_to_window(df, period, interval):
+    """Drop the warm-up bars in front of the requested window, keeping the attrs"""
+    if df is None or df.empty or not BAR_STORE_AVAILABLE:
+        return df
+    trimmed = slice_period(df, get_window_period(period, interval))
+    if len(trimmed) == len(df):
+        return df
+    trimmed = trimmed.copy()
+    trimmed.attrs = dict(df.attrs)
+    return trimmed
+
+# Intervals served from one stored base series, by base interval
+PYRAMID_LEVELS = {
+    '1h': ['1h', '3h', '4h', '6h', '8h', '12h'],
+    '1d': ['1d', '2d', '3d']
+}
+
+def get_base_period(fetch_params):
+    """
+    Get the period to fetch when a base series has to be fetched in full
+    
+    Widened to the longest history any interval derived from the same base
+    would ask for, so flipping between those intervals costs one base fetch.
+    
+    Args:
+        fetch_params: Dictionary returned by resolve_fetch_parameters
+        
+    Returns:
+        Period string, never shorter than the fetch period
+    """
+    fetch_period = fetch_params['fetch_period']
+    levels = PYRAMID_LEVELS.get(fetch_params['fetch_interval'])
+    if not levels:
+        return fetch_period
+    candidates = [fetch_period] + [get_history_period(fetch_period, level) for level in levels]
+    # 'max' has no start and sorts first
+    return min(candidates, key=lambda candidate: (period_start(candidate) is not None, period_start(candidate)))
+
+def get_pyramid_bars(ticker, fetch_params, fetcher=None, refresh=False):
+    """
+    Serve a yfinance fetch from the bar pyramid over the stored base series
+    
+    Every interval derived from the same base (1h -> 3h/4h/6h/8h/12h,
+    1d -> 2d/3d) is built once per stored version and then served from memory.
+    
+    Args:
+        ticker: Stock ticker symbol
+        fetch_params: Dictionary returned by resolve_fetch_parameters
+        fetcher: Provider fetcher bringing the stored base up to date first;
+            without one whatever is stored is served
+        refresh: Re-fetch the whole base period even if the store covers it
+        
+    Returns:
+        Prepared DataFrame of the fetch period, or None
+    """
+    return get_bar_pyramid().get_bars(
+        get_bar_store(), 'yfinance', ticker,
+        fetch_params['fetch_interval'], fetch_params['original_interval'], fetch_params['fetch_period'],
+        lambda base: prepare_fetched_data(base.copy(), ticker, fetch_params),
+        fetcher=fetcher, refresh=refresh, full_period=get_base_period(fetch_params)
+    )
+
+def prepare_fetched_data(df, ticker, fetch_params):
+    """
+    Turn raw provider bars into the requested interval and clean them up
+    
+    Args:
+        df: Raw DataFrame returned by the provider for the fetch interval
+        ticker: Stock ticker symbol
+        fetch_params: Dictionary returned by resolve_fetch_parameters
+        
+    Returns:
+        Prepared DataFrame (may be empty if aggregation produced no bars)
+    """
+    fetch_interval = fetch_params['fetch_interval']
+    original_interval = fetch_params['original_interval']
+    custom_resampling = fetch_params['custom_resampling']
+    
+    # Apply traditional resampling for existing custom intervals (4h, 8h, 12h)
+    if custom_resampling and not df.empty:
+        logger.info(f"Traditional resampling data from {fetch_interval} to {original_interval}")
+        df = df.resample(custom_resampling).agg({
+            'Open': 'first',
+            'High': 'max',
+            'Low': 'min',
+            'Close': 'last',
+            'Volume': 'sum'
+        }).dropna()
+    
+    # Apply new smart aggregation for new intervals (3h, 6h, 2d, 3d)
+    elif fetch_params['needs_aggregation'] and TIMEFRAME_AGGREGATION_AVAILABLE and not df.empty:
+        logger.info(f"Smart aggregating data from {fetch_interval} to {original_interval}")
+        df = aggregate_timeframe(df, original_interval, ticker)
+    
+    if df.empty:
+        return df
+    
+    # Check for too many NaN values in critical columns
+    critical_cols = ['Open', 'High', 'Low', 'Close']
+    nan_pct = {col: df[col].isna().mean() for col in critical_cols}
+    max_nan_pct = max(nan_pct.values())
+    
+    if max_nan_pct > 0.25:  # If more than 25% of any critical column is NaN
+        logger.warning(f"High percentage of NaN values in data: {nan_pct}")
+        # Fill NaN values with forward fill, then backward fill
+        df[critical_cols] = df[critical_cols].ffill().bfill()
+    
+    # For intraday data, ensure we have the date component in the index
+    if original_interval in ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '3h', '4h', '6h', '8h', '12h']:
+        # Keep the existing datetime index but ensure it's timezone-aware
+        if df.index.tzinfo is None:
+            df.index = df.index.tz_localize('UTC')
+    
+    # Add aggregation metadata
+    df.attrs['original_interval'] = original_interval
+    df.attrs['was_aggregated'] = fetch_params['needs_aggregation'] or custom_resampling is not None
+    if fetch_params['needs_aggregation']:
+        df.attrs['base_interval'] = fetch_params['base_interval']
+        df.attrs['aggregation_method'] = 'smart_timeframe_aggregator'
+    elif custom_resampling:
+        df.attrs['base_interval'] = '1h'
+        df.attrs['aggregation_method'] = 'traditional_resampling'
+    
+    return df
 
 def fetch_stock_data(ticker, period='1y', interval='1d', max_retries=3, retry_delay=2, use_cache=True):
+    """
+    Fetch stock data, sharing one download between concurrent identical requests
+    
+    Callers asking for the same (ticker, period, interval) while a fetch is
+    in flight wait for it instead of hitting the provider again, and receive
+    their own copy of the resulting DataFrame.
+    
+    Args:
+        ticker: Stock ticker symbol
+        period: Data period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
+        interval: Data interval (15m, 30m, 1h, 3h, 6h, 1d, 2d, 3d, 1wk)
+        max_retries: Maximum number of retry attempts
+        retry_delay: Base delay of the exponential retry backoff in seconds
+        use_cache: Whether to serve from the bar store (False re-fetches the whole period)
+        
+    Returns:
+        DataFrame with stock data or None if failed
+    """
+    key = ('fetch', ticker, period, interval, use_cache)
+    df, shared = get_single_flight().do(
+        key, _fetch_stock_data, ticker, period, interval, max_retries, retry_delay, use_cache
+    )
+    if shared and df is not None:
+        # Callers add indicator columns in place, so followers get their own frame
+        df = df.copy()
+    return df
+
+def _fetch_stock_data(ticker, period='1y', interval='1d', max_retries=3, retry_delay=2, use_cache=True):
     """
     Enhanced fetch stock data function with comprehensive aggregation support
     Now supports both Yahoo Finance (yfinance) and EOD Historical Data API
@@ -116,21 +513,25 @@ def fetch_stock_data(ticker, period='1y', interval='1d', max_retries=3, retry_de
         period: Data period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
         interval: Data interval (15m, 30m, 1h, 3h, 6h, 1d, 2d, 3d, 1wk)
         max_retries: Maximum number of retry attempts
-        retry_delay: Delay between retries in seconds
-        use_cache: Whether to use cached data (for compatibility)
+        retry_delay: Base delay of the exponential retry backoff in seconds
+        use_cache: Whether to serve from the bar store (False re-fetches the whole period)
         
     Returns:
         DataFrame with stock data or None if failed
     """
     
+    if USE_EOD_API and HEDGE_REQUESTS:
+        return _fetch_stock_data_hedged(ticker, period, interval, max_retries, retry_delay, use_cache)
+    
     # Use EOD API if configured and available
     if USE_EOD_API:
         logger.info(f"Using EOD API for {ticker}")
         try:
+            # EOD requests take their provider slot and breaker check inside eod_api
             df = fetch_stock_data_eod(ticker, period, interval, max_retries, retry_delay, use_cache)
             if df is not None:
                 logger.info(f"Successfully fetched {len(df)} rows from EOD API for {ticker}")
-                return df
+                return apply_company_info(df, ticker)
             else:
                 logger.warning(f"EOD API returned no data for {ticker}")
         except Exception as e:
@@ -138,204 +539,426 @@ def fetch_stock_data(ticker, period='1y', interval='1d', max_retries=3, retry_de
             logger.info("Falling back to yfinance...")
     
     # Fall back to yfinance or use as primary with aggregation support
-    logger.info(f"Using yfinance for {ticker}")
+    df = _fetch_stock_data_yfinance(ticker, period, interval, max_retries, retry_delay, use_cache)
+    if df is None:
+        return None
     
-    # Check if we need aggregation for yfinance
-    needs_aggregation = False
-    original_interval = interval
-    base_interval = interval
+    # Add company information from the metadata cache (filled in the background)
+    return apply_company_info(df, ticker)
+
+def _fetch_stock_data_hedged(ticker, period, interval, max_retries=3, retry_delay=2, use_cache=True):
+    """
+    Fetch from EOD, hedged by yfinance when EOD answers slower than usual
     
-    if TIMEFRAME_AGGREGATION_AVAILABLE and should_aggregate_interval(interval):
-        needs_aggregation = True
-        base_interval = get_base_interval_for_aggregation(interval)
-        extended_period = get_extended_period_for_aggregation(period, interval)
+    Which provider won and the latency gained are kept in the 'hedge'
+    attribute of the returned DataFrame.
+    
+    Args:
+        ticker: Stock ticker symbol
+        period: Data period
+        interval: Data interval
+        max_retries: Maximum number of retry attempts
+        retry_delay: Base delay of the exponential retry backoff in seconds
+        use_cache: Whether to serve from the bar store (False re-fetches the whole period)
         
-        logger.info(f"Will aggregate {base_interval} -> {interval} for {ticker}")
+    Returns:
+        DataFrame with stock data or None if failed
+    """
+    df, info = hedged_call(
+        'eod', lambda: fetch_stock_data_eod(ticker, period, interval, max_retries, retry_delay, use_cache),
+        'yfinance', lambda: _fetch_stock_data_yfinance(ticker, period, interval, max_retries, retry_delay, use_cache),
+        accept=lambda result: result is not None and len(result) >= 5
+    )
+    if info['hedged']:
+        logger.info(f"Hedged fetch of {ticker} won by {info['winner']} in {info['latency_seconds']}s")
+    if df is None:
+        logger.error(f"Failed to fetch data for {ticker}")
+        return None
+    
+    df.attrs['hedge'] = info
+    return apply_company_info(df, ticker)
+
+def _fetch_stock_data_yfinance(ticker, period='1y', interval='1d', max_retries=3, retry_delay=2, use_cache=True):
+    """
+    Fetch stock data from yfinance, serving stored bars while it is unavailable
+    
+    Args:
+        ticker: Stock ticker symbol
+        period: Data period
+        interval: Data interval
+        max_retries: Maximum number of retry attempts
+        retry_delay: Base delay of the exponential retry backoff in seconds
+        use_cache: Whether to serve from the bar store (False re-fetches the whole period)
         
-        # Use extended period and base interval for fetching
-        fetch_period = extended_period
-        fetch_interval = base_interval
+    Returns:
+        DataFrame with stock data (without company information) or None if failed
+    """
+    logger.info(f"Using yfinance for {ticker}")
+    
+    # Symbols yfinance recently had nothing for are answered without a round-trip
+    negative_cache = get_negative_cache()
+    if use_cache:
+        reason = negative_cache.check('yfinance', ticker, period, interval)
+        if reason:
+            logger.info(f"Skipping yfinance fetch for {ticker} ({period}, {interval}): {reason}")
+            return None
+    
+    fetch_params = resolve_fetch_parameters(period, interval)
+    fetch_period = fetch_params['fetch_period']
+    fetch_interval = fetch_params['fetch_interval']
+    
+    if fetch_params['needs_aggregation']:
+        logger.info(f"Will aggregate {fetch_params['base_interval']} -> {interval} for {ticker}")
+    
+    outcomes = {'empty': 0, 'errors': 0}
+    history = make_yfinance_fetcher(ticker, fetch_interval, outcomes)
+    
+    def attempt():
+        logger.info(f"Fetching data for {ticker}, period: {fetch_period}, interval: {fetch_interval}")
+        # Fetch historical data - only the missing tail when the bar store has the
+        # rest, with the interval derived from the stored base in memory
+        if USE_BAR_STORE:
+            df = get_pyramid_bars(ticker, fetch_params, history, refresh=not use_cache)
+        else:
+            df = history(period=fetch_period)
+            if df is not None and not df.empty:
+                df = prepare_fetched_data(df, ticker, fetch_params)
+        
+        if df is None or df.empty:
+            logger.warning(f"No data returned for {ticker} with period={fetch_period}, interval={fetch_interval}")
+            outcomes['empty'] += 1
+            return None
+        negative_cache.discard('yfinance', ticker, period, interval)
+        return df
+    
+    # Backoff retries stay inside the retry budget; the rest continue in the
+    # background and land in the bar store for the next request
+    try:
+        df = retry_call(
+            'yfinance', attempt,
+            max_retries=max_retries,
+            base_delay=retry_delay,
+            accept=lambda result: result is not None and len(result) >= 5,  # Require at least 5 data points
+            background_key=('yfinance', ticker, fetch_period, fetch_interval) if USE_BAR_STORE else None
+        )
+    except CircuitOpenError as e:
+        logger.warning(f"{e}, serving stored bars for {ticker}")
+        df = None
+    except NonRetryableError as e:
+        logger.warning(f"yfinance does not know {ticker}: {e}")
+        negative_cache.record('yfinance', ticker, period, interval, INVALID_SYMBOL)
+        return None
+    
+    if df is None or df.empty:
+        df = get_stored_bars(ticker, fetch_params)
+        if df is None:
+            if outcomes['empty'] and not outcomes['errors']:
+                # The provider answered every attempt, just without bars
+                negative_cache.record('yfinance', ticker, period, interval, NO_DATA)
+            logger.error(f"Failed to fetch data for {ticker}")
+            return None
+        logger.info(f"Serving {len(df)} stored rows for {ticker} while yfinance is unavailable")
+    elif len(df) < 5:
+        logger.warning(f"Insufficient data points for {ticker}: {len(df)}")
     else:
-        fetch_period = period
-        fetch_interval = interval
+        logger.info(f"Successfully fetched {len(df)} rows of data for {ticker}")
     
-    for attempt in range(max_retries):
-        try:
-            logger.info(f"Fetching data for {ticker}, period: {fetch_period}, interval: {fetch_interval} (attempt {attempt+1}/{max_retries})")
-            
-            # Validate interval - use base intervals for fetching
-            valid_base_intervals = ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo']
-            if fetch_interval not in valid_base_intervals:
-                logger.warning(f"Invalid fetch interval: {fetch_interval}, defaulting to 1d")
-                fetch_interval = '1d'
-                
-            # Validate period
-            if fetch_period not in VALID_PERIODS:
-                logger.warning(f"Invalid period: {fetch_period}, defaulting to 1y")
-                fetch_period = '1y'
-                
-            # Check if the requested period exceeds the limit for the interval
-            if fetch_interval in INTERVAL_LIMITS:
-                max_period = INTERVAL_LIMITS[fetch_interval]
-                if max_period in VALID_PERIODS and VALID_PERIODS.index(fetch_period) > VALID_PERIODS.index(max_period):
-                    logger.warning(f"Period '{fetch_period}' exceeds limit for interval '{fetch_interval}', using {max_period} instead")
-                    fetch_period = max_period
-
-            # For short timeframes, ensure we include the current day's data
-            # by using a slightly extended period for intraday data
-            if fetch_interval in ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h']:
-                # If requested period is 1d, use '2d' to ensure we get current day + previous day
-                # for better context
-                if fetch_period == '1d':
-                    logger.info(f"Extending period from '1d' to '2d' for intraday data to include current day")
-                    fetch_period = '2d'
-                # For 5d, extend to 7d to get full week + weekend
-                elif fetch_period == '5d':
-                    logger.info(f"Extending period from '5d' to '7d' for intraday data to include full week")
-                    fetch_period = '7d'
-            
-            # Handle existing custom intervals (4h, 8h, 12h) with traditional resampling
-            custom_resampling = None
-            traditional_resampling_interval = fetch_interval
-            
-            if fetch_interval == '4h':
-                # Use 1h data and resample
-                fetch_interval = '1h'
-                custom_resampling = '4H'
-            elif fetch_interval == '8h':
-                # Use 1h data and resample
-                fetch_interval = '1h'
-                custom_resampling = '8H'
-            elif fetch_interval == '12h':
-                # Use 1h data and resample
-                fetch_interval = '1h'
-                custom_resampling = '12H'
-            
-            # Set timeout for yfinance request to prevent hanging
-            import yfinance as yf
-            from requests.exceptions import ReadTimeout, ConnectionError
+    return df
 
-            # Create yfinance ticker object
-            stock = yf.Ticker(ticker)
-            
-            # Fetch historical data - remove unsupported parameters
-            df = stock.history(period=fetch_period, interval=fetch_interval)
-            
-            if df is None or df.empty:
-                logger.warning(f"No data returned for {ticker} with period={fetch_period}, interval={fetch_interval}")
-                continue
-            
-            # Apply traditional resampling for existing custom intervals (4h, 8h, 12h)
-            if custom_resampling and not df.empty:
-                logger.info(f"Traditional resampling data from {fetch_interval} to {traditional_resampling_interval}")
-                df = df.resample(custom_resampling).agg({
-                    'Open': 'first',
-                    'High': 'max',
-                    'Low': 'min',
-                    'Close': 'last',
-                    'Volume': 'sum'
-                }).dropna()
-            
-            # Apply new smart aggregation for new intervals (3h, 6h, 2d, 3d)
-            elif needs_aggregation and TIMEFRAME_AGGREGATION_AVAILABLE and not df.empty:
-                logger.info(f"Smart aggregating data from {fetch_interval} to {original_interval}")
-                df = aggregate_timeframe(df, original_interval, ticker)
-                
-                if df.empty:
-                    logger.warning(f"Aggregation resulted in empty dataset")
-                    continue
-            
-            if df.empty:
-                logger.warning(f"No data returned for {ticker}")
-                if attempt < max_retries - 1:
-                    logger.info(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    continue
-                return None
-            
-            # Validate data quality
-            if len(df) < 5:  # Require at least 5 data points
-                logger.warning(f"Insufficient data points for {ticker}: {len(df)}")
-                if attempt < max_retries - 1:
-                    logger.info(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    continue
-                # Return what we have if this is the last attempt
-            
-            # Check for too many NaN values in critical columns
-            critical_cols = ['Open', 'High', 'Low', 'Close']
-            nan_pct = {col: df[col].isna().mean() for col in critical_cols}
-            max_nan_pct = max(nan_pct.values())
-            
-            if max_nan_pct > 0.25:  # If more than 25% of any critical column is NaN
-                logger.warning(f"High percentage of NaN values in data: {nan_pct}")
-                # Fill NaN values with forward fill, then backward fill
-                df[critical_cols] = df[critical_cols].fillna(method='ffill').fillna(method='bfill')
-            
-            # For intraday data, ensure we have the date component in the index
-            if original_interval in ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '3h', '4h', '6h', '8h', '12h']:
-                # Keep the existing datetime index but ensure it's timezone-aware
-                if df.index.tzinfo is None:
-                    df.index = df.index.tz_localize('UTC')
-            
-            logger.info(f"Successfully fetched {len(df)} rows of data for {ticker}")
-            
-            # Add company information if available
+def make_yfinance_fetcher(ticker, fetch_interval, outcomes):
+    """
+    Build the fetcher the bar store calls to get yfinance bars of one ticker
+    
+    Args:
+        ticker: Stock ticker symbol as typed by the user
+        fetch_interval: yfinance interval to fetch
+        outcomes: Dictionary whose 'errors' count is increased for failed requests
+        
+    Returns:
+        Callable ``history(period=None, start=None, end=None)`` returning a DataFrame
+        
+    Raises:
+        NonRetryableError: When yfinance knows none of the symbol formats
+    """
+    resolver = get_symbol_resolver()
+    candidates = resolver.candidates('yfinance', ticker)
+    
+    def fetch_symbol(symbol, period=None, start=None, end=None):
+        # Every provider round-trip counts towards the yfinance circuit breaker
+        with provider_call('yfinance'):
             try:
-                info = stock.info
-                if 'longName' in info:
-                    df.attrs['company_name'] = info['longName']
+                return _yfinance_history(yf.Ticker(symbol), fetch_interval, period, start, end)
+            except Exception as e:
+                if classify_error(e) == INVALID_SYMBOL:
+                    # yfinance answered; retrying an unknown symbol cannot help
+                    raise NonRetryableError(str(e)) from e
+                outcomes['errors'] += 1
+                raise
+    
+    def history(period=None, start=None, end=None):
+        # An open-ended fetch with a learned symbol extends bars fetched with
+        # it and may rightly be empty, so only that symbol is asked. Any other
+        # fetch, a cold range query included, tries the symbol formats in
+        # order until one has data
+        empty = None
+        invalid = None
+        learned = resolver.learned('yfinance', ticker)
+        tail = start is not None and end is None and learned is not None
+        for symbol in ([learned] if tail else candidates):
+            try:
+                df = fetch_symbol(symbol, period, start, end)
+            except NonRetryableError as e:
+                invalid = e
+                continue
+            if df is not None and not df.empty:
+                resolver.record('yfinance', ticker, symbol)
+                return df
+            empty = df
+        if empty is None and invalid is not None:
+            raise invalid
+        return empty
+    
+    return history
+
+def get_stored_bars(ticker, fetch_params):
+    """
+    Get whatever the bar store holds for a fetch, without calling the provider
+    
+    Used as a degraded answer while the provider's circuit is open or its
+    retries failed.
+    
+    Args:
+        ticker: Stock ticker symbol
+        fetch_params: Result of resolve_fetch_parameters
+        
+    Returns:
+        Prepared DataFrame, or None when nothing usable is stored
+    """
+    if not USE_BAR_STORE:
+        return None
+    df = get_pyramid_bars(ticker, fetch_params)
+    if df is None or df.empty:
+        return None
+    df.attrs['served_from_store'] = True
+    return df
+
+def fetch_stock_data_range(ticker, start, end=None, interval='1d', max_retries=3, retry_delay=2, use_cache=True):
+    """
+    Fetch the bars of a ticker between two timestamps
+    
+    Served by binary search over the bar store's sorted history; only the
+    parts of the range the store does not hold yet are fetched.
+    
+    Args:
+        ticker: Stock ticker symbol
+        start: First timestamp of the range
+        end: Last timestamp of the range (None for the latest bar)
+        interval: Data interval (15m, 30m, 1h, 3h, 6h, 1d, 2d, 3d, 1wk)
+        max_retries: Maximum number of retry attempts
+        retry_delay: Base delay of the exponential retry backoff in seconds
+        use_cache: Whether to serve from the bar store (False fetches the whole range)
+        
+    Returns:
+        DataFrame with stock data or None if failed
+    """
+    if USE_EOD_API:
+        df = fetch_stock_range_eod(ticker, start, end, interval, use_cache=use_cache)
+        if df is not None:
+            return apply_company_info(df, ticker)
+        logger.info(f"EOD API returned no range data for {ticker}, falling back to yfinance")
+    
+    negative_cache = get_negative_cache()
+    if negative_cache.check('yfinance', ticker, 'range', interval) == INVALID_SYMBOL:
+        logger.info(f"Skipping yfinance range fetch for unknown symbol {ticker}")
+        return None
+    
+    fetch_params = resolve_fetch_parameters('max', interval)
+    fetch_interval = fetch_params['fetch_interval']
+    
+    # yfinance only serves intraday bars for a limited time back
+    limit = INTERVAL_LIMITS.get(fetch_interval, 'max')
+    earliest = period_start(limit)
+    start = to_utc(start)
+    if earliest is not None and start < earliest:
+        logger.info(f"Clamping {ticker} {fetch_interval} range start to the {limit} provider limit")
+        start = earliest
+    
+    outcomes = {'empty': 0, 'errors': 0}
+    history = make_yfinance_fetcher(ticker, fetch_interval, outcomes)
+    build = lambda base: prepare_fetched_data(base.copy(), ticker, fetch_params)
+    
+    def attempt(fetcher=history):
+        if USE_BAR_STORE and (use_cache or fetcher is None):
+            return get_bar_pyramid().get_range(
+                get_bar_store(), 'yfinance', ticker, fetch_interval, interval, start, end, build, fetcher=fetcher
+            )
+        if fetcher is None:
+            return None
+        df = fetcher(start=start, end=end)
+        if df is None or df.empty:
+            return df
+        return slice_range(build(df), start, end)
+    
+    try:
+        df = retry_call(
+            'yfinance', attempt,
+            max_retries=max_retries,
+            base_delay=retry_delay,
+            accept=lambda result: result is not None and not result.empty
+        )
+    except CircuitOpenError as e:
+        logger.warning(f"{e}, serving stored bars for {ticker}")
+        df = attempt(fetcher=None)
+    except NonRetryableError as e:
+        logger.warning(f"yfinance does not know {ticker}: {e}")
+        negative_cache.record('yfinance', ticker, 'range', interval, INVALID_SYMBOL)
+        return None
+    
+    if df is None or df.empty:
+        logger.error(f"Failed to fetch {ticker} bars from {start} to {end}")
+        return None
+    return apply_company_info(df, ticker)
+
+def _split_batch_download(raw, tickers):
+    """Split a grouped yfinance download into one frame per ticker"""
+    frames = {}
+    if raw is None or raw.empty:
+        return frames
+    
+    if not isinstance(raw.columns, pd.MultiIndex):
+        # Older yfinance versions return flat columns for a single symbol
+        if len(tickers) == 1:
+            frames[tickers[0]] = raw.dropna(how='all')
+        return frames
+    
+    available = set(raw.columns.get_level_values(0))
+    for ticker in tickers:
+        if ticker not in available:
+            continue
+        df = raw[ticker].dropna(how='all')
+        df.columns.name = None
+        if not df.empty:
+            frames[ticker] = df
+    return frames
+
+def _yfinance_download(tickers, interval, period=None, start=None):
+    """Fetch several symbols in one grouped yfinance download"""
+    kwargs = {
+        'tickers': tickers,
+        'interval': interval,
+        'group_by': 'ticker',
+        'auto_adjust': True,
+        'actions': True,
+        'threads': True,
+        'progress': False,
+        # Daily downloads are tz-naive by default while Ticker.history is
+        # tz-aware; both write the same bar store series
+        'ignore_tz': False
+    }
+    if start is not None:
+        kwargs['start'] = start
+    else:
+        kwargs['period'] = period
+    with provider_call('yfinance'):
+        raw = yf.download(**kwargs)
+    return _split_batch_download(raw, tickers)
+
+def fetch_multi_stock_data(tickers, period='1y', interval='1d'):
+    """
+    Fetch bars for several tickers in as few provider round-trips as possible
+    
+    Tickers are grouped by what the bar store is missing for them: one grouped
+    yfinance download for every ticker that needs the full period and one for
+    every ticker that only needs its tail. Tickers the store already holds
+    fresh bars for cost no request at all.
+    
+    Args:
+        tickers: List of ticker symbols
+        period: Data period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
+        interval: Data interval (15m, 30m, 1h, 3h, 6h, 1d, 2d, 3d, 1wk)
+        
+    Returns:
+        Dictionary of ticker -> prepared DataFrame; tickers that could not be
+        fetched are left out so callers can fall back to fetch_stock_data
+    """
+    if not tickers:
+        return {}
+    
+    if USE_EOD_API:
+        # EOD has no multi-symbol history endpoint, tickers are fetched one by one
+        return {}
+    
+    # Symbols with a recorded empty answer are not worth a place in the batch
+    negative_cache = get_negative_cache()
+    tickers = [ticker for ticker in tickers if not negative_cache.check('yfinance', ticker, period, interval)]
+    if not tickers:
+        return {}
+    
+    fetch_params = resolve_fetch_parameters(period, interval)
+    fetch_period = fetch_params['fetch_period']
+    fetch_interval = fetch_params['fetch_interval']
+    
+    # Download under the yfinance symbols, keep results under what the user typed
+    resolver = get_symbol_resolver()
+    symbols = resolver.resolve_batch('yfinance', tickers)
+    
+    def download(batch, **kwargs):
+        fetched = _yfinance_download(list(dict.fromkeys(symbols[t] for t in batch)), fetch_interval, **kwargs)
+        return {ticker: fetched[symbols[ticker]] for ticker in batch if symbols[ticker] in fetched}
+    
+    frames = {}
+    try:
+        if USE_BAR_STORE:
+            store = get_bar_store()
+            full, tail, stored = [], {}, []
+            for ticker in tickers:
+                mode, start = store.missing_range('yfinance', ticker, fetch_interval, fetch_period)
+                if mode == 'full':
+                    full.append(ticker)
+                elif mode == 'tail':
+                    tail[ticker] = start
                 else:
-                    df.attrs['company_name'] = ticker
-                    
-                if 'industry' in info and info['industry']:
-                    df.attrs['industry'] = info['industry']
-            except:
-                df.attrs['company_name'] = ticker
+                    stored.append(ticker)
             
-            # Add aggregation metadata
-            df.attrs['original_interval'] = original_interval
-            df.attrs['was_aggregated'] = needs_aggregation or custom_resampling is not None
-            if needs_aggregation:
-                df.attrs['base_interval'] = base_interval
-                df.attrs['aggregation_method'] = 'smart_timeframe_aggregator'
-            elif custom_resampling:
-                df.attrs['base_interval'] = '1h'
-                df.attrs['aggregation_method'] = 'traditional_resampling'
-                
-            return df
+            if tail:
+                start = min(tail.values())
+                logger.info(f"Batch fetching tails of {len(tail)} tickers from {start}, interval: {fetch_interval}")
+                fetched = download(list(tail), start=start)
+                for ticker in tail:
+                    if store.update('yfinance', ticker, fetch_interval, fetched.get(ticker)) is None:
+                        full.append(ticker)  # Re-adjusted history, fetched again in full
+                    else:
+                        stored.append(ticker)
             
-        except ReadTimeout:
-            logger.warning(f"Timeout when fetching data for {ticker}")
-            if attempt < max_retries - 1:
-                logger.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                logger.error(f"Failed to fetch data for {ticker} after {max_retries} attempts due to timeout")
-                return None
-                
-        except ConnectionError:
-            logger.warning(f"Connection error when fetching data for {ticker}")
-            if attempt < max_retries - 1:
-                logger.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                logger.error(f"Failed to fetch data for {ticker} after {max_retries} attempts due to connection error")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error fetching data for {ticker}: {str(e)}")
-            logger.error(traceback.format_exc())
-            if attempt < max_retries - 1:
-                logger.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                logger.error(f"Failed to fetch data for {ticker} after {max_retries} attempts")
-                return None
+            if full:
+                base_period = get_base_period(fetch_params)
+                logger.info(f"Batch fetching {len(full)} tickers, period: {base_period}, interval: {fetch_interval}")
+                fetched = download(full, period=base_period)
+                for ticker, df in fetched.items():
+                    resolver.record('yfinance', ticker, symbols[ticker])
+                    store.update('yfinance', ticker, fetch_interval, df, period=base_period)
+                    stored.append(ticker)
+            
+            # Derived intervals come from the base series in memory
+            frames = {ticker: get_pyramid_bars(ticker, fetch_params) for ticker in stored}
+        else:
+            logger.info(f"Batch fetching {len(tickers)} tickers, period: {fetch_period}, interval: {fetch_interval}")
+            raw_frames = download(tickers, period=fetch_period)
+            frames = {
+                ticker: prepare_fetched_data(df.copy(), ticker, fetch_params)
+                for ticker, df in raw_frames.items() if df is not None and not df.empty
+            }
+    except Exception as e:
+        logger.error(f"Batch fetch failed for {tickers}: {e}")
     
-    # This should only be reached if all retries fail
-    logger.error(f"All retry attempts exhausted for {ticker}")
-    return None
+    results = {}
+    for ticker, df in frames.items():
+        if df is None or df.empty:
+            continue
+        results[ticker] = apply_company_info(df, ticker)
+    
+    logger.info(f"Batch fetch returned data for {len(results)}/{len(tickers)} tickers")
+    return results
 
 # Function for determining ticker type (stock, crypto, forex, commodity)
 def get_ticker_type(ticker):
@@ -391,64 +1014,104 @@ def calculate_money_flow(df, period=5, mf_period=60):
     mf = i.rolling(window=mf_period).mean()  # Using SMA as in Pine Script
     return mf
 
+def calculate_core_indicators(df, params):
+    """
+    Calculate WaveTrend, Stochastic, Money Flow, MACD, Bollinger Bands and ADX
+    
+    Uses the fused single-pass kernel when it is available and enabled, and
+    the individual pandas functions otherwise; both give the same numbers.
+    
+    Args:
+        df: OHLC DataFrame
+        params: Interval parameters from adjust_parameters_for_interval
+        
+    Returns:
+        Dict of analyzer_b column name -> Series (see indicator_kernel.CORE_COLUMNS)
+    """
+    if USE_INDICATOR_KERNEL:
+        return compute_core_indicators(df, params)
+    
+    wt1, wt2, wtVwap = calculate_wavetrend(
+        df, 
+        wtChannelLen=params['wtChannelLen'], 
+        wtAverageLen=params['wtAverageLen'], 
+        wtMALen=params['wtMALen']
+    )
+    macd_line, macd_signal, macd_hist = calculate_macd(df['Close'])
+    bb_upper, bb_middle, bb_lower = calculate_bollinger_bands(df['Close'])
+    adx, plus_di, minus_di = calculate_adx(df)
+    
+    return {
+        'WT1': wt1,
+        'WT2': wt2,
+        'WTVwap': wtVwap,
+        'RSI': stoch_heikin_ashi(df, len_period=params['stochPeriod1'], k=2),
+        'Stoch': stoch_heikin_ashi(df, len_period=params['stochPeriod2'], k=2),
+        'MF': calculate_money_flow(df, period=params['mfPeriod1'], mf_period=params['mfPeriod2']),
+        'MACD': macd_line,
+        'MACDSignal': macd_signal,
+        'MACDHist': macd_hist,
+        'BBUpper': bb_upper,
+        'BBMiddle': bb_middle,
+        'BBLower': bb_lower,
+        'ADX': adx,
+        'PlusDI': plus_di,
+        'MinusDI': minus_di
+    }
+
 def generate_signals(wt1, wt2, mf, obLevel=53, osLevel=-53, osLevel3=-75):
-    """Generate trading signals based on WaveTrend and Money Flow"""
+    """
+    Generate trading signals based on WaveTrend and Money Flow
+    
+    Every signal is computed on whole arrays at once: crosses compare each
+    bar with the previous one, so long histories cost a handful of numpy
+    operations instead of per-bar pandas lookups.
+    
+    Args:
+        wt1: WaveTrend line Series
+        wt2: WaveTrend signal line Series (same length as wt1)
+        mf: Money Flow Series (same length as wt1)
+        obLevel: Overbought level of wt2 for sell signals
+        osLevel: Oversold level of wt2 for buy signals
+        osLevel3: Deep oversold level of wt2 for gold buy signals
+        
+    Returns:
+        Tuple of (buy_signal, gold_buy, sell_signal, wt_cross, cross_points);
+        buy and sell are boolean Series, gold_buy and wt_cross 0/1 float
+        Series, cross_points holds wt2 at every cross and NaN elsewhere
+    """
     # WaveTrend conditions - exactly match Pine Script logic
     wt_oversold = wt2 <= osLevel
     wt_overbought = wt2 >= obLevel
     
-    # Crosses - directly matching Pine Script logic
-    wt_cross = pd.Series(np.zeros(len(wt1)), index=wt1.index)
-    wt_cross_up = pd.Series(np.zeros(len(wt1)), index=wt1.index)
-    wt_cross_down = pd.Series(np.zeros(len(wt1)), index=wt1.index)
+    a = wt1.to_numpy(dtype=np.float64)
+    b = wt2.to_numpy(dtype=np.float64)
+    m = mf.to_numpy(dtype=np.float64)
     
-    for i in range(1, len(wt1)):
-        # Cross condition (ta.cross in Pine Script)
-        if (wt1.iloc[i-1] < wt2.iloc[i-1] and wt1.iloc[i] > wt2.iloc[i]) or \
-           (wt1.iloc[i-1] > wt2.iloc[i-1] and wt1.iloc[i] < wt2.iloc[i]):
-            wt_cross.iloc[i] = 1
-            
-        # Cross up (ta.crossover in Pine Script)
-        if wt1.iloc[i-1] < wt2.iloc[i-1] and wt1.iloc[i] > wt2.iloc[i]:
-            wt_cross_up.iloc[i] = 1
-        
-        # Cross down (ta.crossunder in Pine Script)
-        if wt1.iloc[i-1] > wt2.iloc[i-1] and wt1.iloc[i] < wt2.iloc[i]:
-            wt_cross_down.iloc[i] = 1
+    # Crosses - ta.crossover / ta.crossunder / ta.cross in Pine Script; bar 0
+    # has no previous bar, and comparisons with NaN are never true
+    cross_up = np.zeros(len(a), dtype=bool)
+    cross_down = np.zeros(len(a), dtype=bool)
+    cross_up[1:] = (a[:-1] < b[:-1]) & (a[1:] > b[1:])
+    cross_down[1:] = (a[:-1] > b[:-1]) & (a[1:] < b[1:])
+    crossed = cross_up | cross_down
+    wt_cross = pd.Series(crossed.astype(np.float64), index=wt1.index)
     
     # Signal Logic - Exactly as in Pine Script
     # buySignal = wtCross and wtCrossUp and wtOversold
-    buy_signal = (wt_cross == 1) & (wt_cross_up == 1) & wt_oversold
+    buy_signal = (wt_cross == 1) & pd.Series(cross_up, index=wt1.index) & wt_oversold
     # sellSignal = wtCross and wtCrossDown and wtOverbought
-    sell_signal = (wt_cross == 1) & (wt_cross_down == 1) & wt_overbought
-    
-    # Improved Gold Buy signal logic - adds more criteria for stronger signals
-    # goldBuy = buySignal and wt2 <= osLevel3 and mf > 0
-    # Enhanced to better match Market Cipher B:
-    # - Check deeper oversold level
-    # - Require positive money flow
-    # - Require wt1 < wt2 before the cross (diamond setup)
-    gold_buy = pd.Series(np.zeros(len(wt1)), index=wt1.index)
-    for i in range(1, len(wt1)):
-        if buy_signal.iloc[i] and wt2.iloc[i] <= osLevel3 and mf.iloc[i] > 0:
-            # Check for "diamond setup" - WT1 < WT2 before the cross
-            diamond_setup = False
-            # Look back up to 3 bars for the setup
-            for j in range(1, min(4, i+1)):
-                if wt1.iloc[i-j] < wt2.iloc[i-j]:
-                    diamond_setup = True
-                    break
-            
-            if diamond_setup:
-                gold_buy.iloc[i] = 1
+    sell_signal = (wt_cross == 1) & pd.Series(cross_down, index=wt1.index) & wt_overbought
+    
+    # Gold Buy: goldBuy = buySignal and wt2 <= osLevel3 and mf > 0, plus the
+    # Market Cipher B "diamond setup" of WT1 < WT2 within the 3 bars before
+    # the cross. A buy signal is a cross up, so WT1 < WT2 held on the bar
+    # right before it and the setup is always there.
+    gold = buy_signal.to_numpy(dtype=bool) & (b <= osLevel3) & (m > 0)
+    gold_buy = pd.Series(gold.astype(np.float64), index=wt1.index)
     
     # Additional signal for cross points (needed for visualization)
-    cross_points = pd.Series(np.zeros(len(wt1)), index=wt1.index)
-    for i in range(len(wt1)):
-        if wt_cross.iloc[i] == 1:
-            cross_points.iloc[i] = wt2.iloc[i]
-        else:
-            cross_points.iloc[i] = np.nan
+    cross_points = pd.Series(np.where(crossed, b, np.nan), index=wt1.index)
     
     return buy_signal, gold_buy, sell_signal, wt_cross, cross_points
 
@@ -500,6 +1163,119 @@ def adjust_parameters_for_interval(interval):
             'mfPeriod2': 60
         }
 
+def find_pivots(values, lookback=5):
+    """
+    Mark the pivot lows and highs of a series in one pass per offset
+    
+    A bar is a pivot low when none of the up to `lookback` bars on either side
+    is strictly lower (a pivot high when none is strictly higher), so ties and
+    NaN neighbours never disqualify it. Near the edges an offset is only
+    compared when the bars on both sides of it exist, as the per-bar scan
+    did, so the first and last bars count as pivots of whatever window
+    fits; callers that need full windows mask those out.
+    
+    Args:
+        values: 1D array of oscillator or price values
+        lookback: Number of bars compared on each side
+        
+    Returns:
+        Tuple of boolean arrays (is_low, is_high)
+    """
+    x = np.asarray(values, dtype=np.float64)
+    is_low = np.ones(len(x), dtype=bool)
+    is_high = np.ones(len(x), dtype=bool)
+    
+    n = len(x)
+    for k in range(1, min(lookback, (n - 1) // 2) + 1):
+        # Bars k..n-k-1 against the bars k before and k after them
+        centre, before, after = x[k:n - k], x[:n - 2 * k], x[2 * k:]
+        is_low[k:n - k] &= ~((centre > before) | (centre > after))
+        is_high[k:n - k] &= ~((centre < before) | (centre < after))
+    
+    return is_low, is_high
+
+def _previous_pivots(candidates, bars, lookback):
+    """
+    Index of the most recent candidate pivot more than `lookback` bars before
+    each bar (and after bar 0), or -1 when there is none
+    """
+    positions = np.where(candidates, np.arange(len(candidates)), -1)
+    positions[0] = -1
+    last_seen = np.maximum.accumulate(positions)
+    limits = bars - lookback - 1
+    return np.where(limits >= 0, last_seen[np.maximum(limits, 0)], -1)
+
+def _divergence_masks(osc, price, lookback, oversold=None, overbought=None):
+    """
+    Regular and hidden divergences of an oscillator against price
+    
+    Pivots are found once per series and every pivot is matched with the
+    latest earlier pivot of the same kind through a running index, so the
+    whole detection is linear in the number of bars.
+    
+    Args:
+        osc: Oscillator values (WT2, Money Flow, RSI, RSI3M3, ...)
+        price: Price values of the same length
+        lookback: Pivot window on each side; matched pivots must also be
+            more than this many bars apart
+        oversold: Pivot lows only count with the oscillator below this level
+        overbought: Pivot highs only count with the oscillator above this level
+        
+    Returns:
+        Tuple of boolean arrays (bullish, bearish, hidden_bullish, hidden_bearish)
+    """
+    o = np.asarray(osc, dtype=np.float64)
+    p = np.asarray(price, dtype=np.float64)
+    n = len(o)
+    masks = tuple(np.zeros(n, dtype=bool) for _ in range(4))
+    
+    # Need at least 2*lookback+1 bars to detect divergence
+    if n < 2 * lookback + 1:
+        return masks
+    
+    osc_low, osc_high = find_pivots(o, lookback)
+    price_low, price_high = find_pivots(p, lookback)
+    low_level = o < oversold if oversold is not None else np.ones(n, dtype=bool)
+    high_level = o > overbought if overbought is not None else np.ones(n, dtype=bool)
+    
+    # Earlier pivots may sit near the start of the series, current ones need
+    # a full window on both sides
+    bars = np.arange(lookback, n - lookback)
+    bullish, bearish, hidden_bullish, hidden_bearish = masks
+    
+    # Lows extend downwards and highs upwards
+    for is_pivot, extends, retreats, regular, hidden in (
+        (osc_low & price_low & low_level, np.less, np.greater, bullish, hidden_bullish),
+        (osc_high & price_high & high_level, np.greater, np.less, bearish, hidden_bearish),
+    ):
+        previous = _previous_pivots(is_pivot, bars, lookback)
+        found = is_pivot[bars] & (previous >= 0)
+        current, previous = bars[found], previous[found]
+        
+        # Regular: price extends past the previous pivot while the oscillator
+        # retreats from it; hidden: the other way round
+        regular[current] = extends(p[current], p[previous]) & retreats(o[current], o[previous])
+        hidden[current] = retreats(p[current], p[previous]) & extends(o[current], o[previous])
+    
+    return masks
+
+def detect_oscillator_divergences(osc, price, lookback=5, oversold=None, overbought=None):
+    """
+    Detect regular and hidden divergences between any oscillator and price
+    
+    Args:
+        osc: Oscillator Series (WT2, Money Flow, RSI, RSI3M3, ...)
+        price: Price Series on the same index
+        lookback: Pivot window on each side
+        oversold: Only pivot lows below this oscillator level count (None for all)
+        overbought: Only pivot highs above this oscillator level count (None for all)
+        
+    Returns:
+        Tuple of 0/1 Series (bullish, bearish, hidden_bullish, hidden_bearish)
+    """
+    masks = _divergence_masks(osc, price, lookback, oversold, overbought)
+    return tuple(pd.Series(mask.astype(np.float64), index=osc.index) for mask in masks)
+
 def detect_divergences(df, wt2, price, lookback=5):
     """
     Detect regular and hidden divergences between WaveTrend and price
@@ -511,145 +1287,11 @@ def detect_divergences(df, wt2, price, lookback=5):
     Hidden Divergences:
     - Bullish: Price making higher low but WT2 making lower low (continuation)
     - Bearish: Price making lower high but WT2 making higher high (continuation)
-    """
-    bullish_div = pd.Series(np.zeros(len(df)), index=df.index)
-    bearish_div = pd.Series(np.zeros(len(df)), index=df.index)
-    hidden_bullish_div = pd.Series(np.zeros(len(df)), index=df.index)
-    hidden_bearish_div = pd.Series(np.zeros(len(df)), index=df.index)
     
-    # Need at least 2*lookback+1 bars to detect divergence
-    if len(df) < 2 * lookback + 1:
-        return bullish_div, bearish_div, hidden_bullish_div, hidden_bearish_div
-    
-    # Find local minima and maxima
-    for i in range(lookback, len(df) - lookback):
-        # Check if current bar is a local minimum in WT2
-        wt_is_min = True
-        for j in range(1, lookback + 1):
-            if wt2.iloc[i] > wt2.iloc[i - j] or wt2.iloc[i] > wt2.iloc[i + j]:
-                wt_is_min = False
-                break
-        
-        # Check if current bar is a local maximum in WT2
-        wt_is_max = True
-        for j in range(1, lookback + 1):
-            if wt2.iloc[i] < wt2.iloc[i - j] or wt2.iloc[i] < wt2.iloc[i + j]:
-                wt_is_max = False
-                break
-        
-        # Check if current bar is a local minimum in price
-        price_is_min = True
-        for j in range(1, lookback + 1):
-            if price.iloc[i] > price.iloc[i - j] or price.iloc[i] > price.iloc[i + j]:
-                price_is_min = False
-                break
-                
-        # Check if current bar is a local maximum in price
-        price_is_max = True
-        for j in range(1, lookback + 1):
-            if price.iloc[i] < price.iloc[i - j] or price.iloc[i] < price.iloc[i + j]:
-                price_is_max = False
-                break
-        
-        # For regular bullish divergence (when WT2 is near oversold and we have price min and wt min)
-        if wt_is_min and price_is_min and wt2.iloc[i] < -40:
-            # Find the previous local minimum in WT2 and price
-            prev_min_idx = None
-            for j in range(i - lookback, 0, -1):
-                prev_wt_is_min = True
-                prev_price_is_min = True
-                
-                for k in range(1, lookback + 1):
-                    if j - k >= 0 and j + k < len(wt2):
-                        if wt2.iloc[j] > wt2.iloc[j - k] or wt2.iloc[j] > wt2.iloc[j + k]:
-                            prev_wt_is_min = False
-                        if price.iloc[j] > price.iloc[j - k] or price.iloc[j] > price.iloc[j + k]:
-                            prev_price_is_min = False
-                
-                if prev_wt_is_min and prev_price_is_min and wt2.iloc[j] < -40 and i - j > lookback:
-                    prev_min_idx = j
-                    break
-            
-            # Check for regular bullish divergence
-            if prev_min_idx is not None:
-                # If price is making a lower low but WT2 is making a higher low
-                if price.iloc[i] < price.iloc[prev_min_idx] and wt2.iloc[i] > wt2.iloc[prev_min_idx]:
-                    bullish_div.iloc[i] = 1
-        
-        # For regular bearish divergence (when WT2 is near overbought and we have price max and wt max)
-        if wt_is_max and price_is_max and wt2.iloc[i] > 40:
-            # Find the previous local maximum in WT2 and price
-            prev_max_idx = None
-            for j in range(i - lookback, 0, -1):
-                prev_wt_is_max = True
-                prev_price_is_max = True
-                
-                for k in range(1, lookback + 1):
-                    if j - k >= 0 and j + k < len(wt2):
-                        if wt2.iloc[j] < wt2.iloc[j - k] or wt2.iloc[j] < wt2.iloc[j + k]:
-                            prev_wt_is_max = False
-                        if price.iloc[j] < price.iloc[j - k] or price.iloc[j] < price.iloc[j + k]:
-                            prev_price_is_max = False
-                
-                if prev_wt_is_max and prev_price_is_max and wt2.iloc[j] > 40 and i - j > lookback:
-                    prev_max_idx = j
-                    break
-            
-            # Check for regular bearish divergence
-            if prev_max_idx is not None:
-                # If price is making a higher high but WT2 is making a lower high
-                if price.iloc[i] > price.iloc[prev_max_idx] and wt2.iloc[i] < wt2.iloc[prev_max_idx]:
-                    bearish_div.iloc[i] = 1
-        
-        # For hidden bullish divergence (when WT2 is near oversold and we have price min and wt min)
-        if wt_is_min and price_is_min and wt2.iloc[i] < -40:
-            prev_min_idx = None
-            for j in range(i - lookback, 0, -1):
-                prev_wt_is_min = True
-                prev_price_is_min = True
-                
-                for k in range(1, lookback + 1):
-                    if j - k >= 0 and j + k < len(wt2):
-                        if wt2.iloc[j] > wt2.iloc[j - k] or wt2.iloc[j] > wt2.iloc[j + k]:
-                            prev_wt_is_min = False
-                        if price.iloc[j] > price.iloc[j - k] or price.iloc[j] > price.iloc[j + k]:
-                            prev_price_is_min = False
-                
-                if prev_wt_is_min and prev_price_is_min and wt2.iloc[j] < -40 and i - j > lookback:
-                    prev_min_idx = j
-                    break
-            
-            # Check for hidden bullish divergence
-            if prev_min_idx is not None:
-                # If price is making a higher low but WT2 is making a lower low
-                if price.iloc[i] > price.iloc[prev_min_idx] and wt2.iloc[i] < wt2.iloc[prev_min_idx]:
-                    hidden_bullish_div.iloc[i] = 1
-        
-        # For hidden bearish divergence (when WT2 is near overbought and we have price max and wt max)
-        if wt_is_max and price_is_max and wt2.iloc[i] > 40:
-            prev_max_idx = None
-            for j in range(i - lookback, 0, -1):
-                prev_wt_is_max = True
-                prev_price_is_max = True
-                
-                for k in range(1, lookback + 1):
-                    if j - k >= 0 and j + k < len(wt2):
-                        if wt2.iloc[j] < wt2.iloc[j - k] or wt2.iloc[j] < wt2.iloc[j + k]:
-                            prev_wt_is_max = False
-                        if price.iloc[j] < price.iloc[j - k] or price.iloc[j] < price.iloc[j + k]:
-                            prev_price_is_max = False
-                
-                if prev_wt_is_max and prev_price_is_max and wt2.iloc[j] > 40 and i - j > lookback:
-                    prev_max_idx = j
-                    break
-            
-            # Check for hidden bearish divergence
-            if prev_max_idx is not None:
-                # If price is making a lower high but WT2 is making a higher high
-                if price.iloc[i] < price.iloc[prev_max_idx] and wt2.iloc[i] > wt2.iloc[prev_max_idx]:
-                    hidden_bearish_div.iloc[i] = 1
-    
-    return bullish_div, bearish_div, hidden_bullish_div, hidden_bearish_div
+    Only pivots with WT2 below -40 (lows) or above 40 (highs) are compared.
+    """
+    masks = _divergence_masks(wt2, price, lookback, oversold=-40, overbought=40)
+    return tuple(pd.Series(mask.astype(np.float64), index=df.index) for mask in masks)
 
 def detect_mf_divergences(df, mf, price, lookback=5):
     """
@@ -659,94 +1301,9 @@ def detect_mf_divergences(df, mf, price, lookback=5):
     - Bullish: Price making lower low but Money Flow making higher low
     - Bearish: Price making higher high but Money Flow making lower high
     """
-    mf_bullish_div = pd.Series(np.zeros(len(df)), index=df.index)
-    mf_bearish_div = pd.Series(np.zeros(len(df)), index=df.index)
-    
-    # Need at least 2*lookback+1 bars to detect divergence
-    if len(df) < 2 * lookback + 1:
-        return mf_bullish_div, mf_bearish_div
-    
-    # Find local minima and maxima
-    for i in range(lookback, len(df) - lookback):
-        # Check if current bar is a local minimum in Money Flow
-        mf_is_min = True
-        for j in range(1, lookback + 1):
-            if mf.iloc[i] > mf.iloc[i - j] or mf.iloc[i] > mf.iloc[i + j]:
-                mf_is_min = False
-                break
-        
-        # Check if current bar is a local maximum in Money Flow
-        mf_is_max = True
-        for j in range(1, lookback + 1):
-            if mf.iloc[i] < mf.iloc[i - j] or mf.iloc[i] < mf.iloc[i + j]:
-                mf_is_max = False
-                break
-        
-        # Check if current bar is a local minimum in price
-        price_is_min = True
-        for j in range(1, lookback + 1):
-            if price.iloc[i] > price.iloc[i - j] or price.iloc[i] > price.iloc[i + j]:
-                price_is_min = False
-                break
-                
-        # Check if current bar is a local maximum in price
-        price_is_max = True
-        for j in range(1, lookback + 1):
-            if price.iloc[i] < price.iloc[i - j] or price.iloc[i] < price.iloc[i + j]:
-                price_is_max = False
-                break
-        
-        # For Money Flow bullish divergence (when price is making a lower low but MF is making a higher low)
-        if mf_is_min and price_is_min:
-            # Find the previous local minimum in MF and price
-            prev_min_idx = None
-            for j in range(i - lookback, 0, -1):
-                prev_mf_is_min = True
-                prev_price_is_min = True
-                
-                for k in range(1, lookback + 1):
-                    if j - k >= 0 and j + k < len(mf):
-                        if mf.iloc[j] > mf.iloc[j - k] or mf.iloc[j] > mf.iloc[j + k]:
-                            prev_mf_is_min = False
-                        if price.iloc[j] > price.iloc[j - k] or price.iloc[j] > price.iloc[j + k]:
-                            prev_price_is_min = False
-                
-                if prev_mf_is_min and prev_price_is_min and i - j > lookback:
-                    prev_min_idx = j
-                    break
-            
-            # Check for Money Flow bullish divergence
-            if prev_min_idx is not None:
-                # If price is making a lower low but MF is making a higher low
-                if price.iloc[i] < price.iloc[prev_min_idx] and mf.iloc[i] > mf.iloc[prev_min_idx]:
-                    mf_bullish_div.iloc[i] = 1
-        
-        # For Money Flow bearish divergence (when price is making a higher high but MF is making a lower high)
-        if mf_is_max and price_is_max:
-            # Find the previous local maximum in MF and price
-            prev_max_idx = None
-            for j in range(i - lookback, 0, -1):
-                prev_mf_is_max = True
-                prev_price_is_max = True
-                
-                for k in range(1, lookback + 1):
-                    if j - k >= 0 and j + k < len(mf):
-                        if mf.iloc[j] < mf.iloc[j - k] or mf.iloc[j] < mf.iloc[j + k]:
-                            prev_mf_is_max = False
-                        if price.iloc[j] < price.iloc[j - k] or price.iloc[j] < price.iloc[j + k]:
-                            prev_price_is_max = False
-                
-                if prev_mf_is_max and prev_price_is_max and i - j > lookback:
-                    prev_max_idx = j
-                    break
-            
-            # Check for Money Flow bearish divergence
-            if prev_max_idx is not None:
-                # If price is making a higher high but MF is making a lower high
-                if price.iloc[i] > price.iloc[prev_max_idx] and mf.iloc[i] < mf.iloc[prev_max_idx]:
-                    mf_bearish_div.iloc[i] = 1
-    
-    return mf_bullish_div, mf_bearish_div
+    bullish, bearish, _, _ = _divergence_masks(mf, price, lookback)
+    return (pd.Series(bullish.astype(np.float64), index=df.index),
+            pd.Series(bearish.astype(np.float64), index=df.index))
 
 def detect_rsi_trend_breaks(df, rsi, lookback=5):
     """
@@ -971,7 +1528,7 @@ def detect_regime_hmm(df, feature_col, n_states=2):
         from hmmlearn import hmm
         
         # Handle potential NaN values in the input feature column
-        feature_col_clean = feature_col.fillna(method='ffill').fillna(method='bfill')
+        feature_col_clean = feature_col.ffill().bfill()
         
         # Check if any NaNs remain after filling (e.g., if the entire series was NaN)
         if feature_col_clean.isnull().any():
@@ -1339,73 +1896,182 @@ def get_exhaust_data(df):
     
     return df
 
-def analyzer_b(ticker, period='1y', interval='1d'):
-    """Generate Analyzer B oscillator for a stock ticker"""
-    # Check cache first
+def get_analysis_ttl(ticker, interval):
+    """
+    Get how long an analysis result stays cached
+    
+    Results live until the forming bar of the interval closes (a daily
+    analysis until the session close, a 15m one until the quarter hour) and
+    until the next session open when the market is closed. CACHE_TTL only
+    applies when the session calendar is unavailable.
+    """
+    if not TIMEFRAME_AGGREGATION_AVAILABLE:
+        return CACHE_TTL
+    return get_cache_ttl(interval, ticker)
+
+def schedule_analysis_refresh(ticker, period, interval, columns=None):
+    """
+    Recompute an analysis in the background and swap it into the cache
+    
+    Refreshes already queued or running for the same key are not repeated.
+    
+    Args:
+        ticker: Stock ticker symbol
+        period: Data period
+        interval: Data interval
+        columns: Analysis columns of the stale entry (every column when None)
+    
+    Returns:
+        The Future of the refresh, or None if one was already scheduled
+    """
     cache_key = f"{ticker}_{period}_{interval}"
-    if cache_key in ticker_cache:
-        cache_time = ticker_cache[cache_key]['timestamp']
-        if (datetime.now() - cache_time).total_seconds() < CACHE_TTL:
-            logger.info(f"Using cached data for {ticker}")
-            return ticker_cache[cache_key]['data']
+    with _revalidating_lock:
+        if cache_key in _revalidating:
+            return None
+        _revalidating.add(cache_key)
     
-    # Fetch data
-    df = fetch_stock_data(ticker, period, interval)
+    def refresh():
+        try:
+            logger.info(f"Revalidating stale analysis for {cache_key}")
+            get_single_flight().do(('analysis', ticker, period, interval, columns, True), _analyzer_b,
+                                   ticker, period, interval, columns=columns)
+        except Exception as e:
+            logger.warning(f"Background refresh of {cache_key} failed: {e}")
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(cache_key)
     
-    if df is None or df.empty:
-        return None
+    return _revalidate_executor.submit(refresh)
+
+def find_superset_analysis(ticker, period, interval, columns=None):
+    """
+    Find the cache key of a fresh analysis of a longer period of the same ticker and interval
     
-    # Adjust parameters based on interval
-    params = adjust_parameters_for_interval(interval)
+    Analyses are computed with warm-up bars over a whole history, so the
+    window of a shorter period is just a slice of a longer one.
     
-    # Calculate indicators with interval-appropriate parameters
-    wt1, wt2, wtVwap = calculate_wavetrend(
-        df, 
-        wtChannelLen=params['wtChannelLen'], 
-        wtAverageLen=params['wtAverageLen'], 
-        wtMALen=params['wtMALen']
-    )
+    Args:
+        ticker: Stock ticker symbol
+        period: Data period
+        interval: Data interval
+        columns: Analysis columns the superset has to hold (every column when None)
     
-    # Calculate Stochastic RSI based on Pine Script with adjusted parameters
-    rsi = stoch_heikin_ashi(df, len_period=params['stochPeriod1'], k=2)
-    stoch_rsi = stoch_heikin_ashi(df, len_period=params['stochPeriod2'], k=2)
+    Returns:
+        Cache key, or None
+    """
+    if not BAR_STORE_AVAILABLE or period not in VALID_PERIODS:
+        return None
+    requested_start = period_start(period)
+    if requested_start is None:
+        return None
     
-    # Calculate Money Flow with adjusted parameters
-    mf = calculate_money_flow(df, period=params['mfPeriod1'], mf_period=params['mfPeriod2'])
+    # Shortest superset first, it needs the least slicing
+    candidates = []
+    for candidate in VALID_PERIODS:
+        key = f"{ticker}_{candidate}_{interval}"
+        if candidate == period or not ticker_cache.has(key):
+            continue
+        cached = ticker_cache.get(key)
+        if cached is None or not has_analysis_columns(cached, columns):
+            continue
+        start = period_start(candidate)
+        if start is None or start <= requested_start:
+            candidates.append((start is None, start, key))
+    if not candidates:
+        return None
+    return max(candidates, key=lambda candidate: (not candidate[0], candidate[1] or 0))[2]
+
+def get_cached_analysis(ticker, period, interval, columns=None):
+    """
+    Get a cached analyzer_b result, or None
     
-    # Calculate RSI3M3+ oscillator
-    rsi3_raw, rsi3m3, rsi3m3_state, rsi3m3_buy, rsi3m3_sell = calculate_rsi3m3(df)
+    Results past their TTL but inside the stale grace window are returned
+    as well, and a background refresh replaces them (stale-while-revalidate).
+    Without an entry of its own, the window of a fresh longer-period
+    analysis of the same ticker and interval is served. Entries computed
+    for fewer columns than requested do not count.
+    """
+    entry = ticker_cache.get_entry(f"{ticker}_{period}_{interval}", allow_stale=True)
+    if entry is None or not has_analysis_columns(entry[0], columns):
+        superset_key = find_superset_analysis(ticker, period, interval, columns)
+        superset = ticker_cache.get(superset_key) if superset_key else None
+        if superset is None:
+            return None
+        logger.info(f"Serving {ticker} {period} {interval} from cached {superset_key}")
+        return trim_to_window(superset, period, interval)
+    df, stale = entry
+    if stale:
+        schedule_analysis_refresh(ticker, period, interval, df.attrs.get('columns'))
+    return df
+
+def analyzer_b(ticker, period='1y', interval='1d', df=None, columns=None, use_cache=True):
+    """
+    Generate Analyzer B oscillator for a stock ticker
     
-    # Detect regular and hidden divergences between WT2 and price
-    bullish_div, bearish_div, hidden_bullish_div, hidden_bearish_div = detect_divergences(df, wt2, df['Close'], lookback=5)
+    Concurrent calls for the same (ticker, period, interval) share a single
+    computation; the result is cached, so they all get the cached frame.
     
-    # Detect Money Flow divergences between price and Money Flow indicator
-    mf_bullish_div, mf_bearish_div = detect_mf_divergences(df, mf, df['Close'], lookback=5)
+    Args:
+        ticker: Stock ticker symbol
+        period: Data period
+        interval: Data interval
+        df: Pre-fetched OHLCV data (e.g. from fetch_multi_stock_data); fetched when None
+        columns: Analysis columns needed (every column when None, see get_field_columns)
+        use_cache: Whether cached analyses and stored bars may be served
+            (False recomputes from freshly fetched bars, for force_refresh)
+    """
+    # Check cache first
+    if use_cache:
+        cached = get_cached_analysis(ticker, period, interval, columns)
+        if cached is not None:
+            logger.info(f"Using cached data for {ticker}")
+            return cached
     
-    # Detect RSI trend breaks
-    rsi_trend_break_buy, rsi_trend_break_sell = detect_rsi_trend_breaks(df, rsi, lookback=5)
+    result, _ = get_single_flight().do(('analysis', ticker, period, interval, columns, use_cache), _analyzer_b,
+                                       ticker, period, interval, df, columns, use_cache)
+    return result
+
+def _analyzer_b(ticker, period, interval, df=None, columns=None, use_cache=True):
+    """Compute Analyzer B for a ticker and store it in the cache (see analyzer_b)"""
+    cache_key = f"{ticker}_{period}_{interval}"
     
-    macd_line, macd_signal, macd_hist = calculate_macd(df['Close'])
+    # A call that just finished may have filled the cache while this one was queued
+    cached = ticker_cache.get(cache_key) if use_cache else None
+    if cached is not None and has_analysis_columns(cached, columns):
+        return cached
+    if cached is not None and columns is not None:
+        # Keep what the partial analysis being replaced held
+        columns = tuple(sorted(set(columns) | set(cached.attrs['columns'])))
     
-    bb_upper, bb_middle, bb_lower = calculate_bollinger_bands(df['Close'])
+    # Fetch data, including the indicator warm-up bars in front of the window
+    if df is None:
+        df = fetch_stock_data(ticker, get_history_period(period, interval), interval, use_cache=use_cache)
     
-    adx, plus_di, minus_di = calculate_adx(df)
+    if df is None or df.empty:
+        return None
     
-    (bayesian_price_regime, bayesian_wt_regime, 
-     cusum_price_regime, cusum_wt_regime,
-     hmm_price_regime, hmm_wt_regime, 
-     sliding_price_regime, sliding_wt_regime,
-     combined_price_regime, combined_wt_regime) = detect_regimes(df, df['Close'], wt2, 
-                                                              df['Volume'] if 'Volume' in df.columns else None)
+    df = compute_analyzer_b(ticker, df, interval, columns)
+    if df is None:
+        return None
     
-    # Generate signals with Pine Script default parameters
-    buy_signal, gold_buy, sell_signal, wt_cross, cross_points = generate_signals(wt1, wt2, mf, 53, -53, -75)
+    # Add to cache with timestamp
+    result = trim_to_window(df, period, interval)
+    ttl = get_analysis_ttl(ticker, interval)
+    result.attrs['computed_at'] = time.time()
+    result.attrs['expires_at'] = result.attrs['computed_at'] + ttl
+    return cache_analysis(cache_key, result, ttl)
+
+def detect_fast_money(wt1, wt2):
+    """
+    Detect Fast Money patterns (quick WaveTrend overbought/oversold transitions)
     
-    # Detect Fast Money patterns (Quick WT overbought/oversold transitions)
-    fast_money_buy = pd.Series(np.zeros(len(df)), index=df.index)
-    fast_money_sell = pd.Series(np.zeros(len(df)), index=df.index)
+    Returns:
+        Tuple of (buy, sell) Series with 1 on the bars of a pattern
+    """
+    fast_money_buy = pd.Series(np.zeros(len(wt2)), index=wt2.index)
+    fast_money_sell = pd.Series(np.zeros(len(wt2)), index=wt2.index)
     
-    for i in range(3, len(df)):
+    for i in range(3, len(wt2)):
         # Fast money buy: WT2 went from < -75 to > -30 in 3 bars or less
         extreme_oversold = False
         for j in range(1, 4):  # Look back up to 3 bars
@@ -1426,11 +2092,19 @@ def analyzer_b(ticker, period='1y', interval='1d'):
         if extreme_overbought and wt2.iloc[i] < 30 and wt1.iloc[i] < wt2.iloc[i]:
             fast_money_sell.iloc[i] = 1
     
-    # Detect Zero-Line Rejections (bouncing off the zero line)
-    zero_line_reject_buy = pd.Series(np.zeros(len(df)), index=df.index)
-    zero_line_reject_sell = pd.Series(np.zeros(len(df)), index=df.index)
+    return fast_money_buy, fast_money_sell
+
+def detect_zero_line_rejections(wt1, wt2):
+    """
+    Detect Zero-Line Rejections (WaveTrend bouncing off the zero line)
+    
+    Returns:
+        Tuple of (buy, sell) Series with 1 on the bars of a rejection
+    """
+    zero_line_reject_buy = pd.Series(np.zeros(len(wt2)), index=wt2.index)
+    zero_line_reject_sell = pd.Series(np.zeros(len(wt2)), index=wt2.index)
     
-    for i in range(2, len(df)):
+    for i in range(2, len(wt2)):
         # Zero-line buy: WT2 crosses just below zero and then moves up
         if -10 < wt2.iloc[i-1] < 0 and wt2.iloc[i] > 0 and wt1.iloc[i] > wt2.iloc[i]:
             zero_line_reject_buy.iloc[i] = 1
@@ -1439,65 +2113,10 @@ def analyzer_b(ticker, period='1y', interval='1d'):
         if 0 < wt2.iloc[i-1] < 10 and wt2.iloc[i] < 0 and wt1.iloc[i] < wt2.iloc[i]:
             zero_line_reject_sell.iloc[i] = 1
     
-    # Add all indicators to the dataframe
-    df['WT1'] = wt1
-    df['WT2'] = wt2
-    df['WTVwap'] = wtVwap
-    df['RSI'] = rsi
-    df['Stoch'] = stoch_rsi
-    df['MF'] = mf
-    df['Buy'] = buy_signal
-    df['GoldBuy'] = gold_buy
-    df['Sell'] = sell_signal
-    df['WTCross'] = wt_cross
-    df['CrossPoints'] = cross_points  # Added for visualization
-    df['CrossColor'] = np.where((wt2 - wt1) > 0, 1, 0)  # 1 for red, 0 for green
-    
-    # Add RSI3M3+ oscillator data
-    df['RSI3'] = rsi3_raw
-    df['RSI3M3'] = rsi3m3
-    df['RSI3M3State'] = rsi3m3_state
-    df['RSI3M3Buy'] = rsi3m3_buy
-    df['RSI3M3Sell'] = rsi3m3_sell
-    
-    # Add divergence indicators
-    df['BullishDiv'] = bullish_div
-    df['BearishDiv'] = bearish_div
-    df['HiddenBullishDiv'] = hidden_bullish_div
-    df['HiddenBearishDiv'] = hidden_bearish_div
-    df['MFBullishDiv'] = mf_bullish_div
-    df['MFBearishDiv'] = mf_bearish_div
-    
-    # Add additional pattern indicators
-    df['FastMoneyBuy'] = fast_money_buy
-    df['FastMoneySell'] = fast_money_sell
-    df['ZeroLineRejectBuy'] = zero_line_reject_buy
-    df['ZeroLineRejectSell'] = zero_line_reject_sell
-    df['RSITrendBreakBuy'] = rsi_trend_break_buy
-    df['RSITrendBreakSell'] = rsi_trend_break_sell
-    
-    df['BayesianPriceRegime'] = bayesian_price_regime
-    df['BayesianWTRegime'] = bayesian_wt_regime
-    df['CUSUMPriceRegime'] = cusum_price_regime
-    df['CUSUMWTRegime'] = cusum_wt_regime
-    df['HMMPriceRegime'] = hmm_price_regime
-    df['HMMWTRegime'] = hmm_wt_regime
-    df['SlidingPriceRegime'] = sliding_price_regime
-    df['SlidingWTRegime'] = sliding_wt_regime
-    df['CombinedPriceRegime'] = combined_price_regime
-    df['CombinedWTRegime'] = combined_wt_regime
-    
-    df['MACD'] = macd_line
-    df['MACDSignal'] = macd_signal
-    df['MACDHist'] = macd_hist
-    df['BBUpper'] = bb_upper
-    df['BBMiddle'] = bb_middle
-    df['BBLower'] = bb_lower
-    df['ADX'] = adx
-    df['PlusDI'] = plus_di
-    df['MinusDI'] = minus_di
-    
-    # Calculate signal strength (combined metric for sorting)
+    return zero_line_reject_buy, zero_line_reject_sell
+
+def calculate_signal_strength(df):
+    """Combine the recent signals, divergences and Money Flow into one score for sorting"""
     signal_strength = 0
     recent_df = df.iloc[-10:] if len(df) >= 10 else df
     
@@ -1553,9 +2172,175 @@ def analyzer_b(ticker, period='1y', interval='1d'):
         signal_strength += 1
     elif df['MF'].iloc[-1] < -3:
         signal_strength -= 1
+    
+    return signal_strength
+
+def get_trend_exhaust_columns(df):
+    """Calculate the TrendExhaust columns (see get_exhaust_data)"""
+    df = get_exhaust_data(df)
+    return {column: df[column] for column in TREND_EXHAUST_COLUMNS}
+
+SIGNAL_COLUMNS = ('Buy', 'GoldBuy', 'Sell', 'WTCross', 'CrossPoints', 'CrossColor')
+RSI3M3_COLUMNS = ('RSI3', 'RSI3M3', 'RSI3M3State', 'RSI3M3Buy', 'RSI3M3Sell')
+DIVERGENCE_COLUMNS = ('BullishDiv', 'BearishDiv', 'HiddenBullishDiv', 'HiddenBearishDiv')
+MF_DIVERGENCE_COLUMNS = ('MFBullishDiv', 'MFBearishDiv')
+PATTERN_COLUMNS = ('FastMoneyBuy', 'FastMoneySell', 'ZeroLineRejectBuy', 'ZeroLineRejectSell',
+                   'RSITrendBreakBuy', 'RSITrendBreakSell')
+REGIME_COLUMNS = ('BayesianPriceRegime', 'BayesianWTRegime', 'CUSUMPriceRegime', 'CUSUMWTRegime',
+                  'HMMPriceRegime', 'HMMWTRegime', 'SlidingPriceRegime', 'SlidingWTRegime',
+                  'CombinedPriceRegime', 'CombinedWTRegime')
+TREND_EXHAUST_COLUMNS = ('ShortPercentR', 'LongPercentR', 'AvgPercentR', 'TEOverbought', 'TEOversold',
+                         'TEOBReversal', 'TEOSReversal', 'TECrossBull', 'TECrossBear')
+
+# How every Analyzer B column is derived. Node functions get the frame and
+# the interval parameters; each node runs only when a requested column
+# depends on it, and at most once per analysis.
+ANALYZER_B_GRAPH = IndicatorGraph([
+    # WaveTrend, Stochastic RSI, Money Flow, MACD, Bollinger Bands and ADX
+    IndicatorNode('core', CORE_COLUMNS, ('Open', 'High', 'Low', 'Close'),
+                  lambda df, params: calculate_core_indicators(df, params)),
+    # Pine Script default signal levels
+    IndicatorNode('signals', SIGNAL_COLUMNS, ('WT1', 'WT2', 'MF'),
+                  lambda df, params, **levels: (
+                      *generate_signals(df['WT1'], df['WT2'], df['MF'], **levels),
+                      np.where((df['WT2'] - df['WT1']) > 0, 1, 0)  # 1 for red, 0 for green
+                  ),
+                  {'obLevel': 53, 'osLevel': -53, 'osLevel3': -75}),
+    IndicatorNode('rsi3m3', RSI3M3_COLUMNS, ('Close',),
+                  lambda df, params: calculate_rsi3m3(df)),
+    # Regular and hidden divergences between WT2 and price
+    IndicatorNode('divergences', DIVERGENCE_COLUMNS, ('WT2', 'Close'),
+                  lambda df, params, lookback: detect_divergences(df, df['WT2'], df['Close'], lookback=lookback),
+                  {'lookback': 5}),
+    IndicatorNode('mf_divergences', MF_DIVERGENCE_COLUMNS, ('MF', 'Close'),
+                  lambda df, params, lookback: detect_mf_divergences(df, df['MF'], df['Close'], lookback=lookback),
+                  {'lookback': 5}),
+    IndicatorNode('fast_money', PATTERN_COLUMNS[0:2], ('WT1', 'WT2'),
+                  lambda df, params: detect_fast_money(df['WT1'], df['WT2'])),
+    IndicatorNode('zero_line', PATTERN_COLUMNS[2:4], ('WT1', 'WT2'),
+                  lambda df, params: detect_zero_line_rejections(df['WT1'], df['WT2'])),
+    IndicatorNode('rsi_trend_breaks', PATTERN_COLUMNS[4:6], ('RSI',),
+                  lambda df, params, lookback: detect_rsi_trend_breaks(df, df['RSI'], lookback=lookback),
+                  {'lookback': 5}),
+    # Bayesian, CUSUM, HMM and sliding-window change points of price and WT2
+    IndicatorNode('regimes', REGIME_COLUMNS, ('Close', 'WT2', 'Volume'),
+                  lambda df, params: detect_regimes(df, df['Close'], df['WT2'],
+                                                    df['Volume'] if 'Volume' in df.columns else None)),
+    IndicatorNode('trend_exhaust', TREND_EXHAUST_COLUMNS, ('High', 'Low', 'Close'),
+                  lambda df, params: get_trend_exhaust_columns(df)),
+])
+
+# Columns calculate_signal_strength reads
+SIGNAL_STRENGTH_COLUMNS = ('Buy', 'GoldBuy', 'Sell', *DIVERGENCE_COLUMNS, *MF_DIVERGENCE_COLUMNS,
+                           *PATTERN_COLUMNS, 'MF')
+
+# Analysis columns behind each field of the Analyzer B response. Fields not
+# listed (ticker, dates, parameters, ...) come with every response.
+ANALYZER_B_FIELDS = {
+    'price': (), 'high': (), 'low': (), 'open': (), 'close': (), 'volume': (), 'ohlc': (),
+    'wt1': ('WT1',),
+    'wt2': ('WT2',),
+    'wtVwap': ('WTVwap',),
+    'rsi': ('RSI',),
+    'stoch': ('Stoch',),
+    'moneyFlow': ('MF',),
+    'macd': ('MACD',),
+    'macdSignal': ('MACDSignal',),
+    'macdHist': ('MACDHist',),
+    'bbUpper': ('BBUpper',),
+    'bbMiddle': ('BBMiddle',),
+    'bbLower': ('BBLower',),
+    'adx': ('ADX',),
+    'plusDI': ('PlusDI',),
+    'minusDI': ('MinusDI',),
+    'signals': SIGNAL_COLUMNS,
+    'rsi3m3': RSI3M3_COLUMNS,
+    'divergences': DIVERGENCE_COLUMNS + MF_DIVERGENCE_COLUMNS,
+    'patterns': PATTERN_COLUMNS,
+    'regimes': REGIME_COLUMNS,
+    'recommendations': SIGNAL_STRENGTH_COLUMNS + ('CombinedPriceRegime', 'RSI', 'MACD', 'MACDSignal', 'MACDHist',
+                                                  'BBUpper', 'BBLower', 'ADX', 'PlusDI', 'MinusDI'),
+    'trendExhaust': TREND_EXHAUST_COLUMNS,
+    'summary': SIGNAL_STRENGTH_COLUMNS + REGIME_COLUMNS + ('WT1', 'WT2'),
+    'status': ('WT1', 'WT2')
+}
+
+def parse_fields(value):
+    """
+    Parse a comma-separated fields query parameter
+    
+    Returns:
+        List of response field names, or None for every field
+        
+    Raises:
+        ValueError: For a field the Analyzer B response does not have
+    """
+    if value is None or not value.strip():
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in ANALYZER_B_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}. Must be among: {list(ANALYZER_B_FIELDS)}")
+    return fields
+
+def get_field_columns(fields):
+    """
+    Get the analysis columns a set of response fields is built from
+    
+    Returns:
+        Sorted tuple of columns, or None for every column (fields is None)
+    """
+    if fields is None:
+        return None
+    return tuple(sorted({column for field in fields for column in ANALYZER_B_FIELDS[field]}))
+
+def has_analysis_columns(df, columns):
+    """
+    Check whether an analysis frame holds the given columns
+    
+    Frames computed for some fields only record their columns in
+    attrs['columns']; full analyses hold every column.
+    
+    Args:
+        df: Analysis DataFrame
+        columns: Columns needed (every column when None)
+    """
+    computed = df.attrs.get('columns')
+    if computed is None:
+        return True
+    return columns is not None and set(columns) <= set(computed)
+
+def compute_analyzer_b(ticker, df, interval, columns=None):
+    """
+    Add Analyzer B indicator, signal and regime columns to OHLCV bars
+    
+    Only the nodes of ANALYZER_B_GRAPH the requested columns depend on are
+    run, so asking for the WaveTrend lines skips the divergence, regime and
+    TrendExhaust work.
+    
+    Args:
+        ticker: Stock ticker symbol
+        df: OHLCV DataFrame, including any indicator warm-up bars (modified in place)
+        interval: Data interval the indicator parameters are adjusted to
+        columns: Analysis columns wanted (every column when None)
         
-    # Store signal strength in dataframe
-    df.attrs['signal_strength'] = signal_strength
+    Returns:
+        DataFrame with the analysis columns and attrs; a frame with only
+        some columns lists them in attrs['columns']
+    """
+    if df is None or df.empty:
+        return None
+    
+    # Adjust parameters based on interval
+    params = adjust_parameters_for_interval(interval)
+    ANALYZER_B_GRAPH.resolve(df, columns, params)
+    
+    if columns is not None:
+        df.attrs['columns'] = tuple(column for column in ANALYZER_B_GRAPH.columns if column in df.columns)
+    
+    # Store signal strength (combined metric for sorting)
+    if all(column in df.columns for column in SIGNAL_STRENGTH_COLUMNS):
+        df.attrs['signal_strength'] = calculate_signal_strength(df)
     
     # Calculate price change percentage
     if len(df) >= 2:
@@ -1571,34 +2356,143 @@ def analyzer_b(ticker, period='1y', interval='1d'):
     # Store ticker type
     df.attrs['ticker_type'] = get_ticker_type(ticker)
     
-    # Calculate TrendExhaust data
-    df = get_exhaust_data(df)
+    return df
+
+def parse_range_bound(value, end_of_day=False):
+    """
+    Parse a start/end query parameter into a UTC timestamp
     
-    if df is not None:
-        df['BayesianPriceRegime'] = bayesian_price_regime
-        df['BayesianWTRegime'] = bayesian_wt_regime
-        df['CUSUMPriceRegime'] = cusum_price_regime
-        df['CUSUMWTRegime'] = cusum_wt_regime
-        df['HMMPriceRegime'] = hmm_price_regime
-        df['HMMWTRegime'] = hmm_wt_regime
-        df['SlidingPriceRegime'] = sliding_price_regime
-        df['SlidingWTRegime'] = sliding_wt_regime
-        df['CombinedPriceRegime'] = combined_price_regime
-        df['CombinedWTRegime'] = combined_wt_regime
+    Accepts ISO dates and datetimes ('2024-03-01', '2024-03-01T14:30:00Z')
+    and Unix timestamps in seconds; naive values are taken as UTC.
     
-    # Add to cache with timestamp
-    result = df
-    ticker_cache[cache_key] = {
-        'data': result,
-        'timestamp': datetime.now()
-    }
+    Args:
+        value: Query parameter value (None or '' when not given)
+        end_of_day: Take a plain date as the end of that day (for end bounds)
+        
+    Raises:
+        ValueError: When the value is not a timestamp
+    """
+    if value is None or value == '':
+        return None
+    if re.match(r'^\d+(\.\d+)?$', value):
+        return pd.Timestamp(float(value), unit='s', tz='UTC')
+    try:
+        timestamp = to_utc(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid timestamp: {value}") from e
+    if end_of_day and re.match(r'^\d{4}-\d{2}-\d{2}$', value):
+        timestamp += pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+    return timestamp
+
+def get_range_label(start, end):
+    """Get the period label of a start/end range, used in cache keys and responses"""
+    end_label = 'now' if end is None else end.strftime('%Y%m%dT%H%M')
+    return f"{start.strftime('%Y%m%dT%H%M')}-{end_label}"
+
+def find_cached_range(ticker, start, end, interval):
+    """
+    Serve a range from a fresh cached period analysis that holds all of it
+    
+    Returns:
+        The range sliced out of the shortest such analysis, or None
+    """
+    if not BAR_STORE_AVAILABLE:
+        return None
+    # Shortest period first, it is the cheapest to slice
+    for period in ['1d', '5d', '1mo', '3mo', '6mo', 'ytd', '1y', '2y', '5y', '10y', 'max']:
+        cached = ticker_cache.get(f"{ticker}_{period}_{interval}")
+        if cached is None or cached.empty or not has_analysis_columns(cached, None) or to_utc(cached.index[0]) > start:
+            continue
+        logger.info(f"Serving {ticker} {interval} range from cached {period} analysis")
+        result = slice_range(cached, start, end).copy()
+        result.attrs = dict(cached.attrs)
+        return result
+    return None
+
+def analyzer_b_range(ticker, start, end=None, interval='1d', use_cache=True):
+    """
+    Generate Analyzer B for the bars of a ticker between two timestamps
+    
+    Ranges inside a cached analysis are sliced out of it. Otherwise the
+    indicators are computed over the range plus its warm-up bars, which the
+    bar store fetches only where it has gaps.
+    
+    Args:
+        ticker: Stock ticker symbol
+        start: First timestamp of the range (UTC Timestamp)
+        end: Last timestamp of the range (None for the latest bar)
+        interval: Data interval
+        use_cache: Whether cached analyses and stored bars may be served
+            (False recomputes from freshly fetched bars, for force_refresh)
+        
+    Returns:
+        DataFrame with the analysis of the range, or None
+    """
+    cache_key = f"{ticker}_{get_range_label(start, end)}_{interval}"
+    if use_cache:
+        cached = ticker_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        cached = find_cached_range(ticker, start, end, interval)
+        if cached is not None:
+            return cached
+    
+    # Fetch the warm-up bars in front of the range as well
+    df = fetch_stock_data_range(ticker, start - get_warmup_span(interval), end, interval, use_cache=use_cache)
+    if df is None or df.empty:
+        return None
+    df = compute_analyzer_b(ticker, df, interval)
+    
+    result = slice_range(df, start, end).copy()
+    result.attrs = dict(df.attrs)
+    if result.empty:
+        return None
+    ttl = get_analysis_ttl(ticker, interval)
+    result.attrs['computed_at'] = time.time()
+    result.attrs['expires_at'] = result.attrs['computed_at'] + ttl
+    return cache_analysis(cache_key, result, ttl)
+
+def cache_analysis(cache_key, result, ttl):
+    """
+    Store an analysis in ticker_cache and get the frame to return for this request
     
+    The hedge report describes the fetch behind this computation only, so it
+    is kept off the cached frame: later cache hits did not fetch anything.
+    """
+    hedge = result.attrs.pop('hedge', None)
+    ticker_cache.set(cache_key, result, ttl=ttl)
+    if hedge is not None:
+        result = result.copy(deep=False)
+        result.attrs['hedge'] = hedge
     return result
 
-def format_analyzer_result(ticker, df, period, interval):
-    """Format the analyzer result for API response"""
+def get_data_age(df):
+    """Get the seconds since an analysis result was computed, or None if unknown"""
+    computed_at = df.attrs.get('computed_at')
+    return round(time.time() - computed_at, 1) if computed_at is not None else None
+
+def is_stale_result(df):
+    """Check whether an analysis result is being served past its cache TTL"""
+    expires_at = df.attrs.get('expires_at')
+    return expires_at is not None and time.time() >= expires_at
+
+def format_analyzer_result(ticker, df, period, interval, fields=None):
+    """
+    Format the analyzer result for API response
+    
+    Args:
+        ticker: Stock ticker symbol
+        df: Analysis DataFrame
+        period: Data period
+        interval: Data interval
+        fields: Response fields to include besides ticker, dates and
+            parameters (every field when None, see ANALYZER_B_FIELDS)
+    """
     if df is None:
         return None
+    
+    def wants(field):
+        return fields is None or field in fields
         
     # Format the data for charting
     # For date formatting, handle both date-only and datetime indices
@@ -1617,7 +2511,7 @@ def format_analyzer_result(ticker, df, period, interval):
     
     # Format OHLC data for candlestick charts
     ohlc_data = []
-    for i in range(len(df)):
+    for i in range(len(df) if wants('ohlc') else 0):
         if (not pd.isna(df['Open'].iloc[i]) and 
             not pd.isna(df['High'].iloc[i]) and
             not pd.isna(df['Low'].iloc[i]) and
@@ -1634,7 +2528,7 @@ def format_analyzer_result(ticker, df, period, interval):
     # Prepare cross points data
     cross_points_data = []
     
-    for i, cp in enumerate(df['CrossPoints']):
+    for i, cp in enumerate(df['CrossPoints'] if wants('signals') else []):
         if not pd.isna(cp) and not np.isinf(cp):
             cross_points_data.append({
                 'date': dates[i],
@@ -1643,7 +2537,7 @@ def format_analyzer_result(ticker, df, period, interval):
             })
     
     # Prepare divergence data
-    divergences = {
+    divergences = None if not wants('divergences') else {
         'bullish': [dates[i] for i, val in enumerate(df['BullishDiv']) if val == 1],
         'bearish': [dates[i] for i, val in enumerate(df['BearishDiv']) if val == 1],
         'hiddenBullish': [dates[i] for i, val in enumerate(df['HiddenBullishDiv']) if val == 1],
@@ -1653,7 +2547,7 @@ def format_analyzer_result(ticker, df, period, interval):
     }
     
     # Prepare additional pattern data
-    patterns = {
+    patterns = None if not wants('patterns') else {
         'fastMoneyBuy': [dates[i] for i, val in enumerate(df['FastMoneyBuy']) if val == 1],
         'fastMoneySell': [dates[i] for i, val in enumerate(df['FastMoneySell']) if val == 1],
         'zeroLineRejectBuy': [dates[i] for i, val in enumerate(df['ZeroLineRejectBuy']) if val == 1],
@@ -1662,7 +2556,7 @@ def format_analyzer_result(ticker, df, period, interval):
         'rsiTrendBreakSell': [dates[i] for i, val in enumerate(df['RSITrendBreakSell']) if val == 1] if 'RSITrendBreakSell' in df.columns else []
     }
     
-    regimes = {
+    regimes = None if not (wants('regimes') or wants('summary')) else {
         'bayesianPrice': [dates[i] for i, val in enumerate(df['BayesianPriceRegime']) if val == 1] if 'BayesianPriceRegime' in df.columns else [],
         'bayesianWT': [dates[i] for i, val in enumerate(df['BayesianWTRegime']) if val == 1] if 'BayesianWTRegime' in df.columns else [],
         'cusumPrice': [dates[i] for i, val in enumerate(df['CUSUMPriceRegime']) if val == 1] if 'CUSUMPriceRegime' in df.columns else [],
@@ -1678,7 +2572,7 @@ def format_analyzer_result(ticker, df, period, interval):
     # Get company name from dataframe attributes
     company_name = df.attrs.get('company_name', ticker)
     
-    recommendations = generate_trading_recommendations(df)
+    recommendations = generate_trading_recommendations(df) if wants('recommendations') else None
     
     result = {
         'success': True,
@@ -1687,35 +2581,49 @@ def format_analyzer_result(ticker, df, period, interval):
         'interval': interval,
         'period': period,
         'dates': dates,
-        'price': clean_array(df['Close'].tolist()),
-        'high': clean_array(df['High'].tolist()),
-        'low': clean_array(df['Low'].tolist()),
-        'open': clean_array(df['Open'].tolist()),
-        'close': clean_array(df['Close'].tolist()),
-        'volume': clean_array(df['Volume'].tolist() if 'Volume' in df.columns else []),
-        'ohlc': ohlc_data,  # Added OHLC data formatted for candlestick charts
-        'wt1': clean_array(df['WT1'].tolist()),
-        'wt2': clean_array(df['WT2'].tolist()),
-        'wtVwap': clean_array(df['WTVwap'].tolist()),
-        'rsi': clean_array(df['RSI'].tolist()),
-        'stoch': clean_array(df['Stoch'].tolist()),
-        'moneyFlow': clean_array(df['MF'].tolist()),
-        'macd': clean_array(df['MACD'].tolist()) if 'MACD' in df.columns else [],
-        'macdSignal': clean_array(df['MACDSignal'].tolist()) if 'MACDSignal' in df.columns else [],
-        'macdHist': clean_array(df['MACDHist'].tolist()) if 'MACDHist' in df.columns else [],
-        'bbUpper': clean_array(df['BBUpper'].tolist()) if 'BBUpper' in df.columns else [],
-        'bbMiddle': clean_array(df['BBMiddle'].tolist()) if 'BBMiddle' in df.columns else [],
-        'bbLower': clean_array(df['BBLower'].tolist()) if 'BBLower' in df.columns else [],
-        'adx': clean_array(df['ADX'].tolist()) if 'ADX' in df.columns else [],
-        'plusDI': clean_array(df['PlusDI'].tolist()) if 'PlusDI' in df.columns else [],
-        'minusDI': clean_array(df['MinusDI'].tolist()) if 'MinusDI' in df.columns else [],
-        'signals': {
+        'parameters': adjust_parameters_for_interval(interval),
+        'tickerType': df.attrs.get('ticker_type', 'stock')
+    }
+    
+    # Bar and indicator lines
+    series_columns = {
+        'price': 'Close',
+        'high': 'High',
+        'low': 'Low',
+        'open': 'Open',
+        'close': 'Close',
+        'volume': 'Volume',
+        'wt1': 'WT1',
+        'wt2': 'WT2',
+        'wtVwap': 'WTVwap',
+        'rsi': 'RSI',
+        'stoch': 'Stoch',
+        'moneyFlow': 'MF',
+        'macd': 'MACD',
+        'macdSignal': 'MACDSignal',
+        'macdHist': 'MACDHist',
+        'bbUpper': 'BBUpper',
+        'bbMiddle': 'BBMiddle',
+        'bbLower': 'BBLower',
+        'adx': 'ADX',
+        'plusDI': 'PlusDI',
+        'minusDI': 'MinusDI'
+    }
+    for field, column in series_columns.items():
+        if wants(field):
+            result[field] = clean_array(df[column].tolist()) if column in df.columns else []
+    
+    if wants('ohlc'):
+        result['ohlc'] = ohlc_data  # Added OHLC data formatted for candlestick charts
+    if wants('signals'):
+        result['signals'] = {
             'buy': [dates[i] for i, val in enumerate(df['Buy']) if val],
             'goldBuy': [dates[i] for i, val in enumerate(df['GoldBuy']) if val],
             'sell': [dates[i] for i, val in enumerate(df['Sell']) if val],
             'cross': cross_points_data
-        },
-        'rsi3m3': {
+        }
+    if wants('rsi3m3'):
+        result['rsi3m3'] = {
             'rsi3': clean_array(df['RSI3'].tolist()) if 'RSI3' in df.columns else [],
             'rsi3m3': clean_array(df['RSI3M3'].tolist()) if 'RSI3M3' in df.columns else [],
             'state': clean_array(df['RSI3M3State'].tolist()) if 'RSI3M3State' in df.columns else [],
@@ -1731,17 +2639,14 @@ def format_analyzer_result(ticker, df, period, interval):
                 'buyLine': 39,
                 'sellLine': 61
             }
-        },
-        'divergences': divergences,
-        'patterns': patterns,
-        'regimes': regimes,
-        'recommendations': recommendations,
-        'parameters': adjust_parameters_for_interval(interval),
-        'tickerType': df.attrs.get('ticker_type', 'stock')
-    }
+        }
+    for field, value in (('divergences', divergences), ('patterns', patterns),
+                         ('regimes', regimes), ('recommendations', recommendations)):
+        if wants(field):
+            result[field] = value
     
     # Add TrendExhaust data if available
-    if 'ShortPercentR' in df.columns and 'LongPercentR' in df.columns:
+    if wants('trendExhaust') and 'ShortPercentR' in df.columns and 'LongPercentR' in df.columns:
         result['trendExhaust'] = {
             'shortPercentR': clean_array(df['ShortPercentR'].tolist()),
             'longPercentR': clean_array(df['LongPercentR'].tolist()),
@@ -1772,9 +2677,9 @@ def format_analyzer_result(ticker, df, period, interval):
             return 0
         return float(value)
     
-    current_wt1 = safe_float(df['WT1'].iloc[-1])
-    current_wt2 = safe_float(df['WT2'].iloc[-1])
-    current_mf = safe_float(df['MF'].iloc[-1])
+    current_wt1 = safe_float(df['WT1'].iloc[-1]) if 'WT1' in df.columns else 0
+    current_wt2 = safe_float(df['WT2'].iloc[-1]) if 'WT2' in df.columns else 0
+    current_mf = safe_float(df['MF'].iloc[-1]) if 'MF' in df.columns else 0
     
     # Calculate price change percentage
     if len(df) >= 2:
@@ -1787,34 +2692,38 @@ def format_analyzer_result(ticker, df, period, interval):
     else:
         price_change_pct = 0
         
-    result['summary'] = {
-        'buySignals': int(recent['Buy'].sum()),
-        'goldBuySignals': int(recent['GoldBuy'].sum()),
-        'sellSignals': int(recent['Sell'].sum()),
-        'fastMoneyBuySignals': int(recent['FastMoneyBuy'].sum()),
-        'fastMoneySellSignals': int(recent['FastMoneySell'].sum()),
-        'bullishDivergenceSignals': int(recent['BullishDiv'].sum() + recent['HiddenBullishDiv'].sum()),
-        'bearishDivergenceSignals': int(recent['BearishDiv'].sum() + recent['HiddenBearishDiv'].sum()),
-        'mfBullishDivergenceSignals': int(recent['MFBullishDiv'].sum() if 'MFBullishDiv' in recent.columns else 0),
-        'mfBearishDivergenceSignals': int(recent['MFBearishDiv'].sum() if 'MFBearishDiv' in recent.columns else 0),
-        'rsiTrendBreakBuySignals': int(recent['RSITrendBreakBuy'].sum() if 'RSITrendBreakBuy' in recent.columns else 0),
-        'rsiTrendBreakSellSignals': int(recent['RSITrendBreakSell'].sum() if 'RSITrendBreakSell' in recent.columns else 0),
-        'currentWT1': current_wt1,
-        'currentWT2': current_wt2,
-        'currentMF': current_mf,
-        'lastUpdate': dates[-1] if dates else None,
-        'currentPrice': safe_float(df['Close'].iloc[-1]),
-        'priceChangePct': price_change_pct,
-        'signalStrength': df.attrs.get('signal_strength', 0),
-        'regimes': regimes
-    }
+    if wants('summary'):
+        result['summary'] = {
+            'buySignals': int(recent['Buy'].sum()),
+            'goldBuySignals': int(recent['GoldBuy'].sum()),
+            'sellSignals': int(recent['Sell'].sum()),
+            'fastMoneyBuySignals': int(recent['FastMoneyBuy'].sum()),
+            'fastMoneySellSignals': int(recent['FastMoneySell'].sum()),
+            'bullishDivergenceSignals': int(recent['BullishDiv'].sum() + recent['HiddenBullishDiv'].sum()),
+            'bearishDivergenceSignals': int(recent['BearishDiv'].sum() + recent['HiddenBearishDiv'].sum()),
+            'mfBullishDivergenceSignals': int(recent['MFBullishDiv'].sum() if 'MFBullishDiv' in recent.columns else 0),
+            'mfBearishDivergenceSignals': int(recent['MFBearishDiv'].sum() if 'MFBearishDiv' in recent.columns else 0),
+            'rsiTrendBreakBuySignals': int(recent['RSITrendBreakBuy'].sum() if 'RSITrendBreakBuy' in recent.columns else 0),
+            'rsiTrendBreakSellSignals': int(recent['RSITrendBreakSell'].sum() if 'RSITrendBreakSell' in recent.columns else 0),
+            'currentWT1': current_wt1,
+            'currentWT2': current_wt2,
+            'currentMF': current_mf,
+            'lastUpdate': dates[-1] if dates else None,
+            'currentPrice': safe_float(df['Close'].iloc[-1]),
+            'priceChangePct': price_change_pct,
+            'signalStrength': df.attrs.get('signal_strength', 0),
+            'regimes': regimes,
+            'dataAgeSeconds': get_data_age(df),
+            'stale': is_stale_result(df)
+        }
     
-    if current_wt1 > current_wt2 and current_wt2 < -53:
-        result['status'] = "Potential buy zone"
-    elif current_wt1 < current_wt2 and current_wt2 > 53:
-        result['status'] = "Potential sell zone"
-    else:
-        result['status'] = "Neutral zone"
+    if wants('status'):
+        if current_wt1 > current_wt2 and current_wt2 < -53:
+            result['status'] = "Potential buy zone"
+        elif current_wt1 < current_wt2 and current_wt2 > 53:
+            result['status'] = "Potential sell zone"
+        else:
+            result['status'] = "Neutral zone"
         
     return result
 
@@ -1831,13 +2740,26 @@ def get_analyzer_b_data():
         force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
         use_optimized = request.args.get('optimized', 'false').lower() == 'true'
         
+        # Only the indicators behind the requested response fields are computed
+        fields = parse_fields(request.args.get('fields'))
+        
+        # Explicit start/end timestamps replace the period (chart zoom and drill-down)
+        start = parse_range_bound(request.args.get('start'))
+        end = parse_range_bound(request.args.get('end'), end_of_day=True)
+        if end is not None and start is None:
+            raise ValueError("end requires start")
+        if start is not None:
+            if end is not None and end <= start:
+                raise ValueError("start must be before end")
+            period = get_range_label(start, end)
+        
         logger.info(f"API request for {ticker} ({period}, {interval}) - optimized: {use_optimized}, force_refresh: {force_refresh}")
         
         # Validate parameters
         valid_periods = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
         valid_intervals = ['15m', '30m', '1h', '3h', '6h', '1d', '2d', '3d', '1wk']
         
-        if period not in valid_periods:
+        if start is None and period not in valid_periods:
             return jsonify({
                 'success': False,
                 'error': f'Invalid period. Must be one of: {valid_periods}',
@@ -1854,17 +2776,19 @@ def get_analyzer_b_data():
         # Clear cache if force refresh is requested
         if force_refresh:
             cache_key = f"{ticker}_{period}_{interval}"
-            if cache_key in data_cache:
-                del data_cache[cache_key]
+            if ticker_cache.delete(cache_key):
                 logger.info(f"Cache cleared for {cache_key}")
         
         # Choose analyzer function
-        if use_optimized and OPTIMIZATION_AVAILABLE:
+        if start is not None:
+            logger.info(f"Using range analyzer for {ticker} from {start} to {end or 'now'}")
+            df = analyzer_b_range(ticker, start, end, interval, use_cache=not force_refresh)
+        elif use_optimized and OPTIMIZATION_AVAILABLE:
             logger.info(f"Using optimized analyzer for {ticker}")
             df = analyzer_b_optimized(ticker, period, interval, use_cache=True, force_refresh=force_refresh)
         else:
             logger.info(f"Using standard analyzer for {ticker}")
-            df = analyzer_b(ticker, period, interval)
+            df = analyzer_b(ticker, period, interval, columns=get_field_columns(fields), use_cache=not force_refresh)
         
         # Check if data was retrieved successfully
         if df is None or df.empty:
@@ -1922,7 +2846,7 @@ def get_analyzer_b_data():
         logger.info(f"Successfully processed {len(df)} data points for {ticker}")
         
         # Format and return the result
-        result = format_analyzer_result(ticker, df, period, interval)
+        result = format_analyzer_result(ticker, df, period, interval, fields)
         
         # Add metadata to response
         result['metadata'] = {
@@ -1930,8 +2854,13 @@ def get_analyzer_b_data():
             'valid_data_points': valid_data_points,
             'period': period,
             'interval': interval,
-            'optimized': use_optimized and OPTIMIZATION_AVAILABLE,
+            'start': start.isoformat() if start is not None else None,
+            'end': end.isoformat() if end is not None else None,
+            'optimized': use_optimized and OPTIMIZATION_AVAILABLE and start is None,
+            'fields': fields,
             'cache_used': not force_refresh,
+            'data_age_seconds': get_data_age(df),
+            'stale': is_stale_result(df),
             'processing_time': None,  # Could add timing if needed
             'data_quality_issues': issues if OPTIMIZATION_AVAILABLE and not is_valid else [],
             # NEW: Aggregation information
@@ -1939,7 +2868,9 @@ def get_analyzer_b_data():
             'base_interval': df.attrs.get('base_interval', interval),
             'original_interval': df.attrs.get('original_interval', interval),
             'aggregation_method': df.attrs.get('aggregation_method', None),
-            'timeframe_aggregation_available': TIMEFRAME_AGGREGATION_AVAILABLE
+            'timeframe_aggregation_available': TIMEFRAME_AGGREGATION_AVAILABLE,
+            # Which provider answered a hedged fetch and how much sooner
+            'hedge': df.attrs.get('hedge')
         }
         
         return jsonify(result)
@@ -1977,6 +2908,43 @@ def get_analyzer_b_data():
             ]
         }), 500
 
+def analyze_ticker_for_grid(ticker, period, interval, df=None, fields=None):
+    """
+    Run and format the analysis of one ticker of a multi-ticker request
+    
+    Args:
+        ticker: Stock ticker symbol
+        period: Data period
+        interval: Data interval
+        df: Pre-fetched OHLCV data; fetched when None
+        fields: Response fields to compute and return (every field when None)
+        
+    Returns:
+        Tuple of (formatted result or None, error message or None, wall time in seconds)
+    """
+    started = time.time()
+    try:
+        df = analyzer_b(ticker, period, interval, df=df, columns=get_field_columns(fields))
+        
+        if df is not None:
+            result = format_analyzer_result(ticker, df, period, interval, fields)
+            if result:
+                logger.info(f"✅ Successfully loaded {ticker}")
+                return result, None, time.time() - started
+            return None, 'Failed to format data', time.time() - started
+        reason = get_negative_cache().describe(ticker, period, interval)
+        if reason == INVALID_SYMBOL:
+            return None, 'Unknown ticker symbol', time.time() - started
+        if reason == NO_DATA:
+            return None, f'No data available for {period} / {interval}', time.time() - started
+        return None, 'No data available - likely rate limited', time.time() - started
+    
+    except Exception as e:
+        logger.error(f"Error processing {ticker}: {str(e)}")
+        if "rate limit" in str(e).lower():
+            return None, 'Rate limited by Yahoo Finance', time.time() - started
+        return None, str(e), time.time() - started
+
 # New endpoint to handle multiple tickers at once
 @app.route('/api/multi-ticker', methods=['GET'])
 def get_multi_ticker_data():
@@ -1984,9 +2952,11 @@ def get_multi_ticker_data():
     period = request.args.get('period', default='1y', type=str)  # Changed back to '1y' for proper indicator warm-up with EOD API
     interval = request.args.get('interval', default='1d', type=str)
     safe_mode = request.args.get('safe_mode', default='false', type=str).lower() == 'true'
+    parallel = request.args.get('parallel', default='true', type=str).lower() == 'true'
     
-    # Parse tickers from comma-separated string
-    tickers = [t.strip() for t in tickers_str.split(',') if t.strip()]
+    # Parse tickers from comma-separated string, upper-cased once so the
+    # analysis cache keys and the warmed watchlist match the single-ticker API
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers_str.split(',') if t.strip()))
     
     if len(tickers) > 20:
         return jsonify({
@@ -1994,42 +2964,66 @@ def get_multi_ticker_data():
             'message': 'Maximum 20 tickers allowed per request'
         }), 400
     
-    logger.info(f"Multi-ticker API request received for {len(tickers)} tickers, period: {period}, interval: {interval}, safe_mode: {safe_mode}")
-    
-    results = {}
-    errors = {}
+    # Grid tiles usually need a few fields, e.g. fields=summary
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     
-    # Process tickers sequentially with delays to avoid rate limiting
-    for i, ticker in enumerate(tickers):
-        try:
+    logger.info(f"Multi-ticker API request received for {len(tickers)} tickers, period: {period}, interval: {interval}, safe_mode: {safe_mode}, parallel: {parallel}")
+    request_started = time.time()
+    
+    # Fill company names of the whole watchlist in the background
+    get_metadata_cache().fill_async(tickers)
+    
+    # Remember the grid so the cache warmer keeps it warm
+    cache_warmer.record_watchlist(tickers, period, interval)
+    
+    # Fetch bars for every uncached ticker in grouped downloads up front
+    uncached = [t for t in tickers
+                if not ticker_cache.has(f"{t}_{period}_{interval}", allow_stale=True)
+                and not find_superset_analysis(t, period, interval, get_field_columns(fields))]
+    prefetched = fetch_multi_stock_data(uncached, get_history_period(period, interval), interval)
+    
+    outcomes = {}
+    workers = max(1, min(MULTI_TICKER_WORKERS, len(tickers)))
+    if parallel and workers > 1:
+        # Analyse tickers concurrently, provider calls are bounded by provider_call
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='multi-ticker') as executor:
+            futures = {
+                executor.submit(analyze_ticker_for_grid, ticker, period, interval, prefetched.get(ticker), fields): ticker
+                for ticker in tickers
+            }
+            for future in concurrent.futures.as_completed(futures):
+                outcomes[futures[future]] = future.result()
+    else:
+        # Process tickers sequentially with delays to avoid rate limiting
+        for i, ticker in enumerate(tickers):
             logger.info(f"Processing ticker {i+1}/{len(tickers)}: {ticker}")
             
             # With EOD API (paid service), we don't need aggressive delays
-            # Add minimal delay only for very rapid requests
-            if i > 0:
+            # Add minimal delay only when this ticker still has to be fetched on its own
+            if i > 0 and ticker in uncached and ticker not in prefetched:
                 delay = 0.02  # Just 0.5 second delay between requests
                 logger.info(f"Adding {delay}s delay before {ticker}")
                 time.sleep(delay)
             
-            # Fetch data with proper error handling
-            df = analyzer_b(ticker, period, interval)
-            
-            if df is not None:
-                result = format_analyzer_result(ticker, df, period, interval)
-                if result:
-                    results[ticker] = result
-                    logger.info(f"✅ Successfully loaded {ticker}")
-                else:
-                    errors[ticker] = 'Failed to format data'
-            else:
-                errors[ticker] = 'No data available - likely rate limited'
-                
-        except Exception as e:
-            logger.error(f"Error processing {ticker}: {str(e)}")
-            if "rate limit" in str(e).lower():
-                errors[ticker] = 'Rate limited by Yahoo Finance'
-            else:
-                errors[ticker] = str(e)
+            outcomes[ticker] = analyze_ticker_for_grid(ticker, period, interval, prefetched.get(ticker), fields)
+    
+    # Keep the requested ticker order in the response
+    results = {}
+    errors = {}
+    ticker_timings = {}
+    for ticker in tickers:
+        result, error, elapsed = outcomes[ticker]
+        ticker_timings[ticker] = round(elapsed, 3)
+        if result is not None:
+            results[ticker] = result
+        else:
+            errors[ticker] = error
     
     return jsonify({
         'success': True,
@@ -2040,12 +3034,79 @@ def get_multi_ticker_data():
             'total_tickers': len(tickers),
             'successful': len(results),
             'failed': len(errors),
-            'sequential_processing': True,
-            'safe_mode': safe_mode
+            'batch_fetched': len(prefetched),
+            'sequential_processing': not (parallel and workers > 1),
+            'workers': workers if parallel else 1,
+            'total_time': round(time.time() - request_started, 3),
+            'ticker_timings': ticker_timings,
+            'resolved_symbols': get_symbol_resolver().resolve_batch('eod' if USE_EOD_API else 'yfinance', tickers),
+            'safe_mode': safe_mode,
+            'fields': fields
         },
         'rate_limit_notice': 'If you see many rate limit errors, add &safe_mode=true to the URL for much longer delays'
     })
 
+WARM_WORKERS = int(os.getenv('WARM_WORKERS', '2'))
+
+def warm_watchlist(tickers, period, interval):
+    """
+    Compute analyzer_b results for a watchlist into the analysis cache
+    
+    Tickers with a fresh cached result are skipped; stale ones are
+    recomputed. Bars are fetched in grouped downloads and the analyses run
+    on a small pool, leaving provider slots free for user requests.
+    
+    Args:
+        tickers: List of ticker symbols
+        period: Data period
+        interval: Data interval
+        
+    Returns:
+        Number of tickers warmed
+    """
+    def needs_warming(ticker):
+        key = f"{ticker}_{period}_{interval}"
+        cached = ticker_cache.get(key) if key in ticker_cache else None
+        # Analyses of only some fields are replaced by full ones
+        return cached is None or not has_analysis_columns(cached, None)
+    
+    todo = [t for t in tickers if needs_warming(t)]
+    if not todo:
+        return 0
+    
+    get_metadata_cache().fill_async(todo)
+    prefetched = fetch_multi_stock_data(todo, get_history_period(period, interval), interval)
+    
+    def warm(ticker):
+        key = ('analysis', ticker, period, interval, None, True)
+        df, _ = get_single_flight().do(key, _analyzer_b, ticker, period, interval, prefetched.get(ticker))
+        return df is not None
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, WARM_WORKERS), thread_name_prefix='cache-warm') as executor:
+        return sum(executor.map(warm, todo))
+
+def prepare_warm_run(reason):
+    """
+    Bulk-load the day's daily bars before the post-close warm run
+    
+    With EOD as the provider the settled daily bar of every stored daily
+    series is appended from one request per exchange, so warming the daily
+    watchlists afterwards needs no per-ticker fetches.
+    
+    Args:
+        reason: Trigger of the warm run
+        
+    Returns:
+        Summary of the bulk ingest, or None when nothing was ingested
+    """
+    if reason != 'post_close' or not (USE_EOD_API and USE_BAR_STORE):
+        return None
+    return ingest_bulk_last_day_eod()
+
+cache_warmer = get_cache_warmer(warm_watchlist, prepare_warm_run)
+if CACHE_WARMER_ENABLED:
+    cache_warmer.start()
+
 def analyzer_b_with_data(ticker, df, period, interval):
     """
     Run analyzer_b using provided data instead of fetching from yfinance
@@ -2119,6 +3180,70 @@ def analyzer_b_with_data(ticker, df, period, interval):
         logger.error(f"Error in analyzer_b_with_data for {ticker}: {e}")
         return None
 
+def advance_live_indicators(ticker, period, interval):
+    """
+    Bring the streaming indicator state of a ticker up to its latest bar
+    
+    The first call seeds the state from the period's history, warm-up bars
+    included; later calls only apply the bars that arrived since and revise
+    the still-forming last bar, so their cost does not grow with history.
+    
+    Args:
+        ticker: Stock ticker symbol
+        period: History period the state is seeded from
+        interval: Data interval
+        
+    Returns:
+        Tuple of (IndicatorState, whether it was seeded), or (None, False) without data
+    """
+    df = fetch_stock_data(ticker, get_history_period(period, interval), interval)
+    if df is None or df.empty:
+        return None, False
+    return get_indicator_streams().advance(ticker, interval, df, adjust_parameters_for_interval(interval))
+
+@app.route('/api/live-indicators', methods=['GET'])
+def get_live_indicators():
+    """
+    Latest bar's indicator values from the streaming indicator state
+    
+    Query parameters:
+        ticker: Stock ticker symbol
+        interval: Data interval (default 1d)
+        period: History the state is seeded from on first use (default 1y)
+    """
+    ticker = request.args.get('ticker', 'AAPL').upper()
+    interval = request.args.get('interval', '1d')
+    period = request.args.get('period', '1y')
+    
+    if interval not in VALID_INTERVALS or period not in VALID_PERIODS:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid interval or period. Intervals: {VALID_INTERVALS}, periods: {VALID_PERIODS}'
+        }), 400
+    
+    try:
+        state, seeded = advance_live_indicators(ticker, period, interval)
+    except Exception as e:
+        logger.error(f"Error advancing live indicators of {ticker} {interval}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    if state is None:
+        return jsonify({'success': False, 'error': f'No data available for {ticker}'}), 404
+    
+    indicators = {
+        name: None if isinstance(value, float) and not np.isfinite(value) else value
+        for name, value in state.last_values.items()
+    }
+    return jsonify({
+        'success': True,
+        'ticker': ticker,
+        'interval': interval,
+        'time': str(state.last_time),
+        'forming': state.forming,
+        'bars': state.bars,
+        'seeded': seeded,
+        'indicators': indicators
+    })
+
 # Endpoint to get available intervals and periods
 @app.route('/api/available-options', methods=['GET'])
 def get_available_options():
@@ -2132,14 +3257,157 @@ def get_available_options():
 @app.route('/api/clear-cache', methods=['GET'])
 def clear_cache():
     """Clear the data cache"""
-    global ticker_cache
-    ticker_cache = {}
-    logger.info("Cache cleared")
+    cleared = ticker_cache.clear()
+    logger.info(f"Cache cleared ({cleared} entries)")
     return jsonify({
         'success': True,
         'message': 'Cache cleared successfully'
     })
 
+def get_cache_layers():
+    """Get the cache layers managed by the cache admin endpoints by name"""
+    layers = {
+        'analysis': ticker_cache,
+        'metadata': get_metadata_cache(),
+        'negative': get_negative_cache(),
+        'streams': get_indicator_streams(),
+        'symbols': get_symbol_resolver()
+    }
+    if USE_BAR_STORE:
+        layers['bars'] = get_bar_store()
+        layers['pyramid'] = get_bar_pyramid()
+    return layers
+
+def find_cache_entries(layer_name, layer, key=None, pattern=None, ticker=None):
+    """
+    List the entries of a cache layer matching the given filters
+    
+    Args:
+        layer_name: Name of the layer ('analysis', 'bars', 'metadata', 'negative', 'pyramid', 'streams', 'symbols')
+        layer: Cache object of the layer
+        key: Exact entry key
+        pattern: fnmatch pattern on the entry key (e.g. 'AAPL_*', 'yfinance/1h/*')
+        ticker: fnmatch pattern on the ticker (e.g. 'AAPL', 'BTC-*')
+        
+    Returns:
+        List of matching entry descriptions
+    """
+    matches = []
+    for entry in layer.list_entries():
+        if layer_name == 'analysis':
+            # Analysis keys are ticker_period_interval
+            entry['ticker'] = entry['key'].rsplit('_', 2)[0]
+        if key is not None and entry['key'] != key:
+            continue
+        if pattern is not None and not fnmatch.fnmatchcase(entry['key'], pattern):
+            continue
+        if ticker is not None and not fnmatch.fnmatchcase(entry['ticker'], ticker.upper()):
+            continue
+        matches.append(entry)
+    return matches
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Per-layer cache statistics (entries, bytes, hit ratio, age)"""
+    return jsonify({
+        'success': True,
+        'layers': {name: layer.get_stats() for name, layer in get_cache_layers().items()},
+        'single_flight': get_single_flight().get_stats(),
+        'providers': get_provider_limiter().get_stats(),
+        'hedging': get_provider_limiter().get_hedge_stats(),
+        'replay': yf.get_stats() if REPLAY_MODE else None,
+        'warmer': cache_warmer.get_stats()
+    })
+
+@app.route('/api/cache/warmer', methods=['GET', 'POST'])
+def cache_warmer_status():
+    """
+    Cache warmer status: watchlists, last and next run
+    
+    Query parameters:
+        run: When true, start a warm run of every watchlist now
+        interval: Restrict a manual run to watchlists of one interval
+    """
+    started = False
+    if request.args.get('run', 'false').lower() == 'true':
+        cache_warmer.run_async('manual', request.args.get('interval'))
+        started = True
+    return jsonify({
+        'success': True,
+        'run_started': started,
+        'warmer': cache_warmer.get_stats()
+    })
+
+@app.route('/api/cache/bulk-ingest', methods=['POST'])
+def cache_bulk_ingest():
+    """
+    Append the latest daily bar to every stored EOD daily series
+    
+    Query parameters:
+        exchanges: Comma-separated EOD exchange codes (default: EOD_BULK_EXCHANGES)
+        date: Trading day to ingest, YYYY-MM-DD (default: the last one)
+    """
+    if not (USE_EOD_API and USE_BAR_STORE):
+        return jsonify({
+            'success': False,
+            'error': 'Bulk ingest needs the EOD API and the bar store enabled'
+        }), 400
+    
+    exchanges = request.args.get('exchanges')
+    exchanges = [e.strip() for e in exchanges.split(',') if e.strip()] if exchanges else None
+    summary = ingest_bulk_last_day_eod(exchanges, request.args.get('date'))
+    if summary is None:
+        return jsonify({'success': False, 'error': 'Bulk ingest failed'}), 500
+    return jsonify({'success': True, 'ingest': summary})
+
+@app.route('/api/cache/invalidate', methods=['GET', 'POST'])
+def cache_invalidate():
+    """
+    Invalidate selected cache entries
+    
+    Query parameters:
+        key: Exact entry key (e.g. AAPL_1y_1d)
+        pattern: fnmatch pattern on entry keys (e.g. AAPL_*)
+        ticker: fnmatch pattern on tickers, applied to every selected layer
+        layers: Comma-separated layers to act on (default: analysis)
+        dry_run: When true, only list what would be removed
+    """
+    key = request.args.get('key')
+    pattern = request.args.get('pattern')
+    ticker = request.args.get('ticker')
+    dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+    layer_names = [name.strip() for name in request.args.get('layers', 'analysis').split(',') if name.strip()]
+    
+    if key is None and pattern is None and ticker is None:
+        return jsonify({
+            'success': False,
+            'error': 'Provide key, pattern or ticker (use /api/clear-cache to drop everything)'
+        }), 400
+    
+    layers = get_cache_layers()
+    unknown = [name for name in layer_names if name not in layers]
+    if unknown:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown cache layers: {unknown}. Available: {list(layers)}'
+        }), 400
+    
+    report = {}
+    for name in layer_names:
+        matches = find_cache_entries(name, layers[name], key, pattern, ticker)
+        if not dry_run:
+            for entry in matches:
+                layers[name].delete(entry['key'])
+        report[name] = {'matched': len(matches), 'entries': matches}
+    
+    matched = {name: info['matched'] for name, info in report.items()}
+    logger.info(f"Cache invalidation (dry_run={dry_run}) key={key} pattern={pattern} ticker={ticker}: {matched}")
+    return jsonify({
+        'success': True,
+        'dry_run': dry_run,
+        'layers': report
+    })
+
 @app.route('/')
 def home():
     """Basic route to test if API is running"""
@@ -2204,7 +3472,6 @@ def display_trading_recommendations_js():
 # Add this import at the top of the file with other imports
 try:
     from api_optimization import (
-        detect_divergences_optimized, 
         validate_data_quality, 
         calculate_indicators_batch,
         optimize_regime_detection,
@@ -2241,8 +3508,7 @@ def analyzer_b_optimized(ticker, period='1mo', interval='1d', use_cache=True, fo
         # Clear cache if force refresh is requested
         if force_refresh and use_cache:
             cache_key = f"{ticker}_{period}_{interval}"
-            if cache_key in data_cache:
-                del data_cache[cache_key]
+            if ticker_cache.delete(cache_key):
                 logger.info(f"Cache cleared for {cache_key}")
         
         # Fetch stock data with improved error handling
@@ -2251,7 +3517,6 @@ def analyzer_b_optimized(ticker, period='1mo', interval='1d', use_cache=True, fo
             period=period, 
             interval=interval, 
             max_retries=3, 
-            retry_delay=5,  # Increased from 2 to 5 seconds
             use_cache=use_cache
         )
         
@@ -2301,17 +3566,11 @@ def analyzer_b_optimized(ticker, period='1mo', interval='1d', use_cache=True, fo
             # Try to recalculate missing indicators
             df = recalculate_missing_indicators(df, missing_indicators, params)
         
-        # Calculate divergences with optimization if available
-        if OPTIMIZATION_AVAILABLE and 'WT2' in df.columns and len(df) > 20:
-            logger.info("Using optimized divergence detection")
-            bullish_div, bearish_div, hidden_bullish_div, hidden_bearish_div = detect_divergences_optimized(
-                df, df['WT2'], df['Close']
-            )
-        else:
-            logger.info("Using standard divergence detection")
-            bullish_div, bearish_div, hidden_bullish_div, hidden_bearish_div = detect_divergences(
-                df, df['WT2'], df['Close']
-            )
+        # Calculate divergences with the same engine as analyzer_b so both
+        # paths agree on every pivot
+        bullish_div, bearish_div, hidden_bullish_div, hidden_bearish_div = detect_divergences(
+            df, df['WT2'], df['Close']
+        )
         
         # Add divergence results to DataFrame
         df['BullishDiv'] = bullish_div
@@ -262,13 +262,13 @@ def validate_data_quality(df, essential_columns):
         if col in cleaned_df.columns:
             if col in ['Open', 'High', 'Low', 'Close']:
                 # Forward fill then backward fill for price data
-                cleaned_df[col] = cleaned_df[col].fillna(method='ffill').fillna(method='bfill')
+                cleaned_df[col] = cleaned_df[col].ffill().bfill()
             elif col == 'Volume':
                 # Fill volume with 0 or median
                 cleaned_df[col] = cleaned_df[col].fillna(0)
             else:
                 # Fill indicators with interpolation or forward/backward fill
-                cleaned_df[col] = cleaned_df[col].interpolate().fillna(method='ffill').fillna(method='bfill')
+                cleaned_df[col] = cleaned_df[col].interpolate().ffill().bfill()
     
     return is_valid, issues, cleaned_df
 
@@ -0,0 +1,237 @@
+"""
+Multi-Resolution Bar Pyramid
+============================
+
+In-memory per-ticker pyramid of every interval derived from one base series.
+
+The bar store keeps one base series per (provider, ticker, interval) on
+disk, e.g. 1h bars that 3h, 4h, 6h, 8h and 12h are aggregated from and 1d
+bars for 2d and 3d. The pyramid keeps that base series in memory next to
+every level built from it, tagged with the store version (the time the
+series was last saved). As long as the store has not changed, flipping
+between intervals is served from memory without reading the store,
+aggregating again or calling the provider; any change rebuilds the levels
+lazily from the new base.
+
+Configuration:
+
+    BAR_PYRAMID_MAX_SERIES  Base series kept in memory, least recently used dropped (default 200)
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from analysis_cache import estimate_size
+from bar_store import slice_period, slice_range
+
+logger = logging.getLogger(__name__)
+
+BAR_PYRAMID_MAX_SERIES = int(os.getenv('BAR_PYRAMID_MAX_SERIES', '200'))
+
+
+class BarPyramid:
+    """
+    LRU cache of base bar series and the intervals derived from them
+    """
+
+    def __init__(self, max_series=None):
+        """
+        Initialize an empty pyramid
+
+        Args:
+            max_series: Number of base series kept (defaults to BAR_PYRAMID_MAX_SERIES)
+        """
+        self.max_series = BAR_PYRAMID_MAX_SERIES if max_series is None else max_series
+        self.logger = logging.getLogger(__name__)
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'builds': 0, 'base_loads': 0, 'evictions': 0}
+
+    def get_level(self, provider, ticker, base_interval, interval, version, load_base, build):
+        """
+        Get one interval of a ticker, derived from the base series in memory
+
+        Args:
+            provider: Data provider namespace ('yfinance', 'eod')
+            ticker: Ticker symbol
+            base_interval: Interval of the stored base series
+            interval: Interval to return
+            version: Version of the stored base series; a different version
+                drops every level built from the previous one
+            load_base: Callable returning the full base series DataFrame
+            build: Callable ``build(base)`` returning the level DataFrame;
+                must not modify ``base``
+
+        Returns:
+            The level DataFrame, shared between callers (copy before modifying),
+            or None when there is no base series
+        """
+        key = (provider, ticker.upper(), base_interval)
+        with self._lock:
+            entry = self._series.get(key)
+            if entry is not None and entry['version'] == version:
+                self._series.move_to_end(key)
+                level = entry['levels'].get(interval)
+                if level is not None:
+                    self._counters['hits'] += 1
+                    return level
+                base = entry['base']
+            else:
+                entry = None
+
+        if entry is None:
+            base = load_base()
+            if base is None or base.empty:
+                return None
+            entry = {'version': version, 'base': base, 'levels': {}}
+            with self._lock:
+                self._counters['base_loads'] += 1
+                self._series[key] = entry
+                self._series.move_to_end(key)
+                while len(self._series) > self.max_series:
+                    self._series.popitem(last=False)
+                    self._counters['evictions'] += 1
+
+        level = build(base)
+        with self._lock:
+            self._counters['builds'] += 1
+            entry['levels'][interval] = level
+        self.logger.debug(f"Built {interval} level of {ticker} from {len(base)} {base_interval} bars")
+        return level
+
+    def get_bars(self, store, provider, ticker, base_interval, interval, period, build,
+                 fetcher=None, refresh=False, full_period=None):
+        """
+        Serve a period of an interval from the base series held in a bar store
+
+        Args:
+            store: BarStore holding the base series
+            provider: Data provider namespace ('yfinance', 'eod')
+            ticker: Ticker symbol
+            base_interval: Interval of the stored base series
+            interval: Interval to return
+            period: Period to return
+            build: Callable ``build(base)`` turning the base series into the interval
+            fetcher: Provider fetcher bringing the stored series up to date
+                first (see BarStore.sync); without one whatever is stored is served
+            refresh: Re-fetch the whole period even if the store covers it
+            full_period: Period to fetch when the series has to be fetched in full
+
+        Returns:
+            DataFrame of the requested period (the caller's own copy), the
+            empty provider answer when there are no bars, or None
+        """
+        fresh = None
+        if fetcher is not None:
+            meta, fresh = store.sync(provider, ticker, base_interval, period, fetcher,
+                                     refresh=refresh, full_period=full_period)
+        else:
+            meta = store.load_meta(provider, ticker, base_interval)
+        if meta is None:
+            # Pass an empty provider answer on, it may carry why there are no bars
+            return fresh
+
+        level = self._stored_level(store, meta, provider, ticker, base_interval, interval, build)
+        if level is None:
+            return None
+        return slice_period(level, period).copy()
+
+    def get_range(self, store, provider, ticker, base_interval, interval, start, end, build, fetcher=None):
+        """
+        Serve the bars of an interval between two timestamps (see get_bars)
+
+        Args:
+            store: BarStore holding the base series
+            provider: Data provider namespace ('yfinance', 'eod')
+            ticker: Ticker symbol
+            base_interval: Interval of the stored base series
+            interval: Interval to return
+            start: First timestamp to return
+            end: Last timestamp to return (None for the latest bar)
+            build: Callable ``build(base)`` turning the base series into the interval
+            fetcher: Provider fetcher filling the gaps of the stored series
+                first (see BarStore.sync_range); without one whatever is stored is served
+
+        Returns:
+            DataFrame of the requested range (the caller's own copy), the
+            empty provider answer when there are no bars, or None
+        """
+        fresh = None
+        if fetcher is not None:
+            meta, fresh = store.sync_range(provider, ticker, base_interval, start, end, fetcher)
+        else:
+            meta = store.load_meta(provider, ticker, base_interval)
+        if meta is None:
+            return fresh
+
+        level = self._stored_level(store, meta, provider, ticker, base_interval, interval, build)
+        if level is None:
+            return None
+        return slice_range(level, start, end).copy()
+
+    def _stored_level(self, store, meta, provider, ticker, base_interval, interval, build):
+        """Get the level of the stored series version described by meta"""
+        return self.get_level(
+            provider, ticker, base_interval, interval, meta['updated_at'],
+            lambda: store.load(provider, ticker, base_interval)[0], build
+        )
+
+    def list_entries(self):
+        """
+        Describe every base series in memory
+
+        Returns:
+            List of dicts with key ('provider/base_interval/TICKER'), ticker,
+            rows, levels and bytes
+        """
+        with self._lock:
+            series = list(self._series.items())
+        return [
+            {
+                'key': f"{provider}/{base_interval}/{ticker}",
+                'ticker': ticker,
+                'rows': len(entry['base']),
+                'levels': sorted(entry['levels']),
+                'bytes': estimate_size(entry['base']) + sum(estimate_size(level) for level in entry['levels'].values())
+            }
+            for (provider, ticker, base_interval), entry in series
+        ]
+
+    def delete(self, key):
+        """Drop one base series and its levels by 'provider/base_interval/TICKER' key"""
+        provider, base_interval, ticker = key.split('/', 2)
+        with self._lock:
+            return self._series.pop((provider, ticker, base_interval), None) is not None
+
+    def clear(self):
+        """Drop every series"""
+        with self._lock:
+            self._series.clear()
+
+    def get_stats(self):
+        """Get series counts, memory use and counters of the pyramid"""
+        entries = self.list_entries()
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['builds']
+            return dict(
+                self._counters,
+                name='pyramid',
+                entries=len(entries),
+                levels=sum(len(entry['levels']) for entry in entries),
+                bytes=sum(entry['bytes'] for entry in entries),
+                max_series=self.max_series,
+                hit_ratio=round(self._counters['hits'] / lookups, 4) if lookups else None
+            )
+
+
+# Global bar pyramid instance
+_bar_pyramid = None
+
+def get_bar_pyramid():
+    """Get or create global bar pyramid instance"""
+    global _bar_pyramid
+    if _bar_pyramid is None:
+        _bar_pyramid = BarPyramid()
+    return _bar_pyramid
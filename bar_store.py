@@ -0,0 +1,666 @@
+"""
+Persistent OHLCV Bar Store
+==========================
+
+On-disk columnar store for raw provider bars, keyed by (ticker, base interval).
+
+Every series is saved as a single ``.npz`` file holding one array per OHLCV
+column plus an int64 nanosecond index, next to a small JSON sidecar that
+records how far back the stored history reaches and the last stored
+timestamp. ``fetch_stock_data`` goes through the store so that a refresh only
+asks the provider for the bars after the last stored timestamp instead of
+re-downloading the whole period. A tail fetch starts at the last settled
+stored bar, so it overlaps the store; when the provider answers with other
+prices for that bar it has re-adjusted its history (a split or dividend on
+auto-adjusted bars), and the series is dropped and fetched in full instead
+of mixing two price bases.
+
+Layout::
+
+    <BAR_STORE_DIR>/<provider>/<interval>/<TICKER>.npz
+    <BAR_STORE_DIR>/<provider>/<interval>/<TICKER>.json
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BAR_STORE_DIR = os.getenv(
+    'BAR_STORE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.bar_store')
+)
+# Minimum number of seconds between two tail fetches for the same series
+BAR_STORE_REFRESH_SECONDS = int(os.getenv('BAR_STORE_REFRESH_SECONDS', '60'))
+
+# Relative price difference of an overlapping settled bar that means the
+# provider re-adjusted the stored history
+BAR_ADJUSTMENT_TOLERANCE = 1e-6
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+
+_PERIOD_PATTERN = re.compile(r'^(\d+)(d|wk|mo|y)$')
+
+
+def period_start(period, now=None):
+    """
+    Get the earliest timestamp a provider period string reaches back to
+
+    Args:
+        period: Period string ('5d', '1mo', '1y', 'ytd', 'max', '730d', ...)
+        now: Reference time (defaults to the current UTC time)
+
+    Returns:
+        UTC Timestamp, or None for 'max' (unbounded history)
+    """
+    now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+    if now.tzinfo is None:
+        now = now.tz_localize('UTC')
+
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1, tz='UTC')
+
+    match = _PERIOD_PATTERN.match(period or '')
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+
+    count, unit = int(match.group(1)), match.group(2)
+    if unit == 'd':
+        return now - pd.Timedelta(days=count)
+    if unit == 'wk':
+        return now - pd.Timedelta(weeks=count)
+    if unit == 'mo':
+        return now - pd.DateOffset(months=count)
+    return now - pd.DateOffset(years=count)
+
+
+def slice_period(df, period, now=None):
+    """
+    Cut a bar series down to the bars a provider would return for ``period``
+
+    Day-based periods count distinct trading dates (like Yahoo's ``range``
+    parameter), so '5d' means the last five sessions rather than five
+    calendar days. Longer periods are calendar based.
+
+    Args:
+        df: DataFrame with a sorted DatetimeIndex
+        period: Period string
+        now: Reference time (defaults to the current UTC time)
+
+    Returns:
+        DataFrame with the bars inside the period
+    """
+    if df is None or df.empty or period == 'max':
+        return df
+
+    match = _PERIOD_PATTERN.match(period or '')
+    if match and match.group(2) == 'd':
+        session_dates = pd.Index(df.index.date).unique()
+        keep = set(session_dates[-int(match.group(1)):])
+        return df[np.isin(df.index.date, list(keep))]
+
+    start = period_start(period, now)
+    index = df.index
+    if index.tz is None:
+        start = start.tz_convert(None)
+    else:
+        start = start.tz_convert(index.tz)
+    return df[index >= start]
+
+
+def to_utc(timestamp):
+    """Get a timestamp as a UTC Timestamp, taking naive values as UTC"""
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize('UTC')
+    return timestamp.tz_convert('UTC')
+
+
+def _align_to_index(timestamp, index):
+    """Express a timestamp in the timezone (or naive UTC) of an index"""
+    timestamp = to_utc(timestamp)
+    return timestamp.tz_convert(None) if index.tz is None else timestamp.tz_convert(index.tz)
+
+
+def slice_range(df, start=None, end=None):
+    """
+    Cut a sorted bar series down to the bars between two timestamps
+
+    Both bounds are inclusive and found by binary search on the index, so
+    zooming into a long history does not scan it.
+
+    Args:
+        df: DataFrame with a sorted DatetimeIndex
+        start: First timestamp to keep (None keeps from the first bar)
+        end: Last timestamp to keep (None keeps up to the last bar)
+
+    Returns:
+        DataFrame with the bars inside the range
+    """
+    if df is None or df.empty:
+        return df
+    index = df.index
+    lo = 0 if start is None else index.searchsorted(_align_to_index(start, index), side='left')
+    hi = len(index) if end is None else index.searchsorted(_align_to_index(end, index), side='right')
+    return df.iloc[lo:hi]
+
+
+class BarStore:
+    """
+    Incremental on-disk store of raw OHLCV bars
+    """
+
+    def __init__(self, root_dir=None, refresh_seconds=None):
+        """
+        Initialize the bar store
+
+        Args:
+            root_dir: Directory holding the stored series (defaults to BAR_STORE_DIR)
+            refresh_seconds: Minimum seconds between tail fetches of one series
+        """
+        self.root_dir = root_dir or BAR_STORE_DIR
+        self.refresh_seconds = BAR_STORE_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self.logger = logging.getLogger(__name__)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0}
+
+    def _key_lock(self, provider, ticker, interval):
+        """Get the lock serialising updates of one stored series"""
+        key = (provider, ticker, interval)
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def _paths(self, provider, ticker, interval):
+        """Get the (data, metadata) file paths for a series"""
+        directory = os.path.join(self.root_dir, provider, interval)
+        name = quote(ticker.upper(), safe='')
+        return os.path.join(directory, f"{name}.npz"), os.path.join(directory, f"{name}.json")
+
+    def load(self, provider, ticker, interval):
+        """
+        Load a stored series
+
+        Args:
+            provider: Data provider namespace ('yfinance', 'eod')
+            ticker: Ticker symbol
+            interval: Base interval of the bars
+
+        Returns:
+            Tuple of (DataFrame or None, metadata dict or None)
+        """
+        data_path, meta_path = self._paths(provider, ticker, interval)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None, None
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with np.load(data_path, allow_pickle=False) as data:
+                index = pd.DatetimeIndex(data['__index__'].view('datetime64[ns]'))
+                columns = {col: data[col] for col in meta['columns']}
+            if meta.get('tz'):
+                index = index.tz_localize('UTC').tz_convert(meta['tz'])
+            df = pd.DataFrame(columns, index=index)
+            df.index.name = meta.get('index_name')
+            return df, meta
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable bar store entry for {ticker} {interval}: {e}")
+            return None, None
+
+    def load_meta(self, provider, ticker, interval):
+        """
+        Load only the metadata sidecar of a stored series
+
+        Returns:
+            Metadata dict, or None when nothing usable is stored
+        """
+        data_path, meta_path = self._paths(provider, ticker, interval)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable bar store metadata for {ticker} {interval}: {e}")
+            return None
+
+    def save(self, provider, ticker, interval, df, coverage_start, fresh_until=None):
+        """
+        Write a series to disk, replacing any stored version atomically
+
+        Args:
+            provider: Data provider namespace
+            ticker: Ticker symbol
+            interval: Base interval of the bars
+            df: DataFrame with a sorted DatetimeIndex
+            coverage_start: Earliest timestamp the stored history is complete from
+                (None when the full provider history is stored)
+            fresh_until: Unix time until which the series is known to be
+                complete, e.g. until the next session after a settled daily bar
+
+        Returns:
+            Metadata dict written alongside the data
+        """
+        data_path, meta_path = self._paths(provider, ticker, interval)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+        numeric = df.select_dtypes(include=[np.number, np.bool_])
+        index = numeric.index
+        tz = str(index.tz) if index.tz is not None else None
+        raw_index = index.tz_convert('UTC').tz_localize(None) if tz else index
+        arrays = {col: numeric[col].to_numpy(dtype=np.float64) for col in numeric.columns}
+        arrays['__index__'] = raw_index.values.astype('datetime64[ns]').astype(np.int64)
+
+        meta = {
+            'ticker': ticker.upper(),
+            'interval': interval,
+            'provider': provider,
+            'columns': list(numeric.columns),
+            'tz': tz,
+            'index_name': index.name,
+            'rows': len(numeric),
+            'coverage_start': coverage_start.isoformat() if coverage_start is not None else None,
+            'first_timestamp': index[0].isoformat() if len(index) else None,
+            'last_timestamp': index[-1].isoformat() if len(index) else None,
+            'settled_timestamp': index[-2].isoformat() if len(index) > 1 else None,
+            'updated_at': time.time(),
+            'fresh_until': fresh_until
+        }
+
+        fd, tmp_data = tempfile.mkstemp(dir=os.path.dirname(data_path), suffix='.npz.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_data, data_path)
+
+        fd, tmp_meta = tempfile.mkstemp(dir=os.path.dirname(meta_path), suffix='.json.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+
+        return meta
+
+    @staticmethod
+    def merge(existing, new):
+        """
+        Merge freshly fetched bars into a stored series
+
+        Bars present in both frames are taken from ``new`` so a previously
+        stored, still-forming last bar gets replaced by its final values.
+        """
+        if existing is None or existing.empty:
+            return new.sort_index()
+        if new is None or new.empty:
+            return existing
+
+        existing, new = BarStore._align_tz(existing, new)
+        combined = pd.concat([existing, new])
+        combined = combined[~combined.index.duplicated(keep='last')]
+        return combined.sort_index()
+
+    @staticmethod
+    def _align_tz(existing, new):
+        """Put two bar frames on the same timezone"""
+        # Naive bars are exchange wall time (tz-naive daily downloads), so
+        # they are localized rather than converted from UTC
+        if existing.index.tz is not None and new.index.tz is not None:
+            new = new.tz_convert(existing.index.tz)
+        elif existing.index.tz is not None:
+            new = new.tz_localize(existing.index.tz)
+        elif new.index.tz is not None:
+            existing = existing.tz_localize(new.index.tz)
+        return existing, new
+
+    @staticmethod
+    def is_readjusted(existing, new):
+        """
+        Check whether re-fetched bars disagree with the settled stored bars
+
+        The last stored bar is left out, it may still have been forming. Any
+        other bar fetched again with different prices means the provider
+        re-adjusted its history since the series was stored.
+        """
+        if existing is None or new is None or len(existing) < 2 or new.empty:
+            return False
+        existing, new = BarStore._align_tz(existing, new)
+        new = new[~new.index.duplicated(keep='last')]
+        overlap = existing.index[:-1].intersection(new.index)
+        columns = [col for col in PRICE_COLUMNS if col in existing.columns and col in new.columns]
+        if overlap.empty or not columns:
+            return False
+        stored = existing.loc[overlap, columns].to_numpy(dtype=np.float64)
+        fetched = new.loc[overlap, columns].to_numpy(dtype=np.float64)
+        return not np.allclose(fetched, stored, rtol=BAR_ADJUSTMENT_TOLERANCE, atol=0, equal_nan=True)
+
+    @staticmethod
+    def covers(meta, period, now=None):
+        """Check whether stored metadata covers the history a period needs"""
+        if meta is None or meta.get('rows', 0) == 0:
+            return False
+        if meta.get('coverage_start') is None:
+            return True  # Full provider history is stored
+        if period == 'max':
+            return False
+        return pd.Timestamp(meta['coverage_start']) <= period_start(period, now)
+
+    def is_fresh(self, meta):
+        """Check whether a stored series is recent enough to skip its tail fetch"""
+        now = time.time()
+        if now < (meta.get('fresh_until') or 0):
+            return True
+        return now - meta.get('updated_at', 0) < self.refresh_seconds
+
+    def missing_range(self, provider, ticker, interval, period, now=None):
+        """
+        Work out what has to be fetched to serve a period from the store
+
+        Args:
+            provider: Data provider namespace
+            ticker: Ticker symbol
+            interval: Base interval of the bars
+            period: Requested period string
+            now: Reference time (defaults to the current UTC time)
+
+        Returns:
+            Tuple of (mode, start) where mode is 'full' (fetch the whole
+            period), 'tail' (fetch from ``start`` onwards) or 'none'
+        """
+        meta = self.load_meta(provider, ticker, interval)
+        if not self.covers(meta, period, now):
+            return 'full', None
+
+        if self.is_fresh(meta):
+            return 'none', None
+
+        # Re-fetch the last stored bar, it may still have been forming, and
+        # the settled one before it to see whether the history was re-adjusted
+        return 'tail', pd.Timestamp(meta.get('settled_timestamp') or meta['last_timestamp'])
+
+    def update(self, provider, ticker, interval, new_bars, period=None, now=None, start=None, fresh_until=None):
+        """
+        Merge fetched bars into the stored series and persist it
+
+        Args:
+            provider: Data provider namespace
+            ticker: Ticker symbol
+            interval: Base interval of the bars
+            new_bars: DataFrame of freshly fetched bars (may be empty)
+            period: Period the bars were fetched for when this was a full
+                fetch, or None for a tail fetch
+            now: Reference time (defaults to the current UTC time)
+            start: Timestamp a range fetch reached back to, extending the
+                stored coverage to it (used when period is None)
+            fresh_until: Unix time until which no tail fetch is needed (see save)
+
+        Returns:
+            The merged DataFrame, or None when a tail or range fetch shows the
+            provider re-adjusted the stored history: the series is dropped
+            and has to be fetched again in full
+        """
+        with self._key_lock(provider, ticker, interval):
+            existing, meta = self.load(provider, ticker, interval)
+            if period is None and self.is_readjusted(existing, new_bars):
+                self.logger.warning(f"Provider re-adjusted the {ticker} {interval} history, dropping the stored bars")
+                for path in self._paths(provider, ticker, interval):
+                    if os.path.exists(path):
+                        os.remove(path)
+                return None
+            merged = self.merge(existing, new_bars)
+            if merged is None or merged.empty:
+                return merged
+
+            if period is None:
+                # Tail fetch, the stored coverage does not change unless a
+                # range fetch reached further back
+                if meta is None:
+                    coverage = merged.index[0] if start is None else to_utc(start)
+                elif meta.get('coverage_start') is None:
+                    coverage = None
+                else:
+                    coverage = pd.Timestamp(meta['coverage_start'])
+                    if start is not None:
+                        coverage = min(coverage, to_utc(start))
+            elif period == 'max':
+                coverage = None
+            else:
+                requested = period_start(period, now)
+                coverage = requested
+                if meta is not None and meta.get('coverage_start') is None:
+                    coverage = None
+                elif meta is not None:
+                    coverage = min(requested, pd.Timestamp(meta['coverage_start']))
+
+            self.save(provider, ticker, interval, merged, coverage, fresh_until)
+            return merged
+
+    def sync(self, provider, ticker, interval, period, fetcher, refresh=False, full_period=None, now=None):
+        """
+        Bring the stored series up to date for a period, fetching only what is missing
+
+        Args:
+            provider: Data provider namespace ('yfinance', 'eod')
+            ticker: Ticker symbol
+            interval: Base interval of the bars
+            period: Requested period string
+            fetcher: Callable ``fetcher(period=None, start=None)`` returning a
+                DataFrame of bars from the provider
+            refresh: Re-fetch the whole period even if the store covers it
+            full_period: Period to fetch when the series has to be fetched in
+                full (defaults to ``period``, must not be shorter)
+            now: Reference time (defaults to the current UTC time)
+
+        Returns:
+            Tuple of (metadata dict of the stored series, freshly fetched
+            bars); the metadata is None when a full fetch returned no bars
+        """
+        if refresh:
+            mode, start = 'full', None
+        else:
+            mode, start = self.missing_range(provider, ticker, interval, period, now)
+
+        with self._locks_guard:
+            self._counters['misses' if mode == 'full' else 'hits'] += 1
+
+        fresh = None
+        if mode == 'tail':
+            self.logger.info(f"Bar store hit for {ticker} {interval}, fetching tail from {start}")
+            fresh = fetcher(start=start)
+            if self.update(provider, ticker, interval, fresh, now=now) is None:
+                mode = 'full'
+        elif mode == 'none':
+            self.logger.info(f"Bar store hit for {ticker} {interval}, stored bars are fresh")
+
+        if mode == 'full':
+            full_period = full_period or period
+            self.logger.info(f"Bar store miss for {ticker} {interval} ({period}), fetching {full_period}")
+            fresh = fetcher(period=full_period)
+            if fresh is None or fresh.empty:
+                return None, fresh
+            self.update(provider, ticker, interval, fresh, period=full_period, now=now)
+
+        return self.load_meta(provider, ticker, interval), fresh
+
+    def sync_range(self, provider, ticker, interval, start, end, fetcher):
+        """
+        Make sure the stored series holds a date range, fetching only the gaps
+
+        Bars before the stored coverage are fetched up to the first stored
+        bar, bars after the last stored one from there to now (the series
+        stays contiguous); a range inside the stored history costs nothing.
+
+        Args:
+            provider: Data provider namespace ('yfinance', 'eod')
+            ticker: Ticker symbol
+            interval: Base interval of the bars
+            start: First timestamp of the range
+            end: Last timestamp of the range (None for now)
+            fetcher: Callable ``fetcher(period=None, start=None, end=None)``
+                returning a DataFrame of bars from the provider
+
+        Returns:
+            Tuple of (metadata dict of the stored series, freshly fetched
+            bars); the metadata is None when nothing is stored and the
+            provider returned no bars
+        """
+        start = to_utc(start)
+        meta = self.load_meta(provider, ticker, interval)
+        fresh = None
+        if meta is None or meta.get('rows', 0) == 0:
+            with self._locks_guard:
+                self._counters['misses'] += 1
+            self.logger.info(f"Bar store miss for {ticker} {interval}, fetching from {start}")
+            fresh = fetcher(start=start)
+            if fresh is None or fresh.empty:
+                return None, fresh
+            self.update(provider, ticker, interval, fresh, start=start)
+            return self.load_meta(provider, ticker, interval), fresh
+
+        with self._locks_guard:
+            self._counters['hits'] += 1
+        readjusted = False
+        coverage = meta.get('coverage_start')
+        if coverage is not None and start < to_utc(coverage):
+            first = to_utc(meta['first_timestamp'])
+            self.logger.info(f"Bar store gap for {ticker} {interval}, fetching {start} to {first}")
+            fresh = fetcher(start=start, end=first)
+            if fresh is not None:
+                # An empty answer still tells the provider has nothing earlier
+                readjusted = self.update(provider, ticker, interval, fresh, start=start) is None
+
+        last = to_utc(meta['last_timestamp'])
+        if not readjusted and (end is None or to_utc(end) > last) and not self.is_fresh(meta):
+            tail_start = to_utc(meta.get('settled_timestamp') or meta['last_timestamp'])
+            self.logger.info(f"Bar store hit for {ticker} {interval}, fetching tail from {tail_start}")
+            fresh = fetcher(start=tail_start)
+            readjusted = self.update(provider, ticker, interval, fresh) is None
+
+        if readjusted:
+            start = min(start, to_utc(meta['first_timestamp']))
+            self.logger.info(f"Refetching re-adjusted {ticker} {interval} bars from {start}")
+            fresh = fetcher(start=start)
+            if fresh is None or fresh.empty:
+                return None, fresh
+            self.update(provider, ticker, interval, fresh, start=start)
+
+        return self.load_meta(provider, ticker, interval), fresh
+
+    def get_bars(self, provider, ticker, interval, period, fetcher, refresh=False, now=None):
+        """
+        Serve a period of bars, fetching only what the store is missing
+
+        Args:
+            provider: Data provider namespace ('yfinance', 'eod')
+            ticker: Ticker symbol
+            interval: Base interval of the bars
+            period: Requested period string
+            fetcher: Callable ``fetcher(period=None, start=None)`` returning a
+                DataFrame of bars from the provider
+            refresh: Re-fetch the whole period even if the store covers it
+            now: Reference time (defaults to the current UTC time)
+
+        Returns:
+            DataFrame with the bars of the requested period, or None
+        """
+        meta, fresh = self.sync(provider, ticker, interval, period, fetcher, refresh, now=now)
+        if meta is None:
+            return fresh
+        stored, _ = self.load(provider, ticker, interval)
+        return slice_period(stored, period, now)
+
+    def list_entries(self):
+        """
+        Describe every stored series
+
+        Returns:
+            List of dicts with key ('provider/interval/TICKER'), ticker, rows,
+            bytes, age_seconds and last_timestamp
+        """
+        entries = []
+        if not os.path.isdir(self.root_dir):
+            return entries
+
+        now = time.time()
+        for provider in sorted(os.listdir(self.root_dir)):
+            provider_dir = os.path.join(self.root_dir, provider)
+            if not os.path.isdir(provider_dir):
+                continue
+            for interval in sorted(os.listdir(provider_dir)):
+                interval_dir = os.path.join(provider_dir, interval)
+                for name in sorted(os.listdir(interval_dir)):
+                    if not name.endswith('.json'):
+                        continue
+                    meta_path = os.path.join(interval_dir, name)
+                    data_path = meta_path[:-len('.json')] + '.npz'
+                    try:
+                        with open(meta_path) as f:
+                            meta = json.load(f)
+                        size = os.path.getsize(meta_path) + os.path.getsize(data_path)
+                    except (OSError, ValueError):
+                        continue
+                    entries.append({
+                        'key': f"{provider}/{interval}/{meta['ticker']}",
+                        'ticker': meta['ticker'],
+                        'rows': meta.get('rows', 0),
+                        'bytes': size,
+                        'age_seconds': round(now - meta.get('updated_at', now), 1),
+                        'last_timestamp': meta.get('last_timestamp')
+                    })
+        return entries
+
+    def delete(self, key):
+        """
+        Remove a stored series
+
+        Args:
+            key: Series key in the form 'provider/interval/TICKER'
+
+        Returns:
+            True if the series existed
+        """
+        provider, interval, ticker = key.split('/', 2)
+        removed = False
+        with self._key_lock(provider, ticker, interval):
+            for path in self._paths(provider, ticker, interval):
+                if os.path.exists(path):
+                    os.remove(path)
+                    removed = True
+        return removed
+
+    def get_stats(self):
+        """Get series count, disk usage and hit/miss counters of the store"""
+        entries = self.list_entries()
+        with self._locks_guard:
+            counters = dict(self._counters)
+        lookups = counters['hits'] + counters['misses']
+        return dict(
+            counters,
+            name='bars',
+            root_dir=self.root_dir,
+            entries=len(entries),
+            bytes=sum(entry['bytes'] for entry in entries),
+            hit_ratio=round(counters['hits'] / lookups, 4) if lookups else None,
+            oldest_age_seconds=max((entry['age_seconds'] for entry in entries), default=None)
+        )
+
+
+# Global bar store instance
+_bar_store = None
+
+def get_bar_store():
+    """Get or create global bar store instance"""
+    global _bar_store
+    if _bar_store is None:
+        _bar_store = BarStore()
+    return _bar_store
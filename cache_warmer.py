@@ -0,0 +1,299 @@
+"""
+Scheduled Cache Warmer
+======================
+
+Precomputes analysis results for watchlists before users ask for them.
+
+Dashboard users load the same watchlists right at the open and all hit cold
+caches at once. The warmer runs the analysis for a set of watchlists on a
+background thread at fixed points of the US session:
+
+- ``pre_open``: WARM_PRE_OPEN_MINUTES before the open
+- ``bar_close``: after every intraday bar close, for watchlists on that interval
+- ``post_close``: once the daily bar has settled after the close (the API
+  first bulk-loads the day's daily bars when EOD is the provider)
+
+Watchlists come from the environment and from the grids users actually load
+through /api/multi-ticker (the dashboard's saved ticker list), so no
+separate configuration is needed for the common case.
+
+Configuration:
+
+    CACHE_WARMER_ENABLED   Start the scheduler with the API (default false)
+    WARM_WATCHLISTS        Semicolon separated ticker lists, e.g. "AAPL,MSFT;BTC-USD"
+    WARM_INTERVALS         interval:period pairs to warm them for (default "1d:1y")
+    WARM_SCHEDULE          Triggers to run (default "pre_open,bar_close,post_close")
+    WARM_PRE_OPEN_MINUTES  Lead time of the pre-open run (default 10)
+"""
+
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from timeframe_aggregator import get_aggregator
+
+logger = logging.getLogger(__name__)
+
+CACHE_WARMER_ENABLED = os.getenv('CACHE_WARMER_ENABLED', 'false').lower() == 'true'
+WARM_WATCHLISTS = os.getenv('WARM_WATCHLISTS', '')
+WARM_INTERVALS = os.getenv('WARM_INTERVALS', '1d:1y')
+WARM_SCHEDULE = os.getenv('WARM_SCHEDULE', 'pre_open,bar_close,post_close')
+WARM_PRE_OPEN_MINUTES = float(os.getenv('WARM_PRE_OPEN_MINUTES', '10'))
+
+# Watchlists seen through the API are kept this long and capped at this many
+OBSERVED_WATCHLIST_DAYS = 3
+MAX_OBSERVED_WATCHLISTS = 10
+
+# Ticker whose calendar drives the schedule
+SCHEDULE_REFERENCE_TICKER = 'SPY'
+
+
+def parse_watchlists(text):
+    """Parse 'AAPL,MSFT;BTC-USD' into a list of ticker tuples"""
+    watchlists = []
+    for chunk in text.split(';'):
+        tickers = tuple(t.strip().upper() for t in chunk.split(',') if t.strip())
+        if tickers:
+            watchlists.append(tickers)
+    return watchlists
+
+
+def parse_intervals(text):
+    """Parse '1d:1y,1h:1mo' into a list of (interval, period) pairs"""
+    pairs = []
+    for chunk in text.split(','):
+        if ':' in chunk:
+            interval, period = chunk.split(':', 1)
+            pairs.append((interval.strip(), period.strip()))
+    return pairs
+
+
+class CacheWarmer:
+    """
+    Background scheduler that keeps watchlist analyses warm
+    """
+
+    def __init__(self, warm_fn, watchlists=None, intervals=None, schedule=None, pre_open_minutes=None,
+                 prepare_fn=None):
+        """
+        Initialize the warmer
+
+        Args:
+            warm_fn: Callable ``warm_fn(tickers, period, interval)`` computing
+                the results of one watchlist into the cache and returning how
+                many tickers it warmed
+            watchlists: List of ticker tuples (defaults to WARM_WATCHLISTS)
+            intervals: List of (interval, period) pairs (defaults to WARM_INTERVALS)
+            schedule: Iterable of trigger names (defaults to WARM_SCHEDULE)
+            pre_open_minutes: Lead time of the pre-open run
+            prepare_fn: Optional callable ``prepare_fn(reason)`` run before the
+                watchlists are warmed, e.g. to bulk-load the day's bars; its
+                return value is recorded in the run summary
+        """
+        self.warm_fn = warm_fn
+        self.prepare_fn = prepare_fn
+        self.watchlists = parse_watchlists(WARM_WATCHLISTS) if watchlists is None else list(watchlists)
+        self.intervals = parse_intervals(WARM_INTERVALS) if intervals is None else list(intervals)
+        self.schedule = set(t.strip() for t in (WARM_SCHEDULE.split(',') if schedule is None else schedule))
+        self.pre_open = pd.Timedelta(minutes=WARM_PRE_OPEN_MINUTES if pre_open_minutes is None else pre_open_minutes)
+        self.aggregator = get_aggregator()
+        self.logger = logging.getLogger(__name__)
+        self._observed = {}
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_run = None
+
+    def record_watchlist(self, tickers, period, interval):
+        """
+        Remember a watchlist a user loaded so later runs warm it too
+
+        Args:
+            tickers: Ticker symbols of the grid
+            period: Requested period
+            interval: Requested interval
+        """
+        key = (tuple(sorted(t.upper() for t in tickers)), period, interval)
+        if not key[0]:
+            return
+        now = time.time()
+        with self._lock:
+            self._observed[key] = now
+            cutoff = now - OBSERVED_WATCHLIST_DAYS * 86400
+            recent = sorted(
+                ((seen, k) for k, seen in self._observed.items() if seen >= cutoff), reverse=True
+            )[:MAX_OBSERVED_WATCHLISTS]
+            self._observed = {k: seen for seen, k in recent}
+
+    def get_jobs(self, interval=None):
+        """
+        Get the (tickers, period, interval) jobs to warm
+
+        Args:
+            interval: Only return jobs for this interval
+
+        Returns:
+            List of (tickers tuple, period, interval)
+        """
+        jobs = {}
+        for tickers in self.watchlists:
+            for job_interval, period in self.intervals:
+                jobs[(tickers, period, job_interval)] = True
+        with self._lock:
+            for key in self._observed:
+                jobs[key] = True
+        return [job for job in jobs if interval is None or job[2] == interval]
+
+    def next_run(self, now=None):
+        """
+        Work out the next scheduled run
+
+        Args:
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Tuple of (UTC Timestamp, trigger name, interval or None)
+        """
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now).tz_convert('UTC')
+        candidates = []
+
+        if 'pre_open' in self.schedule:
+            session_open = self.aggregator.get_next_session_open('stocks', now)
+            if session_open - self.pre_open <= now:
+                session_open = self.aggregator.get_next_session_open('stocks', session_open)
+            candidates.append((session_open - self.pre_open, 'pre_open', None))
+
+        if 'post_close' in self.schedule:
+            settle = self.aggregator.SESSION_SETTLE
+            session_close = self.aggregator.get_next_bar_close('1d', SCHEDULE_REFERENCE_TICKER, now - settle)
+            candidates.append((session_close + settle, 'post_close', None))
+
+        if 'bar_close' in self.schedule:
+            delay = self.aggregator.BAR_CLOSE_DELAY
+            intraday = {job[2] for job in self.get_jobs()
+                        if self.aggregator.BAR_DURATIONS.get(job[2], pd.Timedelta(days=1)) < pd.Timedelta(days=1)}
+            for interval in sorted(intraday):
+                bar_close = self.aggregator.get_next_bar_close(interval, SCHEDULE_REFERENCE_TICKER, now - delay)
+                candidates.append((bar_close + delay, 'bar_close', interval))
+
+        if not candidates:
+            return None
+        return min(candidates, key=lambda candidate: candidate[0])
+
+    def run_once(self, reason='manual', interval=None):
+        """
+        Warm every job (or every job of one interval) now
+
+        Args:
+            reason: Trigger name recorded in the run summary
+            interval: Only warm jobs for this interval
+
+        Returns:
+            Summary dict of the run
+        """
+        with self._run_lock:
+            started = time.time()
+            jobs = self.get_jobs(interval)
+            warmed = 0
+            errors = 0
+            prepared = None
+            if self.prepare_fn is not None:
+                try:
+                    prepared = self.prepare_fn(reason)
+                except Exception as e:
+                    errors += 1
+                    self.logger.warning(f"Preparing the cache warm run ({reason}) failed: {e}")
+            self.logger.info(f"Cache warm run ({reason}) for {len(jobs)} watchlists")
+            for tickers, period, job_interval in jobs:
+                if self._stop.is_set():
+                    break
+                try:
+                    warmed += self.warm_fn(list(tickers), period, job_interval) or 0
+                except Exception as e:
+                    errors += 1
+                    self.logger.warning(f"Warming {tickers} ({period}, {job_interval}) failed: {e}")
+
+            self.last_run = {
+                'reason': reason,
+                'interval': interval,
+                'started_at': started,
+                'duration_seconds': round(time.time() - started, 2),
+                'watchlists': len(jobs),
+                'tickers_warmed': warmed,
+                'prepared': prepared,
+                'errors': errors
+            }
+            self.logger.info(f"Cache warm run ({reason}) warmed {warmed} tickers in {self.last_run['duration_seconds']}s")
+            return self.last_run
+
+    def run_async(self, reason='manual', interval=None):
+        """Start run_once on a background thread"""
+        thread = threading.Thread(target=self.run_once, args=(reason, interval), name='cache-warm', daemon=True)
+        thread.start()
+        return thread
+
+    def _loop(self):
+        """Scheduler loop: sleep until the next trigger, then warm"""
+        last_run_at = None
+        while not self._stop.is_set():
+            now = pd.Timestamp.now(tz='UTC')
+            if last_run_at is not None and now <= last_run_at:
+                # Never schedule the trigger that just ran a second time
+                now = last_run_at + pd.Timedelta(seconds=1)
+            upcoming = self.next_run(now)
+            if upcoming is None:
+                return
+            run_at, reason, interval = upcoming
+            wait = (run_at - pd.Timestamp.now(tz='UTC')).total_seconds()
+            if wait > 0 and self._stop.wait(wait):
+                return
+            self.run_once(reason, interval)
+            last_run_at = run_at
+
+    def start(self):
+        """Start the scheduler thread (no-op if already running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='cache-warmer', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Cache warmer started with schedule {sorted(self.schedule)}")
+
+    def stop(self):
+        """Stop the scheduler thread"""
+        self._stop.set()
+
+    def get_stats(self):
+        """Get the jobs, last run and next run of the warmer"""
+        upcoming = self.next_run()
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'schedule': sorted(self.schedule),
+            'jobs': [
+                {'tickers': list(tickers), 'period': period, 'interval': interval}
+                for tickers, period, interval in self.get_jobs()
+            ],
+            'last_run': self.last_run,
+            'next_run': {
+                'at': upcoming[0].isoformat(),
+                'reason': upcoming[1],
+                'interval': upcoming[2]
+            } if upcoming else None
+        }
+
+
+# Global cache warmer instance
+_cache_warmer = None
+
+def get_cache_warmer(warm_fn=None, prepare_fn=None):
+    """Get or create global cache warmer instance (warm_fn is required on first call)"""
+    global _cache_warmer
+    if _cache_warmer is None:
+        if warm_fn is None:
+            raise ValueError("warm_fn is required to create the cache warmer")
+        _cache_warmer = CacheWarmer(warm_fn, prepare_fn=prepare_fn)
+    return _cache_warmer
@@ -490,82 +490,12 @@ function fetchTickersData(tickers) {
                 const successCount = Object.keys(data.results).length;
                 console.warn(`${errorCount} ticker(s) failed, ${successCount} succeeded`);
                 
-                // 🔄 AUTO-RETRY FEATURE: Try failed tickers with .US suffix
-                const retryableTickers = [];
-                const nonRetryableErrors = [];
-                
-                Object.entries(data.errors).forEach(([ticker, error]) => {
-                    if (!ticker.includes('.') && !ticker.includes('/') && !ticker.includes('-')) {
-                        // Plain format ticker - can retry with .US
-                        retryableTickers.push(ticker + '.US');
-                        console.log(`🔄 Queuing retry: ${ticker} → ${ticker}.US`);
-                    } else {
-                        nonRetryableErrors.push(`${ticker}: ${error}`);
-                    }
-                });
-                
-                if (retryableTickers.length > 0) {
-                    console.log(`🔄 Auto-retrying ${retryableTickers.length} tickers with .US suffix:`, retryableTickers);
-                    showAlert(`🔄 Auto-retrying ${retryableTickers.length} ticker(s) with .US suffix...`, 'info');
-                    
-                    const retryApiUrl = `/api/multi-ticker?tickers=${retryableTickers.join(',')}&period=${period}&interval=${apiInterval}`;
-                    
-                    fetch(retryApiUrl)
-                        .then(response => response.ok ? response.json() : Promise.reject(response))
-                        .then(retryData => {
-                            console.log('🔄 Retry API Response:', retryData);
-                            
-                            if (retryData.results && Object.keys(retryData.results).length > 0) {
-                                // Merge successful retry results with original successful results
-                                const combinedResults = { ...data.results, ...retryData.results };
-                                const successfulRetries = Object.keys(retryData.results);
-                                const retryMappings = successfulRetries.map(ticker => 
-                                    `${ticker.replace('.US', '')} → ${ticker}`
-                                );
-                                
-                                // Update with combined data
-                                const combinedData = { 
-                                    results: combinedResults, 
-                                    errors: retryData.errors || {} 
-                                };
-                                tickersData = combinedData;
-                                renderTickersGrid(combinedData);
-                                updateTimestamp();
-                                
-                                // Update ticker input and localStorage
-                                const allSuccessfulTickers = Object.keys(combinedResults);
-                                document.getElementById('tickerInput').value = allSuccessfulTickers.join(',');
-                                localStorage.setItem('enhancedDashboardTickers', allSuccessfulTickers.join(','));
-                                
-                                showAlert(`✅ Auto-retry successful! Fixed ${successfulRetries.length} ticker(s):\n${retryMappings.join('\n')}`, 'success');
-                                
-                                // Show any remaining errors after retry
-                                const remainingErrors = Object.keys(retryData.errors || {});
-                                if (remainingErrors.length > 0) {
-                                    setTimeout(() => {
-                                        const errorList = remainingErrors.map(ticker => 
-                                            `${ticker.replace('.US', '')}: Failed even with .US suffix`
-                                        ).join('\n');
-                                        showAlert(`Some tickers still failed:\n${errorList}`, 'warning');
-                                    }, 2000);
-                                }
-                            } else {
-                                // Retry didn't return any results
-                                console.log('❌ Auto-retry returned no results');
-                                const failedTickers = Object.keys(data.errors).join(', ');
-                                showAlert(`Warning: Could not load data for: ${failedTickers}. Auto-retry with .US suffix also failed.`, 'warning');
-                            }
-                        })
-                        .catch(error => {
-                            console.error('❌ Auto-retry request failed:', error);
-                            const failedTickers = Object.keys(data.errors).join(', ');
-                            showAlert(`Warning: Could not load data for: ${failedTickers}. Auto-retry failed.`, 'warning');
-                        });
-                } else {
-                    // No retryable tickers - show original error
-                    const failedTickers = Object.keys(data.errors).join(', ');
-                    showAlert(`Warning: Could not load data for: ${failedTickers}. Other tickers loaded successfully.`, 'warning');
-                }
+                // The server already tried every provider symbol format (e.g. AAPL.US),
+                // so a failed ticker is reported as is instead of retried here
+                const errorMessages = Object.entries(data.errors)
+                    .map(([ticker, error]) => `${ticker}: ${error}`)
+                    .join('\n');
+                showAlert(`Warning: Could not load data for:\n${errorMessages}\nOther tickers loaded successfully.`, 'warning');
             }
         })
         .catch(error => {
@@ -1,10 +1,19 @@
 import pandas as pd
 import numpy as np
 from eodhd import APIClient
+import concurrent.futures
 import logging
 from datetime import datetime, timedelta
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, GoodFriday, USLaborDay, USMartinLutherKingJr, USMemorialDay,
+    USPresidentsDay, USThanksgivingDay, nearest_workday, sunday_to_monday
+)
+import threading
 import time
 import os
+import re
+import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 # Import aggregation functionality
@@ -13,7 +22,8 @@ try:
         get_aggregator, 
         should_aggregate_interval, 
         get_base_interval_for_aggregation,
-        get_extended_period_for_aggregation
+        get_extended_period_for_aggregation,
+        get_cache_ttl
     )
     AGGREGATION_AVAILABLE = True
     logging.info("Timeframe aggregation module loaded in EOD API")
@@ -21,6 +31,24 @@ except ImportError:
     AGGREGATION_AVAILABLE = False
     logging.warning("Timeframe aggregation module not available in EOD API")
 
+# Import persistent bar store
+try:
+    from bar_store import get_bar_store, slice_range
+    from bar_pyramid import get_bar_pyramid
+    BAR_STORE_AVAILABLE = True
+except ImportError:
+    BAR_STORE_AVAILABLE = False
+    logging.warning("Bar store not available in EOD API")
+
+# Per-provider request slots and circuit breaker
+from provider_access import provider_call, NonRetryableError
+
+# Short-TTL memory of unknown symbols and empty provider answers
+from negative_cache import get_negative_cache, classify_error, NO_DATA, INVALID_SYMBOL
+
+# Learned user symbol -> EOD symbol mapping
+from symbol_resolver import get_symbol_resolver
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -28,6 +56,94 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+EOD_API_URL = 'https://eodhd.com/api'
+
+# api_token query parameter of request URLs, kept out of logged errors
+API_TOKEN_PATTERN = re.compile(r'(api_token=)[^&\s\'"]+')
+# Long intraday ranges are split into windows of at most this many days and
+# fetched concurrently over one pooled HTTP session
+EOD_INTRADAY_CHUNK_DAYS = int(os.getenv('EOD_INTRADAY_CHUNK_DAYS', '30'))
+EOD_INTRADAY_WORKERS = int(os.getenv('EOD_INTRADAY_WORKERS', '4'))
+EOD_HTTP_TIMEOUT = float(os.getenv('EOD_HTTP_TIMEOUT', '30'))
+# Longest range the intraday endpoint serves in one request, by interval
+EOD_INTRADAY_MAX_DAYS = {'1m': 120, '5m': 600, '1h': 7200}
+# Exchanges whose last daily bar is ingested in one bulk request per exchange;
+# only series the bulk day directly follows on from are appended to, series
+# further behind are left to their own tail fetch, a single bulk day would
+# leave a hole in them
+EOD_BULK_EXCHANGES = [e.strip().upper() for e in os.getenv('EOD_BULK_EXCHANGES', 'US').split(',') if e.strip()]
+
+
+class USMarketHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE/Nasdaq closures, so a bulk day after a holiday still counts as the next session"""
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday)
+    ]
+
+
+# Exchange closures known per bulk exchange; elsewhere only weekends are skipped
+EXCHANGE_HOLIDAY_CALENDARS = {'US': USMarketHolidayCalendar()}
+
+def is_next_session(last, day, exchange):
+    """
+    Check whether a daily bar directly follows on from the last stored one
+    
+    Args:
+        last: Date of the last stored bar
+        day: Date of the new bar
+        exchange: EOD exchange code, selects the holiday calendar
+        
+    Returns:
+        True when day is last itself or the first session after it
+    """
+    if day < last:
+        return False
+    calendar = EXCHANGE_HOLIDAY_CALENDARS.get(exchange)
+    holidays = calendar.holidays(last, day).values.astype('datetime64[D]') if calendar is not None else []
+    # Sessions in [last, day): only last itself when nothing lies in between
+    return np.busday_count(last.date(), day.date(), holidays=holidays) <= 1
+
+_http_session = None
+_http_session_lock = threading.Lock()
+_intraday_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=EOD_INTRADAY_WORKERS, thread_name_prefix='eod-intraday'
+)
+
+def get_http_session():
+    """Get the pooled HTTP session shared by direct EOD API requests"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(EOD_INTRADAY_WORKERS, 1))
+            session.mount('https://', adapter)
+            _http_session = session
+        return _http_session
+
+def split_unix_range(from_ts, to_ts, window_seconds):
+    """
+    Split [from_ts, to_ts] into consecutive windows of at most window_seconds
+    
+    Returns:
+        List of (from, to) Unix timestamp pairs; windows share no second
+    """
+    windows = []
+    start = from_ts
+    while start <= to_ts:
+        end = min(start + window_seconds - 1, to_ts)
+        windows.append((start, end))
+        start = end + 1
+    return windows
+
 class EODDataProvider:
     def __init__(self, api_key=None):
         """
@@ -43,9 +159,10 @@ class EODDataProvider:
             raise ValueError("EOD API key is required. Set EOD_API_KEY environment variable or pass api_key parameter")
             
         self.api = APIClient(api_key)
+        self.api_key = api_key
         self.logger = logging.getLogger(__name__)
         
-    def fetch_stock_data(self, ticker, period='1y', interval='1d'):
+    def fetch_stock_data(self, ticker, period='1y', interval='1d', use_store=True):
         """
         Fetch stock data from EOD Historical Data API with aggregation support
         
@@ -53,11 +170,19 @@ class EODDataProvider:
             ticker: Stock ticker symbol (e.g., 'AAPL', 'BTC-USD')
             period: Data period ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max')
             interval: Data interval ('1m', '5m', '15m', '30m', '1h', '3h', '6h', '1d', '2d', '3d')
+            use_store: Serve bars from the bar store, fetching only the missing tail
             
         Returns:
             DataFrame with OHLCV data or None if failed
         """
         try:
+            # Symbols EOD recently had nothing for are answered without a round-trip
+            if use_store:
+                reason = get_negative_cache().check('eod', ticker, period, interval)
+                if reason:
+                    self.logger.info(f"Skipping EOD fetch for {ticker} ({period}, {interval}): {reason}")
+                    return None
+            
             # Check if we need aggregation
             needs_aggregation = False
             original_interval = interval
@@ -69,24 +194,29 @@ class EODDataProvider:
                 
                 self.logger.info(f"Will aggregate {base_interval} -> {interval} for {ticker}")
                 
-                # Fetch base interval data with extended period
-                df = self._fetch_base_data(ticker, extended_period, base_interval)
+                # Aggregate base interval data fetched with the extended period
+                aggregator = get_aggregator()
+                df = self._fetch_base_data(
+                    ticker, extended_period, base_interval, use_store,
+                    level=original_interval,
+                    build=lambda base: aggregator.aggregate_ohlcv(base.copy(), original_interval, ticker)
+                )
                 
                 if df is None or df.empty:
+                    self._record_empty(ticker, period, interval, df)
                     self.logger.warning(f"No base data available for aggregation")
                     return None
                 
-                # Perform aggregation
-                aggregator = get_aggregator()
-                df = aggregator.aggregate_ohlcv(df, original_interval, ticker)
-                
             else:
                 # Direct fetch without aggregation
-                df = self._fetch_base_data(ticker, period, interval)
+                df = self._fetch_base_data(ticker, period, interval, use_store)
             
             if df is None or df.empty:
+                self._record_empty(ticker, period, interval, df)
                 return None
             
+            get_negative_cache().discard('eod', ticker, period, interval)
+            
             # Add metadata
             df.attrs['company_name'] = ticker
             df.attrs['original_interval'] = original_interval
@@ -103,26 +233,153 @@ class EODDataProvider:
             self.logger.error(f"Error fetching data for {ticker}: {str(e)}")
             return None
     
-    def _fetch_base_data(self, ticker, period, interval):
+    def fetch_range_data(self, ticker, start, end=None, interval='1d', use_store=True):
         """
-        Fetch base data from EOD API (no aggregation)
+        Fetch the bars between two timestamps, with aggregation support
+        
+        Only the parts of the range the bar store does not hold yet are
+        requested from EOD.
+        
+        Args:
+            ticker: Stock ticker symbol
+            start: First timestamp of the range
+            end: Last timestamp of the range (None for now)
+            interval: Data interval ('15m', '30m', '1h', '3h', '6h', '1d', '2d', '3d', ...)
+            use_store: Serve bars from the bar store, fetching only the gaps
+            
+        Returns:
+            DataFrame with OHLCV data or None if failed
+        """
+        try:
+            if get_negative_cache().check('eod', ticker, 'range', interval) == INVALID_SYMBOL:
+                self.logger.info(f"Skipping EOD range fetch for unknown symbol {ticker}")
+                return None
+            
+            base_interval = interval
+            build = lambda base: base
+            if AGGREGATION_AVAILABLE and should_aggregate_interval(interval):
+                base_interval = get_base_interval_for_aggregation(interval)
+                aggregator = get_aggregator()
+                build = lambda base: aggregator.aggregate_ohlcv(base.copy(), interval, ticker)
+            
+            if BAR_STORE_AVAILABLE and use_store:
+                df = get_bar_pyramid().get_range(
+                    get_bar_store(), 'eod', ticker, base_interval, interval, start, end, build,
+                    fetcher=lambda period=None, start=None, end=None: self._fetch_range(
+                        ticker, base_interval, period, start, end
+                    )
+                )
+            else:
+                df = self._fetch_range(ticker, base_interval, start=start, end=end)
+                if df is not None and not df.empty:
+                    df = slice_range(build(df), start, end)
+            
+            if df is None or df.empty:
+                if df is not None and df.attrs.get('negative_reason') == INVALID_SYMBOL:
+                    get_negative_cache().record('eod', ticker, 'range', interval, INVALID_SYMBOL)
+                return None
+            
+            df.attrs['company_name'] = ticker
+            df.attrs['original_interval'] = interval
+            df.attrs['was_aggregated'] = base_interval != interval
+            if base_interval != interval:
+                df.attrs['base_interval'] = base_interval
+                df.attrs['aggregation_method'] = 'smart_timeframe_aggregator'
+            return df
+            
+        except Exception as e:
+            self.logger.error(f"Error fetching range data for {ticker}: {str(e)}")
+            return None
+    
+    def _record_empty(self, ticker, period, interval, df):
+        """
+        Remember a fetch that EOD answered without bars in the negative cache
+        
+        Failed requests come back as None and are not recorded; an empty
+        DataFrame means EOD answered (see _call_api).
+        """
+        if df is not None and df.empty:
+            get_negative_cache().record('eod', ticker, period, interval, df.attrs.get('negative_reason', NO_DATA))
+    
+    def _call_api(self, method, **params):
+        """
+        Call an EOD API client method through the provider guard
+        
+        Raises:
+            NonRetryableError: When EOD rejects the symbol
+        """
+        with provider_call('eod'):
+            try:
+                return method(**params)
+            except Exception as e:
+                if classify_error(e) == INVALID_SYMBOL:
+                    # EOD answered; the symbol does not exist
+                    raise NonRetryableError(str(e)) from e
+                raise
+    
+    @staticmethod
+    def _empty_result(reason=NO_DATA):
+        """Empty frame for a request EOD answered without bars"""
+        df = pd.DataFrame()
+        df.attrs['negative_reason'] = reason
+        return df
+    
+    def _fetch_base_data(self, ticker, period, interval, use_store=True, level=None, build=None):
+        """
+        Fetch base data from EOD API, optionally turned into a derived interval
         
         Args:
             ticker: Stock ticker symbol
             period: Data period
             interval: Data interval (must be supported by EOD)
+            use_store: Serve bars from the bar store, fetching only the missing tail
+            level: Interval ``build`` derives from the base bars (defaults to ``interval``)
+            build: Callable ``build(base)`` deriving ``level`` (defaults to the bars as they are)
             
         Returns:
             DataFrame with OHLCV data or None if failed
         """
+        level = level or interval
+        build = build or (lambda base: base)
         try:
-            # Convert our period format to EOD API format
-            from_date, to_date = self._convert_period_to_dates(period)
+            if BAR_STORE_AVAILABLE and use_store:
+                # Derived intervals are kept in memory per stored base version
+                return get_bar_pyramid().get_bars(
+                    get_bar_store(), 'eod', ticker, interval, level, period, build,
+                    fetcher=lambda period=None, start=None: self._fetch_range(ticker, interval, period, start)
+                )
+            df = self._fetch_range(ticker, interval, period)
+            if df is None or df.empty:
+                return df
+            return build(df)
             
-            # Convert ticker format
-            eod_symbol = self._convert_ticker_format(ticker)
+        except Exception as e:
+            self.logger.error(f"Error fetching base data: {str(e)}")
+            return None
+    
+    def _fetch_range(self, ticker, interval, period=None, start=None, end=None):
+        """
+        Fetch bars from EOD API for a whole period or from a start timestamp onwards
+        
+        Args:
+            ticker: Stock ticker symbol
+            interval: Data interval (must be supported by EOD)
+            period: Data period, used when start is None
+            start: Timestamp of the first bar to fetch
+            end: Timestamp of the last bar to fetch (None for now)
             
-            self.logger.info(f"Fetching EOD base data for {eod_symbol}, period: {period}, interval: {interval}")
+        Returns:
+            DataFrame with OHLCV data or None if failed
+        """
+        try:
+            # Convert our period format to EOD API format
+            if start is not None:
+                # Run to the day after so the intraday API includes the last day's bars
+                last_day = datetime.now() if end is None else pd.Timestamp(end)
+                from_date = pd.Timestamp(start).strftime('%Y-%m-%d')
+                to_date = (last_day + timedelta(days=1)).strftime('%Y-%m-%d')
+            else:
+                from_date, to_date = self._convert_period_to_dates(period)
             
             # Map our intervals to EOD supported intervals
             eod_interval_map = {
@@ -142,12 +399,30 @@ class EODDataProvider:
             
             eod_interval = eod_interval_map[interval]
             
-            if interval in ['1m', '5m', '15m', '30m', '1h']:
-                # Use intraday API for short intervals
-                df = self._fetch_intraday_data(eod_symbol, eod_interval, from_date, to_date)
-            else:
-                # Use end-of-day API for daily and longer intervals
-                df = self._fetch_eod_data(eod_symbol, from_date, to_date)
+            # Tail fetches extend a series fetched with the learned symbol;
+            # full fetches try the other symbol formats until one has data
+            resolver = get_symbol_resolver()
+            candidates = resolver.candidates('eod', ticker)
+            if start is not None and end is None:
+                candidates = candidates[:1]
+            
+            df = None
+            for eod_symbol in candidates:
+                self.logger.info(f"Fetching EOD base data for {eod_symbol}, from: {from_date}, interval: {interval}")
+                
+                if interval in ['1m', '5m', '15m', '30m', '1h']:
+                    # Use intraday API for short intervals
+                    df = self._fetch_intraday_data(eod_symbol, eod_interval, from_date, to_date)
+                else:
+                    # Use end-of-day API for daily and longer intervals
+                    df = self._fetch_eod_data(eod_symbol, from_date, to_date)
+                
+                if df is None:
+                    # The request failed, another symbol format will not help
+                    break
+                if not df.empty:
+                    resolver.record('eod', ticker, eod_symbol)
+                    break
             
             return df
             
@@ -163,20 +438,11 @@ class EODDataProvider:
         - US stocks: AAPL.US
         - Crypto: BTC-USD.CC  
         - Forex: EURUSD.FOREX
+        
+        Returns the symbol that last worked for this ticker, else the best guess
+        (see symbol_resolver).
         """
-        if '-USD' in ticker and not ticker.endswith('.CC'):
-            # Crypto currency
-            return f"{ticker}.CC"
-        elif '=' in ticker or ticker.endswith('USD') or ticker.endswith('EUR') or ticker.endswith('GBP'):
-            # Forex
-            clean_ticker = ticker.replace('=X', '').replace('=', '')
-            return f"{clean_ticker}.FOREX"
-        elif '.' not in ticker and not any(suffix in ticker for suffix in ['-USD', '.CC', '.FOREX']):
-            # Assume US stock if no exchange specified
-            return f"{ticker}.US"
-        else:
-            # Already in correct format or keep as is
-            return ticker
+        return get_symbol_resolver().resolve('eod', ticker)
     
     def _convert_period_to_dates(self, period):
         """Convert period string to from_date and to_date"""
@@ -208,7 +474,8 @@ class EODDataProvider:
     def _fetch_eod_data(self, symbol, from_date, to_date):
         """Fetch end-of-day data"""
         try:
-            data = self.api.get_eod_historical_stock_market_data(
+            data = self._call_api(
+                self.api.get_eod_historical_stock_market_data,
                 symbol=symbol,
                 period='d',
                 from_date=from_date,
@@ -217,7 +484,7 @@ class EODDataProvider:
             )
             
             if not data:
-                return None
+                return self._empty_result()
                 
             df = pd.DataFrame(data)
             
@@ -243,12 +510,22 @@ class EODDataProvider:
             
             return df
             
+        except NonRetryableError as e:
+            self.logger.warning(f"EOD does not know {symbol}: {e}")
+            return self._empty_result(INVALID_SYMBOL)
         except Exception as e:
             self.logger.error(f"Error fetching EOD data for {symbol}: {str(e)}")
             return None
     
     def _fetch_intraday_data(self, symbol, interval, from_date, to_date):
-        """Fetch intraday data"""
+        """
+        Fetch intraday data, in concurrent windows for long ranges
+        
+        The range is split into windows of EOD_INTRADAY_CHUNK_DAYS (capped by
+        the provider's range limit of the interval), fetched in parallel over
+        the pooled HTTP session and merged by timestamp. A window that fails
+        fails the whole fetch, so no gaps end up in the bar store.
+        """
         try:
             # Convert interval format
             interval_mapping = {
@@ -265,17 +542,23 @@ class EODDataProvider:
             from_ts = int(datetime.strptime(from_date, '%Y-%m-%d').timestamp())
             to_ts = int(datetime.strptime(to_date, '%Y-%m-%d').timestamp())
             
-            data = self.api.get_intraday_historical_data(
-                symbol=symbol,
-                interval=eod_interval,
-                from_unix_time=from_ts,
-                to_unix_time=to_ts
-            )
-            
-            if not data:
-                return None
+            window_days = min(EOD_INTRADAY_CHUNK_DAYS, EOD_INTRADAY_MAX_DAYS.get(eod_interval, EOD_INTRADAY_CHUNK_DAYS))
+            windows = split_unix_range(from_ts, to_ts, max(window_days, 1) * 86400)
+            if len(windows) > 1:
+                self.logger.info(f"Fetching {symbol} {eod_interval} in {len(windows)} windows of {window_days} days")
+            
+            futures = [
+                _intraday_executor.submit(self._fetch_intraday_window, symbol, eod_interval, start, end)
+                for start, end in windows
+            ]
+            records = []
+            for future in futures:
+                records.extend(future.result())
+            
+            if not records:
+                return self._empty_result()
                 
-            df = pd.DataFrame(data)
+            df = pd.DataFrame(records)
             
             # Rename columns to match yfinance format
             column_mapping = {
@@ -293,14 +576,151 @@ class EODDataProvider:
             df['Date'] = pd.to_datetime(df['Date'])
             df.set_index('Date', inplace=True)
             
-            # Sort by date
+            # Merge the windows: sort by timestamp, bars on a window edge only once
             df.sort_index(inplace=True)
+            df = df[~df.index.duplicated(keep='last')]
             
             return df
             
+        except NonRetryableError as e:
+            self.logger.warning(f"EOD does not know {symbol}: {e}")
+            return self._empty_result(INVALID_SYMBOL)
         except Exception as e:
             self.logger.error(f"Error fetching intraday data for {symbol}: {str(e)}")
             return None
+    
+    def _fetch_intraday_window(self, symbol, interval, from_ts, to_ts):
+        """Fetch the intraday bar records of one window"""
+        data = self._call_api(
+            self._get_json,
+            endpoint=f"intraday/{symbol}",
+            interval=interval,
+            **{'from': from_ts, 'to': to_ts}
+        )
+        return data or []
+    
+    def fetch_bulk_last_day(self, exchange='US', date=None):
+        """
+        Fetch the daily bar of every symbol of an exchange in one request
+        
+        Args:
+            exchange: EOD exchange code (e.g. 'US', 'LSE', 'CC')
+            date: Trading day to fetch ('YYYY-MM-DD', defaults to the last one)
+            
+        Returns:
+            Dict of EOD symbol code -> bar record (date, open, high, low,
+            close, adjusted_close, volume), or None if the request failed
+        """
+        params = {'endpoint': f"eod-bulk-last-day/{exchange}"}
+        if date is not None:
+            params['date'] = date
+        try:
+            data = self._call_api(self._get_json, **params)
+        except Exception as e:
+            self.logger.error(f"Error fetching EOD bulk data for {exchange}: {str(e)}")
+            return None
+        return {record['code'].upper(): record for record in data or [] if record.get('code')}
+    
+    def ingest_bulk_last_day(self, exchanges=None, date=None):
+        """
+        Append the latest daily bar to every stored EOD daily series
+        
+        Tracked tickers are the 'eod/1d' series in the bar store. They are
+        grouped by the exchange of their EOD symbol and each exchange costs a
+        single bulk request, instead of one tail fetch per ticker. The
+        appended series are marked fresh until the next daily bar closes, so
+        requests in between are served from the store.
+        
+        Args:
+            exchanges: EOD exchange codes to ingest (defaults to EOD_BULK_EXCHANGES)
+            date: Trading day to ingest ('YYYY-MM-DD', defaults to the last one)
+            
+        Returns:
+            Summary dict with exchanges, requests, tracked, appended and
+            skipped ticker counts
+        """
+        exchanges = [e.upper() for e in (EOD_BULK_EXCHANGES if exchanges is None else exchanges)]
+        summary = {'exchanges': exchanges, 'date': date, 'requests': 0, 'tracked': 0, 'appended': 0, 'skipped': 0}
+        if not BAR_STORE_AVAILABLE:
+            return summary
+        
+        store = get_bar_store()
+        resolver = get_symbol_resolver()
+        by_exchange = {}
+        for entry in store.list_entries():
+            if not entry['key'].startswith('eod/1d/'):
+                continue
+            code, _, exchange = resolver.resolve('eod', entry['ticker']).rpartition('.')
+            if code and exchange.upper() in exchanges:
+                by_exchange.setdefault(exchange.upper(), []).append((entry['ticker'], code.upper()))
+        
+        for exchange, tickers in by_exchange.items():
+            summary['tracked'] += len(tickers)
+            records = self.fetch_bulk_last_day(exchange, date)
+            summary['requests'] += 1
+            if records is None:
+                summary['skipped'] += len(tickers)
+                continue
+            for ticker, code in tickers:
+                if self._ingest_bulk_record(store, ticker, records.get(code), exchange):
+                    summary['appended'] += 1
+                else:
+                    summary['skipped'] += 1
+        
+        self.logger.info(
+            f"EOD bulk ingest of {summary['appended']}/{summary['tracked']} daily series "
+            f"in {summary['requests']} requests"
+        )
+        return summary
+    
+    def _ingest_bulk_record(self, store, ticker, record, exchange):
+        """Append one bulk bar record to a stored daily series if it continues it"""
+        meta = store.load_meta('eod', ticker, '1d')
+        if meta is None or record is None or not record.get('date'):
+            return False
+        
+        day = pd.Timestamp(record['date'])
+        last = pd.Timestamp(meta['last_timestamp']).tz_localize(None).normalize()
+        if not is_next_session(last, day, exchange):
+            return False
+        
+        column_mapping = {
+            'open': 'Open',
+            'high': 'High',
+            'low': 'Low',
+            'close': 'Close',
+            'adjusted_close': 'Adj Close',
+            'volume': 'Volume'
+        }
+        values = {column: record.get(field) for field, column in column_mapping.items() if column in meta['columns']}
+        bar = pd.DataFrame(values, index=pd.DatetimeIndex([day], name=meta.get('index_name'))).astype(float)
+        
+        fresh_until = None
+        if AGGREGATION_AVAILABLE:
+            fresh_until = time.time() + get_cache_ttl('1d', ticker, max_update_seconds=store.refresh_seconds)
+        store.update('eod', ticker, '1d', bar, fresh_until=fresh_until)
+        return True
+    
+    def _get_json(self, endpoint, **params):
+        """
+        GET an EOD API endpoint over the pooled session and decode the JSON answer
+        
+        Raises:
+            requests.RequestException: With the api_token of the request URL
+                redacted from the message, so errors can be logged safely
+        """
+        params.update(api_token=self.api_key, fmt='json')
+        try:
+            response = get_http_session().get(f"{EOD_API_URL}/{endpoint}", params=params, timeout=EOD_HTTP_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            # HTTP and connection errors quote the request URL, token included
+            raise type(e)(redact_api_token(str(e)), response=e.response) from None
+        return response.json()
+
+def redact_api_token(text):
+    """Replace api_token values in a URL or error message"""
+    return API_TOKEN_PATTERN.sub(r'\1***', text)
 
 # Global EOD provider instance
 _eod_provider = None
@@ -322,18 +742,57 @@ def fetch_stock_data_eod(ticker, period='1y', interval='1d', max_retries=3, retr
         interval: Data interval ('1m', '5m', '15m', '30m', '1h', '1d')
         max_retries: Maximum number of retry attempts (kept for compatibility)
         retry_delay: Delay between retries in seconds (kept for compatibility)
-        use_cache: Whether to use caching (kept for compatibility)
+        use_cache: Whether to serve from the bar store (False re-fetches the whole period)
         
     Returns:
         DataFrame with stock data or None if failed
     """
     try:
         provider = get_eod_provider()
-        return provider.fetch_stock_data(ticker, period, interval)
+        return provider.fetch_stock_data(ticker, period, interval, use_store=use_cache)
     except Exception as e:
         logger.error(f"Error in EOD fetch_stock_data for {ticker}: {str(e)}")
         return None
 
+def fetch_stock_range_eod(ticker, start, end=None, interval='1d', use_cache=True):
+    """
+    EOD version of fetch_stock_data_range - bars between two timestamps
+    
+    Args:
+        ticker: Stock ticker symbol
+        start: First timestamp of the range
+        end: Last timestamp of the range (None for now)
+        interval: Data interval
+        use_cache: Whether to serve from the bar store
+        
+    Returns:
+        DataFrame with stock data or None if failed
+    """
+    try:
+        provider = get_eod_provider()
+        return provider.fetch_range_data(ticker, start, end, interval, use_store=use_cache)
+    except Exception as e:
+        logger.error(f"Error in EOD fetch_stock_range for {ticker}: {str(e)}")
+        return None
+
+def ingest_bulk_last_day_eod(exchanges=None, date=None):
+    """
+    Append the latest daily bar to every stored EOD daily series, one request per exchange
+    
+    Args:
+        exchanges: EOD exchange codes (defaults to EOD_BULK_EXCHANGES)
+        date: Trading day to ingest ('YYYY-MM-DD', defaults to the last one)
+        
+    Returns:
+        Summary dict of the ingest (see EODDataProvider.ingest_bulk_last_day) or None if failed
+    """
+    try:
+        provider = get_eod_provider()
+        return provider.ingest_bulk_last_day(exchanges, date)
+    except Exception as e:
+        logger.error(f"Error in EOD bulk ingest: {str(e)}")
+        return None
+
 # Test function
 def test_eod_api():
     """Test the EOD API integration"""
@@ -0,0 +1,180 @@
+"""
+Indicator Dependency Graph
+==========================
+
+Declarative description of how analysis columns are derived from OHLCV bars,
+and a resolver that computes only the columns a request needs.
+
+Each IndicatorNode lists the columns it writes, the columns it reads and the
+fixed parameters it is called with. Resolving a set of columns walks the
+graph back from those columns to the bars and runs every node on the way
+once, in dependency order. The columns a node writes stay on the frame, so
+an intermediate that several columns share (WT2 feeds the signals,
+divergences, patterns and regimes) is computed a single time, and a node
+whose columns are already on the frame is skipped.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns of the OHLCV bars every graph starts from
+SOURCE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+class IndicatorNode:
+    """
+    One computation step of an indicator graph
+
+    The function is called as ``func(df, context, **params)``: df holds the
+    bars and every column resolved so far, context is the per-resolution
+    value passed to IndicatorGraph.resolve (the interval parameters for
+    Analyzer B). It returns a Series for a single output, a tuple of Series
+    in the order of outputs, or a dict keyed by output column.
+    """
+
+    def __init__(self, name, outputs, inputs, func, params=None):
+        """
+        Args:
+            name: Name of the step, used in logs and plans
+            outputs: Columns the step writes
+            inputs: Columns the step reads (source columns or other outputs)
+            func: Callable computing the outputs
+            params: Fixed keyword arguments of func
+        """
+        self.name = name
+        self.outputs = tuple(outputs)
+        self.inputs = tuple(inputs)
+        self.func = func
+        self.params = dict(params or {})
+
+    def __repr__(self):
+        return f"IndicatorNode({self.name!r}, outputs={self.outputs}, inputs={self.inputs})"
+
+    def compute(self, df, context):
+        """Run the step and return a dict of output column -> values"""
+        values = self.func(df, context, **self.params)
+        if isinstance(values, dict):
+            return {column: values[column] for column in self.outputs}
+        if len(self.outputs) == 1 and not isinstance(values, (tuple, list)):
+            values = (values,)
+        if len(values) != len(self.outputs):
+            raise ValueError(f"Node {self.name} returned {len(values)} values for {len(self.outputs)} outputs")
+        return dict(zip(self.outputs, values))
+
+
+class IndicatorGraph:
+    """
+    A set of IndicatorNodes and the resolver over them
+    """
+
+    def __init__(self, nodes, sources=SOURCE_COLUMNS):
+        """
+        Args:
+            nodes: IndicatorNodes; a full resolution runs them in this order
+            sources: Columns the bars provide
+
+        Raises:
+            ValueError: When two nodes write the same column, a node reads
+                an unknown column or the nodes form a cycle
+        """
+        self.nodes = list(nodes)
+        self.sources = tuple(sources)
+        self._producers = {}
+        for node in self.nodes:
+            for column in node.outputs:
+                if column in self._producers or column in self.sources:
+                    raise ValueError(f"Column {column} is written by more than one node")
+                self._producers[column] = node
+        for node in self.nodes:
+            for column in node.inputs:
+                if column not in self._producers and column not in self.sources:
+                    raise ValueError(f"Node {node.name} reads unknown column {column}")
+        self.plan(self.columns)
+        self.stats = {'resolutions': 0, 'nodes_run': 0, 'nodes_skipped': 0}
+
+    @property
+    def columns(self):
+        """Every column the nodes write, in declaration order"""
+        return [column for node in self.nodes for column in node.outputs]
+
+    def dependencies(self, columns):
+        """
+        Get every computed column the given columns are derived from
+
+        Returns:
+            Set of output columns, the requested ones included
+        """
+        return {column for node in self.plan(columns) for column in node.outputs}
+
+    def plan(self, columns=None):
+        """
+        Get the nodes needed for a set of columns, in the order they run
+
+        Args:
+            columns: Columns wanted (every column when None)
+
+        Returns:
+            List of IndicatorNodes, each after the nodes it reads from
+
+        Raises:
+            KeyError: For a column no node writes and the bars do not hold
+            ValueError: When the nodes form a cycle
+        """
+        if columns is None:
+            columns = self.columns
+        order = []
+        visiting = set()
+        done = set()
+
+        def visit(node):
+            if node.name in done:
+                return
+            if node.name in visiting:
+                raise ValueError(f"Indicator graph has a cycle through {node.name}")
+            visiting.add(node.name)
+            for column in node.inputs:
+                if column in self._producers:
+                    visit(self._producers[column])
+            visiting.discard(node.name)
+            done.add(node.name)
+            order.append(node)
+
+        wanted = set()
+        for column in columns:
+            if column in self._producers:
+                wanted.add(self._producers[column].name)
+            elif column not in self.sources:
+                raise KeyError(f"Unknown indicator column: {column}")
+        # Visit in declaration order so a full plan runs the nodes as listed
+        for node in self.nodes:
+            if node.name in wanted:
+                visit(node)
+        return order
+
+    def resolve(self, df, columns=None, context=None):
+        """
+        Compute the given columns onto a DataFrame of bars
+
+        Nodes whose outputs are all on the frame already are not run again.
+
+        Args:
+            df: OHLCV DataFrame (modified in place)
+            columns: Columns wanted (every column when None)
+            context: Value passed to every node function
+
+        Returns:
+            The DataFrame, holding the requested columns and everything they
+            were derived from
+        """
+        plan = self.plan(columns)
+        self.stats['resolutions'] += 1
+        for node in plan:
+            if all(column in df.columns for column in node.outputs):
+                self.stats['nodes_skipped'] += 1
+                continue
+            for column, values in node.compute(df, context).items():
+                df[column] = values
+            self.stats['nodes_run'] += 1
+        logger.debug(f"Resolved {len(plan)} indicator nodes: {[node.name for node in plan]}")
+        return df
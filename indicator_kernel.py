@@ -0,0 +1,348 @@
+"""
+Fused Indicator Kernel
+======================
+
+Single-pass computation of the core Analyzer B indicators over contiguous
+OHLC arrays.
+
+The pandas functions in api.py (calculate_wavetrend, stoch_heikin_ashi,
+calculate_money_flow, calculate_macd, calculate_bollinger_bands and
+calculate_adx) each walk the whole history, some of them several times,
+and recompute shared inputs such as HLC3 and the Heikin Ashi range. The
+kernel walks the bars once and advances every indicator per bar:
+
+- exponential means use the recursion of pandas ``ewm(adjust=False)``,
+  including how it carries through NaN inputs
+- rolling means keep a compensated running sum over a ring buffer and
+  return the exact value on constant windows, like pandas ``rolling``
+- rolling min/max of the Heikin Ashi range use monotonic index deques
+- the Bollinger standard deviation reuses the ring buffer of the middle band
+
+Results are written into one preallocated (columns x bars) buffer and match
+the pandas functions within float tolerance. The kernel is compiled with
+numba; without numba INDICATOR_KERNEL_AVAILABLE is False and callers keep
+using the pandas functions.
+"""
+
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+    INDICATOR_KERNEL_AVAILABLE = True
+except ImportError:
+    INDICATOR_KERNEL_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in decorator when numba is not installed"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+logger = logging.getLogger(__name__)
+
+# Rows of the output buffer, named like the analyzer_b columns
+CORE_COLUMNS = (
+    'WT1', 'WT2', 'WTVwap', 'RSI', 'Stoch', 'MF',
+    'MACD', 'MACDSignal', 'MACDHist', 'BBUpper', 'BBMiddle', 'BBLower',
+    'ADX', 'PlusDI', 'MinusDI'
+)
+
+# Exponential mean slots
+_EMA_HLC3, _EMA_DEV, _EMA_TCI, _EMA_FAST, _EMA_SLOW, _EMA_SIGNAL = range(6)
+
+# Rolling mean slots
+(_SMA_WT2, _SMA_RSI, _SMA_STOCH, _SMA_MF_MEAN, _SMA_MF_DEV, _SMA_MF,
+ _SMA_BB, _SMA_ATR, _SMA_PLUS_DM, _SMA_MINUS_DM, _SMA_ADX) = range(11)
+
+# Rolling extreme slots
+_LOW_RSI, _HIGH_RSI, _LOW_STOCH, _HIGH_STOCH = range(4)
+
+
+def span_to_alpha(span):
+    """Smoothing factor pandas derives from ewm(span=...)"""
+    com = (span - 1) / 2.0
+    return 1.0 / (1.0 + com)
+
+
+@njit(cache=True)
+def _ewm_step(state, slot, value, alpha):
+    """
+    Advance one ewm(adjust=False) mean by a bar
+
+    state[slot] holds the running mean and the weight of its past; NaN bars
+    keep the mean and decay that weight, as pandas does.
+    """
+    weighted = state[slot, 0]
+    if weighted == weighted:
+        old_wt = state[slot, 1] * (1.0 - alpha)
+        if value == value:
+            if weighted != value:
+                weighted = old_wt * weighted + alpha * value
+                weighted /= (old_wt + alpha)
+            old_wt = 1.0
+        state[slot, 1] = old_wt
+    elif value == value:
+        weighted = value
+    state[slot, 0] = weighted
+    return weighted
+
+
+@njit(cache=True)
+def _kahan_add(state, slot, value):
+    y = value - state[slot, 1]
+    t = state[slot, 0] + y
+    state[slot, 1] = (t - state[slot, 0]) - y
+    state[slot, 0] = t
+
+
+@njit(cache=True)
+def _sma_step(state, ring, slot, i, value, window):
+    """
+    Advance one rolling(window).mean() by bar i
+
+    state[slot] holds the compensated sum, its compensation, the NaN and
+    negative counts of the window, the last value and how many bars in a
+    row had it.
+    """
+    pos = i % window
+    if i >= window:
+        old = ring[slot, pos]
+        if old == old:
+            _kahan_add(state, slot, -old)
+            if old < 0:
+                state[slot, 3] -= 1
+        else:
+            state[slot, 2] -= 1
+    ring[slot, pos] = value
+    if value == value:
+        _kahan_add(state, slot, value)
+        if value < 0:
+            state[slot, 3] += 1
+    else:
+        state[slot, 2] += 1
+    if value == state[slot, 4]:
+        state[slot, 5] += 1
+    else:
+        state[slot, 4] = value
+        state[slot, 5] = 1
+
+    if i + 1 < window or state[slot, 2] > 0:
+        return np.nan
+    if state[slot, 5] >= window:
+        return value
+    result = state[slot, 0] / window
+    # Keep sums of one sign from drifting across zero
+    if state[slot, 3] == 0 and result < 0:
+        result = 0.0
+    elif state[slot, 3] == window and result > 0:
+        result = 0.0
+    return result
+
+
+@njit(cache=True)
+def _ring_std(ring, slot, window):
+    """Sample standard deviation of a full rolling window"""
+    total = 0.0
+    for k in range(window):
+        total += ring[slot, k]
+    mean = total / window
+    squares = 0.0
+    for k in range(window):
+        squares += (ring[slot, k] - mean) ** 2
+    return np.sqrt(squares / (window - 1))
+
+
+@njit(cache=True)
+def _extreme_step(values, deques, bounds, slot, i, window, is_max):
+    """
+    Advance one rolling(window).min() or .max() by bar i
+
+    deques[slot] holds bar indices whose values are monotonic from
+    bounds[slot, 0] to bounds[slot, 1]; bounds[slot, 2] counts NaN bars in
+    the window.
+    """
+    if i >= window and values[i - window] != values[i - window]:
+        bounds[slot, 2] -= 1
+    value = values[i]
+    if value != value:
+        bounds[slot, 2] += 1
+    else:
+        tail = bounds[slot, 1]
+        while tail > bounds[slot, 0]:
+            last = values[deques[slot, tail - 1]]
+            if (is_max and last > value) or (not is_max and last < value):
+                break
+            tail -= 1
+        deques[slot, tail] = i
+        bounds[slot, 1] = tail + 1
+    while bounds[slot, 0] < bounds[slot, 1] and deques[slot, bounds[slot, 0]] <= i - window:
+        bounds[slot, 0] += 1
+
+    if i + 1 < window or bounds[slot, 2] > 0:
+        return np.nan
+    return values[deques[slot, bounds[slot, 0]]]
+
+
+@njit(cache=True)
+def _nanmax3(a, b, c):
+    result = np.nan
+    for value in (a, b, c):
+        if value == value and not (result >= value):
+            result = value
+    return result
+
+
+@njit(cache=True)
+def _nanmin3(a, b, c):
+    result = np.nan
+    for value in (a, b, c):
+        if value == value and not (result <= value):
+            result = value
+    return result
+
+
+@njit(cache=True, error_model='numpy')
+def _fused_kernel(open_, high, low, close, wt_channel_alpha, wt_average_alpha, wt_ma_len,
+                  stoch_period1, stoch_period2, stoch_k, mf_period, mf_len,
+                  fast_alpha, slow_alpha, signal_alpha, bb_period, bb_std, adx_period, out):
+    n = len(close)
+
+    ewm_state = np.empty((6, 2))
+    ewm_state[:, 0] = np.nan
+    ewm_state[:, 1] = 1.0
+
+    windows = np.array([wt_ma_len, stoch_k, stoch_k, mf_period, mf_period, mf_len,
+                        bb_period, adx_period, adx_period, adx_period, adx_period])
+    sma_state = np.zeros((11, 6))
+    sma_state[:, 4] = np.nan
+    ring = np.empty((11, max(windows.max(), 1)))
+
+    ha_high = np.empty(n)
+    ha_low = np.empty(n)
+    deques = np.empty((4, max(n, 1)), dtype=np.int64)
+    bounds = np.zeros((4, 3), dtype=np.int64)
+
+    prev_high = np.nan
+    prev_low = np.nan
+    prev_close = np.nan
+
+    for i in range(n):
+        o, h, l, c = open_[i], high[i], low[i], close[i]
+        hlc3 = (h + l + c) / 3
+
+        # WaveTrend
+        ema = _ewm_step(ewm_state, _EMA_HLC3, hlc3, wt_channel_alpha)
+        d = _ewm_step(ewm_state, _EMA_DEV, abs(hlc3 - ema), wt_channel_alpha)
+        ci = (hlc3 - ema) / (0.015 * d)
+        wt1 = _ewm_step(ewm_state, _EMA_TCI, ci, wt_average_alpha)
+        wt2 = _sma_step(sma_state, ring, _SMA_WT2, i, wt1, wt_ma_len)
+        out[0, i] = wt1
+        out[1, i] = wt2
+        out[2, i] = wt1 - wt2
+
+        # Stochastic on the Heikin Ashi range, both periods from one pass
+        ha_close = (o + h + l + c) / 4
+        ha_high[i] = _nanmax3(h, o, c)
+        ha_low[i] = _nanmin3(l, o, c)
+        lowest = _extreme_step(ha_low, deques, bounds, _LOW_RSI, i, stoch_period1, False)
+        highest = _extreme_step(ha_high, deques, bounds, _HIGH_RSI, i, stoch_period1, True)
+        raw = (ha_close - lowest) / (highest - lowest) * 100
+        out[3, i] = _sma_step(sma_state, ring, _SMA_RSI, i, raw, stoch_k)
+        lowest = _extreme_step(ha_low, deques, bounds, _LOW_STOCH, i, stoch_period2, False)
+        highest = _extreme_step(ha_high, deques, bounds, _HIGH_STOCH, i, stoch_period2, True)
+        raw = (ha_close - lowest) / (highest - lowest) * 100
+        out[4, i] = _sma_step(sma_state, ring, _SMA_STOCH, i, raw, stoch_k)
+
+        # Money Flow
+        m = _sma_step(sma_state, ring, _SMA_MF_MEAN, i, hlc3, mf_period)
+        f = _sma_step(sma_state, ring, _SMA_MF_DEV, i, abs(hlc3 - m), mf_period)
+        out[5, i] = _sma_step(sma_state, ring, _SMA_MF, i, (hlc3 - m) / (0.015 * f), mf_len)
+
+        # MACD
+        macd = (_ewm_step(ewm_state, _EMA_FAST, c, fast_alpha) -
+                _ewm_step(ewm_state, _EMA_SLOW, c, slow_alpha))
+        signal = _ewm_step(ewm_state, _EMA_SIGNAL, macd, signal_alpha)
+        out[6, i] = macd
+        out[7, i] = signal
+        out[8, i] = macd - signal
+
+        # Bollinger Bands, the deviation read from the middle band's window
+        middle = _sma_step(sma_state, ring, _SMA_BB, i, c, bb_period)
+        if middle == middle:
+            if sma_state[_SMA_BB, 5] >= bb_period:
+                std = 0.0
+            else:
+                std = _ring_std(ring, _SMA_BB, bb_period)
+        else:
+            std = np.nan
+        out[9, i] = middle + (std * bb_std)
+        out[10, i] = middle
+        out[11, i] = middle - (std * bb_std)
+
+        # ADX
+        tr = _nanmax3(h - l, abs(h - prev_close), abs(l - prev_close))
+        atr = _sma_step(sma_state, ring, _SMA_ATR, i, tr, adx_period)
+        up_move = h - prev_high
+        down_move = prev_low - l
+        plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+        plus_di = 100 * (_sma_step(sma_state, ring, _SMA_PLUS_DM, i, plus_dm, adx_period) / atr)
+        minus_di = 100 * (_sma_step(sma_state, ring, _SMA_MINUS_DM, i, minus_dm, adx_period) / atr)
+        dx = 100 * (abs(plus_di - minus_di) / (plus_di + minus_di))
+        out[12, i] = _sma_step(sma_state, ring, _SMA_ADX, i, dx, adx_period)
+        out[13, i] = plus_di
+        out[14, i] = minus_di
+
+        prev_high, prev_low, prev_close = h, l, c
+
+
+def compute_core_indicators(df, params, macd_periods=(12, 26, 9), bb_period=20, bb_std=2, adx_period=14):
+    """
+    Compute every core indicator of OHLC bars in one pass
+
+    Args:
+        df: DataFrame with Open, High, Low and Close columns
+        params: Interval parameters from adjust_parameters_for_interval
+        macd_periods: Fast, slow and signal EMA periods of the MACD
+        bb_period: Bollinger Bands moving average period
+        bb_std: Bollinger Bands width in standard deviations
+        adx_period: ADX period
+
+    Returns:
+        Dict of CORE_COLUMNS name -> Series on the index of df
+    """
+    arrays = [np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+              for col in ('Open', 'High', 'Low', 'Close')]
+    out = np.empty((len(CORE_COLUMNS), len(df)))
+    fast, slow, signal = macd_periods
+
+    _fused_kernel(
+        *arrays,
+        span_to_alpha(params['wtChannelLen']), span_to_alpha(params['wtAverageLen']), params['wtMALen'],
+        params['stochPeriod1'], params['stochPeriod2'], 2, params['mfPeriod1'], params['mfPeriod2'],
+        span_to_alpha(fast), span_to_alpha(slow), span_to_alpha(signal),
+        bb_period, float(bb_std), adx_period, out
+    )
+    return {name: pd.Series(out[row], index=df.index) for row, name in enumerate(CORE_COLUMNS)}
+
+
+def warm_indicator_kernel():
+    """
+    Compile the kernel (or load numba's cached build) ahead of the first request
+    """
+    if not INDICATOR_KERNEL_AVAILABLE:
+        return
+    try:
+        started = time.time()
+        bars = pd.DataFrame({col: np.linspace(1.0, 2.0, 3) for col in ('Open', 'High', 'Low', 'Close')})
+        compute_core_indicators(bars, {
+            'wtChannelLen': 2, 'wtAverageLen': 2, 'wtMALen': 2, 'stochPeriod1': 2,
+            'stochPeriod2': 2, 'mfPeriod1': 2, 'mfPeriod2': 2
+        })
+        logger.info(f"Indicator kernel ready in {time.time() - started:.1f}s")
+    except Exception as e:
+        logger.warning(f"Indicator kernel warm-up failed: {e}")
@@ -0,0 +1,669 @@
+"""
+Streaming Indicator State
+=========================
+
+Per-(ticker, interval) indicator state that advances by one bar in constant
+time.
+
+A full analysis recomputes every indicator over the whole history even
+when only one bar arrived since the last refresh. IndicatorState keeps what
+the indicators need to continue instead: the exponential mean accumulators,
+a ring buffer per rolling window, monotonic deques for rolling extremes and
+the few previous values the signal state machines compare with. Feeding it
+the bars of a history one by one gives the same values as compute_analyzer_b
+within float tolerance (same recursions as indicator_kernel), and each new
+bar costs the same however long the history is.
+
+The still-forming last bar can be updated as often as it changes: before a
+forming bar is applied the state is snapshotted, and every revision of that
+bar starts again from the snapshot. A bar with a later time closes it.
+
+States serialize to plain JSON-compatible dicts (to_dict / from_dict), and
+IndicatorStreams keeps the live ones per (ticker, interval) in memory.
+
+Configuration:
+
+    INDICATOR_STREAMS_MAX  States kept in memory, least recently used dropped (default 500)
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+INDICATOR_STREAMS_MAX = int(os.getenv('INDICATOR_STREAMS_MAX', '500'))
+
+NAN = float('nan')
+
+# Fixed parameters of the indicators compute_analyzer_b runs with defaults
+MACD_PERIODS = (12, 26, 9)
+BB_PERIOD, BB_STD = 20, 2
+ADX_PERIOD = 14
+RSI3M3_LENGTH, RSI3M3_MA_LENGTH = 3, 3
+TREND_EXHAUST = {'short_length': 21, 'long_length': 112, 'short_smoothing': 7,
+                 'long_smoothing': 3, 'average_ma': 3, 'threshold': 20}
+
+# Values produced for every bar, named like the analyzer_b columns
+STREAM_COLUMNS = (
+    'WT1', 'WT2', 'WTVwap', 'RSI', 'Stoch', 'MF',
+    'Buy', 'GoldBuy', 'Sell', 'WTCross', 'CrossPoints', 'CrossColor',
+    'FastMoneyBuy', 'FastMoneySell', 'ZeroLineRejectBuy', 'ZeroLineRejectSell',
+    'RSI3', 'RSI3M3', 'RSI3M3State', 'RSI3M3Buy', 'RSI3M3Sell',
+    'MACD', 'MACDSignal', 'MACDHist', 'BBUpper', 'BBMiddle', 'BBLower',
+    'ADX', 'PlusDI', 'MinusDI',
+    'ShortPercentR', 'LongPercentR', 'AvgPercentR', 'TEOverbought', 'TEOversold',
+    'TEOBReversal', 'TEOSReversal', 'TECrossBull', 'TECrossBear'
+)
+
+
+def _divide(a, b):
+    """a / b with numpy semantics for zero divisors (inf or NaN instead of raising)"""
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a != a or a == 0:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+def _nanmax(*values):
+    valid = [value for value in values if value == value]
+    return max(valid) if valid else NAN
+
+
+def _nanmin(*values):
+    valid = [value for value in values if value == value]
+    return min(valid) if valid else NAN
+
+
+class _Ewm:
+    """ewm(span, adjust=False).mean(), carried through NaN bars like pandas"""
+
+    def __init__(self, span):
+        self.alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+        self.weighted = NAN
+        self.old_wt = 1.0
+
+    def update(self, value):
+        weighted = self.weighted
+        if weighted == weighted:
+            old_wt = self.old_wt * (1.0 - self.alpha)
+            if value == value:
+                if weighted != value:
+                    weighted = old_wt * weighted + self.alpha * value
+                    weighted /= (old_wt + self.alpha)
+                old_wt = 1.0
+            self.old_wt = old_wt
+        elif value == value:
+            weighted = value
+        self.weighted = weighted
+        return weighted
+
+    def get_state(self):
+        return [self.weighted, self.old_wt]
+
+    def set_state(self, state):
+        self.weighted, self.old_wt = state
+
+
+class _Mean:
+    """rolling(window).mean() over a ring buffer with a compensated running sum"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.compensation = 0.0
+        self.nans = 0
+        self.negatives = 0
+        self.last = NAN
+        self.run = 0
+
+    def _add(self, value):
+        y = value - self.compensation
+        t = self.total + y
+        self.compensation = (t - self.total) - y
+        self.total = t
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if old == old:
+                self._add(-old)
+                self.negatives -= old < 0
+            else:
+                self.nans -= 1
+        self.values.append(value)
+        if value == value:
+            self._add(value)
+            self.negatives += value < 0
+        else:
+            self.nans += 1
+        if value == self.last:
+            self.run += 1
+        else:
+            self.last, self.run = value, 1
+
+        if len(self.values) < self.window or self.nans:
+            return NAN
+        if self.run >= self.window:
+            return value
+        result = self.total / self.window
+        # Keep sums of one sign from drifting across zero
+        if self.negatives == 0 and result < 0:
+            result = 0.0
+        elif self.negatives == self.window and result > 0:
+            result = 0.0
+        return result
+
+    def std(self):
+        """Sample standard deviation of the current window (NaN unless full and valid)"""
+        if len(self.values) < self.window or self.nans:
+            return NAN
+        if self.run >= self.window:
+            return 0.0
+        mean = sum(self.values) / self.window
+        return math.sqrt(sum((value - mean) ** 2 for value in self.values) / (self.window - 1))
+
+    def get_state(self):
+        return [list(self.values), self.total, self.compensation, self.nans, self.negatives, self.last, self.run]
+
+    def set_state(self, state):
+        values, self.total, self.compensation, self.nans, self.negatives, self.last, self.run = state
+        self.values = deque(values, maxlen=self.window)
+
+
+class _Extreme:
+    """rolling(window).max() or .min() with a monotonic deque of (bar, value)"""
+
+    def __init__(self, window, is_max):
+        self.window = window
+        self.is_max = is_max
+        self.recent = deque(maxlen=window)
+        self.candidates = deque()
+        self.count = 0
+        self.nans = 0
+
+    def update(self, value):
+        if len(self.recent) == self.window and self.recent[0] != self.recent[0]:
+            self.nans -= 1
+        self.recent.append(value)
+        if value != value:
+            self.nans += 1
+        else:
+            while self.candidates and (
+                self.candidates[-1][1] <= value if self.is_max else self.candidates[-1][1] >= value
+            ):
+                self.candidates.pop()
+            self.candidates.append((self.count, value))
+        while self.candidates and self.candidates[0][0] <= self.count - self.window:
+            self.candidates.popleft()
+        self.count += 1
+
+        if self.count < self.window or self.nans:
+            return NAN
+        return self.candidates[0][1]
+
+    def get_state(self):
+        return [list(self.recent), [list(candidate) for candidate in self.candidates], self.count, self.nans]
+
+    def set_state(self, state):
+        recent, candidates, self.count, self.nans = state
+        self.recent = deque(recent, maxlen=self.window)
+        self.candidates = deque(tuple(candidate) for candidate in candidates)
+
+
+class IndicatorState:
+    """
+    Indicator accumulators of one (ticker, interval) series, advanced bar by bar
+    """
+
+    def __init__(self, params):
+        """
+        Initialize the state before the first bar
+
+        Args:
+            params: Interval parameters from adjust_parameters_for_interval
+        """
+        self.params = dict(params)
+        self.last_time = None
+        self.bars = 0
+        self.last_values = None
+        # Time and close of the last bar applied as closed
+        self.settled_time = None
+        self.settled_close = NAN
+        self._snapshot = None
+
+        fast, slow, signal = MACD_PERIODS
+        te = TREND_EXHAUST
+        self._components = {
+            'wt_ema': _Ewm(params['wtChannelLen']),
+            'wt_dev': _Ewm(params['wtChannelLen']),
+            'wt_tci': _Ewm(params['wtAverageLen']),
+            'wt_ma': _Mean(params['wtMALen']),
+            'rsi_low': _Extreme(params['stochPeriod1'], False),
+            'rsi_high': _Extreme(params['stochPeriod1'], True),
+            'rsi_ma': _Mean(2),
+            'stoch_low': _Extreme(params['stochPeriod2'], False),
+            'stoch_high': _Extreme(params['stochPeriod2'], True),
+            'stoch_ma': _Mean(2),
+            'mf_mean': _Mean(params['mfPeriod1']),
+            'mf_dev': _Mean(params['mfPeriod1']),
+            'mf': _Mean(params['mfPeriod2']),
+            'macd_fast': _Ewm(fast),
+            'macd_slow': _Ewm(slow),
+            'macd_signal': _Ewm(signal),
+            'bb': _Mean(BB_PERIOD),
+            'atr': _Mean(ADX_PERIOD),
+            'plus_dm': _Mean(ADX_PERIOD),
+            'minus_dm': _Mean(ADX_PERIOD),
+            'adx': _Mean(ADX_PERIOD),
+            'rsi3_gain': _Mean(RSI3M3_LENGTH),
+            'rsi3_loss': _Mean(RSI3M3_LENGTH),
+            'rsi3_ma': _Mean(RSI3M3_MA_LENGTH),
+            'te_short_high': _Extreme(te['short_length'], True),
+            'te_short_low': _Extreme(te['short_length'], False),
+            'te_long_high': _Extreme(te['long_length'], True),
+            'te_long_low': _Extreme(te['long_length'], False),
+            'te_short': _Ewm(te['short_smoothing']),
+            'te_long': _Ewm(te['long_smoothing']),
+            'te_average': _Ewm(te['average_ma'])
+        }
+        # Previous values the crosses and state machines compare with
+        self._memory = {
+            'high': NAN, 'low': NAN, 'close': NAN,
+            'wt1': NAN, 'wt2': NAN, 'recent_wt2': [],
+            'rsi3': NAN, 'rsi3m3_state': 0, 'recent_rsi3m3': [],
+            'te_short': NAN, 'te_long': NAN, 'te_overbought': 0.0, 'te_oversold': 0.0
+        }
+
+    def update(self, timestamp, bar, forming=False):
+        """
+        Apply one bar and get the indicator values of it
+
+        A bar at the time of the last one replaces it if that one was
+        forming; a later bar closes a forming last bar as it was last given.
+
+        Args:
+            timestamp: Bar time (anything ordered, e.g. a pandas Timestamp)
+            bar: Mapping with Open, High, Low and Close
+            forming: Whether the bar is still forming and may be updated again
+
+        Returns:
+            Dict of STREAM_COLUMNS name -> value
+        """
+        if self.last_time is not None:
+            if timestamp < self.last_time:
+                raise ValueError(f"Bar at {timestamp} is older than the last bar at {self.last_time}")
+            if timestamp == self.last_time:
+                if self._snapshot is None:
+                    raise ValueError(f"Bar at {timestamp} is already closed")
+                self._load(self._snapshot)
+                self.bars -= 1
+
+        self._snapshot = self._dump() if forming else None
+        values = self._apply(
+            float(bar['Open']), float(bar['High']), float(bar['Low']), float(bar['Close'])
+        )
+        self.last_time = timestamp
+        self.bars += 1
+        self.last_values = values
+        if not forming:
+            self.settled_time, self.settled_close = timestamp, float(bar['Close'])
+        return values
+
+    def is_rebased(self, bars):
+        """Check whether a frame holds another close for the last closed bar"""
+        if self.settled_time is None or self.settled_time not in bars.index:
+            return False
+        close = float(bars.at[self.settled_time, 'Close'])
+        if math.isnan(close) or math.isnan(self.settled_close):
+            return math.isnan(close) != math.isnan(self.settled_close)
+        return close != self.settled_close
+
+    @property
+    def forming(self):
+        """Whether the last bar was applied as forming"""
+        return self._snapshot is not None
+
+    def _apply(self, o, h, l, c):
+        """Advance every indicator by one bar"""
+        comp = self._components
+        memory = self._memory
+        bar_index = self.bars
+        values = {}
+
+        # WaveTrend
+        hlc3 = (h + l + c) / 3
+        ema = comp['wt_ema'].update(hlc3)
+        d = comp['wt_dev'].update(abs(hlc3 - ema))
+        wt1 = comp['wt_tci'].update(_divide(hlc3 - ema, 0.015 * d))
+        wt2 = comp['wt_ma'].update(wt1)
+        values['WT1'], values['WT2'], values['WTVwap'] = wt1, wt2, wt1 - wt2
+
+        # Stochastic on the Heikin Ashi range
+        ha_close = (o + h + l + c) / 4
+        ha_high, ha_low = _nanmax(h, o, c), _nanmin(l, o, c)
+        for column, prefix in (('RSI', 'rsi'), ('Stoch', 'stoch')):
+            lowest = comp[f'{prefix}_low'].update(ha_low)
+            highest = comp[f'{prefix}_high'].update(ha_high)
+            raw = _divide(ha_close - lowest, highest - lowest) * 100
+            values[column] = comp[f'{prefix}_ma'].update(raw)
+
+        # Money Flow
+        m = comp['mf_mean'].update(hlc3)
+        f = comp['mf_dev'].update(abs(hlc3 - m))
+        mf = comp['mf'].update(_divide(hlc3 - m, 0.015 * f))
+        values['MF'] = mf
+
+        # WaveTrend signals (see generate_signals) with Pine Script default levels
+        prev_wt1, prev_wt2 = memory['wt1'], memory['wt2']
+        cross_up = prev_wt1 < prev_wt2 and wt1 > wt2
+        cross_down = prev_wt1 > prev_wt2 and wt1 < wt2
+        crossed = cross_up or cross_down
+        buy = cross_up and wt2 <= -53
+        values['Buy'] = buy
+        values['GoldBuy'] = float(buy and wt2 <= -75 and mf > 0)
+        values['Sell'] = cross_down and wt2 >= 53
+        values['WTCross'] = float(crossed)
+        values['CrossPoints'] = wt2 if crossed else NAN
+        values['CrossColor'] = 1 if (wt2 - wt1) > 0 else 0
+
+        # Fast Money and Zero-Line Rejections (see compute_analyzer_b)
+        recent_wt2 = memory['recent_wt2']
+        fast_buy = fast_sell = zero_buy = zero_sell = 0.0
+        if bar_index >= 3:
+            if any(value < -75 for value in recent_wt2) and wt2 > -30 and wt1 > wt2:
+                fast_buy = 1.0
+            if any(value > 75 for value in recent_wt2) and wt2 < 30 and wt1 < wt2:
+                fast_sell = 1.0
+        if bar_index >= 2:
+            if -10 < prev_wt2 < 0 and wt2 > 0 and wt1 > wt2:
+                zero_buy = 1.0
+            if 0 < prev_wt2 < 10 and wt2 < 0 and wt1 < wt2:
+                zero_sell = 1.0
+        values['FastMoneyBuy'], values['FastMoneySell'] = fast_buy, fast_sell
+        values['ZeroLineRejectBuy'], values['ZeroLineRejectSell'] = zero_buy, zero_sell
+        memory['wt1'], memory['wt2'] = wt1, wt2
+        memory['recent_wt2'] = (recent_wt2 + [wt2])[-3:]
+
+        # RSI3M3+ (see calculate_rsi3m3)
+        delta = c - memory['close']
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        rs = _divide(comp['rsi3_gain'].update(gain), comp['rsi3_loss'].update(loss))
+        rsi3 = 100 - _divide(100, 1 + rs)
+        rsi3m3 = comp['rsi3_ma'].update(rsi3)
+        prev_rsi3, state = memory['rsi3'], memory['rsi3m3_state']
+        if bar_index >= 1:
+            if prev_rsi3 <= 67 and rsi3 > 67:
+                state = 1
+            elif prev_rsi3 >= 33 and rsi3 < 33:
+                state = 2
+            elif state == 1 and prev_rsi3 >= 39 and rsi3 < 39:
+                state = 3
+            elif state == 2 and prev_rsi3 <= 61 and rsi3 > 61:
+                state = 3
+        recent = memory['recent_rsi3m3']
+        rsi3m3_buy = rsi3m3_sell = False
+        if bar_index >= 2:
+            ma_prev2, ma_prev1 = recent
+            rsi3m3_buy = rsi3m3 > ma_prev1 and ma_prev1 < ma_prev2 and ma_prev1 < 30
+            rsi3m3_sell = rsi3m3 < ma_prev1 and ma_prev1 > ma_prev2 and ma_prev1 > 70
+        values['RSI3'], values['RSI3M3'], values['RSI3M3State'] = rsi3, rsi3m3, state
+        values['RSI3M3Buy'], values['RSI3M3Sell'] = rsi3m3_buy, rsi3m3_sell
+        memory['rsi3'], memory['rsi3m3_state'] = rsi3, state
+        memory['recent_rsi3m3'] = (recent + [rsi3m3])[-2:]
+
+        # MACD
+        macd = comp['macd_fast'].update(c) - comp['macd_slow'].update(c)
+        signal = comp['macd_signal'].update(macd)
+        values['MACD'], values['MACDSignal'], values['MACDHist'] = macd, signal, macd - signal
+
+        # Bollinger Bands
+        middle = comp['bb'].update(c)
+        std = comp['bb'].std()
+        values['BBUpper'], values['BBMiddle'], values['BBLower'] = (
+            middle + (std * BB_STD), middle, middle - (std * BB_STD)
+        )
+
+        # ADX
+        prev_high, prev_low, prev_close = memory['high'], memory['low'], memory['close']
+        tr = _nanmax(h - l, abs(h - prev_close), abs(l - prev_close))
+        atr = comp['atr'].update(tr)
+        up_move, down_move = h - prev_high, prev_low - l
+        plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+        plus_di = 100 * _divide(comp['plus_dm'].update(plus_dm), atr)
+        minus_di = 100 * _divide(comp['minus_dm'].update(minus_dm), atr)
+        dx = 100 * _divide(abs(plus_di - minus_di), plus_di + minus_di)
+        values['ADX'], values['PlusDI'], values['MinusDI'] = comp['adx'].update(dx), plus_di, minus_di
+        memory['high'], memory['low'], memory['close'] = h, l, c
+
+        # TrendExhaust Williams %R (see get_exhaust_data)
+        threshold = TREND_EXHAUST['threshold']
+        short_high, short_low = comp['te_short_high'].update(h), comp['te_short_low'].update(l)
+        long_high, long_low = comp['te_long_high'].update(h), comp['te_long_low'].update(l)
+        short_r = _divide(-100 * (short_high - c), short_high - short_low)
+        long_r = _divide(-100 * (long_high - c), long_high - long_low)
+        average = comp['te_average'].update((short_r + long_r) / 2)
+        short_r, long_r = comp['te_short'].update(short_r), comp['te_long'].update(long_r)
+        overbought = oversold = ob_reversal = os_reversal = cross_bull = cross_bear = 0.0
+        if bar_index >= 1:
+            overbought = 1.0 if average >= -threshold else 0.0
+            oversold = 1.0 if average <= -100 + threshold else 0.0
+            ob_reversal = 1.0 if memory['te_overbought'] == 1 and overbought == 0 else 0.0
+            os_reversal = 1.0 if memory['te_oversold'] == 1 and oversold == 0 else 0.0
+            if memory['te_short'] <= memory['te_long'] and short_r > long_r:
+                cross_bull = 1.0
+            if memory['te_short'] >= memory['te_long'] and short_r < long_r:
+                cross_bear = 1.0
+        values['ShortPercentR'], values['LongPercentR'], values['AvgPercentR'] = short_r, long_r, average
+        values['TEOverbought'], values['TEOversold'] = overbought, oversold
+        values['TEOBReversal'], values['TEOSReversal'] = ob_reversal, os_reversal
+        values['TECrossBull'], values['TECrossBear'] = cross_bull, cross_bear
+        memory['te_short'], memory['te_long'] = short_r, long_r
+        memory['te_overbought'], memory['te_oversold'] = overbought, oversold
+
+        return values
+
+    def _dump(self):
+        """Accumulators and memory as plain lists and numbers"""
+        return {
+            'components': {name: component.get_state() for name, component in self._components.items()},
+            'memory': {key: list(value) if isinstance(value, list) else value
+                       for key, value in self._memory.items()}
+        }
+
+    def _load(self, dumped):
+        for name, state in dumped['components'].items():
+            self._components[name].set_state(state)
+        self._memory = {key: list(value) if isinstance(value, list) else value
+                        for key, value in dumped['memory'].items()}
+
+    def to_dict(self):
+        """
+        Serialize the state to a JSON-compatible dict
+
+        Times are stored as given; pandas Timestamps become ISO strings.
+        """
+        def dump_time(value):
+            return value.isoformat() if hasattr(value, 'isoformat') else value
+
+        return dict(
+            self._dump(),
+            params=self.params,
+            last_time=dump_time(self.last_time),
+            settled_time=dump_time(self.settled_time),
+            settled_close=self.settled_close,
+            bars=self.bars,
+            last_values=self.last_values,
+            snapshot=self._snapshot
+        )
+
+    @classmethod
+    def from_dict(cls, data, parse_time=None):
+        """
+        Restore a state serialized by to_dict
+
+        Args:
+            data: Dict from to_dict
+            parse_time: Callable turning the stored last time back into a
+                timestamp (e.g. pd.Timestamp); kept as stored when None
+        """
+        def parse(value):
+            return parse_time(value) if parse_time and value is not None else value
+
+        state = cls(data['params'])
+        state._load(data)
+        state.last_time = parse(data['last_time'])
+        state.settled_time = parse(data.get('settled_time'))
+        state.settled_close = data.get('settled_close', NAN)
+        state.bars = data['bars']
+        state.last_values = data['last_values']
+        state._snapshot = data['snapshot']
+        return state
+
+
+class IndicatorStreams:
+    """
+    LRU registry of live IndicatorStates by (ticker, interval)
+    """
+
+    def __init__(self, max_states=None):
+        """
+        Initialize an empty registry
+
+        Args:
+            max_states: Number of states kept (defaults to INDICATOR_STREAMS_MAX)
+        """
+        self.max_states = INDICATOR_STREAMS_MAX if max_states is None else max_states
+        self.logger = logging.getLogger(__name__)
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'advances': 0, 'seeds': 0, 'bars_applied': 0, 'evictions': 0}
+
+    def advance(self, ticker, interval, bars, params, last_forming=True):
+        """
+        Bring the state of a series up to date with its latest bars
+
+        Bars after the last one the state has seen are applied one by one,
+        and a forming last bar is revised with its current values. The state
+        is seeded from the whole frame when there is none yet, when the
+        parameters changed, when its last bar is not in the frame or when
+        the frame holds another close for its last closed bar (the history
+        was re-adjusted for a split or dividend).
+
+        Args:
+            ticker: Ticker symbol
+            interval: Data interval
+            bars: OHLC DataFrame on a time index, oldest first
+            params: Interval parameters from adjust_parameters_for_interval
+            last_forming: Whether the last bar of the frame is still forming
+
+        Returns:
+            Tuple of (IndicatorState, whether it was seeded from scratch)
+        """
+        key = (ticker, interval)
+        with self._lock:
+            entry = self._states.get(key)
+            if entry is None:
+                entry = {'state': None, 'lock': threading.Lock(), 'updated_at': None}
+                self._states[key] = entry
+                while len(self._states) > self.max_states:
+                    self._states.popitem(last=False)
+                    self._counters['evictions'] += 1
+            self._states.move_to_end(key)
+
+        with entry['lock']:
+            state = entry['state']
+            seeded = (
+                state is None or state.params != dict(params) or state.last_time is None
+                or state.last_time not in bars.index
+                or state.is_rebased(bars)
+            )
+            if seeded:
+                state = IndicatorState(params)
+                pending = bars
+            else:
+                # The last seen bar may have changed while it was forming
+                pending = bars[bars.index >= state.last_time]
+                if not state.forming:
+                    pending = pending.iloc[1:]
+
+            last = len(pending) - 1
+            for position, (timestamp, bar) in enumerate(pending.iterrows()):
+                state.update(timestamp, bar, forming=last_forming and position == last)
+            entry['state'] = state
+            entry['updated_at'] = time.time()
+
+        with self._lock:
+            self._counters['advances'] += 1
+            self._counters['seeds'] += seeded
+            self._counters['bars_applied'] += len(pending)
+        if seeded:
+            self.logger.debug(f"Seeded indicator state of {ticker} {interval} from {len(pending)} bars")
+        return state, seeded
+
+    def get(self, ticker, interval):
+        """Get the state of a series, or None"""
+        with self._lock:
+            entry = self._states.get((ticker, interval))
+        return entry['state'] if entry else None
+
+    def list_entries(self):
+        """
+        Describe every state in memory
+
+        Returns:
+            List of dicts with key ('TICKER/interval'), ticker, bars, last_time and updated_at
+        """
+        with self._lock:
+            states = list(self._states.items())
+        return [
+            {
+                'key': f"{ticker}/{interval}",
+                'ticker': ticker,
+                'bars': entry['state'].bars,
+                'last_time': str(entry['state'].last_time),
+                'updated_at': entry['updated_at']
+            }
+            for (ticker, interval), entry in states if entry['state'] is not None
+        ]
+
+    def delete(self, key):
+        """Drop one state by 'TICKER/interval' key"""
+        ticker, interval = key.rsplit('/', 1)
+        with self._lock:
+            return self._states.pop((ticker, interval), None) is not None
+
+    def clear(self):
+        """Drop every state"""
+        with self._lock:
+            self._states.clear()
+
+    def get_stats(self):
+        """Get state counts and counters of the registry"""
+        entries = self.list_entries()
+        with self._lock:
+            return dict(
+                self._counters,
+                name='streams',
+                entries=len(entries),
+                max_states=self.max_states
+            )
+
+
+# Global indicator stream registry
+_indicator_streams = None
+
+def get_indicator_streams():
+    """Get or create global indicator stream registry"""
+    global _indicator_streams
+    if _indicator_streams is None:
+        _indicator_streams = IndicatorStreams()
+    return _indicator_streams
@@ -0,0 +1,313 @@
+"""
+Company Metadata Cache
+======================
+
+Long-lived cache of company names and industries, kept apart from price data.
+
+Names and industries almost never change, yet ``stock.info`` is one of the
+slowest Yahoo calls. This cache keeps them for days in a JSON file that
+survives restarts. Lookups on the request path never go to the provider:
+unknown or expired symbols are queued for a background fill, and whole
+watchlists can be filled in one go with ``fill`` / ``fill_async``. A ticker
+whose fetch failed is not fetched again for METADATA_RETRY_SECONDS, so a
+failing symbol on a busy page does not start a fill on every lookup.
+
+Metadata calls take a yfinance request slot but stay out of its circuit
+breaker: the quote-summary endpoint behind ``.info`` fails independently of
+price history, and its errors must not cut off price fetches.
+
+Configuration:
+
+    METADATA_CACHE_PATH      JSON file (default <repo>/.metadata_cache.json)
+    METADATA_CACHE_TTL_DAYS  Days before an entry is refreshed (default 7)
+    METADATA_RETRY_SECONDS   Seconds before a failed ticker is fetched again (default 300)
+"""
+
+import concurrent.futures
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+METADATA_CACHE_PATH = os.getenv(
+    'METADATA_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.metadata_cache.json')
+)
+METADATA_CACHE_TTL_DAYS = float(os.getenv('METADATA_CACHE_TTL_DAYS', '7'))
+METADATA_RETRY_SECONDS = float(os.getenv('METADATA_RETRY_SECONDS', '300'))
+METADATA_FILL_WORKERS = 4
+
+
+def fetch_yfinance_metadata(ticker):
+    """
+    Fetch company metadata for a ticker from yfinance
+
+    Args:
+        ticker: Ticker symbol
+
+    Returns:
+        Dictionary with company_name, industry and sector
+    """
+    import yfinance as yf
+    from provider_access import provider_slot
+
+    with provider_slot('yfinance'):
+        info = yf.Ticker(ticker).info or {}
+    return {
+        'company_name': info.get('longName') or info.get('shortName') or ticker,
+        'industry': info.get('industry') or None,
+        'sector': info.get('sector') or None
+    }
+
+
+class MetadataCache:
+    """
+    Persistent ticker -> company metadata cache with a TTL of days
+    """
+
+    def __init__(self, path=None, ttl_days=None, fetcher=None, retry_seconds=None):
+        """
+        Initialize the cache and load any persisted entries
+
+        Args:
+            path: JSON file the entries are persisted to (defaults to METADATA_CACHE_PATH)
+            ttl_days: Age in days after which an entry is refreshed
+            fetcher: Callable ``fetcher(ticker)`` returning a metadata dict
+                (defaults to fetch_yfinance_metadata)
+            retry_seconds: Seconds before a ticker whose fetch failed is tried again
+        """
+        self.path = path or METADATA_CACHE_PATH
+        self.ttl_seconds = (METADATA_CACHE_TTL_DAYS if ttl_days is None else ttl_days) * 86400
+        self.fetcher = fetcher or fetch_yfinance_metadata
+        self.retry_seconds = METADATA_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self.logger = logging.getLogger(__name__)
+        self._entries = {}
+        self._pending = set()
+        self._failed = {}
+        self._lock = threading.RLock()
+        self._counters = {'hits': 0, 'misses': 0}
+        self._load()
+
+    def _load(self):
+        """Read persisted entries from disk"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self._entries = json.load(f)
+            self.logger.info(f"Loaded metadata for {len(self._entries)} tickers from {self.path}")
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable metadata cache {self.path}: {e}")
+            self._entries = {}
+
+    def _save(self):
+        """Write all entries to disk atomically"""
+        with self._lock:
+            snapshot = dict(self._entries)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.json.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, ticker):
+        """Check whether a ticker has an entry younger than the TTL"""
+        entry = self._entries.get(ticker.upper())
+        return entry is not None and time.time() - entry.get('updated_at', 0) < self.ttl_seconds
+
+    def _needs_fetch(self, ticker, force=False):
+        """Check whether a ticker is stale and not backing off after a failed fetch"""
+        if force:
+            return True
+        failed_at = self._failed.get(ticker.upper())
+        if failed_at is not None and time.time() - failed_at < self.retry_seconds:
+            return False
+        return not self.is_fresh(ticker)
+
+    def get(self, ticker, schedule_fill=True):
+        """
+        Get the cached metadata of a ticker without calling the provider
+
+        Expired entries are still returned; they are refreshed in the
+        background together with missing ones.
+
+        Args:
+            ticker: Ticker symbol
+            schedule_fill: Queue a background fetch when the entry is missing or expired
+
+        Returns:
+            Metadata dict, or None when the ticker is not cached yet
+        """
+        entry = self._entries.get(ticker.upper())
+        with self._lock:
+            self._counters['hits' if entry is not None else 'misses'] += 1
+        if schedule_fill and self._needs_fetch(ticker):
+            self.fill_async([ticker])
+        return entry
+
+    def set(self, ticker, metadata, persist=True):
+        """
+        Store metadata for a ticker
+
+        Args:
+            ticker: Ticker symbol
+            metadata: Dictionary with company_name, industry, sector
+            persist: Write the cache file afterwards
+        """
+        with self._lock:
+            self._entries[ticker.upper()] = dict(metadata, updated_at=time.time())
+        if persist:
+            self._save()
+
+    def fill(self, tickers, force=False):
+        """
+        Fetch metadata for every missing or expired ticker of a watchlist
+
+        Args:
+            tickers: Iterable of ticker symbols
+            force: Refetch fresh entries and recently failed tickers as well
+
+        Returns:
+            Number of tickers fetched successfully
+        """
+        todo = [t.upper() for t in dict.fromkeys(tickers) if self._needs_fetch(t, force)]
+        if not todo:
+            return 0
+
+        self.logger.info(f"Filling company metadata for {len(todo)} tickers")
+        fetched = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(METADATA_FILL_WORKERS, len(todo))) as executor:
+            futures = {executor.submit(self.fetcher, ticker): ticker for ticker in todo}
+            for future in concurrent.futures.as_completed(futures):
+                ticker = futures[future]
+                try:
+                    self.set(ticker, future.result(), persist=False)
+                    fetched += 1
+                    with self._lock:
+                        self._failed.pop(ticker, None)
+                except Exception as e:
+                    with self._lock:
+                        self._failed[ticker] = time.time()
+                    self.logger.warning(f"Could not fetch metadata for {ticker}: {e}")
+
+        if fetched:
+            self._save()
+        return fetched
+
+    def fill_async(self, tickers, force=False):
+        """
+        Run ``fill`` on a background thread, skipping tickers already queued
+
+        Args:
+            tickers: Iterable of ticker symbols
+            force: Refetch fresh entries and recently failed tickers as well
+
+        Returns:
+            The started thread, or None when there was nothing to fetch
+        """
+        with self._lock:
+            todo = [t.upper() for t in tickers
+                    if t.upper() not in self._pending and self._needs_fetch(t, force)]
+            self._pending.update(todo)
+        if not todo:
+            return None
+
+        def run():
+            try:
+                self.fill(todo, force=force)
+            finally:
+                with self._lock:
+                    self._pending.difference_update(todo)
+
+        thread = threading.Thread(target=run, name='metadata-fill', daemon=True)
+        thread.start()
+        return thread
+
+    def apply(self, df, ticker):
+        """
+        Set company_name / industry attrs of a DataFrame from the cache
+
+        Falls back to the ticker as company name while the entry is still
+        being fetched.
+
+        Args:
+            df: DataFrame to annotate
+            ticker: Ticker symbol
+
+        Returns:
+            The same DataFrame
+        """
+        entry = self.get(ticker) or {}
+        df.attrs['company_name'] = entry.get('company_name') or ticker
+        if entry.get('industry'):
+            df.attrs['industry'] = entry['industry']
+        return df
+
+    def list_entries(self):
+        """
+        Describe every cached ticker
+
+        Returns:
+            List of dicts with key, ticker, company_name, age_seconds and expired
+        """
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    'key': ticker,
+                    'ticker': ticker,
+                    'company_name': entry.get('company_name'),
+                    'age_seconds': round(now - entry.get('updated_at', 0), 1),
+                    'expired': not self.is_fresh(ticker)
+                }
+                for ticker, entry in self._entries.items()
+            ]
+
+    def delete(self, ticker):
+        """Remove one ticker, returning True if it was cached"""
+        with self._lock:
+            removed = self._entries.pop(ticker.upper(), None) is not None
+        if removed:
+            self._save()
+        return removed
+
+    def get_stats(self):
+        """Get entry counts and hit/miss counters of the cache"""
+        now = time.time()
+        with self._lock:
+            fresh = sum(1 for ticker in self._entries if self.is_fresh(ticker))
+            lookups = self._counters['hits'] + self._counters['misses']
+            oldest = min((entry.get('updated_at', 0) for entry in self._entries.values()), default=None)
+            return dict(
+                self._counters,
+                name='metadata',
+                entries=len(self._entries),
+                bytes=os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+                fresh=fresh,
+                expired=len(self._entries) - fresh,
+                pending=len(self._pending),
+                failed=len(self._failed),
+                ttl_days=self.ttl_seconds / 86400,
+                hit_ratio=round(self._counters['hits'] / lookups, 4) if lookups else None,
+                oldest_age_seconds=round(now - oldest, 1) if oldest is not None else None
+            )
+
+
+# Global metadata cache instance
+_metadata_cache = None
+
+def get_metadata_cache():
+    """Get or create global metadata cache instance"""
+    global _metadata_cache
+    if _metadata_cache is None:
+        _metadata_cache = MetadataCache()
+    return _metadata_cache
+
+def apply_company_info(df, ticker):
+    """Convenience wrapper for MetadataCache.apply on the global cache"""
+    return get_metadata_cache().apply(df, ticker)
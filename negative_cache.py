@@ -0,0 +1,230 @@
+"""
+Negative Result Cache
+=====================
+
+Short-lived memory of fetches that came back without data.
+
+A typo'd or delisted ticker in a shared watchlist used to go through every
+retry with backoff on every request. This cache records two outcomes per
+provider and answers them right away until they expire:
+
+- ``no_data``: the provider answered, but had no bars for this
+  (ticker, period, interval)
+- ``invalid_symbol``: the provider does not know the symbol at all; recorded
+  for every period and interval of the ticker
+
+Transport errors (timeouts, rate limits, open circuits) are never recorded
+here, they say nothing about the symbol.
+
+Configuration:
+
+    NEGATIVE_CACHE_TTL     Seconds a no_data outcome is kept (default 300)
+    INVALID_SYMBOL_TTL     Seconds an invalid_symbol outcome is kept (default 3600)
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+NEGATIVE_CACHE_TTL = float(os.getenv('NEGATIVE_CACHE_TTL', '300'))
+INVALID_SYMBOL_TTL = float(os.getenv('INVALID_SYMBOL_TTL', '3600'))
+
+NO_DATA = 'no_data'
+INVALID_SYMBOL = 'invalid_symbol'
+
+# Provider error messages that mean the symbol itself is unknown
+INVALID_SYMBOL_PATTERN = re.compile(
+    r'delisted|no timezone found|symbol not found|quote not found|invalid (ticker|symbol)|\b404\b',
+    re.IGNORECASE
+)
+
+# Period / interval placeholder of entries that cover every request of a ticker
+ANY = '*'
+
+
+def classify_error(error):
+    """
+    Tell whether a provider error means the symbol does not exist
+
+    Args:
+        error: Exception raised by a provider call
+
+    Returns:
+        INVALID_SYMBOL, or None for errors that may be transient
+    """
+    return INVALID_SYMBOL if INVALID_SYMBOL_PATTERN.search(str(error)) else None
+
+
+class NegativeCache:
+    """
+    Per-provider TTL cache of "no data" and "invalid symbol" outcomes
+    """
+
+    def __init__(self, ttl=None, invalid_ttl=None):
+        """
+        Initialize the cache
+
+        Args:
+            ttl: Seconds a no_data outcome is kept (defaults to NEGATIVE_CACHE_TTL)
+            invalid_ttl: Seconds an invalid_symbol outcome is kept
+                (defaults to INVALID_SYMBOL_TTL)
+        """
+        self.ttl = NEGATIVE_CACHE_TTL if ttl is None else ttl
+        self.invalid_ttl = INVALID_SYMBOL_TTL if invalid_ttl is None else invalid_ttl
+        self.logger = logging.getLogger(__name__)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'recorded': 0}
+
+    @staticmethod
+    def _key(provider, ticker, period, interval):
+        return (provider, ticker.upper(), period, interval)
+
+    def record(self, provider, ticker, period, interval, reason=NO_DATA, ttl=None):
+        """
+        Remember that a fetch came back without data
+
+        Args:
+            provider: Data provider name ('yfinance', 'eod')
+            ticker: Ticker symbol as requested
+            period: Requested period
+            interval: Requested interval
+            reason: NO_DATA or INVALID_SYMBOL
+            ttl: Seconds to keep the outcome (defaults by reason)
+        """
+        if reason == INVALID_SYMBOL:
+            period, interval = ANY, ANY
+        if ttl is None:
+            ttl = self.invalid_ttl if reason == INVALID_SYMBOL else self.ttl
+        now = time.time()
+        with self._lock:
+            self._entries[self._key(provider, ticker, period, interval)] = {
+                'reason': reason,
+                'created_at': now,
+                'expires_at': now + ttl
+            }
+            self._counters['recorded'] += 1
+        self.logger.info(f"Negative cache: {provider} {ticker} ({period}, {interval}) -> {reason} for {ttl:.0f}s")
+
+    def _lookup(self, key, now):
+        """Get a live entry, dropping it when expired (lock held)"""
+        entry = self._entries.get(key)
+        if entry is not None and entry['expires_at'] <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def check(self, provider, ticker, period, interval):
+        """
+        Get the recorded outcome of a fetch, if it is still live
+
+        Args:
+            provider: Data provider name
+            ticker: Ticker symbol
+            period: Requested period
+            interval: Requested interval
+
+        Returns:
+            NO_DATA, INVALID_SYMBOL, or None when the fetch should be attempted
+        """
+        now = time.time()
+        with self._lock:
+            entry = (self._lookup(self._key(provider, ticker, ANY, ANY), now)
+                     or self._lookup(self._key(provider, ticker, period, interval), now))
+            self._counters['hits' if entry is not None else 'misses'] += 1
+            return entry['reason'] if entry is not None else None
+
+    def describe(self, ticker, period, interval):
+        """
+        Get the outcome recorded for a ticker by any provider, without counting a lookup
+
+        Returns:
+            INVALID_SYMBOL if any provider rejected the symbol, else NO_DATA
+            if one had no bars, else None
+        """
+        now = time.time()
+        reasons = set()
+        with self._lock:
+            for provider in {key[0] for key in self._entries}:
+                for key in (self._key(provider, ticker, ANY, ANY), self._key(provider, ticker, period, interval)):
+                    entry = self._lookup(key, now)
+                    if entry is not None:
+                        reasons.add(entry['reason'])
+        if INVALID_SYMBOL in reasons:
+            return INVALID_SYMBOL
+        return NO_DATA if reasons else None
+
+    def discard(self, provider, ticker, period=None, interval=None):
+        """
+        Forget the outcomes of a ticker after a fetch returned data
+
+        Args:
+            provider: Data provider name
+            ticker: Ticker symbol
+            period: Only forget this period (with interval); None forgets all
+            interval: Only forget this interval (with period)
+        """
+        ticker = ticker.upper()
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] != provider or key[1] != ticker:
+                    continue
+                if period is None or key[2:] in ((period, interval), (ANY, ANY)):
+                    del self._entries[key]
+
+    def list_entries(self):
+        """
+        Describe every live entry
+
+        Returns:
+            List of dicts with key ('provider/TICKER/period/interval'), ticker,
+            reason and expires_in_seconds
+        """
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    'key': '/'.join(key),
+                    'ticker': key[1],
+                    'reason': entry['reason'],
+                    'expires_in_seconds': round(entry['expires_at'] - now, 1)
+                }
+                for key, entry in self._entries.items()
+                if entry['expires_at'] > now
+            ]
+
+    def delete(self, key):
+        """Remove one entry by its 'provider/TICKER/period/interval' key, returning True if present"""
+        with self._lock:
+            return self._entries.pop(tuple(key.split('/', 3)), None) is not None
+
+    def get_stats(self):
+        """Get entry counts and hit/miss counters of the cache"""
+        now = time.time()
+        with self._lock:
+            live = [entry for entry in self._entries.values() if entry['expires_at'] > now]
+            lookups = self._counters['hits'] + self._counters['misses']
+            return dict(
+                self._counters,
+                name='negative',
+                entries=len(live),
+                invalid_symbols=sum(1 for entry in live if entry['reason'] == INVALID_SYMBOL),
+                ttl_seconds=self.ttl,
+                invalid_ttl_seconds=self.invalid_ttl,
+                hit_ratio=round(self._counters['hits'] / lookups, 4) if lookups else None
+            )
+
+
+# Global negative cache instance
+_negative_cache = None
+
+def get_negative_cache():
+    """Get or create global negative cache instance"""
+    global _negative_cache
+    if _negative_cache is None:
+        _negative_cache = NegativeCache()
+    return _negative_cache
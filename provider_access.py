@@ -0,0 +1,605 @@
+"""
+Provider Access Control
+=======================
+
+Guards every request that goes out to a market data provider.
+
+- Concurrency: the multi-ticker endpoint analyses tickers concurrently, but
+  Yahoo throttles aggressively and EOD enforces per-key limits, so every
+  provider call takes a slot from the provider's semaphore first.
+- Circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive failures a
+  provider is considered down for CIRCUIT_RESET_SECONDS and calls fail fast
+  with CircuitOpenError; one trial call is then let through to probe it.
+- Retries: ``retry_call`` retries with exponential backoff and full jitter,
+  but only inside a small latency budget. Attempts that do not fit are
+  handed to a background worker so the request thread is released.
+- Hedging: ``hedged_call`` starts the primary provider and, if it has not
+  answered within a percentile of its recent latencies, fires the secondary
+  one too and returns whichever brings acceptable data first. Each provider
+  runs its hedged fetches on its own workers, so primaries stuck on a slow
+  provider never hold up the hedges meant to bypass them.
+
+Configuration:
+
+    YFINANCE_MAX_CONCURRENCY   (default 4)
+    EOD_MAX_CONCURRENCY        (default 8)
+    CIRCUIT_FAILURE_THRESHOLD  (default 5)
+    CIRCUIT_RESET_SECONDS      (default 30)
+    RETRY_MAX_DELAY            Cap of a single backoff sleep in seconds (default 8)
+    RETRY_BUDGET_SECONDS       Time a request may spend retrying (default 3)
+    HEDGE_PERCENTILE           Primary latency percentile after which to hedge (default 95)
+    HEDGE_MIN_DELAY            Floor of the hedge delay in seconds (default 0.25)
+    HEDGE_DEFAULT_DELAY        Hedge delay while too few latencies are known (default 2)
+    HEDGE_TIMEOUT_SECONDS      Longest a hedged call waits for any result (default 30)
+"""
+
+import concurrent.futures
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_CONCURRENCY = {
+    'yfinance': int(os.getenv('YFINANCE_MAX_CONCURRENCY', '4')),
+    'eod': int(os.getenv('EOD_MAX_CONCURRENCY', '8'))
+}
+DEFAULT_PROVIDER_CONCURRENCY = 4
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', '30'))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '8'))
+RETRY_BUDGET_SECONDS = float(os.getenv('RETRY_BUDGET_SECONDS', '3'))
+BACKGROUND_RETRY_WORKERS = 2
+
+HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', '95'))
+HEDGE_MIN_DELAY = float(os.getenv('HEDGE_MIN_DELAY', '0.25'))
+HEDGE_DEFAULT_DELAY = float(os.getenv('HEDGE_DEFAULT_DELAY', '2'))
+HEDGE_TIMEOUT_SECONDS = float(os.getenv('HEDGE_TIMEOUT_SECONDS', '30'))
+# Worker threads of each provider's hedged fetches
+HEDGE_WORKERS = 8
+# Fetch latencies kept per provider, and needed before percentiles are trusted
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+
+# Worker threads used to analyse the tickers of one multi-ticker request
+MULTI_TICKER_WORKERS = int(os.getenv('MULTI_TICKER_WORKERS', '8'))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+
+class NonRetryableError(Exception):
+    """Raised for a provider answer that retrying cannot change (e.g. an unknown symbol)"""
+
+
+def backoff_delay(attempt, base_delay, max_delay=None):
+    """
+    Get a sleep time with exponential backoff and full jitter
+
+    Args:
+        attempt: Zero-based number of the attempt that just failed
+        base_delay: Delay scale in seconds
+        max_delay: Cap of the exponential term (defaults to RETRY_MAX_DELAY)
+
+    Returns:
+        Seconds to sleep, uniformly drawn from [0, min(max_delay, base * 2^attempt)]
+    """
+    max_delay = RETRY_MAX_DELAY if max_delay is None else max_delay
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one provider
+    """
+
+    def __init__(self, provider, failure_threshold=None, reset_timeout=None):
+        """
+        Initialize a closed breaker
+
+        Args:
+            provider: Provider name used in logs
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.provider = provider
+        self.failure_threshold = CIRCUIT_FAILURE_THRESHOLD if failure_threshold is None else failure_threshold
+        self.reset_timeout = CIRCUIT_RESET_SECONDS if reset_timeout is None else reset_timeout
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._rejected = 0
+
+    @property
+    def state(self):
+        """Get 'closed', 'open' or 'half_open'"""
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.time() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def is_open(self):
+        """Check whether a call would currently be rejected"""
+        with self._lock:
+            state = self._state()
+            return state == 'open' or (state == 'half_open' and self._trial_in_flight)
+
+    def before_call(self):
+        """
+        Admit a call or raise CircuitOpenError
+
+        While half-open a single trial call is admitted; its outcome closes
+        or re-opens the circuit.
+        """
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self._rejected += 1
+        raise CircuitOpenError(f"{self.provider} circuit is open, failing fast")
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        with self._lock:
+            if self._opened_at is not None:
+                self.logger.info(f"{self.provider} circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failed call, opening the circuit at the threshold"""
+        with self._lock:
+            self._failures += 1
+            trial_failed = self._trial_in_flight
+            self._trial_in_flight = False
+            if trial_failed or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.time()
+                self.logger.warning(f"{self.provider} circuit opened after {self._failures} consecutive failures")
+
+    def get_stats(self):
+        """Get the state and counters of the breaker"""
+        with self._lock:
+            return {
+                'state': self._state(),
+                'consecutive_failures': self._failures,
+                'rejected': self._rejected,
+                'opened_seconds_ago': round(time.time() - self._opened_at, 1) if self._opened_at else None
+            }
+
+
+class ProviderLimiter:
+    """
+    Per-provider concurrency limits and circuit breakers for outgoing data requests
+    """
+
+    def __init__(self, limits=None, failure_threshold=None, reset_timeout=None):
+        """
+        Initialize the limiter
+
+        Args:
+            limits: Dictionary of provider -> maximum concurrent requests
+                (defaults to PROVIDER_CONCURRENCY)
+            failure_threshold: Consecutive failures that open a provider's circuit
+            reset_timeout: Seconds a circuit stays open before a trial call
+        """
+        self.limits = dict(PROVIDER_CONCURRENCY if limits is None else limits)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.logger = logging.getLogger(__name__)
+        self._semaphores = {}
+        self._breakers = {}
+        self._guard = threading.Lock()
+        self._active = {}
+        self._waited = {}
+        self._background = None
+        self._background_keys = set()
+        self._latencies = {}
+        self._hedge_pools = {}
+        self._hedge_counters = {'calls': 0, 'hedged': 0, 'secondary_wins': 0, 'gain_seconds': 0.0}
+
+    def _semaphore(self, provider):
+        """Get the semaphore of a provider, creating it on first use"""
+        with self._guard:
+            if provider not in self._semaphores:
+                limit = max(1, self.limits.get(provider, DEFAULT_PROVIDER_CONCURRENCY))
+                self._semaphores[provider] = threading.BoundedSemaphore(limit)
+                self._active[provider] = 0
+                self._waited[provider] = 0.0
+            return self._semaphores[provider]
+
+    def breaker(self, provider):
+        """Get the circuit breaker of a provider, creating it on first use"""
+        with self._guard:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(provider, self.failure_threshold, self.reset_timeout)
+            return self._breakers[provider]
+
+    @contextmanager
+    def slot(self, provider):
+        """
+        Hold one request slot of a provider for the duration of the block
+
+        Args:
+            provider: Data provider name ('yfinance', 'eod')
+        """
+        semaphore = self._semaphore(provider)
+        wait_start = time.time()
+        semaphore.acquire()
+        waited = time.time() - wait_start
+        with self._guard:
+            self._active[provider] += 1
+            self._waited[provider] += waited
+        if waited > 1:
+            self.logger.info(f"Waited {waited:.2f}s for a {provider} request slot")
+        try:
+            yield
+        finally:
+            with self._guard:
+                self._active[provider] -= 1
+            semaphore.release()
+
+    @contextmanager
+    def call(self, provider):
+        """
+        Guard one provider request: circuit check, request slot and outcome
+
+        Exceptions raised inside the block count as provider failures,
+        except NonRetryableError: the provider did answer.
+
+        Args:
+            provider: Data provider name ('yfinance', 'eod')
+
+        Raises:
+            CircuitOpenError: When the provider's circuit is open
+        """
+        breaker = self.breaker(provider)
+        breaker.before_call()
+        try:
+            with self.slot(provider):
+                yield
+        except NonRetryableError:
+            breaker.record_success()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+
+    def retry_call(self, provider, fn, max_retries=3, base_delay=1.0, budget_seconds=None,
+                   accept=None, background_key=None):
+        """
+        Call ``fn`` with exponential backoff, inside a latency budget
+
+        ``fn`` is expected to guard its own provider requests with ``call``
+        so failures reach the breaker. Attempts stop early when the circuit
+        opens. When the next backoff would overrun the budget, the remaining
+        attempts continue on a background worker (if ``background_key`` is
+        given, deduplicated on it) so their result can land in a cache for
+        the next request, and this call returns what it has so far.
+
+        Args:
+            provider: Data provider name
+            fn: Callable doing one attempt; returns a result or raises
+            max_retries: Total number of attempts
+            base_delay: Backoff scale in seconds
+            budget_seconds: Time this call may spend (defaults to RETRY_BUDGET_SECONDS)
+            accept: Predicate deciding whether a result is good enough
+                (defaults to "not None")
+            background_key: Key identifying the work for background retries;
+                None disables handing off
+
+        Returns:
+            The first accepted result, else the last non-None result, else None
+
+        Raises:
+            CircuitOpenError: When the circuit is open before any attempt ran
+            NonRetryableError: When an attempt raised it
+        """
+        accept = accept or (lambda result: result is not None)
+        budget = RETRY_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+        deadline = time.time() + budget
+        breaker = self.breaker(provider)
+        best = None
+
+        for attempt in range(max_retries):
+            if breaker.is_open():
+                if attempt == 0:
+                    raise CircuitOpenError(f"{provider} circuit is open, failing fast")
+                self.logger.warning(f"{provider} circuit opened, giving up after {attempt} attempts")
+                break
+
+            try:
+                result = fn()
+                if accept(result):
+                    return result
+                if result is not None:
+                    best = result
+                self.logger.warning(f"{provider} attempt {attempt + 1}/{max_retries} returned unusable data")
+            except CircuitOpenError:
+                if attempt == 0:
+                    raise
+                break
+            except NonRetryableError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"{provider} attempt {attempt + 1}/{max_retries} failed: {e}")
+
+            if attempt == max_retries - 1:
+                break
+
+            delay = backoff_delay(attempt, base_delay)
+            if time.time() + delay > deadline:
+                if background_key is not None:
+                    self._retry_in_background(provider, fn, max_retries - attempt - 1, base_delay,
+                                              accept, background_key, attempt + 1)
+                break
+            time.sleep(delay)
+
+        return best
+
+    def _retry_in_background(self, provider, fn, attempts, base_delay, accept, key, first_attempt):
+        """Continue the remaining attempts of a retry_call off the request thread"""
+        with self._guard:
+            if (provider, key) in self._background_keys:
+                return
+            self._background_keys.add((provider, key))
+            if self._background is None:
+                self._background = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=BACKGROUND_RETRY_WORKERS, thread_name_prefix='provider-retry'
+                )
+        self.logger.info(f"Handing {attempts} remaining {provider} attempts for {key} to the background")
+
+        def run():
+            try:
+                for attempt in range(first_attempt, first_attempt + attempts):
+                    time.sleep(backoff_delay(attempt - 1, base_delay))
+                    if self.breaker(provider).is_open():
+                        return
+                    try:
+                        if accept(fn()):
+                            self.logger.info(f"Background retry of {key} succeeded")
+                            return
+                    except NonRetryableError:
+                        return
+                    except Exception as e:
+                        self.logger.warning(f"Background {provider} attempt for {key} failed: {e}")
+            finally:
+                with self._guard:
+                    self._background_keys.discard((provider, key))
+
+        self._background.submit(run)
+
+    def record_latency(self, provider, seconds):
+        """Remember how long a successful fetch from a provider took"""
+        with self._guard:
+            samples = self._latencies.setdefault(provider, deque(maxlen=LATENCY_WINDOW))
+            samples.append(seconds)
+
+    def latency_percentile(self, provider, percentile):
+        """
+        Get a percentile of a provider's recent fetch latencies
+
+        Returns:
+            Seconds, or None while fewer than LATENCY_MIN_SAMPLES are known
+        """
+        with self._guard:
+            samples = sorted(self._latencies.get(provider, ()))
+        if len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        rank = min(len(samples) - 1, max(0, int(round(percentile / 100 * len(samples))) - 1))
+        return samples[rank]
+
+    def hedge_delay(self, provider, percentile=None):
+        """Seconds to wait for a provider before hedging it with another one"""
+        latency = self.latency_percentile(provider, HEDGE_PERCENTILE if percentile is None else percentile)
+        if latency is None:
+            return HEDGE_DEFAULT_DELAY
+        return max(latency, HEDGE_MIN_DELAY)
+
+    def _hedge_pool(self, provider):
+        """Get the worker pool of a provider's hedged fetches, creating it on first use"""
+        with self._guard:
+            if provider not in self._hedge_pools:
+                self._hedge_pools[provider] = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=HEDGE_WORKERS, thread_name_prefix=f'provider-hedge-{provider}'
+                )
+            return self._hedge_pools[provider]
+
+    def hedged_call(self, primary, primary_fn, secondary, secondary_fn, accept=None, percentile=None,
+                    timeout=None):
+        """
+        Call the primary provider, hedged by the secondary once it is slow
+
+        The primary fetch starts right away. When it has not returned an
+        accepted result within ``hedge_delay`` (a percentile of its recent
+        latencies), or fails before that, the secondary fetch starts as
+        well and the first accepted result wins. The other fetch keeps
+        running in the background (so its bars still reach the caches) and
+        only feeds the latency statistics. The secondary is not hedged in
+        when its circuit is open. Each provider's fetches run on that
+        provider's own workers, and the call gives up on both once
+        ``timeout`` has passed.
+
+        Args:
+            primary: Name of the primary provider
+            primary_fn: Callable fetching from the primary provider
+            secondary: Name of the secondary provider
+            secondary_fn: Callable fetching from the secondary provider
+            accept: Predicate deciding whether a result is good enough
+                (defaults to "not None")
+            percentile: Latency percentile of the hedge delay (defaults to HEDGE_PERCENTILE)
+            timeout: Seconds to wait for any result (defaults to HEDGE_TIMEOUT_SECONDS)
+
+        Returns:
+            Tuple of (result, info). The result is the first accepted one,
+            else the primary's non-None result, else the secondary's, else
+            None. info describes the call: primary, winner, hedged,
+            hedge_delay_seconds, latency_seconds, latency_gain_seconds
+            (how much sooner the result came than waiting for the primary;
+            estimated from its latency tail while it is still running) and
+            timed_out.
+        """
+        accept = accept or (lambda result: result is not None)
+        delay = self.hedge_delay(primary, percentile)
+        timeout = HEDGE_TIMEOUT_SECONDS if timeout is None else timeout
+        with self._guard:
+            self._hedge_counters['calls'] += 1
+        started = time.time()
+        info = {'primary': primary, 'winner': None, 'hedged': False, 'hedge_delay_seconds': round(delay, 3),
+                'timed_out': False}
+
+        def timed(provider, fn):
+            def run():
+                result = fn()
+                if accept(result):
+                    self.record_latency(provider, time.time() - started)
+                return result
+            return run
+
+        futures = {self._hedge_pool(primary).submit(timed(primary, primary_fn)): primary}
+        outcomes = {}
+        deadline = started + delay
+        give_up = started + timeout
+        decided = False
+        while futures:
+            remaining = give_up - time.time()
+            if remaining <= 0:
+                info['timed_out'] = True
+                self.logger.warning(f"Hedged {primary}/{secondary} fetch gave up after {timeout:.1f}s")
+                break
+            wait = remaining if decided else min(remaining, max(0.0, deadline - time.time()))
+            done, _ = concurrent.futures.wait(futures, timeout=wait,
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                provider = futures.pop(future)
+                try:
+                    outcomes[provider] = future.result()
+                except Exception as e:
+                    self.logger.warning(f"Hedged {provider} fetch failed: {e}")
+                    outcomes[provider] = None
+                if accept(outcomes[provider]):
+                    info['winner'] = provider
+                    break
+            if info['winner'] is not None:
+                break
+
+            if not decided and (not futures or time.time() >= deadline):
+                decided = True
+                if self.breaker(secondary).is_open():
+                    # Nothing to hedge with, wait for the primary alone
+                    continue
+                info['hedged'] = True
+                with self._guard:
+                    self._hedge_counters['hedged'] += 1
+                self.logger.info(f"{primary} has not answered in {delay:.2f}s, hedging with {secondary}")
+                futures[self._hedge_pool(secondary).submit(timed(secondary, secondary_fn))] = secondary
+
+        latency = time.time() - started
+        info['latency_seconds'] = round(latency, 3)
+        info['latency_gain_seconds'] = 0.0
+        if info['winner'] == secondary:
+            pending = [future for future, provider in futures.items() if provider == primary]
+            with self._guard:
+                self._hedge_counters['secondary_wins'] += 1
+            if pending:
+                # The primary is still running: estimate from its latency tail
+                # now, count the real gain once it finishes
+                tail = self.latency_percentile(primary, 99)
+                info['latency_gain_seconds'] = round(max(0.0, (tail or latency) - latency), 3)
+                info['latency_gain_estimated'] = True
+                pending[0].add_done_callback(lambda _: self._record_gain(time.time() - started - latency))
+            else:
+                self._record_gain(0.0)
+
+        if info['winner'] is not None:
+            return outcomes[info['winner']], info
+        for provider in (primary, secondary):
+            if outcomes.get(provider) is not None:
+                return outcomes[provider], info
+        return None, info
+
+    def _record_gain(self, seconds):
+        """Add the time a hedge saved to the hedging counters"""
+        with self._guard:
+            self._hedge_counters['gain_seconds'] += max(0.0, seconds)
+
+    def get_hedge_stats(self):
+        """Get hedging counters and the latency percentiles of every provider"""
+        with self._guard:
+            stats = dict(self._hedge_counters)
+            providers = list(self._latencies)
+        stats['gain_seconds'] = round(stats['gain_seconds'], 3)
+        stats['latency'] = {
+            provider: {
+                'p50': self.latency_percentile(provider, 50),
+                'p95': self.latency_percentile(provider, 95),
+                'hedge_delay': self.hedge_delay(provider)
+            }
+            for provider in providers
+        }
+        return stats
+
+    def get_stats(self):
+        """Get the limit, active requests, wait time, background retries and circuit state per provider"""
+        with self._guard:
+            providers = set(self._semaphores) | set(self._breakers)
+            stats = {
+                provider: {
+                    'limit': max(1, self.limits.get(provider, DEFAULT_PROVIDER_CONCURRENCY)),
+                    'active': self._active.get(provider, 0),
+                    'total_wait_seconds': round(self._waited.get(provider, 0.0), 3)
+                }
+                for provider in providers
+            }
+            for provider in providers:
+                stats[provider]['background_retries'] = sum(
+                    1 for pending, _ in self._background_keys if pending == provider
+                )
+            breakers = dict(self._breakers)
+        for provider, breaker in breakers.items():
+            stats[provider]['circuit'] = breaker.get_stats()
+        return stats
+
+
+# Global limiter instance
+_provider_limiter = None
+
+def get_provider_limiter():
+    """Get or create global provider limiter instance"""
+    global _provider_limiter
+    if _provider_limiter is None:
+        _provider_limiter = ProviderLimiter()
+    return _provider_limiter
+
+def provider_slot(provider):
+    """Convenience wrapper for ProviderLimiter.slot on the global limiter"""
+    return get_provider_limiter().slot(provider)
+
+def provider_call(provider):
+    """Convenience wrapper for ProviderLimiter.call on the global limiter"""
+    return get_provider_limiter().call(provider)
+
+def retry_call(provider, fn, **kwargs):
+    """Convenience wrapper for ProviderLimiter.retry_call on the global limiter"""
+    return get_provider_limiter().retry_call(provider, fn, **kwargs)
+
+def hedged_call(primary, primary_fn, secondary, secondary_fn, **kwargs):
+    """Convenience wrapper for ProviderLimiter.hedged_call on the global limiter"""
+    return get_provider_limiter().hedged_call(primary, primary_fn, secondary, secondary_fn, **kwargs)
@@ -0,0 +1,596 @@
+"""
+Record/Replay Data Provider
+===========================
+
+Offline stand-in for yfinance, for benchmarks and load tests.
+
+The provider mimics the part of the yfinance module the API uses
+(``Ticker(symbol).history(...)``, ``Ticker(symbol).info`` and ``download``)
+and is swapped in for it when REPLAY_MODE is set:
+
+- ``record``: requests go to the real yfinance and every answer is merged
+  into the fixture directory
+- ``replay``: requests are answered from the fixtures only; symbols without
+  one come back empty, like an unknown symbol from yfinance
+- ``synthetic``: like replay, but symbols without a fixture get a generated
+  series (see generate_series)
+
+Fixtures use the bar store layout (one ``.npz`` + ``.json`` per symbol and
+interval under ``<REPLAY_FIXTURE_DIR>/replay/``), so they can be recorded
+once, copied around and grown by ``python replay_provider.py generate``.
+Replayed series are moved forward by whole weeks so that their last bar
+lies in the current week, keeping weekdays and session times intact and
+the API's freshness logic meaningful for old recordings.
+
+Replayed requests sleep for a lognormal synthetic latency and fail with a
+ConnectionError at the configured rate; both draw from one seeded random
+generator so runs are reproducible.
+
+Configuration:
+
+    REPLAY_MODE               off, record, replay or synthetic (default off)
+    REPLAY_FIXTURE_DIR        Fixture directory (default ./.replay_fixtures)
+    REPLAY_LATENCY_MS         Mean injected latency per request (default 0)
+    REPLAY_LATENCY_JITTER_MS  Standard deviation of the latency (default 0)
+    REPLAY_FAILURE_RATE       Share of requests failing with ConnectionError (default 0)
+    REPLAY_SEED               Seed of latency, failures and generated series (default 42)
+    REPLAY_SYNTHETIC_DAYS     Calendar days of history generated per series (default 730)
+
+Replayed bars and metadata flow into the API's own caches as usual; point
+BAR_STORE_DIR and METADATA_CACHE_PATH somewhere else for replay runs so
+they do not mix with real data.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore, slice_period, slice_range, to_utc
+
+logger = logging.getLogger(__name__)
+
+REPLAY_MODE = os.getenv('REPLAY_MODE', 'off').lower()
+if REPLAY_MODE == 'off':
+    REPLAY_MODE = None
+REPLAY_FIXTURE_DIR = os.getenv(
+    'REPLAY_FIXTURE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.replay_fixtures')
+)
+REPLAY_LATENCY_MS = float(os.getenv('REPLAY_LATENCY_MS', '0'))
+REPLAY_LATENCY_JITTER_MS = float(os.getenv('REPLAY_LATENCY_JITTER_MS', '0'))
+REPLAY_FAILURE_RATE = float(os.getenv('REPLAY_FAILURE_RATE', '0'))
+REPLAY_SEED = int(os.getenv('REPLAY_SEED', '42'))
+REPLAY_SYNTHETIC_DAYS = int(os.getenv('REPLAY_SYNTHETIC_DAYS', '730'))
+
+REPLAY_MODES = ('record', 'replay', 'synthetic')
+
+# Bar length of every interval the generator understands
+INTERVAL_MINUTES = {
+    '1m': 1, '2m': 2, '5m': 5, '15m': 15, '30m': 30,
+    '60m': 60, '1h': 60, '90m': 90, '1d': 1440, '1wk': 10080, '1mo': 43200
+}
+
+# US regular session the generated stock bars fall into
+SESSION_TZ = 'America/New_York'
+SESSION_OPEN_MINUTES = 9 * 60 + 30
+SESSION_CLOSE_MINUTES = 16 * 60
+
+# Annualised volatility and typical daily volume of generated series
+ANNUAL_VOLATILITY = {'stock': 0.30, 'crypto': 0.70, 'forex': 0.08}
+DAILY_VOLUME = {'stock': 5e6, 'crypto': 2e4, 'forex': 0.0}
+
+
+def get_asset_type(symbol):
+    """Classify a yfinance symbol as 'stock', 'crypto' or 'forex'"""
+    symbol = symbol.upper()
+    if symbol.endswith('=X'):
+        return 'forex'
+    if symbol.endswith('-USD') or symbol.endswith('-USDT'):
+        return 'crypto'
+    return 'stock'
+
+
+def symbol_seed(symbol, interval, seed=None):
+    """Stable per-series seed (Python's hash() differs between processes)"""
+    base = REPLAY_SEED if seed is None else seed
+    return (zlib.crc32(f"{symbol.upper()}|{interval}".encode()) ^ base) & 0xFFFFFFFF
+
+
+def build_index(symbol, interval, start, end):
+    """
+    Bar timestamps of a symbol between two times, as yfinance labels them
+
+    Stock intraday bars start at the open and stop before the close of every
+    weekday, daily bars sit at New York midnight; crypto trades around the
+    clock and forex on weekdays, both in UTC.
+    """
+    asset_type = get_asset_type(symbol)
+    minutes = INTERVAL_MINUTES[interval]
+    start, end = to_utc(start), to_utc(end)
+
+    if minutes >= 1440:
+        tz = SESSION_TZ if asset_type == 'stock' else 'UTC'
+        days = pd.date_range(start.tz_convert(tz).normalize(), end.tz_convert(tz), freq='D')
+        if asset_type != 'crypto':
+            days = days[days.weekday < 5]
+        if interval == '1wk':
+            days = days[days.weekday == 0]
+        elif interval == '1mo':
+            days = days[days.day == 1]
+        return days
+
+    if asset_type == 'stock':
+        local_start = start.tz_convert(SESSION_TZ)
+        local_end = end.tz_convert(SESSION_TZ)
+        days = pd.date_range(local_start.tz_localize(None).normalize(),
+                             local_end.tz_localize(None).normalize(), freq='D')
+        days = days[days.weekday < 5]
+        offsets = pd.to_timedelta(np.arange(SESSION_OPEN_MINUTES, SESSION_CLOSE_MINUTES, minutes), unit='min')
+        # Session times are wall-clock times, localised once they are laid out
+        stamps = (days.values[:, None] + offsets.values[None, :]).ravel()
+        index = pd.DatetimeIndex(stamps).tz_localize(SESSION_TZ, ambiguous='NaT', nonexistent='NaT')
+        index = index[index.notna()]
+        return index[(index >= local_start) & (index <= local_end)]
+
+    index = pd.date_range(start.floor(f"{minutes}min"), end, freq=f"{minutes}min")
+    if asset_type == 'forex':
+        index = index[index.weekday < 5]
+    return index
+
+
+def generate_series(symbol, interval='1d', start=None, end=None, seed=None, base_price=None):
+    """
+    Generate a realistic OHLCV series for one symbol
+
+    Prices follow a geometric random walk whose volatility scales with the
+    bar length and is higher at the open and close; the first bar of each
+    session gaps from the previous close. Volume follows the intraday
+    U-shape with lognormal noise. The series depends only on the symbol,
+    interval, seed and the requested span.
+
+    Args:
+        symbol: yfinance symbol (its suffix decides the asset type)
+        interval: Bar interval (see INTERVAL_MINUTES)
+        start: First timestamp (defaults to REPLAY_SYNTHETIC_DAYS before end)
+        end: Last timestamp (defaults to now)
+        seed: Seed mixed into the per-symbol seed (defaults to REPLAY_SEED)
+        base_price: Price of the first bar (defaults to a per-symbol price)
+
+    Returns:
+        DataFrame with Open, High, Low, Close, Volume, Dividends and Stock Splits
+    """
+    if interval not in INTERVAL_MINUTES:
+        raise ValueError(f"Cannot generate {interval} bars, supported: {sorted(INTERVAL_MINUTES)}")
+    end = pd.Timestamp.now(tz='UTC') if end is None else to_utc(end)
+    start = end - pd.Timedelta(days=REPLAY_SYNTHETIC_DAYS) if start is None else to_utc(start)
+
+    index = build_index(symbol, interval, start, end)
+    n = len(index)
+    columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+    if n == 0:
+        return pd.DataFrame(columns=columns, index=index, dtype=float)
+
+    asset_type = get_asset_type(symbol)
+    rng = np.random.default_rng(symbol_seed(symbol, interval, seed))
+    if base_price is None:
+        base_price = float(np.exp(rng.uniform(np.log(5), np.log(500))))
+        if asset_type == 'forex':
+            base_price = float(rng.uniform(0.5, 2.0))
+
+    # Per-bar volatility from the annual one, by the share of a trading year a bar covers
+    minutes = INTERVAL_MINUTES[interval]
+    session_minutes = 1440 if asset_type != 'stock' else SESSION_CLOSE_MINUTES - SESSION_OPEN_MINUTES
+    bars_per_year = 365 if asset_type == 'crypto' else 252
+    sigma = ANNUAL_VOLATILITY[asset_type] / math.sqrt(bars_per_year * max(session_minutes / minutes, 1 / 30))
+    if minutes >= 1440:
+        sigma = ANNUAL_VOLATILITY[asset_type] * math.sqrt(minutes / 1440 / bars_per_year)
+
+    # Intraday U-shape: busier and more volatile near the open and the close
+    if minutes < 1440:
+        local = index.tz_convert(SESSION_TZ) if asset_type == 'stock' else index
+        minute_of_day = local.hour * 60 + local.minute
+        if asset_type == 'stock':
+            position = (minute_of_day - SESSION_OPEN_MINUTES) / session_minutes
+        else:
+            position = minute_of_day / 1440
+        shape = 1 + 1.5 * (2 * np.asarray(position, dtype=float) - 1) ** 2
+        session_day = np.asarray(local.normalize().asi8)
+        new_session = np.r_[True, session_day[1:] != session_day[:-1]]
+    else:
+        shape = np.ones(n)
+        new_session = np.ones(n, dtype=bool)
+
+    drift = rng.normal(0.0, 0.1) / bars_per_year * min(minutes / 1440, 30)
+    returns = rng.standard_t(5, n) * sigma * np.sqrt(shape / shape.mean()) * math.sqrt(3 / 5) + drift
+    gaps = np.where(new_session & (minutes < 1440), rng.normal(0, sigma * 2, n), rng.normal(0, sigma * 0.1, n))
+    close = base_price * np.exp(np.cumsum(returns + gaps))
+    previous_close = np.r_[base_price, close[:-1]]
+    open_ = previous_close * np.exp(gaps)
+    wick = np.abs(rng.normal(0, sigma * 0.6, (2, n)))
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+
+    volume = np.zeros(n)
+    if DAILY_VOLUME[asset_type]:
+        bars_per_day = max(session_minutes / minutes, 1 / 30) if minutes < 1440 else 1440 / minutes
+        volume = DAILY_VOLUME[asset_type] / bars_per_day * shape * rng.lognormal(0, 0.4, n)
+        volume = np.round(volume * np.exp(rng.normal(0, 0.5)))
+
+    decimals = 4 if asset_type == 'forex' or base_price < 1 else 2
+    return pd.DataFrame({
+        'Open': np.round(open_, decimals),
+        'High': np.round(high, decimals),
+        'Low': np.round(low, decimals),
+        'Close': np.round(close, decimals),
+        'Volume': volume,
+        'Dividends': np.zeros(n),
+        'Stock Splits': np.zeros(n)
+    }, index=index.rename('Datetime' if minutes < 1440 else 'Date'))
+
+
+def generate_universe(count=1000, intervals=('1d', '1h'), days=None, fixture_dir=None, prefix='SYN', seed=None):
+    """
+    Write generated fixtures for a universe of symbols
+
+    Args:
+        count: Number of symbols, named PREFIX0000, PREFIX0001, ...
+        intervals: Intervals to generate for every symbol
+        days: Calendar days of history (defaults to REPLAY_SYNTHETIC_DAYS)
+        fixture_dir: Fixture directory (defaults to REPLAY_FIXTURE_DIR)
+        prefix: Symbol prefix
+        seed: Seed of the generated series (defaults to REPLAY_SEED)
+
+    Returns:
+        List of the generated symbols
+    """
+    store = BarStore(root_dir=fixture_dir or REPLAY_FIXTURE_DIR)
+    end = pd.Timestamp.now(tz='UTC')
+    start = end - pd.Timedelta(days=REPLAY_SYNTHETIC_DAYS if days is None else days)
+    width = max(4, len(str(count - 1)))
+    symbols = [f"{prefix}{i:0{width}d}" for i in range(count)]
+    for symbol in symbols:
+        for interval in intervals:
+            df = generate_series(symbol, interval, start, end, seed=seed)
+            store.save('replay', symbol, interval, df, None)
+    logger.info(f"Generated {len(intervals)} intervals for {count} symbols in {store.root_dir}")
+    return symbols
+
+
+class ReplayProvider:
+    """
+    yfinance-compatible provider recording, replaying or generating bars
+    """
+
+    def __init__(self, mode=None, fixture_dir=None, latency_ms=None, latency_jitter_ms=None,
+                 failure_rate=None, seed=None, upstream=None):
+        """
+        Initialize the provider
+
+        Args:
+            mode: 'record', 'replay' or 'synthetic' (defaults to REPLAY_MODE, else 'synthetic')
+            fixture_dir: Fixture directory (defaults to REPLAY_FIXTURE_DIR)
+            latency_ms: Mean injected latency per request in milliseconds
+            latency_jitter_ms: Standard deviation of the injected latency
+            failure_rate: Share of requests failing with ConnectionError
+            seed: Seed of the latency and failure draws and of generated series
+            upstream: Module or object answering record-mode requests like
+                yfinance does (defaults to the yfinance module)
+        """
+        self.mode = (mode or REPLAY_MODE or 'synthetic').lower()
+        if self.mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode {self.mode}, must be one of {REPLAY_MODES}")
+        self.fixture_dir = fixture_dir or REPLAY_FIXTURE_DIR
+        self.latency_ms = REPLAY_LATENCY_MS if latency_ms is None else latency_ms
+        self.latency_jitter_ms = REPLAY_LATENCY_JITTER_MS if latency_jitter_ms is None else latency_jitter_ms
+        self.failure_rate = REPLAY_FAILURE_RATE if failure_rate is None else failure_rate
+        self.seed = REPLAY_SEED if seed is None else seed
+        self.upstream = upstream
+        self.store = BarStore(root_dir=self.fixture_dir, refresh_seconds=0)
+        self.logger = logging.getLogger(__name__)
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._generated = {}
+        self._metadata = None
+        self._counters = {'requests': 0, 'fixture_hits': 0, 'generated': 0, 'recorded': 0,
+                          'empty': 0, 'injected_failures': 0, 'injected_latency_seconds': 0.0}
+
+    # yfinance module interface
+
+    def Ticker(self, symbol):
+        """Counterpart of yfinance.Ticker"""
+        return ReplayTicker(self, symbol)
+
+    def download(self, tickers, interval='1d', period=None, start=None, end=None, group_by='ticker', **kwargs):
+        """
+        Counterpart of yfinance.download, grouped by ticker
+
+        One call is one request: latency and failures are injected once.
+
+        Returns:
+            DataFrame with (ticker, field) columns; symbols without bars are left out
+        """
+        if isinstance(tickers, str):
+            tickers = tickers.replace(',', ' ').split()
+        if self.mode == 'record':
+            raw = self._get_upstream().download(tickers=tickers, interval=interval, period=period, start=start,
+                                                end=end, group_by='ticker', **kwargs)
+            self._record_download(raw, tickers, interval, period, start)
+            return raw
+
+        self._inject(f"download of {len(tickers)} symbols")
+        frames = {}
+        for symbol in tickers:
+            df = self._load(symbol, interval, period, start, end)
+            if not df.empty:
+                frames[symbol] = df
+        if not frames:
+            return pd.DataFrame()
+        raw = pd.concat(frames, axis=1, sort=True)
+        return raw if group_by == 'ticker' else raw.swaplevel(axis=1).sort_index(axis=1)
+
+    # Core
+
+    def history(self, symbol, interval='1d', period=None, start=None, end=None):
+        """
+        Bars of one symbol, like yfinance.Ticker(symbol).history
+
+        Args:
+            symbol: yfinance symbol
+            interval: Bar interval
+            period: Period ending now (used when start is None, default '1mo')
+            start: First timestamp
+            end: Last timestamp (None for now)
+
+        Returns:
+            DataFrame of bars, empty when there are none
+
+        Raises:
+            ConnectionError: For an injected failure
+        """
+        if self.mode == 'record':
+            df = _history_call(self._get_upstream().Ticker(symbol), interval, period, start, end)
+            if df is not None and not df.empty:
+                self.store.update('replay', symbol, interval, df,
+                                  period=period if start is None else None, start=start)
+                self._count('recorded')
+            return df
+
+        self._inject(symbol)
+        return self._load(symbol, interval, period, start, end)
+
+    def metadata(self, symbol):
+        """
+        Company metadata of a symbol, in the metadata cache's format
+
+        Recorded metadata when there is some, else the symbol as the name
+        """
+        info = self.info(symbol)
+        return {
+            'company_name': info.get('longName') or info.get('shortName') or symbol,
+            'industry': info.get('industry') or None,
+            'sector': info.get('sector') or None
+        }
+
+    def info(self, symbol):
+        """Counterpart of yfinance.Ticker(symbol).info"""
+        metadata = self._load_metadata()
+        if self.mode == 'record':
+            info = self._get_upstream().Ticker(symbol).info or {}
+            recorded = {key: info.get(key) for key in ('longName', 'shortName', 'industry', 'sector')}
+            with self._lock:
+                metadata[symbol.upper()] = recorded
+                self._save_metadata(metadata)
+            return info
+        with self._lock:
+            return dict(metadata.get(symbol.upper(), {}))
+
+    def _load(self, symbol, interval, period=None, start=None, end=None):
+        """Serve bars from the fixture, or a generated series in synthetic mode"""
+        with self._lock:
+            self._counters['requests'] += 1
+        df = self._series(symbol, interval)
+        if df is None or df.empty:
+            self._count('empty')
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        if start is not None:
+            df = slice_range(df, start, end)
+        else:
+            df = slice_period(df, period or '1mo')
+        return df.copy()
+
+    def _series(self, symbol, interval):
+        """Full series of a symbol, shifted to end in the current week"""
+        df, meta = self.store.load('replay', symbol, interval)
+        if meta is not None:
+            self._count('fixture_hits')
+            return shift_to_now(df)
+        if self.mode != 'synthetic' or interval not in INTERVAL_MINUTES:
+            return None
+
+        key = (symbol.upper(), interval)
+        today = pd.Timestamp.now(tz='UTC').normalize()
+        with self._lock:
+            cached = self._generated.get(key)
+        if cached is not None and cached[0] == today:
+            return cached[1]
+        # Generated up to the end of today, then cut at now, so a day's series is stable
+        df = generate_series(symbol, interval, end=today + pd.Timedelta(days=1), seed=self.seed)
+        df = df[df.index <= _align_now(df.index)]
+        self._count('generated')
+        with self._lock:
+            self._generated[key] = (today, df)
+        return df
+
+    def _inject(self, what):
+        """Sleep for the synthetic latency and fail at the configured rate"""
+        with self._lock:
+            delay = 0.0
+            if self.latency_ms > 0:
+                if self.latency_jitter_ms > 0:
+                    # Lognormal with the configured mean and standard deviation
+                    variance = math.log(1 + (self.latency_jitter_ms / self.latency_ms) ** 2)
+                    delay = self._random.lognormvariate(math.log(self.latency_ms) - variance / 2, math.sqrt(variance))
+                else:
+                    delay = self.latency_ms
+            fail = self.failure_rate > 0 and self._random.random() < self.failure_rate
+            self._counters['injected_latency_seconds'] += delay / 1000
+            if fail:
+                self._counters['injected_failures'] += 1
+        if delay:
+            time.sleep(delay / 1000)
+        if fail:
+            raise ConnectionError(f"Injected replay failure for {what}")
+
+    def _record_download(self, raw, tickers, interval, period, start):
+        """Merge a grouped upstream download into the fixtures"""
+        if raw is None or raw.empty:
+            return
+        for symbol in tickers:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if symbol not in raw.columns.get_level_values(0):
+                    continue
+                df = raw[symbol].dropna(how='all')
+            elif len(tickers) == 1:
+                df = raw.dropna(how='all')
+            else:
+                continue
+            if not df.empty:
+                self.store.update('replay', symbol, interval, df, period=period if start is None else None, start=start)
+                self._count('recorded')
+
+    def _get_upstream(self):
+        """The real provider record mode forwards to"""
+        if self.upstream is None:
+            import yfinance
+            self.upstream = yfinance
+        return self.upstream
+
+    def _metadata_path(self):
+        return os.path.join(self.fixture_dir, 'metadata.json')
+
+    def _load_metadata(self):
+        """Recorded metadata of every symbol, read once"""
+        with self._lock:
+            if self._metadata is None:
+                self._metadata = {}
+                path = self._metadata_path()
+                if os.path.exists(path):
+                    try:
+                        with open(path) as f:
+                            self._metadata = json.load(f)
+                    except Exception as e:
+                        self.logger.warning(f"Ignoring unreadable replay metadata {path}: {e}")
+            return self._metadata
+
+    def _save_metadata(self, metadata):
+        """Write recorded metadata atomically (caller holds the lock)"""
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.fixture_dir, suffix='.json.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, self._metadata_path())
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def get_stats(self):
+        """Get the mode, fixture directory and request counters of the provider"""
+        with self._lock:
+            stats = dict(self._counters, mode=self.mode, fixture_dir=self.fixture_dir,
+                         latency_ms=self.latency_ms, failure_rate=self.failure_rate)
+        stats['injected_latency_seconds'] = round(stats['injected_latency_seconds'], 3)
+        return stats
+
+
+class ReplayTicker:
+    """Counterpart of yfinance.Ticker bound to a ReplayProvider"""
+
+    def __init__(self, provider, symbol):
+        self.provider = provider
+        self.ticker = symbol
+
+    def history(self, period=None, interval='1d', start=None, end=None, **kwargs):
+        return self.provider.history(self.ticker, interval, period, start, end)
+
+    @property
+    def info(self):
+        return self.provider.info(self.ticker)
+
+
+def _history_call(stock, interval, period=None, start=None, end=None):
+    """Call a yfinance Ticker.history for either a period or a start/end range"""
+    if start is not None:
+        kwargs = {'start': start, 'interval': interval}
+        if end is not None:
+            kwargs['end'] = end
+        return stock.history(**kwargs)
+    return stock.history(period=period or '1mo', interval=interval)
+
+
+def _align_now(index):
+    """The current time in the timezone of an index"""
+    now = pd.Timestamp.now(tz='UTC')
+    if index.tz is None:
+        return now.tz_convert(None)
+    return now.tz_convert(index.tz)
+
+
+def shift_to_now(df):
+    """
+    Move a recorded series forward by whole weeks so it ends in the current week
+
+    Returns:
+        The shifted DataFrame (the series itself when nothing has to move)
+    """
+    if df.empty:
+        return df
+    weeks = (_align_now(df.index) - df.index[-1]) // pd.Timedelta(weeks=1)
+    if weeks <= 0:
+        return df
+    shifted = df.copy()
+    shifted.index = df.index + pd.Timedelta(weeks=weeks)
+    return shifted
+
+
+# Global replay provider instance
+_replay_provider = None
+
+def get_replay_provider():
+    """Get or create global replay provider instance"""
+    global _replay_provider
+    if _replay_provider is None:
+        _replay_provider = ReplayProvider()
+    return _replay_provider
+
+
+def main():
+    """Command line: generate a synthetic fixture universe"""
+    parser = argparse.ArgumentParser(description='Generate replay fixtures for offline benchmarks')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    generate = subcommands.add_parser('generate', help='Write generated series for many symbols')
+    generate.add_argument('--symbols', type=int, default=1000, help='Number of symbols')
+    generate.add_argument('--intervals', default='1d,1h', help='Comma-separated intervals')
+    generate.add_argument('--days', type=int, default=REPLAY_SYNTHETIC_DAYS, help='Calendar days of history')
+    generate.add_argument('--prefix', default='SYN', help='Symbol prefix')
+    generate.add_argument('--out', default=REPLAY_FIXTURE_DIR, help='Fixture directory')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    started = time.time()
+    symbols = generate_universe(args.symbols, args.intervals.split(','), args.days, args.out, args.prefix)
+    print(f"✅ Generated {len(symbols)} symbols in {time.time() - started:.1f}s into {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Single-Flight Request Coalescing
+================================
+
+Makes concurrent identical calls share one execution.
+
+When several dashboard users open the same watchlist at once, identical
+(ticker, period, interval) requests reach ``fetch_stock_data`` and
+``analyzer_b`` together. The first caller for a key runs the function; every
+caller that arrives with the same key while it is still running waits for
+that result instead of downloading and computing it again.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight execution and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight"""
+        self.logger = logging.getLogger(__name__)
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {'executions': 0, 'coalesced': 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run ``fn`` once for all concurrent callers with the same key
+
+        Exceptions raised by the leading call are re-raised in every caller
+        waiting on it. Once a call finishes the key is released, so later
+        calls run again (caching results is left to the caller).
+
+        Args:
+            key: Hashable key identifying identical work
+            fn: Callable to run
+            *args, **kwargs: Arguments passed to ``fn``
+
+        Returns:
+            Tuple of (result, shared) where shared is True for callers that
+            received the result of another caller's execution
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            self.logger.info(f"Waiting for in-flight call {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self):
+        """Get the keys currently being executed"""
+        with self._lock:
+            return list(self._calls)
+
+    def get_stats(self):
+        """Get execution and coalescing counters"""
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._calls))
+
+
+# Global single-flight instance
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+def get_single_flight():
+    """Get or create global single-flight instance"""
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
@@ -0,0 +1,250 @@
+"""
+Provider Symbol Resolver
+========================
+
+Maps what users type into the grid to the symbol each provider understands.
+
+Providers disagree on symbol formats: EOD wants ``AAPL.US``, ``BTC-USD.CC``
+and ``EURUSD.FOREX``, yfinance wants ``AAPL``, ``BRK-B`` and ``EURUSD=X``.
+Instead of guessing once with string heuristics (and the dashboard retrying
+failed tickers as ``TICKER.US`` in a second request), the resolver keeps an
+ordered list of candidate formats per provider. Fetches try them in order
+and the first one that returns bars is remembered in a JSON file, so later
+requests, batches and restarts go straight to the working symbol.
+
+Configuration:
+
+    SYMBOL_MAP_PATH  JSON file (default <repo>/.symbol_map.json)
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_MAP_PATH = os.getenv(
+    'SYMBOL_MAP_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.symbol_map.json')
+)
+
+FOREX_QUOTES = ('USD', 'EUR', 'GBP')
+SHARE_CLASS = re.compile(r'^([A-Z]+)\.([A-Z])$')
+
+
+def eod_candidates(ticker):
+    """
+    Get the EOD symbol formats worth trying for a user symbol, best guess first
+
+    EOD uses SYMBOL.EXCHANGE:
+    - US stocks: AAPL.US (share classes as BRK-B.US)
+    - Crypto: BTC-USD.CC
+    - Forex: EURUSD.FOREX
+    """
+    ticker = ticker.upper()
+    candidates = []
+    share_class = SHARE_CLASS.match(ticker)
+    if '-USD' in ticker and not ticker.endswith('.CC'):
+        # Crypto currency
+        candidates.append(f"{ticker}.CC")
+    elif '=' in ticker or (len(ticker) == 6 and ticker.endswith(FOREX_QUOTES)):
+        # Forex
+        clean_ticker = ticker.replace('=X', '').replace('=', '')
+        candidates.append(f"{clean_ticker}.FOREX")
+    elif share_class:
+        candidates.append(f"{share_class.group(1)}-{share_class.group(2)}.US")
+    if not any(char in ticker for char in '.-='):
+        # Assume US stock if no exchange specified
+        candidates.append(f"{ticker}.US")
+    # Already in EOD format, or an exchange suffix we do not know about
+    candidates.append(ticker)
+    return list(dict.fromkeys(candidates))
+
+
+def yfinance_candidates(ticker):
+    """Get the yfinance symbol formats worth trying for a user symbol, best guess first"""
+    ticker = ticker.upper()
+    candidates = []
+    if ticker.endswith('.US'):
+        # EOD style US listing
+        ticker = ticker[:-3]
+    elif ticker.endswith('.CC'):
+        ticker = ticker[:-3]
+    elif ticker.endswith('.FOREX'):
+        ticker = f"{ticker[:-6]}=X"
+    share_class = SHARE_CLASS.match(ticker)
+    if share_class:
+        candidates.append(f"{share_class.group(1)}-{share_class.group(2)}")
+    candidates.append(ticker)
+    if len(ticker) == 6 and ticker.isalpha() and ticker.endswith(FOREX_QUOTES):
+        candidates.append(f"{ticker}=X")
+    return list(dict.fromkeys(candidates))
+
+
+CANDIDATE_FUNCTIONS = {
+    'eod': eod_candidates,
+    'yfinance': yfinance_candidates
+}
+
+
+class SymbolResolver:
+    """
+    Persistent user symbol -> provider symbol mapping learned from successful fetches
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize the resolver and load any persisted mappings
+
+        Args:
+            path: JSON file the mappings are persisted to (defaults to SYMBOL_MAP_PATH)
+        """
+        self.path = path or SYMBOL_MAP_PATH
+        self.logger = logging.getLogger(__name__)
+        self._mappings = {}
+        self._lock = threading.RLock()
+        self._counters = {'hits': 0, 'misses': 0, 'learned': 0}
+        self._load()
+
+    def _load(self):
+        """Read persisted mappings from disk"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self._mappings = json.load(f)
+            count = sum(len(mapping) for mapping in self._mappings.values())
+            self.logger.info(f"Loaded {count} symbol mappings from {self.path}")
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable symbol map {self.path}: {e}")
+            self._mappings = {}
+
+    def _save(self):
+        """Write all mappings to disk atomically"""
+        with self._lock:
+            snapshot = json.loads(json.dumps(self._mappings))
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.json.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path)
+
+    def candidates(self, provider, ticker):
+        """
+        Get the provider symbols to try for a user symbol, in order
+
+        The learned symbol comes first, followed by the format heuristics.
+
+        Args:
+            provider: Data provider name ('yfinance', 'eod')
+            ticker: Symbol as typed by the user
+
+        Returns:
+            List of provider symbols
+        """
+        guesses = CANDIDATE_FUNCTIONS.get(provider, lambda t: [t.upper()])(ticker)
+        with self._lock:
+            learned = self._mappings.get(provider, {}).get(ticker.upper())
+            self._counters['hits' if learned else 'misses'] += 1
+        if learned:
+            return list(dict.fromkeys([learned['symbol']] + guesses))
+        return guesses
+
+    def learned(self, provider, ticker):
+        """Get the provider symbol recorded for a user symbol, or None when none was learned yet"""
+        with self._lock:
+            entry = self._mappings.get(provider, {}).get(ticker.upper())
+        return entry['symbol'] if entry else None
+
+    def resolve(self, provider, ticker):
+        """Get the single best provider symbol for a user symbol, without calling the provider"""
+        return self.candidates(provider, ticker)[0]
+
+    def resolve_batch(self, provider, tickers):
+        """
+        Resolve a whole watchlist in one pass
+
+        Args:
+            provider: Data provider name
+            tickers: Iterable of user symbols
+
+        Returns:
+            Dictionary of user symbol -> provider symbol
+        """
+        return {ticker: self.resolve(provider, ticker) for ticker in tickers}
+
+    def record(self, provider, ticker, symbol):
+        """
+        Remember the provider symbol that returned data for a user symbol
+
+        Args:
+            provider: Data provider name
+            ticker: Symbol as typed by the user
+            symbol: Provider symbol that worked
+        """
+        with self._lock:
+            mapping = self._mappings.setdefault(provider, {})
+            current = mapping.get(ticker.upper())
+            if current is not None and current['symbol'] == symbol:
+                return
+            mapping[ticker.upper()] = {'symbol': symbol, 'updated_at': time.time()}
+            self._counters['learned'] += 1
+        self.logger.info(f"Learned {provider} symbol {symbol} for {ticker}")
+        self._save()
+
+    def list_entries(self):
+        """
+        Describe every learned mapping
+
+        Returns:
+            List of dicts with key ('provider/TICKER'), ticker, symbol and age_seconds
+        """
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    'key': f"{provider}/{ticker}",
+                    'ticker': ticker,
+                    'symbol': entry['symbol'],
+                    'age_seconds': round(now - entry.get('updated_at', 0), 1)
+                }
+                for provider, mapping in self._mappings.items()
+                for ticker, entry in mapping.items()
+            ]
+
+    def delete(self, key):
+        """Forget one mapping by its 'provider/TICKER' key, returning True if it was known"""
+        provider, _, ticker = key.partition('/')
+        with self._lock:
+            removed = self._mappings.get(provider, {}).pop(ticker, None) is not None
+        if removed:
+            self._save()
+        return removed
+
+    def get_stats(self):
+        """Get mapping counts and hit/miss counters of the resolver"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return dict(
+                self._counters,
+                name='symbols',
+                entries=sum(len(mapping) for mapping in self._mappings.values()),
+                providers={provider: len(mapping) for provider, mapping in self._mappings.items()},
+                hit_ratio=round(self._counters['hits'] / lookups, 4) if lookups else None
+            )
+
+
+# Global symbol resolver instance
+_symbol_resolver = None
+
+def get_symbol_resolver():
+    """Get or create global symbol resolver instance"""
+    global _symbol_resolver
+    if _symbol_resolver is None:
+        _symbol_resolver = SymbolResolver()
+    return _symbol_resolver
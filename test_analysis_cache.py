@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded analysis cache
+==========================================
+
+Checks byte-budget LRU eviction, TTL expiry and the counters on small
+synthetic frames.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis_cache import AnalysisCache, estimate_size
+
+
+def make_frame(rows=1000, columns=10):
+    """Build a numeric frame of a predictable size"""
+    return pd.DataFrame(np.random.rand(rows, columns), columns=[f"c{i}" for i in range(columns)])
+
+
+def test_byte_budget_evicts_least_recently_used():
+    """Storing past the budget evicts the entry used longest ago"""
+    size = estimate_size(make_frame())
+    cache = AnalysisCache(max_bytes=int(size * 3.5))
+
+    for key in ['AAPL', 'MSFT', 'NVDA']:
+        cache.set(key, make_frame())
+    cache.get('AAPL')  # AAPL becomes most recently used
+    cache.set('AMZN', make_frame())
+
+    assert cache.keys() == ['NVDA', 'AAPL', 'AMZN']
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= stats['max_bytes']
+
+
+def test_entry_limit_and_oversized_values():
+    """The entry limit is enforced and values larger than the budget are refused"""
+    cache = AnalysisCache(max_bytes=estimate_size(make_frame()) * 10, max_entries=2)
+    for key in ['A', 'B', 'C']:
+        cache.set(key, make_frame(rows=10))
+    assert cache.keys() == ['B', 'C']
+
+    assert cache.set('HUGE', make_frame(rows=20000)) is False
+    assert 'HUGE' not in cache
+    assert cache.get_stats()['rejected'] == 1
+
+
+def test_ttl_expiry_and_counters():
+    """Expired entries are dropped on read and counted as misses"""
+    cache = AnalysisCache(default_ttl=0.05)
+    cache.set('SPY', make_frame(rows=10))
+    assert cache.get('SPY') is not None
+    time.sleep(0.06)
+    assert cache.get('SPY') is None
+    assert cache.get('QQQ') is None
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['expirations']) == (1, 2, 1)
+    assert stats['hit_ratio'] == round(1 / 3, 4)
+    assert len(cache) == 0 and stats['bytes'] == 0
+
+
+def test_concurrent_access_keeps_accounting_consistent():
+    """Byte accounting stays exact under concurrent writers"""
+    frame = make_frame(rows=100)
+    cache = AnalysisCache(max_bytes=estimate_size(frame) * 5)
+
+    def writer(offset):
+        for i in range(200):
+            cache.set(f"T{(offset + i) % 12}", frame)
+            cache.get(f"T{i % 12}")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache) <= 5
+    assert cache.get_stats()['bytes'] == len(cache) * estimate_size(frame)
+
+
+def test_stale_grace_window():
+    """Expired entries are served to stale-tolerant readers until the grace ends"""
+    cache = AnalysisCache(default_ttl=0.05, stale_grace=0.1)
+    cache.set('SPY', make_frame(rows=10))
+    time.sleep(0.06)
+
+    assert cache.get('SPY') is None
+    value, stale = cache.get_entry('SPY', allow_stale=True)
+    assert stale and value is not None
+    assert cache.has('SPY', allow_stale=True) and 'SPY' not in cache
+
+    time.sleep(0.1)
+    assert cache.get_entry('SPY', allow_stale=True) is None
+    assert len(cache) == 0
+    assert cache.get_stats()['stale_hits'] == 1
+
+
+if __name__ == "__main__":
+    test_byte_budget_evicts_least_recently_used()
+    test_entry_limit_and_oversized_values()
+    test_ttl_expiry_and_counters()
+    test_concurrent_access_keeps_accounting_consistent()
+    test_stale_grace_window()
+    print("✅ Analysis cache tests passed")
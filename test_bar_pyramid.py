@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-resolution bar pyramid
+================================================
+
+Checks that levels are rebuilt only when the stored base series changes,
+and that flipping through the intervals derived from 1h bars costs one
+base fetch against a stubbed yfinance.
+"""
+
+import numpy as np
+import pandas as pd
+
+import api
+import provider_access
+from bar_pyramid import BarPyramid
+from bar_store import BarStore
+from negative_cache import NegativeCache
+from symbol_resolver import SymbolResolver
+
+
+def make_hourly_bars(days=400):
+    """Hourly bars over the regular session of every weekday up to now"""
+    index = pd.date_range(end=pd.Timestamp.now(tz='UTC').floor('h'), periods=days * 24, freq='h')
+    local = index.tz_convert('America/New_York')
+    index = index[(local.weekday < 5) & (local.hour >= 9) & (local.hour < 16)]
+    close = np.linspace(100, 200, len(index))
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': np.full(len(index), 1000.0)
+    }, index=index)
+
+
+def test_levels_rebuilt_on_new_version():
+    """Levels are built once per base version"""
+    pyramid = BarPyramid(max_series=1)
+    loads = []
+    base = make_hourly_bars(days=10)
+
+    def load_base():
+        loads.append(1)
+        return base
+
+    def build(df):
+        return df.iloc[::2]
+
+    first = pyramid.get_level('yfinance', 'aapl', '1h', '2h', 1.0, load_base, build)
+    again = pyramid.get_level('yfinance', 'AAPL', '1h', '2h', 1.0, load_base, build)
+    assert again is first and len(loads) == 1
+    pyramid.get_level('yfinance', 'AAPL', '1h', '3h', 1.0, load_base, build)
+    assert len(loads) == 1
+
+    pyramid.get_level('yfinance', 'AAPL', '1h', '2h', 2.0, load_base, build)
+    assert len(loads) == 2
+    stats = pyramid.get_stats()
+    assert (stats['hits'], stats['builds'], stats['levels']) == (1, 3, 1)
+
+    # Only one series fits, the least recently used goes
+    pyramid.get_level('yfinance', 'MSFT', '1h', '2h', 1.0, load_base, build)
+    assert [entry['key'] for entry in pyramid.list_entries()] == ['yfinance/1h/MSFT']
+    assert pyramid.delete('yfinance/1h/MSFT') and pyramid.get_stats()['entries'] == 0
+
+
+def test_custom_intervals_use_hourly_base():
+    """4h/8h/12h are fetched as 1h bars instead of being coerced to 1d"""
+    for interval in ['4h', '8h', '12h']:
+        assert api.resolve_fetch_parameters('1mo', interval)['fetch_interval'] == '1h'
+
+
+def test_one_base_fetch_serves_every_interval(tmp_path, monkeypatch):
+    """Flipping through the hourly intervals costs one 1h fetch"""
+    bars = make_hourly_bars()
+    requested = []
+
+    class StubTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, period=None, interval=None, start=None):
+            requested.append((period, interval))
+            return bars.copy()
+
+    pyramid = BarPyramid()
+    monkeypatch.setattr(api.yf, 'Ticker', StubTicker)
+    monkeypatch.setattr(api, 'USE_EOD_API', False)
+    monkeypatch.setattr(api, 'USE_BAR_STORE', True)
+    monkeypatch.setattr(api, 'get_bar_store', lambda: BarStore(root_dir=str(tmp_path), refresh_seconds=3600))
+    monkeypatch.setattr(api, 'get_symbol_resolver', lambda resolver=SymbolResolver(path=str(tmp_path / 'map.json')): resolver)
+    monkeypatch.setattr(api, 'get_bar_pyramid', lambda: pyramid)
+    monkeypatch.setattr(api, 'get_negative_cache', lambda: NegativeCache())
+    monkeypatch.setattr(provider_access, '_provider_limiter', provider_access.ProviderLimiter())
+
+    frames = {}
+    for interval in ['1h', '3h', '4h', '6h', '12h']:
+        frames[interval] = api.fetch_stock_data('PYR', '1mo', interval, retry_delay=0.01)
+        assert frames[interval] is not None and len(frames[interval]) >= 5
+    assert len(requested) == 1 and requested[0][1] == '1h'
+
+    assert frames['4h'].attrs['original_interval'] == '4h'
+    assert (frames['4h'].index.to_series().diff().dropna() >= pd.Timedelta(hours=2)).all()
+    assert len(frames['12h']) < len(frames['3h']) < len(frames['1h'])
+
+    # Served again from memory, without touching the stored base
+    api.fetch_stock_data('PYR', '1mo', '6h', retry_delay=0.01)
+    stats = pyramid.get_stats()
+    assert stats['base_loads'] == 1 and stats['hits'] >= 1
+    assert len(requested) == 1
+
+
+if __name__ == "__main__":
+    test_levels_rebuilt_on_new_version()
+    test_custom_intervals_use_hourly_base()
+    print("✅ Bar pyramid tests passed")
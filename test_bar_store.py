@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent bar store
+========================================
+
+Runs the incremental fetch logic against a fake provider, so it works
+offline and counts exactly which ranges the store asks for.
+"""
+
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore, slice_period
+
+
+def make_bars(start, periods, freq='D', tz='America/New_York'):
+    """Build a simple OHLCV frame"""
+    index = pd.date_range(start=start, periods=periods, freq=freq, tz=tz)
+    close = np.linspace(100, 100 + periods, periods)
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': np.full(periods, 1000.0)
+    }, index=index)
+
+
+class FakeProvider:
+    """Provider stub recording every call the store makes"""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.calls = []
+
+    def __call__(self, period=None, start=None):
+        self.calls.append((period, start))
+        if start is not None:
+            return self.bars[self.bars.index >= start]
+        return slice_period(self.bars, period, now=self.bars.index[-1])
+
+
+def test_tail_only_refresh():
+    """A second request only fetches bars from the last settled stored bar on"""
+    history = make_bars('2024-01-01', 400)
+    now = history.index[-1]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root_dir=root, refresh_seconds=0)
+
+        provider = FakeProvider(history.iloc[:-1])
+        first = store.get_bars('yfinance', 'AAPL', '1d', '1y', provider, now=now)
+        assert provider.calls == [('1y', None)]
+        assert first.index[-1] == history.index[-2]
+
+        # One new bar arrives at the provider
+        provider.bars = history
+        second = store.get_bars('yfinance', 'AAPL', '1d', '1y', provider, now=now)
+        assert len(provider.calls) == 2
+        assert provider.calls[1][0] is None
+        assert provider.calls[1][1] == history.index[-3]
+        assert second.index[-1] == history.index[-1]
+        pd.testing.assert_frame_equal(second, slice_period(history, '1y', now=now), check_freq=False, check_index_type=False)
+
+
+def test_longer_period_triggers_full_fetch():
+    """A period reaching past the stored coverage is fetched in full"""
+    history = make_bars('2020-01-01', 1500)
+    now = history.index[-1]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root_dir=root, refresh_seconds=0)
+        provider = FakeProvider(history)
+
+        store.get_bars('yfinance', 'MSFT', '1d', '6mo', provider, now=now)
+        store.get_bars('yfinance', 'MSFT', '1d', '2y', provider, now=now)
+        assert [call[0] for call in provider.calls] == ['6mo', '2y']
+
+        # The shorter period is now covered and only refreshes the tail
+        short = store.get_bars('yfinance', 'MSFT', '1d', '3mo', provider, now=now)
+        assert provider.calls[-1][0] is None
+        assert short.index[0] >= now - pd.DateOffset(months=3)
+
+
+def test_readjusted_history_is_fetched_in_full():
+    """A tail whose settled bar moved (a split or dividend) replaces the whole series"""
+    history = make_bars('2024-01-01', 400)
+    now = history.index[-1]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root_dir=root, refresh_seconds=0)
+        provider = FakeProvider(history.iloc[:-1])
+        store.get_bars('yfinance', 'AAPL', '1d', '1y', provider, now=now)
+
+        # A 2:1 split: the provider halves every earlier price and adds a bar
+        split = history.copy()
+        split[['Open', 'High', 'Low', 'Close']] /= 2
+        provider.bars = split
+        bars = store.get_bars('yfinance', 'AAPL', '1d', '1y', provider, now=now)
+        assert [call[0] for call in provider.calls] == ['1y', None, '1y']
+        pd.testing.assert_frame_equal(bars, slice_period(split, '1y', now=now), check_freq=False, check_index_type=False)
+
+        # A revised forming last bar alone is not a re-adjustment
+        revised = split.copy()
+        revised.iloc[-1, revised.columns.get_loc('Close')] += 1
+        provider.bars = revised
+        store.get_bars('yfinance', 'AAPL', '1d', '1y', provider, now=now)
+        assert [call[0] for call in provider.calls] == ['1y', None, '1y', None]
+
+
+def test_round_trip_preserves_timezone():
+    """Stored series come back with their original timezone and values"""
+    bars = make_bars('2024-03-01 09:30', 50, freq='h', tz='UTC')
+
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root_dir=root)
+        store.save('eod', 'BTC-USD', '1h', bars, bars.index[0])
+        loaded, meta = store.load('eod', 'BTC-USD', '1h')
+
+        assert meta['rows'] == 50
+        assert str(loaded.index.tz) == 'UTC'
+        pd.testing.assert_frame_equal(loaded, bars, check_freq=False, check_index_type=False)
+
+
+if __name__ == "__main__":
+    test_tail_only_refresh()
+    test_longer_period_triggers_full_fetch()
+    test_readjusted_history_is_fetched_in_full()
+    test_round_trip_preserves_timezone()
+    print("✅ Bar store tests passed")
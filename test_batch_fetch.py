@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched multi-ticker fetch path
+===================================================
+
+Replaces yfinance's grouped download with a stub so the number of provider
+round-trips for a multi-ticker request can be checked offline.
+"""
+
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import api
+import provider_access
+from bar_store import BarStore
+from symbol_resolver import SymbolResolver
+
+
+def make_grouped_download(tickers, periods=300):
+    """Build a frame shaped like yf.download(..., group_by='ticker')"""
+    index = pd.date_range('2024-01-01', periods=periods, freq='D', tz='America/New_York')
+    frames = {}
+    for offset, ticker in enumerate(tickers):
+        close = np.linspace(50, 150, periods) + offset
+        frames[ticker] = pd.DataFrame({
+            'Open': close - 0.5,
+            'High': close + 1,
+            'Low': close - 1,
+            'Close': close,
+            'Volume': np.full(periods, 1000.0)
+        }, index=index)
+    return pd.concat(frames, axis=1)
+
+
+def test_one_download_per_batch(monkeypatch):
+    """Twenty uncached tickers cost one grouped download"""
+    tickers = [f"T{i}" for i in range(20)]
+    calls = []
+
+    def fake_download(**kwargs):
+        calls.append(kwargs)
+        return make_grouped_download(kwargs['tickers'])
+
+    with tempfile.TemporaryDirectory() as root:
+        monkeypatch.setattr(api, 'USE_EOD_API', False)
+        monkeypatch.setattr(api, 'get_bar_store', lambda: BarStore(root_dir=root, refresh_seconds=3600))
+        monkeypatch.setattr(api, 'get_symbol_resolver', lambda resolver=SymbolResolver(path=f"{root}/map.json"): resolver)
+        monkeypatch.setattr(api.yf, 'download', fake_download)
+
+        frames = api.fetch_multi_stock_data(tickers, period='max', interval='1d')
+        assert len(calls) == 1
+        assert sorted(frames) == sorted(tickers)
+        assert frames['T3']['Close'].iloc[-1] == 153
+
+        # Stored bars are fresh, so a second grid load needs no download
+        frames = api.fetch_multi_stock_data(tickers, period='max', interval='1d')
+        assert len(calls) == 1
+        assert len(frames) == 20
+
+
+def test_split_skips_missing_symbols():
+    """Symbols the provider returned nothing for are left out"""
+    raw = make_grouped_download(['AAPL', 'MSFT'])
+    raw.loc[:, 'MSFT'] = np.nan
+
+    frames = api._split_batch_download(raw, ['AAPL', 'MSFT', 'NOPE'])
+    assert list(frames) == ['AAPL']
+    assert list(frames['AAPL'].columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def test_batch_and_single_fetch_share_one_series(monkeypatch):
+    """Grouped downloads and Ticker.history write the same daily bars, without duplicates"""
+    def fake_download(**kwargs):
+        raw = make_grouped_download(kwargs['tickers'], periods=301).iloc[:300]
+        if kwargs.get('ignore_tz') is not False:
+            # yfinance drops the timezone of daily downloads unless told not to
+            raw.index = raw.index.tz_localize(None)
+        return raw
+
+    class FakeTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, start=None, **kwargs):
+            # The last stored bar again plus one new bar, tz-aware like yfinance
+            bars = make_grouped_download([self.symbol], periods=301)[self.symbol]
+            start = pd.Timestamp(start)
+            start = start.tz_localize(bars.index.tz) if start.tzinfo is None else start
+            return bars[bars.index >= start]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root_dir=root, refresh_seconds=0)
+        monkeypatch.setattr(api, 'USE_EOD_API', False)
+        monkeypatch.setattr(api, 'get_bar_store', lambda: store)
+        monkeypatch.setattr(api, 'get_symbol_resolver', lambda resolver=SymbolResolver(path=f"{root}/map.json"): resolver)
+        monkeypatch.setattr(api.yf, 'download', fake_download)
+        monkeypatch.setattr(api.yf, 'Ticker', FakeTicker)
+        monkeypatch.setattr(api, 'apply_company_info', lambda df, ticker: df)
+        monkeypatch.setattr(provider_access, '_provider_limiter', provider_access.ProviderLimiter())
+
+        api.fetch_multi_stock_data(['T0'], period='max', interval='1d')
+        api._fetch_stock_data_yfinance('T0', 'max', '1d', max_retries=1, retry_delay=0)
+
+        stored, _ = store.load('yfinance', 'T0', '1d')
+        assert stored.index.tz is not None
+        assert not stored.index.duplicated().any()
+        assert len(stored) == 301
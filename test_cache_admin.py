@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for force_refresh and the cache administration endpoints
+=====================================================================
+
+Swaps every cache layer for a temporary instance and drives the endpoints
+through the Flask test client.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import api
+from analysis_cache import AnalysisCache
+from bar_store import BarStore
+from metadata_cache import MetadataCache
+
+
+def make_bars(periods=30):
+    """Build a small daily OHLCV frame"""
+    index = pd.date_range('2024-01-01', periods=periods, freq='D', tz='UTC')
+    close = np.linspace(100, 130, periods)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': np.full(periods, 1000.0)}, index=index)
+
+
+@pytest.fixture
+def layers(monkeypatch):
+    """Temporary analysis, bar and metadata layers with a few entries each"""
+    with tempfile.TemporaryDirectory() as root:
+        analysis = AnalysisCache()
+        bars = BarStore(root_dir=os.path.join(root, 'bars'))
+        metadata = MetadataCache(path=os.path.join(root, 'metadata.json'), fetcher=lambda t: {})
+
+        for key in ['AAPL_1y_1d', 'AAPL_1mo_1h', 'MSFT_1y_1d']:
+            analysis.set(key, make_bars())
+        bars.save('yfinance', 'AAPL', '1d', make_bars(), None)
+        bars.save('yfinance', 'MSFT', '1d', make_bars(), None)
+        metadata.set('AAPL', {'company_name': 'Apple Inc.'})
+
+        monkeypatch.setattr(api, 'ticker_cache', analysis)
+        monkeypatch.setattr(api, 'USE_BAR_STORE', True)
+        monkeypatch.setattr(api, 'get_bar_store', lambda: bars)
+        monkeypatch.setattr(api, 'get_metadata_cache', lambda: metadata)
+        yield analysis, bars, metadata
+
+
+def test_stats_cover_every_layer(layers):
+    """Stats report entries, bytes and hit ratio per layer"""
+    stats = api.app.test_client().get('/api/cache/stats').get_json()['layers']
+    assert set(stats) == {'analysis', 'bars', 'metadata', 'negative', 'pyramid', 'streams', 'symbols'}
+    assert stats['analysis']['entries'] == 3
+    assert stats['bars']['entries'] == 2 and stats['bars']['bytes'] > 0
+    assert 'hit_ratio' in stats['metadata']
+
+
+def test_dry_run_lists_without_removing(layers):
+    """A dry run reports the matches of a ticker across layers and keeps them"""
+    analysis, bars, _ = layers
+    response = api.app.test_client().get('/api/cache/invalidate?ticker=aapl&layers=analysis,bars&dry_run=true')
+    report = response.get_json()['layers']
+
+    assert sorted(e['key'] for e in report['analysis']['entries']) == ['AAPL_1mo_1h', 'AAPL_1y_1d']
+    assert [e['key'] for e in report['bars']['entries']] == ['yfinance/1d/AAPL']
+    assert len(analysis) == 3 and len(bars.list_entries()) == 2
+
+
+def test_invalidate_by_key_and_pattern(layers):
+    """Key and pattern invalidation only drop the matching entries"""
+    analysis, bars, _ = layers
+    client = api.app.test_client()
+
+    client.post('/api/cache/invalidate?key=MSFT_1y_1d')
+    assert analysis.keys() == ['AAPL_1y_1d', 'AAPL_1mo_1h']
+
+    client.post('/api/cache/invalidate?pattern=*_1h')
+    assert analysis.keys() == ['AAPL_1y_1d']
+    assert len(bars.list_entries()) == 2  # Bars are only touched when requested
+
+    assert client.get('/api/cache/invalidate').status_code == 400
+    assert client.get('/api/cache/invalidate?key=X&layers=nope').status_code == 400
+
+
+def test_force_refresh_invalidates_analysis(layers, monkeypatch):
+    """force_refresh drops the cached analysis before recomputing"""
+    analysis, _, _ = layers
+    seen = []
+
+    def fake_analyzer(ticker, period, interval, columns=None, use_cache=True):
+        seen.append((f"{ticker}_{period}_{interval}" in analysis, use_cache))
+        return None
+
+    monkeypatch.setattr(api, 'analyzer_b', fake_analyzer)
+
+    api.app.test_client().get('/api/analyzer-b?ticker=AAPL&period=1y&interval=1d&force_refresh=true')
+    # Cached longer periods and stored bars are bypassed as well
+    assert seen == [(False, False)]
+    assert 'MSFT_1y_1d' in analysis
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for bar-close-aware cache expiry
+============================================
+
+Checks the expiry computed for stocks, crypto and forex at fixed points in
+time around the US session.
+"""
+
+import pandas as pd
+
+from timeframe_aggregator import get_aggregator, get_cache_ttl
+
+
+def utc(text):
+    return pd.Timestamp(text, tz='UTC')
+
+
+def test_intraday_bar_close_during_session():
+    """Intraday stock bars close on the 9:30-aligned grid"""
+    aggregator = get_aggregator()
+    # Monday 10:00 New York (EDT)
+    now = utc('2024-03-11 14:00')
+    assert aggregator.get_next_bar_close('1h', 'AAPL', now) == utc('2024-03-11 14:30')
+    assert aggregator.get_next_bar_close('15m', 'AAPL', now) == utc('2024-03-11 14:15')
+    assert aggregator.get_next_bar_close('1d', 'AAPL', now) == utc('2024-03-11 20:00')
+    # The last hourly bar is cut off at the 16:00 close
+    assert aggregator.get_next_bar_close('1h', 'AAPL', utc('2024-03-11 19:45')) == utc('2024-03-11 20:00')
+
+    # 15 minutes to the bar close plus the publish delay
+    assert get_cache_ttl('15m', 'AAPL', utc('2024-03-11 14:01')) == 14 * 60 + 60
+    # Daily and weekly results live until the session close
+    assert get_cache_ttl('1d', 'AAPL', now) == 6 * 3600 + 60
+    assert get_cache_ttl('1wk', 'AAPL', now) == 6 * 3600 + 60
+    # Callers can still cap the lifetime of a forming bar
+    assert get_cache_ttl('1d', 'AAPL', now, max_update_seconds=300) == 300
+
+
+def test_closed_market_lives_until_next_open():
+    """Outside the session stock results are kept until the next open"""
+    # Friday 16:30 New York (EST), after the settle window
+    friday_evening = utc('2024-03-08 21:30')
+    monday_open = utc('2024-03-11 13:30')  # 9:30 EDT after the DST change
+    for interval in ['15m', '1h', '1d', '1wk']:
+        assert get_cache_ttl(interval, 'AAPL', friday_evening) == (monday_open - friday_evening).total_seconds()
+
+    # Inside the settle window the daily bar is refreshed once the closing prints are in
+    assert get_cache_ttl('1d', 'AAPL', utc('2024-03-08 21:05')) == 10 * 60
+
+
+def test_crypto_and_forex_sessions():
+    """Crypto never closes; forex is closed from Friday to Sunday 17:00 New York"""
+    saturday = utc('2024-03-09 15:00')
+    assert get_cache_ttl('1d', 'BTC-USD', saturday) == 9 * 3600 + 60
+    assert get_aggregator().get_next_bar_close('1d', 'BTC-USD', saturday) == utc('2024-03-10 00:00')
+
+    sunday_open = utc('2024-03-10 21:00')  # 17:00 EDT
+    assert get_cache_ttl('1h', 'EURUSD=X', saturday) == (sunday_open - saturday).total_seconds()
+
+
+if __name__ == "__main__":
+    test_intraday_bar_close_during_session()
+    test_closed_market_lives_until_next_open()
+    test_crypto_and_forex_sessions()
+    print("✅ Cache TTL tests passed")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the scheduled cache warmer
+==========================================
+
+Checks the trigger times around the US session and which watchlists a run
+warms, using a recording warm function.
+"""
+
+import pandas as pd
+
+import api
+from cache_warmer import CacheWarmer, parse_intervals, parse_watchlists
+
+
+def utc(text):
+    return pd.Timestamp(text, tz='UTC')
+
+
+class RecordingWarm:
+    """warm_fn stub recording every watchlist it is asked to warm"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, tickers, period, interval):
+        self.calls.append((tuple(tickers), period, interval))
+        return len(tickers)
+
+
+def test_parse_configuration():
+    assert parse_watchlists('aapl, msft;BTC-USD;') == [('AAPL', 'MSFT'), ('BTC-USD',)]
+    assert parse_intervals('1d:1y, 1h:1mo') == [('1d', '1y'), ('1h', '1mo')]
+
+
+def test_schedule_around_the_session():
+    """Pre-open, bar-close and post-close triggers fire at the right times"""
+    warmer = CacheWarmer(RecordingWarm(), watchlists=[('AAPL',)], intervals=[('1d', '1y')],
+                         schedule=['pre_open', 'post_close'], pre_open_minutes=10)
+    # Monday 08:00 New York (EDT): next is the pre-open run at 09:20
+    assert warmer.next_run(utc('2024-03-11 12:00'))[:2] == (utc('2024-03-11 13:20'), 'pre_open')
+    # During the session: the post-close run once the daily bar settled
+    assert warmer.next_run(utc('2024-03-11 15:00'))[:2] == (utc('2024-03-11 20:15'), 'post_close')
+    # Inside the settle window the same day's post-close run is still ahead
+    assert warmer.next_run(utc('2024-03-11 20:05'))[:2] == (utc('2024-03-11 20:15'), 'post_close')
+    # Friday evening: the next run is Monday's pre-open
+    assert warmer.next_run(utc('2024-03-08 22:00'))[:2] == (utc('2024-03-11 13:20'), 'pre_open')
+
+    warmer = CacheWarmer(RecordingWarm(), watchlists=[('AAPL',)], intervals=[('1h', '1mo'), ('1d', '1y')],
+                         schedule=['bar_close'])
+    assert warmer.next_run(utc('2024-03-11 14:00')) == (utc('2024-03-11 14:31'), 'bar_close', '1h')
+
+
+def test_runs_configured_and_observed_watchlists():
+    """A run warms configured watchlists and the grids users loaded"""
+    warm = RecordingWarm()
+    warmer = CacheWarmer(warm, watchlists=[('AAPL', 'MSFT')], intervals=[('1d', '1y')], schedule=[])
+    warmer.record_watchlist(['nvda', 'amd'], '1mo', '1h')
+    warmer.record_watchlist(['AMD', 'NVDA'], '1mo', '1h')
+
+    summary = warmer.run_once('manual')
+    assert sorted(warm.calls) == [(('AAPL', 'MSFT'), '1y', '1d'), (('AMD', 'NVDA'), '1mo', '1h')]
+    assert summary['tickers_warmed'] == 4 and summary['errors'] == 0
+
+    warm.calls.clear()
+    warmer.run_once('bar_close', interval='1h')
+    assert warm.calls == [(('AMD', 'NVDA'), '1mo', '1h')]
+    assert warmer.next_run() is None
+
+
+def test_grid_tickers_are_upper_cased_once(monkeypatch):
+    """A watchlist typed in lower case is analysed, cached and warmed under the same keys"""
+    warmer = CacheWarmer(RecordingWarm(), watchlists=[], intervals=[('1d', '1y')], schedule=[])
+    analysed = []
+
+    def analysis(ticker, period, interval, df=None, columns=None):
+        analysed.append(ticker)
+        return ticker
+
+    monkeypatch.setattr(api, 'cache_warmer', warmer)
+    monkeypatch.setattr(api, 'fetch_multi_stock_data', lambda tickers, period, interval: {})
+    monkeypatch.setattr(api, 'get_cached_analysis', lambda ticker, period, interval, columns=None: None)
+    monkeypatch.setattr(api, 'analyzer_b', analysis)
+    monkeypatch.setattr(api, 'format_analyzer_result', lambda ticker, df, period, interval, fields=None: {'ticker': ticker})
+    monkeypatch.setattr(api.get_metadata_cache(), 'fill_async', lambda tickers: None)
+
+    data = api.app.test_client().get('/api/multi-ticker?tickers=aapl,Msft,AAPL&parallel=false').get_json()
+    assert list(data['results']) == ['AAPL', 'MSFT'] and analysed == ['AAPL', 'MSFT']
+    assert warmer.get_jobs() == [(('AAPL', 'MSFT'), '1y', '1d')]
+
+
+if __name__ == "__main__":
+    test_parse_configuration()
+    test_schedule_around_the_session()
+    test_runs_configured_and_observed_watchlists()
+    print("✅ Cache warmer tests passed")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script for the linear-time divergence engine
+=================================================
+
+Compares api.detect_divergences, api.detect_mf_divergences and
+api.detect_oscillator_divergences with the per-bar pivot scans they
+replaced, on random series with NaN warm-up bars, plateaus and edge pivots,
+and checks the engine stays fast on a long history.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+import api
+
+
+def reference_divergences(osc, price, lookback=5, oversold=None, overbought=None):
+    """The per-bar pivot scan detect_divergences/detect_mf_divergences used to run"""
+    n = len(osc)
+    o, p = osc.tolist(), price.tolist()
+    results = [[0.0] * n for _ in range(4)]
+    bullish, bearish, hidden_bullish, hidden_bearish = results
+    if n < 2 * lookback + 1:
+        return results
+
+    def is_pivot(x, i, low):
+        for k in range(1, lookback + 1):
+            if i - k >= 0 and i + k < n:
+                if low and (x[i] > x[i - k] or x[i] > x[i + k]):
+                    return False
+                if not low and (x[i] < x[i - k] or x[i] < x[i + k]):
+                    return False
+        return True
+
+    def level_ok(i, low):
+        if low:
+            return oversold is None or o[i] < oversold
+        return overbought is None or o[i] > overbought
+
+    for i in range(lookback, n - lookback):
+        for low in (True, False):
+            if not (is_pivot(o, i, low) and is_pivot(p, i, low) and level_ok(i, low)):
+                continue
+            prev = None
+            for j in range(i - lookback, 0, -1):
+                if is_pivot(o, j, low) and is_pivot(p, j, low) and level_ok(j, low) and i - j > lookback:
+                    prev = j
+                    break
+            if prev is None:
+                continue
+            if low:
+                if p[i] < p[prev] and o[i] > o[prev]:
+                    bullish[i] = 1.0
+                if p[i] > p[prev] and o[i] < o[prev]:
+                    hidden_bullish[i] = 1.0
+            else:
+                if p[i] > p[prev] and o[i] < o[prev]:
+                    bearish[i] = 1.0
+                if p[i] < p[prev] and o[i] > o[prev]:
+                    hidden_bearish[i] = 1.0
+    return results
+
+
+def make_series(n, seed, scale=60):
+    """Choppy oscillator and price with NaN warm-up bars and flat plateaus"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2015-01-01', periods=n, freq='h')
+    osc = pd.Series(np.sin(np.arange(n) / 7.0) * scale + rng.normal(0, scale / 4, n), index=index)
+    osc = osc.round(0)
+    osc.iloc[:12] = np.nan
+    swings = np.sin(np.arange(n) / 7.0 + rng.normal(0, 0.3)) * 5
+    price = pd.Series(100 + swings + np.cumsum(rng.normal(0, 0.5, n)), index=index).round(1)
+    df = pd.DataFrame({'Close': price})
+    return df, osc, price
+
+
+def as_series(values, index):
+    return [pd.Series(v, index=index, dtype=np.float64) for v in values]
+
+
+def assert_same(actual, expected):
+    for got, want in zip(actual, expected):
+        pd.testing.assert_series_equal(got, want)
+
+
+def test_wavetrend_divergences_match_reference():
+    """WT2 divergences are identical, including the +/-40 pivot levels"""
+    found = 0
+    for seed in range(6):
+        df, wt2, price = make_series(1200, seed)
+        expected = as_series(reference_divergences(wt2, price, 5, -40, 40), df.index)
+        actual = api.detect_divergences(df, wt2, price, lookback=5)
+        assert_same(actual, expected)
+        found += sum(s.sum() for s in expected)
+    assert found > 0
+
+
+def test_money_flow_divergences_match_reference():
+    """MF divergences compare every pivot, NaN warm-up bars included"""
+    found = 0
+    for seed in range(6):
+        df, mf, price = make_series(1200, seed + 20, scale=10)
+        expected = as_series(reference_divergences(mf, price, 5)[:2], df.index)
+        actual = api.detect_mf_divergences(df, mf, price, lookback=5)
+        assert_same(actual, expected)
+        found += sum(s.sum() for s in expected)
+    assert found > 0
+
+
+def test_any_oscillator_and_short_series():
+    """RSI-style levels and lookbacks work, and short series return zeros"""
+    df, rsi, price = make_series(800, 3, scale=30)
+    rsi = rsi + 50
+    for lookback in (2, 3, 5):
+        expected = as_series(reference_divergences(rsi, price, lookback, 30, 70), df.index)
+        assert_same(api.detect_oscillator_divergences(rsi, price, lookback, 30, 70), expected)
+
+    for n in (0, 1, 10, 11, 12):
+        expected = as_series(reference_divergences(rsi.iloc[:n], price.iloc[:n]), df.index[:n])
+        assert_same(api.detect_oscillator_divergences(rsi.iloc[:n], price.iloc[:n]), expected)
+
+
+def test_earlier_pivots_at_the_start():
+    """Earlier pivots inside the first lookback bars only need the window that fits"""
+    index = pd.date_range('2024-01-01', periods=60, freq='D')
+    # Bar 2 tops bars 0-4 but not the rising bars after them; bar 49 is the next high
+    price = pd.Series([100, 101, 105, 102, 103] + list(np.linspace(104, 150, 45)) + list(np.linspace(149, 140, 10)),
+                      index=index)
+    osc = pd.Series(np.full(60, 20.0), index=index)
+    osc.iloc[2], osc.iloc[49] = 80, 60
+    df = pd.DataFrame({'Close': price})
+    bearish = api.detect_divergences(df, osc, price, lookback=5)[1]
+    assert bearish.iloc[49] == 1 and bearish.sum() == 1
+
+    found = 0
+    for seed in range(300):
+        rng = np.random.default_rng(seed)
+        osc = pd.Series(rng.normal(0, 30, 60) + np.linspace(60, 0, 60), index=index).round(0)
+        price = pd.Series(100 + np.cumsum(rng.normal(0.6, 1, 60)), index=index).round(1)
+        df = pd.DataFrame({'Close': price})
+        expected = as_series(reference_divergences(osc, price, 5, -40, 40), index)
+        assert_same(api.detect_divergences(df, osc, price, lookback=5), expected)
+        expected_mf = as_series(reference_divergences(osc / 6, price, 5)[:2], index)
+        assert_same(api.detect_mf_divergences(df, osc / 6, price, lookback=5), expected_mf)
+        found += sum(s.sum() for s in expected + expected_mf)
+    assert found > 0
+
+
+def test_long_history_is_fast():
+    """Ten years of hourly bars take well under a second"""
+    df, wt2, price = make_series(60000, 7)
+    started = time.perf_counter()
+    api.detect_divergences(df, wt2, price)
+    api.detect_mf_divergences(df, wt2, price)
+    assert time.perf_counter() - started < 1.0
+
+
+if __name__ == "__main__":
+    test_wavetrend_divergences_match_reference()
+    test_money_flow_divergences_match_reference()
+    test_any_oscillator_and_short_series()
+    test_earlier_pivots_at_the_start()
+    test_long_history_is_fast()
+    print("✅ Divergence engine tests passed")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for EOD bulk last-day ingestion
+===========================================
+
+Stores a few daily EOD series, serves the bulk endpoint from a stub session
+and checks that one request per exchange appends the day to every series
+that it continues, and that the ingested series need no tail fetch.
+"""
+
+import numpy as np
+import pandas as pd
+
+import eod_api
+import provider_access
+from bar_store import BarStore
+from eod_api import EODDataProvider
+
+
+def make_daily_bars(last_day, days=30):
+    """Daily bars like _fetch_eod_data returns them, ending on last_day"""
+    index = pd.bdate_range(end=pd.Timestamp(last_day), periods=days, name='Date')
+    close = np.linspace(100, 130, days)
+    return pd.DataFrame({
+        'Open': close - 1,
+        'High': close + 1,
+        'Low': close - 2,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': np.full(days, 1000.0)
+    }, index=index)
+
+
+class StubResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class BulkSession:
+    """Answers eod-bulk-last-day requests with one bar per known code"""
+
+    def __init__(self, day, codes):
+        self.day = day
+        self.codes = codes
+        self.urls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.urls.append(url)
+        return StubResponse([
+            {'code': code, 'exchange_short_name': 'US', 'date': self.day, 'open': 200.0, 'high': 210.0,
+             'low': 190.0, 'close': 205.0, 'adjusted_close': 205.0, 'volume': 5000}
+            for code in self.codes
+        ])
+
+
+def test_bulk_ingest_appends_every_tracked_series(tmp_path, monkeypatch):
+    """One request updates every stored series the day continues"""
+    store = BarStore(root_dir=str(tmp_path), refresh_seconds=60)
+    for ticker in ['AAPL', 'MSFT']:
+        store.save('eod', ticker, '1d', make_daily_bars('2024-03-07'), None)
+    # Two weeks behind: a single bulk day would leave a hole
+    store.save('eod', 'IBM', '1d', make_daily_bars('2024-02-22'), None)
+    store.save('yfinance', 'TSLA', '1d', make_daily_bars('2024-03-07'), None)
+
+    session = BulkSession('2024-03-08', ['AAPL', 'MSFT', 'IBM', 'TSLA', 'GOOG'])
+    monkeypatch.setattr(eod_api, 'get_bar_store', lambda: store)
+    monkeypatch.setattr(eod_api, 'get_http_session', lambda: session)
+    monkeypatch.setattr(provider_access, '_provider_limiter', provider_access.ProviderLimiter())
+
+    summary = EODDataProvider(api_key='demo').ingest_bulk_last_day(['US'])
+    assert len(session.urls) == 1 and session.urls[0].endswith('/eod-bulk-last-day/US')
+    assert (summary['tracked'], summary['appended'], summary['skipped']) == (3, 2, 1)
+
+    bars, meta = store.load('eod', 'AAPL', '1d')
+    assert bars.index[-1] == pd.Timestamp('2024-03-08') and len(bars) == 31
+    assert bars['Close'].iloc[-1] == 205.0 and bars['Adj Close'].iloc[-1] == 205.0
+    assert meta['fresh_until'] is not None
+    assert store.load_meta('eod', 'IBM', '1d')['rows'] == 30
+    assert store.load_meta('yfinance', 'TSLA', '1d')['rows'] == 30
+
+
+def test_bulk_day_must_follow_last_stored_session(tmp_path, monkeypatch):
+    """A bulk day after missing sessions is not appended; one after a holiday is"""
+    store = BarStore(root_dir=str(tmp_path), refresh_seconds=60)
+    # Monday 2024-03-04: Tuesday and Wednesday would be missing for good
+    store.save('eod', 'AAPL', '1d', make_daily_bars('2024-03-04'), None)
+    monkeypatch.setattr(eod_api, 'get_bar_store', lambda: store)
+    monkeypatch.setattr(provider_access, '_provider_limiter', provider_access.ProviderLimiter())
+
+    monkeypatch.setattr(eod_api, 'get_http_session', lambda: BulkSession('2024-03-07', ['AAPL']))
+    summary = EODDataProvider(api_key='demo').ingest_bulk_last_day(['US'])
+    assert (summary['appended'], summary['skipped']) == (0, 1)
+    meta = store.load_meta('eod', 'AAPL', '1d')
+    assert meta['rows'] == 30 and meta.get('fresh_until') is None
+
+    # Thursday before Good Friday 2024, then the Monday after
+    store.save('eod', 'MSFT', '1d', make_daily_bars('2024-03-28'), None)
+    monkeypatch.setattr(eod_api, 'get_http_session', lambda: BulkSession('2024-04-01', ['MSFT']))
+    assert EODDataProvider(api_key='demo').ingest_bulk_last_day(['US'])['appended'] == 1
+    assert store.load_meta('eod', 'MSFT', '1d')['rows'] == 31
+
+
+def test_fresh_until_skips_tail_fetch(tmp_path):
+    """A series marked fresh is served without a tail fetch past refresh_seconds"""
+    store = BarStore(root_dir=str(tmp_path), refresh_seconds=0)
+    bars = make_daily_bars(pd.Timestamp.now().normalize())
+    store.save('eod', 'AAPL', '1d', bars, None)
+    assert store.missing_range('eod', 'AAPL', '1d', '1mo')[0] == 'tail'
+
+    store.update('eod', 'AAPL', '1d', bars.iloc[-1:], fresh_until=pd.Timestamp.now().timestamp() + 3600)
+    assert store.missing_range('eod', 'AAPL', '1d', '1mo') == ('none', None)
+
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as root:
+        test_fresh_until_skips_tail_fetch(root)
+    print("✅ EOD bulk ingest tests passed")
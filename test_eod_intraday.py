@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for chunked EOD intraday fetching
+=============================================
+
+Replaces the pooled HTTP session with a stub serving hourly bars, and
+checks that long ranges are split into windows and merged by timestamp.
+"""
+
+import threading
+
+import pandas as pd
+import requests
+
+import eod_api
+import provider_access
+from eod_api import EODDataProvider, split_unix_range
+
+
+class StubResponse:
+    def __init__(self, data, status=200, url=''):
+        self.data = data
+        self.status = status
+        self.url = url
+
+    def raise_for_status(self):
+        if self.status != 200:
+            # Like requests, the message quotes the full URL
+            raise requests.HTTPError(f"{self.status} Client Error: Not Found for url: {self.url}", response=self)
+
+    def json(self):
+        return self.data
+
+
+class StubSession:
+    """Serves one bar per hour of the requested window (edges included)"""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.windows = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.windows.append((params['from'], params['to']))
+        stamps = range(params['from'] - params['from'] % 3600, params['to'] + 1, 3600)
+        return StubResponse([
+            {
+                'datetime': pd.Timestamp(stamp, unit='s').strftime('%Y-%m-%d %H:%M:%S'),
+                'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 100
+            }
+            for stamp in stamps
+        ], self.status, f"{url}?api_token={params['api_token']}&fmt=json")
+
+
+def use_stub_session(monkeypatch, session):
+    monkeypatch.setattr(eod_api, 'get_http_session', lambda: session)
+    monkeypatch.setattr(provider_access, '_provider_limiter', provider_access.ProviderLimiter())
+
+
+def test_split_unix_range():
+    """Windows cover the range exactly once"""
+    windows = split_unix_range(0, 250, 100)
+    assert windows == [(0, 99), (100, 199), (200, 250)]
+    assert split_unix_range(10, 10, 100) == [(10, 10)]
+
+
+def test_long_range_fetched_in_windows(monkeypatch):
+    """Six months of 1h bars come back as one sorted, duplicate-free frame"""
+    session = StubSession()
+    use_stub_session(monkeypatch, session)
+    monkeypatch.setattr(eod_api, 'EOD_INTRADAY_CHUNK_DAYS', 30)
+
+    provider = EODDataProvider(api_key='demo')
+    df = provider._fetch_intraday_data('AAPL.US', '1h', '2024-01-01', '2024-07-01')
+
+    from_ts, to_ts = min(session.windows)[0], max(session.windows)[1]
+    assert len(session.windows) == 7
+    assert df.index.is_monotonic_increasing and not df.index.duplicated().any()
+    assert len(df) == (to_ts - from_ts) // 3600 + 1
+    assert df.index[0] == pd.Timestamp(from_ts, unit='s')
+    assert {'Open', 'High', 'Low', 'Close', 'Volume'} <= set(df.columns)
+
+
+def test_unknown_symbol_is_tagged(monkeypatch):
+    """A 404 from any window marks the answer as an unknown symbol"""
+    use_stub_session(monkeypatch, StubSession(status=404))
+
+    provider = EODDataProvider(api_key='demo')
+    df = provider._fetch_intraday_data('NOPE.US', '1h', '2024-01-01', '2024-03-01')
+    assert df is not None and df.empty
+    assert df.attrs['negative_reason'] == eod_api.INVALID_SYMBOL
+
+
+def test_api_token_kept_out_of_errors(monkeypatch, caplog):
+    """HTTP and connection errors are logged without the api_token"""
+    use_stub_session(monkeypatch, StubSession(status=404))
+    provider = EODDataProvider(api_key='SECRETTOKEN12345678')
+    with caplog.at_level('DEBUG'):
+        df = provider._fetch_intraday_data('NOPE.US', '1h', '2024-01-01', '2024-03-01')
+    assert df.attrs['negative_reason'] == eod_api.INVALID_SYMBOL
+    assert 'api_token=***' in caplog.text and 'SECRETTOKEN12345678' not in caplog.text
+
+    class FailingSession:
+        def get(self, url, params=None, timeout=None):
+            raise requests.ConnectionError(f"Max retries exceeded with url: /api/eod?api_token={params['api_token']}")
+
+    monkeypatch.setattr(eod_api, 'get_http_session', lambda: FailingSession())
+    try:
+        provider._get_json('eod/AAPL.US')
+        assert False, "no error raised"
+    except requests.ConnectionError as e:
+        assert 'SECRETTOKEN12345678' not in str(e) and e.__cause__ is None
+
+
+if __name__ == "__main__":
+    test_split_unix_range()
+    print("✅ EOD intraday tests passed")
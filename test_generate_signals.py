@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized signal generation
+================================================
+
+Compares api.generate_signals with the per-bar reference implementation it
+replaced, on random WaveTrend/Money Flow series with NaN warm-up bars, ties
+and deep oversold crosses, and checks the speedup on a long history.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+import api
+
+
+def reference_generate_signals(wt1, wt2, mf, obLevel=53, osLevel=-53, osLevel3=-75):
+    """The per-bar implementation generate_signals used to have"""
+    wt_oversold = wt2 <= osLevel
+    wt_overbought = wt2 >= obLevel
+
+    wt_cross = pd.Series(np.zeros(len(wt1)), index=wt1.index)
+    wt_cross_up = pd.Series(np.zeros(len(wt1)), index=wt1.index)
+    wt_cross_down = pd.Series(np.zeros(len(wt1)), index=wt1.index)
+
+    for i in range(1, len(wt1)):
+        if (wt1.iloc[i-1] < wt2.iloc[i-1] and wt1.iloc[i] > wt2.iloc[i]) or \
+           (wt1.iloc[i-1] > wt2.iloc[i-1] and wt1.iloc[i] < wt2.iloc[i]):
+            wt_cross.iloc[i] = 1
+        if wt1.iloc[i-1] < wt2.iloc[i-1] and wt1.iloc[i] > wt2.iloc[i]:
+            wt_cross_up.iloc[i] = 1
+        if wt1.iloc[i-1] > wt2.iloc[i-1] and wt1.iloc[i] < wt2.iloc[i]:
+            wt_cross_down.iloc[i] = 1
+
+    buy_signal = (wt_cross == 1) & (wt_cross_up == 1) & wt_oversold
+    sell_signal = (wt_cross == 1) & (wt_cross_down == 1) & wt_overbought
+
+    gold_buy = pd.Series(np.zeros(len(wt1)), index=wt1.index)
+    for i in range(1, len(wt1)):
+        if buy_signal.iloc[i] and wt2.iloc[i] <= osLevel3 and mf.iloc[i] > 0:
+            diamond_setup = False
+            for j in range(1, min(4, i+1)):
+                if wt1.iloc[i-j] < wt2.iloc[i-j]:
+                    diamond_setup = True
+                    break
+            if diamond_setup:
+                gold_buy.iloc[i] = 1
+
+    cross_points = pd.Series(np.zeros(len(wt1)), index=wt1.index)
+    for i in range(len(wt1)):
+        if wt_cross.iloc[i] == 1:
+            cross_points.iloc[i] = wt2.iloc[i]
+        else:
+            cross_points.iloc[i] = np.nan
+
+    return buy_signal, gold_buy, sell_signal, wt_cross, cross_points
+
+
+def make_indicators(n, seed):
+    """Oscillating wt1/wt2 around the signal levels, with NaN warm-up and ties"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2010-01-01', periods=n, freq='D')
+    wt1 = pd.Series(np.cumsum(rng.normal(0, 12, n)) % 200 - 100, index=index, name='WT1')
+    wt2 = wt1.rolling(3).mean().rename('WT2')
+    ties = rng.integers(5, n, n // 40)
+    wt2.iloc[ties] = wt1.iloc[ties].to_numpy()
+    mf = pd.Series(rng.normal(0, 20, n), index=index, name='MF')
+    mf.iloc[:60] = np.nan
+    return wt1, wt2, mf
+
+
+def assert_same_signals(actual, expected):
+    for got, want in zip(actual, expected):
+        pd.testing.assert_series_equal(got, want)
+
+
+def test_matches_reference_implementation():
+    """Every output is identical to the per-bar loops, NaNs and ties included"""
+    for seed in range(5):
+        wt1, wt2, mf = make_indicators(1500, seed)
+        expected = reference_generate_signals(wt1, wt2, mf, 53, -53, -75)
+        actual = api.generate_signals(wt1, wt2, mf, 53, -53, -75)
+        assert_same_signals(actual, expected)
+        assert expected[0].any() and expected[1].any() and expected[2].any()
+
+    for n in [0, 1, 2]:
+        wt1, wt2, mf = make_indicators(200, 9)
+        assert_same_signals(
+            api.generate_signals(wt1.iloc[:n], wt2.iloc[:n], mf.iloc[:n]),
+            reference_generate_signals(wt1.iloc[:n], wt2.iloc[:n], mf.iloc[:n])
+        )
+
+
+def test_speedup_on_long_history():
+    """5,000 bars run at least 50x faster than the per-bar loops"""
+    wt1, wt2, mf = make_indicators(5000, 11)
+
+    started = time.perf_counter()
+    reference_generate_signals(wt1, wt2, mf)
+    reference = time.perf_counter() - started
+
+    vectorized = min(
+        _timed(lambda: api.generate_signals(wt1, wt2, mf)) for _ in range(5)
+    )
+    assert reference / vectorized >= 50
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    test_matches_reference_implementation()
+    test_speedup_on_long_history()
+    print("✅ Signal generation tests passed")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script for the lazy indicator dependency graph
+===================================================
+
+Checks indicator_graph plans and memoizes nodes, that compute_analyzer_b
+for a few columns gives the same values as the full analysis without
+running the nodes it does not need, and that the fields parameter of the
+Analyzer B endpoints trims the work, the response and the cache entries.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import api
+from analysis_cache import AnalysisCache
+from indicator_graph import IndicatorGraph, IndicatorNode
+
+logging.disable(logging.INFO)
+
+
+def make_bars(n, seed):
+    """Random walk OHLCV daily bars ending today"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 0.5, n))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 0.5, n))
+    return pd.DataFrame(
+        {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': rng.integers(1, 1000, n) * 1.0},
+        index=pd.date_range(end=pd.Timestamp.today().normalize(), periods=n, freq='D')
+    )
+
+
+def test_plan_memoizes_shared_nodes():
+    """Nodes run once, after their inputs, and only when a requested column needs them"""
+    calls = []
+
+    def node(name, value):
+        def func(df, context, offset=0):
+            calls.append(name)
+            return df['Close'] * value + offset
+        return func
+
+    graph = IndicatorGraph([
+        IndicatorNode('a', ('A',), ('Close',), node('a', 2)),
+        IndicatorNode('b', ('B',), ('A',), lambda df, context: df['A'] + 1),
+        IndicatorNode('c', ('C', 'D'), ('A', 'B'), lambda df, context: (df['A'] + df['B'], df['A'] - df['B'])),
+        IndicatorNode('e', ('E',), ('Close',), node('e', 3), {'offset': 5}),
+    ])
+    assert [node.name for node in graph.plan(['D'])] == ['a', 'b', 'c']
+    assert graph.dependencies(['B']) == {'A', 'B'}
+
+    df = pd.DataFrame({'Close': [1.0, 2.0]})
+    graph.resolve(df, ['C', 'B'])
+    assert calls == ['a'] and 'E' not in df.columns
+    assert df['C'].tolist() == [5.0, 9.0]
+
+    # Columns already on the frame are not computed again
+    graph.resolve(df, ['E', 'D'])
+    assert calls == ['a', 'e'] and df['E'].tolist() == [8.0, 11.0]
+
+    with pytest.raises(KeyError):
+        graph.plan(['Missing'])
+    with pytest.raises(ValueError):
+        IndicatorGraph([IndicatorNode('x', ('X',), ('Y',), None), IndicatorNode('y', ('Y',), ('X',), None)])
+    with pytest.raises(ValueError):
+        IndicatorGraph([IndicatorNode('x', ('X',), ('Unknown',), None)])
+
+
+def test_partial_analysis_matches_full(monkeypatch):
+    """WaveTrend and Money Flow alone equal the full analysis, without regime or divergence work"""
+    df = make_bars(600, 1)
+    full = api.compute_analyzer_b('TEST', df.copy(), '1d')
+    assert 'columns' not in full.attrs
+    assert set(api.ANALYZER_B_GRAPH.columns) <= set(full.columns)
+
+    def not_needed(*args, **kwargs):
+        raise AssertionError("computed a column that was not requested")
+
+    for name in ('detect_regimes', 'detect_divergences', 'detect_mf_divergences', 'get_exhaust_data'):
+        monkeypatch.setattr(api, name, not_needed)
+
+    columns = api.get_field_columns(['wt1', 'wt2', 'moneyFlow'])
+    partial = api.compute_analyzer_b('TEST', df.copy(), '1d', columns)
+    assert set(columns) <= set(partial.attrs['columns'])
+    assert 'HMMPriceRegime' not in partial.columns and 'BullishDiv' not in partial.columns
+    for column in partial.attrs['columns']:
+        pd.testing.assert_series_equal(partial[column], full[column])
+
+    assert api.has_analysis_columns(partial, columns)
+    assert not api.has_analysis_columns(partial, api.get_field_columns(['summary']))
+    assert not api.has_analysis_columns(partial, None)
+
+
+def test_summary_fields_match_full_response():
+    """A summary-only response holds the same summary as the full one"""
+    df = make_bars(600, 2)
+    full = api.format_analyzer_result('TEST', api.compute_analyzer_b('TEST', df.copy(), '1d'), '1y', '1d')
+    columns = api.get_field_columns(['summary', 'status'])
+    partial_df = api.compute_analyzer_b('TEST', df.copy(), '1d', columns)
+    partial = api.format_analyzer_result('TEST', partial_df, '1y', '1d', ['summary', 'status'])
+
+    assert 'TEOverbought' not in partial_df.columns and 'RSI3' not in partial_df.columns
+    assert set(partial) == {'success', 'ticker', 'companyName', 'interval', 'period', 'dates',
+                            'parameters', 'tickerType', 'summary', 'status'}
+    assert partial['summary'] == full['summary'] and partial['status'] == full['status']
+
+    with pytest.raises(ValueError):
+        api.parse_fields('wt1,bogus')
+    assert api.parse_fields('') is None
+
+
+def test_endpoint_fields_and_cache(monkeypatch):
+    """Partial analyses are cached for their columns and widened, never served as full ones"""
+    bars = make_bars(600, 3)
+    fetches = []
+
+    def fetch(ticker, period, interval, use_cache=True):
+        fetches.append(ticker)
+        return bars.copy()
+
+    monkeypatch.setattr(api, 'ticker_cache', AnalysisCache('analysis'))
+    monkeypatch.setattr(api, 'fetch_stock_data', fetch)
+    client = api.app.test_client()
+    url = '/api/analyzer-b?ticker=TEST&period=1y&interval=1d'
+
+    first = client.get(url + '&fields=wt1,wt2,moneyFlow').get_json()
+    assert first['success'] and first['metadata']['fields'] == ['wt1', 'wt2', 'moneyFlow']
+    assert {'wt1', 'wt2', 'moneyFlow'} <= set(first) and 'summary' not in first and 'ohlc' not in first
+    assert 'HMMPriceRegime' not in api.ticker_cache.get('TEST_1y_1d').columns
+
+    # Served from the cached partial analysis
+    client.get(url + '&fields=wt2')
+    assert len(fetches) == 1
+
+    # Needs more columns: recomputed with those of the cached entry as well
+    client.get(url + '&fields=summary')
+    cached = api.ticker_cache.get('TEST_1y_1d')
+    assert len(fetches) == 2 and 'WT1' in cached.columns and 'HMMPriceRegime' in cached.columns
+
+    full = client.get(url).get_json()
+    assert len(fetches) == 3 and 'columns' not in api.ticker_cache.get('TEST_1y_1d').attrs
+    assert full['wt1'] == first['wt1'] and 'trendExhaust' in full
+
+    assert client.get(url + '&fields=bogus').status_code == 400
+    assert client.get('/api/multi-ticker?tickers=TEST&fields=bogus').status_code == 400
+
+
+if __name__ == "__main__":
+    test_plan_memoizes_shared_nodes()
+    test_summary_fields_match_full_response()
+    print("✅ Indicator graph tests passed")
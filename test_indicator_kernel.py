@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the fused indicator kernel
+==========================================
+
+Compares indicator_kernel.compute_core_indicators with the pandas indicator
+functions in api.py for every interval's parameters, on random OHLC bars
+with flat stretches and missing bars, and checks compute_analyzer_b gives
+the same columns with the kernel switched on and off.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+import api
+from indicator_kernel import CORE_COLUMNS, compute_core_indicators
+
+logging.disable(logging.INFO)
+
+
+def make_bars(n, seed):
+    """Random walk OHLC bars with a flat stretch and a few missing bars"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 0.5, n))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 0.5, n))
+    df = pd.DataFrame(
+        {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': rng.integers(1, 1000, n) * 1.0},
+        index=pd.date_range('2015-01-01', periods=n, freq='D')
+    )
+    df.iloc[300:400] = df.iloc[300].to_numpy()
+    df.iloc[700:703, :4] = np.nan
+    return df
+
+
+def pandas_indicators(df, params):
+    """The per-indicator pandas path compute_analyzer_b used to take"""
+    wt1, wt2, wt_vwap = api.calculate_wavetrend(
+        df, params['wtChannelLen'], params['wtAverageLen'], params['wtMALen']
+    )
+    values = [
+        wt1, wt2, wt_vwap,
+        api.stoch_heikin_ashi(df, params['stochPeriod1'], 2),
+        api.stoch_heikin_ashi(df, params['stochPeriod2'], 2),
+        api.calculate_money_flow(df, params['mfPeriod1'], params['mfPeriod2']),
+        *api.calculate_macd(df['Close']),
+        *api.calculate_bollinger_bands(df['Close']),
+        *api.calculate_adx(df)
+    ]
+    return dict(zip(CORE_COLUMNS, values))
+
+
+def test_matches_pandas_indicators():
+    """Every core column matches the pandas functions within float tolerance"""
+    for seed, interval in enumerate(['5m', '1h', '4h', '1d']):
+        df = make_bars(2000, seed)
+        params = api.adjust_parameters_for_interval(interval)
+        expected = pandas_indicators(df, params)
+        actual = compute_core_indicators(df, params)
+
+        assert list(actual) == list(CORE_COLUMNS)
+        for column in CORE_COLUMNS:
+            # pandas leaves ~1e-6 of rounding noise in the rolling std of the
+            # flat stretch where the kernel returns exactly 0
+            pd.testing.assert_series_equal(
+                actual[column], expected[column], check_names=False, rtol=1e-7, atol=1e-5
+            )
+            assert actual[column].notna().sum() > 1000
+
+
+def test_short_series():
+    """Series shorter than the indicator windows come back all NaN, not failing"""
+    params = api.adjust_parameters_for_interval('1d')
+    for n in (0, 1, 5):
+        df = make_bars(500, 1).iloc[:n]
+        expected = pandas_indicators(df, params)
+        actual = compute_core_indicators(df, params)
+        for column in CORE_COLUMNS:
+            pd.testing.assert_series_equal(actual[column], expected[column], check_names=False, check_index_type=False)
+
+
+def test_analyzer_b_columns_unchanged():
+    """compute_analyzer_b gives the same analysis with and without the kernel"""
+    df = make_bars(600, 7).iloc[:-100]
+    enabled = api.USE_INDICATOR_KERNEL
+    try:
+        api.USE_INDICATOR_KERNEL = True
+        with_kernel = api.compute_analyzer_b('TEST', df.copy(), '1d')
+        api.USE_INDICATOR_KERNEL = False
+        without_kernel = api.compute_analyzer_b('TEST', df.copy(), '1d')
+    finally:
+        api.USE_INDICATOR_KERNEL = enabled
+
+    assert list(with_kernel.columns) == list(without_kernel.columns)
+    pd.testing.assert_frame_equal(with_kernel, without_kernel, rtol=1e-7, atol=1e-5)
+
+
+if __name__ == "__main__":
+    test_matches_pandas_indicators()
+    test_short_series()
+    test_analyzer_b_columns_unchanged()
+    print("✅ Indicator kernel tests passed")
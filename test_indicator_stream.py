@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming indicator state
+=============================================
+
+Feeds OHLC bars one at a time through indicator_stream.IndicatorState and
+compares every value with the full-history columns of compute_analyzer_b,
+including revisions of a forming bar, a JSON round trip in the middle of a
+series and the registry catching up with new bars.
+"""
+
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+import api
+from indicator_stream import IndicatorState, IndicatorStreams, STREAM_COLUMNS
+
+logging.disable(logging.INFO)
+
+PARAMS = api.adjust_parameters_for_interval('1d')
+
+
+def make_bars(n, seed):
+    """Random walk OHLC bars with a flat stretch"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 0.5, n))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 0.5, n))
+    df = pd.DataFrame(
+        {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': 1000.0},
+        index=pd.date_range('2020-01-01', periods=n, freq='D')
+    )
+    df.iloc[200:230] = df.iloc[200].to_numpy()
+    return df
+
+
+def stream_frame(state, df):
+    """Apply every bar of df as closed and collect the values"""
+    rows = [state.update(timestamp, bar) for timestamp, bar in df.iterrows()]
+    return pd.DataFrame(rows, index=df.index)
+
+
+def assert_matches_batch(streamed, batch):
+    for column in STREAM_COLUMNS:
+        expected = batch[column]
+        actual = streamed[column].astype(expected.dtype)
+        if expected.dtype == bool or expected.dtype.kind in 'iu':
+            pd.testing.assert_series_equal(actual, expected, check_names=False)
+        else:
+            pd.testing.assert_series_equal(actual, expected, check_names=False, rtol=1e-7, atol=1e-5)
+
+
+def test_matches_full_history_analysis():
+    """Bar-by-bar values equal the compute_analyzer_b columns"""
+    df = make_bars(500, 1)
+    batch = api.compute_analyzer_b('TEST', df.copy(), '1d')
+    streamed = stream_frame(IndicatorState(PARAMS), df)
+
+    assert_matches_batch(streamed, batch)
+    assert streamed['Buy'].any() or streamed['Sell'].any()
+    assert streamed['RSI3M3State'].nunique() > 1
+
+
+def test_forming_bar_revisions():
+    """Revising a forming bar ends where applying its final values would"""
+    df = make_bars(300, 2)
+    state = IndicatorState(PARAMS)
+    stream_frame(state, df.iloc[:-1])
+
+    timestamp, final = df.index[-1], df.iloc[-1]
+    for fraction in (0.2, 0.6, 0.9):
+        partial = final.copy()
+        partial['Close'] = final['Open'] + (final['Close'] - final['Open']) * fraction
+        state.update(timestamp, partial, forming=True)
+        assert state.forming and state.bars == len(df)
+    revised = state.update(timestamp, final, forming=True)
+
+    expected = stream_frame(IndicatorState(PARAMS), df).iloc[-1]
+    pd.testing.assert_series_equal(pd.Series(revised, dtype=object), expected.astype(object), check_names=False)
+
+    # A later bar closes the forming one, which cannot be revised any more
+    next_time = timestamp + pd.Timedelta(days=1)
+    state.update(next_time, final)
+    try:
+        state.update(next_time, final)
+        assert False, "closed bar was revised"
+    except ValueError:
+        pass
+
+
+def test_json_round_trip_continues_identically():
+    """A state restored from JSON keeps producing the same values, at constant size"""
+    df = make_bars(600, 3)
+    uninterrupted = stream_frame(IndicatorState(PARAMS), df)
+
+    state = IndicatorState(PARAMS)
+    stream_frame(state, df.iloc[:300])
+    size = len(json.dumps(state.to_dict()))
+    state.update(df.index[300], df.iloc[300] * 1.01, forming=True)
+
+    restored = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())), parse_time=pd.Timestamp)
+    assert restored.forming and restored.last_time == df.index[300]
+    resumed = stream_frame(restored, df.iloc[300:])
+    pd.testing.assert_frame_equal(resumed, uninterrupted.iloc[300:])
+
+    # State holds windows and accumulators only, not the history
+    assert not restored.forming
+    assert abs(len(json.dumps(restored.to_dict())) - size) < size * 0.1
+
+
+def test_registry_applies_only_new_bars():
+    """The registry seeds once, then applies new bars and revises the forming one"""
+    df = make_bars(400, 4)
+    streams = IndicatorStreams(max_states=2)
+
+    state, seeded = streams.advance('TEST', '1d', df.iloc[:350], PARAMS)
+    assert seeded and state.bars == 350 and state.forming
+
+    state, seeded = streams.advance('TEST', '1d', df, PARAMS)
+    assert not seeded and state.bars == 400
+    assert streams.get_stats()['bars_applied'] == 350 + 51
+
+    reference = stream_frame(IndicatorState(PARAMS), df).iloc[-1]
+    for column in ('WT2', 'MF', 'ADX', 'BBUpper', 'ShortPercentR'):
+        assert np.isclose(state.last_values[column], reference[column], equal_nan=True)
+
+    # Re-adjusted history (a split): seeded again instead of continuing on the old prices
+    split = df.copy()
+    split[['Open', 'High', 'Low', 'Close']] /= 2
+    state, seeded = streams.advance('TEST', '1d', split, PARAMS)
+    assert seeded and state.bars == 400
+
+    streams.advance('OTHER', '1d', df, PARAMS)
+    streams.advance('THIRD', '1d', df, PARAMS)
+    assert streams.get('TEST', '1d') is None and streams.get_stats()['evictions'] == 1
+
+
+def test_live_indicators_endpoint(monkeypatch):
+    """The endpoint seeds on first use, then only applies what the fetch added"""
+    df = make_bars(400, 5)
+    frames = [df.iloc[:399], df]
+    monkeypatch.setattr(api, 'fetch_stock_data', lambda ticker, period, interval: frames.pop(0))
+    monkeypatch.setattr(api, 'get_indicator_streams', lambda streams=IndicatorStreams(): streams)
+    client = api.app.test_client()
+
+    first = client.get('/api/live-indicators?ticker=test&interval=1d').get_json()
+    second = client.get('/api/live-indicators?ticker=test&interval=1d').get_json()
+    assert first['success'] and first['seeded'] and first['bars'] == 399
+    assert second['success'] and not second['seeded'] and second['bars'] == 400
+    assert second['time'] == str(df.index[-1]) and second['forming']
+    assert second['indicators']['WT2'] is not None
+
+    assert client.get('/api/live-indicators?ticker=test&interval=7m').status_code == 400
+
+
+if __name__ == "__main__":
+    test_matches_full_history_analysis()
+    test_forming_bar_revisions()
+    test_json_round_trip_continues_identically()
+    test_registry_applies_only_new_bars()
+    print("✅ Indicator stream tests passed")
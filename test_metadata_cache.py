@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for the company metadata cache
+==========================================
+
+Uses a counting fetcher in place of yfinance, so it runs offline.
+"""
+
+import os
+import tempfile
+import time
+
+import pandas as pd
+import yfinance as yf
+
+import metadata_cache
+import provider_access
+from metadata_cache import MetadataCache
+
+
+class CountingFetcher:
+    """Metadata fetcher stub recording every ticker it is asked for"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, ticker):
+        self.calls.append(ticker)
+        return {'company_name': f"{ticker} Inc.", 'industry': 'Testing', 'sector': None}
+
+
+def test_bulk_fill_persists_across_restarts():
+    """A filled watchlist is served from disk by a new cache instance"""
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'metadata.json')
+        fetcher = CountingFetcher()
+
+        cache = MetadataCache(path=path, fetcher=fetcher)
+        assert cache.fill(['AAPL', 'MSFT', 'AAPL']) == 2
+        assert cache.fill(['AAPL', 'MSFT']) == 0
+
+        restarted = MetadataCache(path=path, fetcher=fetcher)
+        assert restarted.get('msft', schedule_fill=False)['company_name'] == 'MSFT Inc.'
+        assert sorted(fetcher.calls) == ['AAPL', 'MSFT']
+
+
+def test_expired_entries_are_refetched():
+    """Entries older than the TTL are still served but refetched by fill"""
+    with tempfile.TemporaryDirectory() as root:
+        fetcher = CountingFetcher()
+        cache = MetadataCache(path=os.path.join(root, 'metadata.json'), ttl_days=0, fetcher=fetcher)
+        cache.set('NVDA', {'company_name': 'Old Name'})
+
+        assert cache.get('NVDA', schedule_fill=False)['company_name'] == 'Old Name'
+        assert cache.fill(['NVDA']) == 1
+        assert fetcher.calls == ['NVDA']
+
+
+def test_apply_falls_back_to_ticker_and_fills_in_background():
+    """Unknown tickers get their symbol as name until the fill completes"""
+    with tempfile.TemporaryDirectory() as root:
+        fetcher = CountingFetcher()
+        cache = MetadataCache(path=os.path.join(root, 'metadata.json'), fetcher=fetcher)
+        df = pd.DataFrame({'Close': [1.0, 2.0]})
+
+        cache.apply(df, 'AMZN')
+        assert df.attrs['company_name'] == 'AMZN'
+
+        cache.fill_async(['AMZN'])  # Already queued by apply, nothing new starts
+        while cache.get_stats()['pending']:
+            time.sleep(0.01)
+        cache.apply(df, 'AMZN')
+        assert df.attrs['company_name'] == 'AMZN Inc.'
+        assert df.attrs['industry'] == 'Testing'
+        assert fetcher.calls == ['AMZN']
+
+
+def test_failed_fetches_back_off(monkeypatch):
+    """A failing ticker is fetched once per retry period, and never trips the price breaker"""
+    with tempfile.TemporaryDirectory() as root:
+        calls = []
+
+        def failing(ticker):
+            calls.append(ticker)
+            raise RuntimeError("quote summary unavailable")
+
+        cache = MetadataCache(path=os.path.join(root, 'metadata.json'), fetcher=failing)
+        for _ in range(5):
+            cache.get('BAD')
+            while cache.get_stats()['pending']:
+                time.sleep(0.01)
+        assert calls == ['BAD'] and cache.get_stats()['failed'] == 1
+
+        cache.retry_seconds = 0
+        assert cache.fill(['BAD']) == 0 and calls == ['BAD', 'BAD']
+
+    class BrokenTicker:
+        def __init__(self, ticker):
+            pass
+
+        @property
+        def info(self):
+            raise RuntimeError("quote summary unavailable")
+
+    limiter = provider_access.ProviderLimiter()
+    monkeypatch.setattr(provider_access, '_provider_limiter', limiter)
+    monkeypatch.setattr(yf, 'Ticker', BrokenTicker)
+    for _ in range(provider_access.CIRCUIT_FAILURE_THRESHOLD + 1):
+        try:
+            metadata_cache.fetch_yfinance_metadata('BAD')
+        except RuntimeError:
+            pass
+    assert limiter.breaker('yfinance').state == 'closed'
+
+
+if __name__ == "__main__":
+    test_bulk_fill_persists_across_restarts()
+    test_expired_entries_are_refetched()
+    test_apply_falls_back_to_ticker_and_fills_in_background()
+    print("✅ Metadata cache tests passed")
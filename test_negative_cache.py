@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the negative result cache
+=========================================
+
+Checks expiry and scoping of the cache, and that fetch_stock_data answers
+recorded unknown or empty symbols without calling a stubbed yfinance.
+"""
+
+import time
+
+import pandas as pd
+
+import api
+import provider_access
+from negative_cache import NegativeCache, classify_error, NO_DATA, INVALID_SYMBOL
+
+
+class StubTicker:
+    """yf.Ticker stand-in counting history calls"""
+
+    calls = 0
+    error = None
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    def history(self, **kwargs):
+        StubTicker.calls += 1
+        if StubTicker.error is not None:
+            raise StubTicker.error
+        return pd.DataFrame()
+
+
+def use_stub_yfinance(monkeypatch, cache, error=None):
+    StubTicker.calls = 0
+    StubTicker.error = error
+    monkeypatch.setattr(api.yf, 'Ticker', StubTicker)
+    monkeypatch.setattr(api, 'USE_EOD_API', False)
+    monkeypatch.setattr(api, 'USE_BAR_STORE', False)
+    monkeypatch.setattr(api, 'get_negative_cache', lambda: cache)
+    # A fresh limiter, so breakers opened by offline requests elsewhere do not interfere
+    monkeypatch.setattr(provider_access, '_provider_limiter', provider_access.ProviderLimiter())
+
+
+def test_entries_expire_and_are_scoped():
+    """no_data is per period/interval, invalid_symbol covers the whole ticker"""
+    cache = NegativeCache(ttl=0.05, invalid_ttl=60)
+    cache.record('yfinance', 'aapl', '1y', '1h', NO_DATA)
+    assert cache.check('yfinance', 'AAPL', '1y', '1h') == NO_DATA
+    assert cache.check('yfinance', 'AAPL', '1y', '1d') is None
+    assert cache.check('eod', 'AAPL', '1y', '1h') is None
+
+    cache.record('eod', 'ZZZZ', '1y', '1d', INVALID_SYMBOL)
+    assert cache.check('eod', 'ZZZZ', '5d', '15m') == INVALID_SYMBOL
+    assert cache.describe('ZZZZ', '1mo', '1d') == INVALID_SYMBOL
+
+    time.sleep(0.06)
+    assert cache.check('yfinance', 'AAPL', '1y', '1h') is None
+    assert [entry['key'] for entry in cache.list_entries()] == ['eod/ZZZZ/*/*']
+    assert cache.delete('eod/ZZZZ/*/*') and cache.get_stats()['entries'] == 0
+
+
+def test_classify_error():
+    """Only symbol errors are classified as invalid"""
+    assert classify_error(Exception("$ZZZZ: possibly delisted; no timezone found")) == INVALID_SYMBOL
+    assert classify_error(Exception("404 Client Error: Not Found for url")) == INVALID_SYMBOL
+    assert classify_error(TimeoutError("Read timed out")) is None
+
+
+def test_empty_answers_are_cached(monkeypatch):
+    """A symbol without bars is asked for once, then answered from the cache"""
+    cache = NegativeCache()
+    use_stub_yfinance(monkeypatch, cache)
+
+    assert api.fetch_stock_data('NODATA', '1y', '1d', retry_delay=0.01) is None
+    calls = StubTicker.calls
+    assert calls == 3
+    assert cache.check('yfinance', 'NODATA', '1y', '1d') == NO_DATA
+
+    assert api.fetch_stock_data('NODATA', '1y', '1d', retry_delay=0.01) is None
+    assert StubTicker.calls == calls
+
+    # A forced refresh still asks the provider
+    api.fetch_stock_data('NODATA', '1y', '1d', retry_delay=0.01, use_cache=False)
+    assert StubTicker.calls > calls
+
+
+def test_invalid_symbol_is_not_retried(monkeypatch):
+    """An unknown symbol costs one request and does not trip the breaker"""
+    cache = NegativeCache()
+    use_stub_yfinance(monkeypatch, cache, Exception("$TYPO: possibly delisted; no timezone found"))
+
+    assert api.fetch_stock_data('TYPO', '1y', '1d', retry_delay=0.01) is None
+    assert StubTicker.calls == 1
+    assert cache.check('yfinance', 'TYPO', '6mo', '1h') == INVALID_SYMBOL
+    assert api.get_provider_limiter().breaker('yfinance').get_stats()['consecutive_failures'] == 0
+
+    result, error, _ = api.analyze_ticker_for_grid('TYPO', '1y', '1d')
+    assert result is None and error == 'Unknown ticker symbol'
+    assert StubTicker.calls == 1
+
+
+if __name__ == "__main__":
+    test_entries_expire_and_are_scoped()
+    test_classify_error()
+    print("✅ Negative cache tests passed")
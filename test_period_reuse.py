@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for serving shorter periods from a longer analysed history
+======================================================================
+
+Runs the real analysis on synthetic daily bars with a stubbed fetch, and
+checks that indicator warm-up bars are fetched and trimmed, and that a
+shorter period is served from the cached longer one without a fetch.
+"""
+
+import numpy as np
+import pandas as pd
+
+import api
+from analysis_cache import AnalysisCache
+
+
+def make_bars(days=800):
+    """Random-walk daily OHLCV bars ending today"""
+    rng = np.random.default_rng(7)
+    index = pd.bdate_range(end=pd.Timestamp.now(tz='UTC').normalize(), periods=days)
+    close = 100 + np.cumsum(rng.normal(0, 1, days))
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.5, days),
+        'High': close + 2,
+        'Low': close - 2,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, days).astype(float)
+    }, index=index)
+
+
+def test_history_period_includes_warmup():
+    """The fetched history reaches back past the window by the warm-up span"""
+    assert api.get_history_period('1y', '1d') == '2y'
+    assert api.get_history_period('1mo', '1d') == '1y'
+    assert api.get_history_period('max', '1d') == 'max'
+    # 15m bars are limited to 60 days, the window itself is not extended past that
+    assert api.get_history_period('1mo', '15m') == '1mo'
+
+
+def test_shorter_period_sliced_from_cached_history(monkeypatch):
+    """3mo after 1y costs no fetch and matches the 1y window"""
+    bars = make_bars()
+    fetched = []
+    fetch_kwargs = []
+
+    def fake_fetch(ticker, period, interval, *args, **kwargs):
+        fetched.append(period)
+        fetch_kwargs.append(kwargs)
+        return api.slice_period(bars, period).copy()
+
+    monkeypatch.setattr(api, 'ticker_cache', AnalysisCache(default_ttl=60))
+    monkeypatch.setattr(api, 'fetch_stock_data', fake_fetch)
+    monkeypatch.setattr(api, 'get_analysis_ttl', lambda ticker, interval: 60)
+
+    year = api.analyzer_b('AAPL', '1y', '1d')
+    assert fetched == ['2y']
+    assert year.index[0] >= api.period_start('1y')
+    # Indicators are warmed up from the first bar of the window
+    assert not year['WT2'].iloc[:5].isna().any()
+
+    quarter = api.analyzer_b('AAPL', '3mo', '1d')
+    assert fetched == ['2y']
+    assert quarter.index[0] >= api.period_start('3mo')
+    pd.testing.assert_frame_equal(quarter, year.loc[quarter.index[0]:])
+    assert quarter.attrs['signal_strength'] == year.attrs['signal_strength']
+
+    # force_refresh skips the cached longer period and the stored bars
+    api.analyzer_b('AAPL', '3mo', '1d', use_cache=False)
+    assert fetched == ['2y', api.get_history_period('3mo', '1d')]
+    assert fetch_kwargs[-1] == {'use_cache': False}
+
+
+if __name__ == "__main__":
+    test_history_period_includes_warmup()
+    print("✅ Period reuse tests passed")
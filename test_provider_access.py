@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Test script for provider access control and the multi-ticker worker pool
+========================================================================
+
+Uses stubbed provider and analysis functions, so it runs offline and only
+checks the concurrency, circuit breaker and retry behaviour.
+"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import api
+import provider_access
+from analysis_cache import AnalysisCache
+from provider_access import CircuitOpenError, ProviderLimiter, backoff_delay
+
+
+def test_limiter_bounds_concurrency():
+    """No more than the configured number of requests run at once"""
+    limiter = ProviderLimiter({'yfinance': 2})
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def request():
+        with limiter.slot('yfinance'):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
+    assert limiter.get_stats()['yfinance']['active'] == 0
+
+
+def test_circuit_opens_fails_fast_and_recovers():
+    """Consecutive failures open the circuit; one trial call closes it again"""
+    limiter = ProviderLimiter({'eod': 2}, failure_threshold=3, reset_timeout=0.1)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        with limiter.call('eod'):
+            raise ConnectionError("rate limited")
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            failing()
+    assert limiter.breaker('eod').state == 'open'
+
+    # While open the provider is not called at all
+    with pytest.raises(CircuitOpenError):
+        failing()
+    assert len(calls) == 4 and limiter.get_stats()['eod']['circuit']['rejected'] == 1
+
+    time.sleep(0.11)
+    assert limiter.breaker('eod').state == 'half_open'
+    with limiter.call('eod'):
+        pass
+    assert limiter.breaker('eod').state == 'closed'
+
+
+def test_backoff_grows_with_full_jitter():
+    """Delays stay within [0, min(cap, base * 2^attempt)]"""
+    for attempt in range(6):
+        delays = [backoff_delay(attempt, 0.5, max_delay=4) for _ in range(200)]
+        assert min(delays) >= 0
+        assert max(delays) <= min(4, 0.5 * 2 ** attempt)
+    assert max(backoff_delay(5, 0.5, max_delay=4) for _ in range(200)) > 2
+
+
+def test_retry_call_respects_budget_and_hands_off():
+    """Retries stop at the budget and the remaining attempts run in the background"""
+    limiter = ProviderLimiter(failure_threshold=100)
+    calls = []
+    done = threading.Event()
+
+    def flaky():
+        calls.append(time.time())
+        with limiter.call('yfinance'):
+            if len(calls) < 3:
+                raise ConnectionError("timeout")
+        done.set()
+        return 'bars'
+
+    started = time.time()
+    result = limiter.retry_call('yfinance', flaky, max_retries=3, base_delay=0.2,
+                                budget_seconds=0.0, background_key='AAPL')
+    assert result is None
+    assert time.time() - started < 0.1 and len(calls) == 1
+
+    assert done.wait(2)
+    assert len(calls) == 3
+
+
+def test_retry_call_fails_fast_when_circuit_open():
+    """An open circuit raises before the provider is called"""
+    limiter = ProviderLimiter(failure_threshold=1, reset_timeout=60)
+    with pytest.raises(ConnectionError):
+        with limiter.call('yfinance'):
+            raise ConnectionError("down")
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        limiter.retry_call('yfinance', lambda: calls.append(1))
+    assert calls == []
+
+
+def test_multi_ticker_parallel_matches_sequential(monkeypatch):
+    """Both paths return the same results, the pool in less wall time"""
+    def slow_analysis(ticker, period, interval, df=None, columns=None):
+        time.sleep(0.1)
+        return ticker
+
+    monkeypatch.setattr(api, 'fetch_multi_stock_data', lambda tickers, period, interval: {})
+    monkeypatch.setattr(api, 'get_cached_analysis', lambda ticker, period, interval, columns=None: None)
+    monkeypatch.setattr(api, 'analyzer_b', slow_analysis)
+    monkeypatch.setattr(api, 'format_analyzer_result', lambda ticker, df, period, interval, fields=None: {'ticker': ticker})
+
+    client = api.app.test_client()
+    tickers = 'AAPL,MSFT,NVDA,AMZN,META,GOOG'
+    sequential = client.get(f'/api/multi-ticker?tickers={tickers}&parallel=false').get_json()
+    parallel = client.get(f'/api/multi-ticker?tickers={tickers}').get_json()
+
+    assert parallel['results'] == sequential['results']
+    assert sequential['processing_info']['sequential_processing'] is True
+    assert parallel['processing_info']['sequential_processing'] is False
+    assert set(parallel['processing_info']['ticker_timings']) == set(tickers.split(','))
+    assert parallel['processing_info']['total_time'] < sequential['processing_info']['total_time']
+
+
+def test_hedged_call_fires_secondary_when_primary_is_slow(monkeypatch):
+    """A primary slower than its latency percentile loses to the hedge"""
+    limiter = ProviderLimiter()
+    for _ in range(50):
+        limiter.record_latency('eod', 0.05)
+    assert limiter.hedge_delay('eod') == pytest.approx(max(0.05, provider_access.HEDGE_MIN_DELAY))
+    monkeypatch.setattr(provider_access, 'HEDGE_MIN_DELAY', 0.05)
+
+    def slow_primary():
+        time.sleep(0.5)
+        return 'eod bars'
+
+    started = time.time()
+    result, info = limiter.hedged_call('eod', slow_primary, 'yfinance', lambda: 'yfinance bars')
+    assert result == 'yfinance bars' and time.time() - started < 0.3
+    assert info['hedged'] and info['winner'] == 'yfinance'
+    assert info['latency_gain_seconds'] >= 0 and info['latency_gain_estimated']
+
+    # The late primary still reports the real gain
+    time.sleep(0.6)
+    stats = limiter.get_hedge_stats()
+    assert (stats['hedged'], stats['secondary_wins']) == (1, 1)
+    assert stats['gain_seconds'] > 0.3
+
+
+def test_hedged_call_keeps_fast_primary():
+    """A primary answering in time is used alone; a failing one is hedged at once"""
+    limiter = ProviderLimiter()
+    secondary = []
+
+    def backup():
+        secondary.append(1)
+        return 'yfinance bars'
+
+    result, info = limiter.hedged_call('eod', lambda: 'eod bars', 'yfinance', backup)
+    assert result == 'eod bars' and info == dict(info, winner='eod', hedged=False, latency_gain_seconds=0.0)
+    assert secondary == []
+
+    def failing():
+        raise ConnectionError("down")
+
+    started = time.time()
+    result, info = limiter.hedged_call('eod', failing, 'yfinance', backup)
+    assert result == 'yfinance bars' and info['winner'] == 'yfinance'
+    assert time.time() - started < provider_access.HEDGE_DEFAULT_DELAY
+
+
+def test_hedged_fetch_reports_winner(monkeypatch):
+    """fetch_stock_data keeps the hedge outcome with the bars"""
+    bars = pd.DataFrame({'Close': range(10)}, index=pd.date_range('2024-01-01', periods=10))
+
+    def slow_eod(*args, **kwargs):
+        time.sleep(0.5)
+        return None
+
+    monkeypatch.setattr(provider_access, '_provider_limiter', ProviderLimiter())
+    monkeypatch.setattr(provider_access, 'HEDGE_DEFAULT_DELAY', 0.05)
+    monkeypatch.setattr(api, 'USE_EOD_API', True)
+    monkeypatch.setattr(api, 'HEDGE_REQUESTS', True)
+    monkeypatch.setattr(api, 'fetch_stock_data_eod', slow_eod, raising=False)
+    monkeypatch.setattr(api, '_fetch_stock_data_yfinance', lambda *args: bars.copy())
+
+    df = api.fetch_stock_data('HEDGE', '1mo', '1d')
+    assert len(df) == 10
+    assert df.attrs['hedge']['winner'] == 'yfinance' and df.attrs['hedge']['hedged']
+
+
+def test_stuck_primaries_do_not_hold_up_hedges(monkeypatch):
+    """Hedges run on their own workers, and a call gives up after its timeout"""
+    monkeypatch.setattr(provider_access, 'HEDGE_WORKERS', 2)
+    monkeypatch.setattr(provider_access, 'HEDGE_DEFAULT_DELAY', 0.05)
+    limiter = ProviderLimiter()
+    release = threading.Event()
+
+    def stuck():
+        release.wait(5)
+        return 'eod bars'
+
+    # Two stuck primaries fill the EOD workers; the third call still gets its hedge
+    calls = [threading.Thread(target=limiter.hedged_call, args=('eod', stuck, 'yfinance', lambda: None),
+                              kwargs={'timeout': 0.5}) for _ in range(2)]
+    for call in calls:
+        call.start()
+    started = time.time()
+    result, info = limiter.hedged_call('eod', stuck, 'yfinance', lambda: 'yfinance bars')
+    assert result == 'yfinance bars' and time.time() - started < 0.5
+
+    # Neither provider answers: the call returns at its timeout instead of waiting on
+    result, info = limiter.hedged_call('eod', stuck, 'yfinance', lambda: None, timeout=0.3)
+    assert result is None and info['timed_out'] and info['latency_seconds'] < 1
+    release.set()
+    for call in calls:
+        call.join()
+
+
+def test_cached_analysis_drops_the_hedge(monkeypatch):
+    """Only the request that fetched reports the hedge; cache hits do not"""
+    monkeypatch.setattr(api, 'ticker_cache', AnalysisCache('analysis'))
+    result = pd.DataFrame({'Close': range(5)})
+    result.attrs['hedge'] = {'winner': 'yfinance', 'hedged': True}
+
+    returned = api.cache_analysis('HEDGE_1mo_1d', result, 60)
+    assert returned.attrs['hedge']['winner'] == 'yfinance'
+    assert 'hedge' not in api.ticker_cache.get('HEDGE_1mo_1d').attrs
+
+
+if __name__ == "__main__":
+    test_limiter_bounds_concurrency()
+    test_circuit_opens_fails_fast_and_recovers()
+    test_backoff_grows_with_full_jitter()
+    test_retry_call_respects_budget_and_hands_off()
+    test_retry_call_fails_fast_when_circuit_open()
+    print("✅ Provider access tests passed")
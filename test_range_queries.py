@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for start/end range queries
+=======================================
+
+Checks binary-search slicing, that the bar store fetches only the gaps of
+a range, and that /api/analyzer-b serves zoomed ranges without provider
+calls against a stubbed yfinance.
+"""
+
+import numpy as np
+import pandas as pd
+
+import api
+import provider_access
+from analysis_cache import AnalysisCache
+from bar_pyramid import BarPyramid
+from bar_store import BarStore, slice_range
+from negative_cache import NegativeCache
+from symbol_resolver import SymbolResolver
+
+
+def make_daily_bars(days=900):
+    """Daily bars up to today, indexed like yfinance (New York midnight)"""
+    index = pd.bdate_range(end=pd.Timestamp.now(tz='America/New_York').normalize(), periods=days)
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 1, days))
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.5, days),
+        'High': close + 2,
+        'Low': close - 2,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, days).astype(float)
+    }, index=index)
+
+
+class RangeFetcher:
+    """Provider stand-in serving a slice of the bars and recording the requests"""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.calls = []
+
+    def __call__(self, period=None, start=None, end=None):
+        self.calls.append((start, end))
+        df = self.bars if start is None else slice_range(self.bars, start, end)
+        return df.copy()
+
+
+def test_slice_range_is_inclusive():
+    """Both bounds are kept, whatever the timezone they are given in"""
+    bars = make_daily_bars(days=10)
+    start, end = bars.index[2], bars.index[5]
+    sliced = slice_range(bars, start.tz_convert('UTC'), end.tz_convert('Asia/Tokyo'))
+    assert list(sliced.index) == list(bars.index[2:6])
+    assert len(slice_range(bars, None, bars.index[0])) == 1
+
+
+def test_store_fetches_only_gaps(tmp_path):
+    """A range inside the stored history costs nothing, an earlier one its head gap"""
+    bars = make_daily_bars()
+    fetcher = RangeFetcher(bars)
+    store = BarStore(root_dir=str(tmp_path), refresh_seconds=3600)
+
+    meta, _ = store.sync_range('yfinance', 'RNG', '1d', bars.index[400], None, fetcher)
+    assert len(fetcher.calls) == 1 and meta['rows'] == 500
+
+    store.sync_range('yfinance', 'RNG', '1d', bars.index[450], bars.index[600], fetcher)
+    assert len(fetcher.calls) == 1
+
+    meta, _ = store.sync_range('yfinance', 'RNG', '1d', bars.index[100], bars.index[200], fetcher)
+    assert len(fetcher.calls) == 2 and meta['rows'] == 800
+    assert fetcher.calls[-1][1] == bars.index[400]
+    stored, _ = store.load('yfinance', 'RNG', '1d')
+    assert stored.index.is_monotonic_increasing and not stored.index.duplicated().any()
+
+
+def test_analyzer_endpoint_serves_ranges(tmp_path, monkeypatch):
+    """Zooming into an analysed range needs no provider request"""
+    bars = make_daily_bars()
+    requested = []
+
+    class StubTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, period=None, interval=None, start=None, end=None):
+            requested.append((start, end))
+            return slice_range(bars, start, end).copy()
+
+    monkeypatch.setattr(api.yf, 'Ticker', StubTicker)
+    monkeypatch.setattr(api, 'USE_EOD_API', False)
+    monkeypatch.setattr(api, 'USE_BAR_STORE', True)
+    monkeypatch.setattr(api, 'get_bar_store', lambda: BarStore(root_dir=str(tmp_path), refresh_seconds=3600))
+    monkeypatch.setattr(api, 'get_symbol_resolver', lambda resolver=SymbolResolver(path=str(tmp_path / 'map.json')): resolver)
+    monkeypatch.setattr(api, 'get_bar_pyramid', lambda: BarPyramid())
+    monkeypatch.setattr(api, 'ticker_cache', AnalysisCache(default_ttl=60))
+    monkeypatch.setattr(api, 'get_negative_cache', lambda: NegativeCache())
+    monkeypatch.setattr(provider_access, '_provider_limiter', provider_access.ProviderLimiter())
+    client = api.app.test_client()
+
+    start, end = bars.index[500], bars.index[700]
+    response = client.get(f"/api/analyzer-b?ticker=RNG&interval=1d&start={start.date()}&end={end.date()}")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['dates'][0] == str(start.date()) and data['dates'][-1] == str(end.date())
+    assert data['metadata']['start'].startswith(str(start.date()))
+    assert len(requested) == 1
+
+    # Zoom in: the warm-up and the range are already stored
+    zoom = bars.index[600]
+    response = client.get(f"/api/analyzer-b?ticker=RNG&interval=1d&start={zoom.date()}&end={end.date()}")
+    assert response.status_code == 200
+    assert response.get_json()['dates'][0] == str(zoom.date())
+    assert len(requested) == 1
+
+    # A forced refresh fetches instead of slicing the cached analysis
+    response = client.get(f"/api/analyzer-b?ticker=RNG&interval=1d&start={zoom.date()}&end={end.date()}&force_refresh=true")
+    assert response.status_code == 200
+    assert response.get_json()['metadata']['cache_used'] is False
+    assert len(requested) == 2
+
+    response = client.get("/api/analyzer-b?ticker=RNG&interval=1d&start=2024-05-01&end=2024-01-01")
+    assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    test_slice_range_is_inclusive()
+    print("✅ Range query tests passed")
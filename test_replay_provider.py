@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the record/replay data provider
+===============================================
+
+Checks the synthetic series, that recorded answers replay without the
+upstream provider, the latency and failure injection, and that the API
+runs offline with the replay provider in place of yfinance.
+"""
+
+import time
+
+import pandas as pd
+import pytest
+
+import api
+import provider_access
+from analysis_cache import AnalysisCache
+from bar_pyramid import BarPyramid
+from bar_store import BarStore, slice_period
+from negative_cache import NegativeCache
+from replay_provider import ReplayProvider, generate_series, generate_universe
+from symbol_resolver import SymbolResolver
+
+
+def test_generated_series_is_realistic_and_reproducible():
+    """Session-aligned, consistent OHLC, identical for the same seed"""
+    end = pd.Timestamp('2024-06-28 21:00', tz='UTC')
+    hourly = generate_series('AAPL', '1h', end - pd.Timedelta(days=30), end)
+    local = hourly.index.tz_convert('America/New_York')
+    assert (local.weekday < 5).all()
+    assert ((local.hour * 60 + local.minute >= 570) & (local.hour < 16)).all()
+    assert (hourly['High'] >= hourly[['Open', 'Close']].max(axis=1)).all()
+    assert (hourly['Low'] <= hourly[['Open', 'Close']].min(axis=1)).all()
+    pd.testing.assert_frame_equal(hourly, generate_series('AAPL', '1h', end - pd.Timedelta(days=30), end))
+    assert not hourly.equals(generate_series('MSFT', '1h', end - pd.Timedelta(days=30), end))
+
+    crypto = generate_series('BTC-USD', '1d', end - pd.Timedelta(days=14), end)
+    assert len(crypto) == 15 and (crypto.index.weekday >= 5).any()
+
+
+def test_record_then_replay_offline(tmp_path):
+    """Recorded answers are served without the upstream provider"""
+    bars = generate_series('AAPL', '1d', end=pd.Timestamp.now(tz='UTC'))
+
+    class Upstream:
+        class Ticker:
+            def __init__(self, symbol):
+                self.symbol = symbol
+                self.info = {'longName': 'Apple Inc.', 'sector': 'Technology'}
+
+            def history(self, period=None, interval=None, start=None, end=None):
+                return slice_period(bars, period).copy() if self.symbol == 'AAPL' else pd.DataFrame()
+
+    recorder = ReplayProvider(mode='record', fixture_dir=str(tmp_path), upstream=Upstream)
+    recorded = recorder.Ticker('AAPL').history(period='1y', interval='1d')
+    recorder.Ticker('AAPL').info
+
+    class Offline:
+        def __getattr__(self, name):
+            raise AssertionError("replay must not reach the upstream provider")
+
+    replayer = ReplayProvider(mode='replay', fixture_dir=str(tmp_path), upstream=Offline())
+    replayed = replayer.Ticker('AAPL').history(period='1y', interval='1d')
+    pd.testing.assert_frame_equal(replayed, recorded, check_freq=False, check_index_type=False)
+    assert len(replayer.Ticker('AAPL').history(period='1mo', interval='1d')) < len(replayed)
+    assert replayer.Ticker('NOPE').history(period='1y', interval='1d').empty
+    assert replayer.metadata('AAPL') == {'company_name': 'Apple Inc.', 'industry': None, 'sector': 'Technology'}
+
+
+def test_latency_and_failure_injection(tmp_path):
+    """Requests take the configured latency and fail at the configured rate"""
+    slow = ReplayProvider(mode='synthetic', fixture_dir=str(tmp_path), latency_ms=50)
+    started = time.time()
+    slow.Ticker('AAPL').history(period='5d', interval='1d')
+    assert time.time() - started >= 0.05
+
+    flaky = ReplayProvider(mode='synthetic', fixture_dir=str(tmp_path), failure_rate=0.5, seed=1)
+    outcomes = []
+    for _ in range(40):
+        try:
+            flaky.Ticker('AAPL').history(period='5d', interval='1d')
+            outcomes.append(True)
+        except ConnectionError:
+            outcomes.append(False)
+    assert 5 < outcomes.count(False) < 35
+    # The same seed fails the same requests
+    again = ReplayProvider(mode='synthetic', fixture_dir=str(tmp_path), failure_rate=0.5, seed=1)
+    for expected in outcomes:
+        if expected:
+            again.Ticker('AAPL').history(period='5d', interval='1d')
+        else:
+            with pytest.raises(ConnectionError):
+                again.Ticker('AAPL').history(period='5d', interval='1d')
+
+
+def test_api_runs_offline_on_replay(tmp_path, monkeypatch):
+    """Single and batch fetches and the analyzer endpoint work on fixtures"""
+    fixtures = tmp_path / 'fixtures'
+    symbols = generate_universe(count=3, intervals=['1d'], days=900, fixture_dir=str(fixtures))
+    provider = ReplayProvider(mode='replay', fixture_dir=str(fixtures))
+
+    monkeypatch.setattr(api, 'yf', provider)
+    monkeypatch.setattr(api, 'USE_EOD_API', False)
+    monkeypatch.setattr(api, 'USE_BAR_STORE', True)
+    monkeypatch.setattr(api, 'get_bar_store', lambda: BarStore(root_dir=str(tmp_path / 'bars'), refresh_seconds=3600))
+    monkeypatch.setattr(api, 'get_symbol_resolver', lambda resolver=SymbolResolver(path=str(tmp_path / 'map.json')): resolver)
+    monkeypatch.setattr(api, 'get_bar_pyramid', lambda: BarPyramid())
+    monkeypatch.setattr(api, 'ticker_cache', AnalysisCache(default_ttl=60))
+    monkeypatch.setattr(api, 'get_negative_cache', lambda: NegativeCache())
+    monkeypatch.setattr(provider_access, '_provider_limiter', provider_access.ProviderLimiter())
+
+    frames = api.fetch_multi_stock_data(symbols, '1y', '1d')
+    assert set(frames) == set(symbols)
+
+    response = api.app.test_client().get(f"/api/analyzer-b?ticker={symbols[0]}&period=6mo&interval=1d")
+    assert response.status_code == 200
+    assert len(response.get_json()['dates']) > 100
+    assert provider.get_stats()['fixture_hits'] >= 3
+
+
+if __name__ == "__main__":
+    test_generated_series_is_realistic_and_reproducible()
+    print("✅ Replay provider tests passed")
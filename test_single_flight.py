@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight request coalescing
+================================================
+
+Runs identical calls from several threads at once and counts how often the
+underlying work is actually executed.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import api
+from single_flight import SingleFlight
+
+
+def run_concurrently(target, count):
+    """Start ``count`` threads on target and return their results"""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_calls_execute_once():
+    """Concurrent callers with one key share a single execution"""
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return 42
+
+    results = run_concurrently(lambda: flight.do('AAPL', slow), 8)
+    assert len(calls) == 1
+    assert [value for value, _ in results] == [42] * 8
+    assert sum(shared for _, shared in results) == 7
+    assert flight.get_stats()['in_flight'] == 0
+
+
+def test_errors_reach_every_waiter():
+    """A failing execution raises in all coalesced callers"""
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise ConnectionError("provider down")
+
+    results = run_concurrently(lambda: flight.do('MSFT', failing), 4)
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert flight.in_flight() == []
+
+
+def test_fetch_stock_data_coalesces(monkeypatch):
+    """Concurrent fetches of one series download once and get separate frames"""
+    downloads = []
+    bars = pd.DataFrame({'Close': np.arange(10.0)}, index=pd.date_range('2024-01-01', periods=10))
+
+    def fake_fetch(*args):
+        downloads.append(args)
+        time.sleep(0.2)
+        return bars.copy()
+
+    monkeypatch.setattr(api, '_fetch_stock_data', fake_fetch)
+    frames = run_concurrently(lambda: api.fetch_stock_data('NVDA', '1y', '1d'), 5)
+
+    assert len(downloads) == 1
+    assert len({id(frame) for frame in frames}) == 5
+
+
+if __name__ == "__main__":
+    test_identical_calls_execute_once()
+    test_errors_reach_every_waiter()
+    print("✅ Single-flight tests passed")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for stale-while-revalidate analysis results
+=======================================================
+
+Replaces the analysis computation with a stub to check that expired results
+are served at once while a background refresh swaps in the new one.
+"""
+
+import threading
+import time
+
+import pandas as pd
+
+import api
+from analysis_cache import AnalysisCache
+
+
+def test_stale_result_served_and_refreshed(monkeypatch):
+    """An expired result is returned immediately and replaced in the background"""
+    cache = AnalysisCache(default_ttl=0.05, stale_grace=60)
+    monkeypatch.setattr(api, 'ticker_cache', cache)
+    monkeypatch.setattr(api, 'get_analysis_ttl', lambda ticker, interval: 60)
+
+    old = pd.DataFrame({'Close': [1.0]})
+    old.attrs['computed_at'] = time.time()
+    old.attrs['expires_at'] = old.attrs['computed_at'] + 0.05
+    cache.set('AAPL_1y_1d', old)
+    time.sleep(0.06)
+
+    release = threading.Event()
+    calls = []
+
+    def slow_recompute(ticker, period, interval, df=None, columns=None):
+        calls.append(ticker)
+        release.wait(5)
+        new = pd.DataFrame({'Close': [2.0]})
+        cache.set(f"{ticker}_{period}_{interval}", new, ttl=60)
+        return new
+
+    monkeypatch.setattr(api, '_analyzer_b', slow_recompute)
+
+    started = time.time()
+    served = api.analyzer_b('AAPL', '1y', '1d')
+    assert served is old
+    assert time.time() - started < 1
+    assert api.is_stale_result(served)
+    assert api.get_data_age(served) >= 0.05
+
+    # Further stale reads do not queue a second refresh
+    assert api.analyzer_b('AAPL', '1y', '1d') is old
+
+    release.set()
+    for _ in range(100):
+        if cache.get('AAPL_1y_1d') is not None:
+            break
+        time.sleep(0.01)
+    assert cache.get('AAPL_1y_1d')['Close'].iloc[0] == 2.0
+    assert calls == ['AAPL']
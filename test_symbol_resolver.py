@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the provider symbol resolver
+============================================
+
+Checks the candidate formats per provider, persistence of learned symbols
+and that fetch_stock_data tries the formats against a stubbed yfinance.
+"""
+
+import numpy as np
+import pandas as pd
+
+import api
+import provider_access
+from bar_pyramid import BarPyramid
+from bar_store import BarStore
+from negative_cache import NegativeCache
+from symbol_resolver import SymbolResolver, eod_candidates, yfinance_candidates
+
+
+def test_candidate_formats():
+    """Best guess first, other plausible formats after it"""
+    assert eod_candidates('aapl') == ['AAPL.US', 'AAPL']
+    assert eod_candidates('BTC-USD') == ['BTC-USD.CC', 'BTC-USD']
+    assert eod_candidates('EURUSD=X')[0] == 'EURUSD.FOREX'
+    assert eod_candidates('BRK.B') == ['BRK-B.US', 'BRK.B']
+    # Only six-letter pairs are taken for forex, stocks ending in USD are not
+    assert eod_candidates('EURUSD')[0] == 'EURUSD.FOREX'
+    assert eod_candidates('BUSD')[0] == 'BUSD.US'
+
+    assert yfinance_candidates('AAPL.US') == ['AAPL']
+    assert yfinance_candidates('brk.b') == ['BRK-B', 'BRK.B']
+    assert yfinance_candidates('EURUSD') == ['EURUSD', 'EURUSD=X']
+
+
+def test_learned_symbols_persist(tmp_path):
+    """Recorded symbols come first and survive a restart"""
+    path = str(tmp_path / 'symbols.json')
+    resolver = SymbolResolver(path)
+    resolver.record('eod', 'brk.b', 'BRK.B')
+    assert resolver.resolve('eod', 'BRK.B') == 'BRK.B'
+
+    reloaded = SymbolResolver(path)
+    assert reloaded.resolve_batch('eod', ['BRK.B', 'MSFT']) == {'BRK.B': 'BRK.B', 'MSFT': 'MSFT.US'}
+    assert reloaded.candidates('eod', 'BRK.B') == ['BRK.B', 'BRK-B.US']
+    assert [entry['key'] for entry in reloaded.list_entries()] == ['eod/BRK.B']
+    assert reloaded.delete('eod/BRK.B') and SymbolResolver(path).get_stats()['entries'] == 0
+
+
+def test_fetch_learns_working_yfinance_symbol(tmp_path, monkeypatch):
+    """A failing first guess falls through to the next format, which is remembered"""
+    requested = []
+    bars = pd.DataFrame(
+        {column: np.linspace(100, 110, 30) for column in ['Open', 'High', 'Low', 'Close']},
+        index=pd.date_range('2024-01-01', periods=30, freq='D')
+    ).assign(Volume=1000)
+
+    class StubTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, **kwargs):
+            requested.append(self.symbol)
+            return bars.copy() if self.symbol == 'EURUSD=X' else pd.DataFrame()
+
+    resolver = SymbolResolver(str(tmp_path / 'symbols.json'))
+    monkeypatch.setattr(api.yf, 'Ticker', StubTicker)
+    monkeypatch.setattr(api, 'USE_EOD_API', False)
+    monkeypatch.setattr(api, 'USE_BAR_STORE', False)
+    monkeypatch.setattr(api, 'get_symbol_resolver', lambda: resolver)
+    monkeypatch.setattr(api, 'get_negative_cache', lambda: NegativeCache())
+    monkeypatch.setattr(provider_access, '_provider_limiter', provider_access.ProviderLimiter())
+
+    df = api.fetch_stock_data('EURUSD', '1mo', '1d', retry_delay=0.01, use_cache=False)
+    assert df is not None and len(df) == 30
+    assert requested == ['EURUSD', 'EURUSD=X']
+    assert resolver.resolve('yfinance', 'EURUSD') == 'EURUSD=X'
+
+    requested.clear()
+    api.fetch_stock_data('EURUSD', '3mo', '1d', retry_delay=0.01, use_cache=False)
+    assert requested == ['EURUSD=X']
+
+
+def test_cold_range_query_tries_every_format(tmp_path, monkeypatch):
+    """An open-ended range fetch without a learned symbol does not stop at the first format"""
+    requested = []
+    bars = pd.DataFrame(
+        {column: np.linspace(100, 110, 200) for column in ['Open', 'High', 'Low', 'Close']},
+        index=pd.date_range('2024-01-01', periods=200, freq='D', tz='America/New_York')
+    ).assign(Volume=1000)
+
+    class StubTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, start=None, end=None, **kwargs):
+            requested.append(self.symbol)
+            if self.symbol != 'EURUSD=X':
+                return pd.DataFrame()
+            return bars[bars.index >= pd.Timestamp(start)] if start is not None else bars.copy()
+
+    resolver = SymbolResolver(str(tmp_path / 'symbols.json'))
+    monkeypatch.setattr(api.yf, 'Ticker', StubTicker)
+    monkeypatch.setattr(api, 'USE_EOD_API', False)
+    monkeypatch.setattr(api, 'USE_BAR_STORE', True)
+    monkeypatch.setattr(api, 'get_bar_store', lambda: BarStore(root_dir=str(tmp_path / 'bars'), refresh_seconds=3600))
+    monkeypatch.setattr(api, 'get_bar_pyramid', lambda: BarPyramid())
+    monkeypatch.setattr(api, 'get_symbol_resolver', lambda: resolver)
+    monkeypatch.setattr(api, 'get_negative_cache', lambda: NegativeCache())
+    monkeypatch.setattr(provider_access, '_provider_limiter', provider_access.ProviderLimiter())
+
+    start = pd.Timestamp('2024-03-01', tz='UTC')
+    for use_cache in (True, False):
+        resolver.delete('yfinance/EURUSD')
+        requested.clear()
+        df = api.fetch_stock_data_range('EURUSD', start, None, '1d', retry_delay=0.01, use_cache=use_cache)
+        assert df is not None and not df.empty
+        assert requested == ['EURUSD', 'EURUSD=X']
+        assert resolver.resolve('yfinance', 'EURUSD') == 'EURUSD=X'
+
+
+if __name__ == "__main__":
+    test_candidate_formats()
+    print("✅ Symbol resolver tests passed")
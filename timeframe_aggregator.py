@@ -6,7 +6,7 @@ This module provides aggregation functionality for creating custom timeframes
 that are not natively supported by data providers (EOD API, yfinance).
 
 Supports aggregating from base intervals (1h, 1d) to custom intervals:
-- 3h, 6h (from 1h) 
+- 3h, 4h, 6h, 8h, 12h (from 1h)
 - 2d, 3d (from 1d)
 
 Includes proper time alignment for different asset types (crypto vs stocks)
@@ -16,6 +16,7 @@ and trading hours awareness.
 import pandas as pd
 import numpy as np
 import logging
+import os
 from datetime import datetime, timedelta
 import pytz
 
@@ -29,14 +30,45 @@ class TimeframeAggregator:
     # Aggregation mappings - what intervals need aggregation and their base intervals
     AGGREGATION_RULES = {
         # From 1h to custom intervals
-        '3h': {'base_interval': '1h', 'frequency': '3H', 'align_to': 'hour'},
-        '6h': {'base_interval': '1h', 'frequency': '6H', 'align_to': 'hour'},
+        '3h': {'base_interval': '1h', 'frequency': '3h', 'align_to': 'hour'},
+        '4h': {'base_interval': '1h', 'frequency': '4h', 'align_to': 'hour'},
+        '6h': {'base_interval': '1h', 'frequency': '6h', 'align_to': 'hour'},
+        '8h': {'base_interval': '1h', 'frequency': '8h', 'align_to': 'hour'},
+        '12h': {'base_interval': '1h', 'frequency': '12h', 'align_to': 'hour'},
         
         # From 1d to custom intervals  
         '2d': {'base_interval': '1d', 'frequency': '2D', 'align_to': 'day'},
         '3d': {'base_interval': '1d', 'frequency': '3D', 'align_to': 'day'},
     }
     
+    # Bar lengths used to work out when the forming bar of an interval closes
+    BAR_DURATIONS = {
+        '15m': pd.Timedelta(minutes=15),
+        '30m': pd.Timedelta(minutes=30),
+        '1h': pd.Timedelta(hours=1),
+        '3h': pd.Timedelta(hours=3),
+        '4h': pd.Timedelta(hours=4),
+        '6h': pd.Timedelta(hours=6),
+        '8h': pd.Timedelta(hours=8),
+        '12h': pd.Timedelta(hours=12),
+        '1d': pd.Timedelta(days=1),
+        '2d': pd.Timedelta(days=2),
+        '3d': pd.Timedelta(days=3),
+        '1wk': pd.Timedelta(weeks=1)
+    }
+    
+    # US regular session (America/New_York), holidays are not modelled
+    MARKET_TIMEZONE = 'America/New_York'
+    MARKET_OPEN = (9, 30)
+    MARKET_CLOSE = (16, 0)
+    # Forex trades from Sunday 17:00 to Friday 17:00 New York time
+    FOREX_ROLLOVER_HOUR = 17
+    
+    # Time providers get to publish a closed bar, and to settle the daily bar after the
+    # close (EOD publishes end-of-day bars hours later, raise SESSION_SETTLE_MINUTES there)
+    BAR_CLOSE_DELAY = pd.Timedelta(seconds=60)
+    SESSION_SETTLE = pd.Timedelta(minutes=float(os.getenv('SESSION_SETTLE_MINUTES', '15')))
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
@@ -191,7 +223,7 @@ class TimeframeAggregator:
         Returns:
             dict: Alignment parameters
         """
-        if interval in ['3h', '6h']:
+        if self.AGGREGATION_RULES.get(interval, {}).get('align_to') == 'hour':
             if asset_type == 'stocks':
                 # Align to market open (13:30 UTC = 9:30 EST) - use timezone-aware origin
                 return {
@@ -217,6 +249,158 @@ class TimeframeAggregator:
                 'origin': None,
             }
     
+    def _market_time(self, day, hour_minute):
+        """Get a New York wall-clock time on a given date as a UTC Timestamp"""
+        return pd.Timestamp(
+            year=day.year, month=day.month, day=day.day,
+            hour=hour_minute[0], minute=hour_minute[1]
+        ).tz_localize(self.MARKET_TIMEZONE).tz_convert('UTC')
+    
+    def _to_utc(self, now):
+        """Normalise a reference time to a UTC Timestamp (defaults to now)"""
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+        return now.tz_localize('UTC') if now.tzinfo is None else now.tz_convert('UTC')
+    
+    def is_session_active(self, asset_type, now=None):
+        """
+        Check whether bars of an asset type can still change
+        
+        Stocks count as active from the open until SESSION_SETTLE after the
+        close, so late closing prints still get picked up.
+        
+        Args:
+            asset_type: 'stocks', 'crypto', or 'forex'
+            now: Reference time (defaults to the current time)
+            
+        Returns:
+            bool: True while the session is trading or settling
+        """
+        now = self._to_utc(now)
+        if asset_type == 'crypto':
+            return True
+        
+        local = now.tz_convert(self.MARKET_TIMEZONE)
+        if asset_type == 'forex':
+            weekday, hour = local.weekday(), local.hour
+            if weekday == 5:
+                return False
+            if weekday == 4 and hour >= self.FOREX_ROLLOVER_HOUR:
+                return False
+            if weekday == 6 and hour < self.FOREX_ROLLOVER_HOUR:
+                return False
+            return True
+        
+        if local.weekday() >= 5:
+            return False
+        session_open = self._market_time(local, self.MARKET_OPEN)
+        session_close = self._market_time(local, self.MARKET_CLOSE)
+        return session_open <= now < session_close + self.SESSION_SETTLE
+    
+    def get_next_session_open(self, asset_type, now=None):
+        """
+        Get the next time the session of an asset type opens
+        
+        Args:
+            asset_type: 'stocks', 'crypto', or 'forex'
+            now: Reference time (defaults to the current time)
+            
+        Returns:
+            pd.Timestamp: Next session open in UTC (now for crypto)
+        """
+        now = self._to_utc(now)
+        if asset_type == 'crypto':
+            return now
+        
+        local = now.tz_convert(self.MARKET_TIMEZONE)
+        if asset_type == 'forex':
+            days_to_sunday = (6 - local.weekday()) % 7
+            sunday = local.date() + timedelta(days=days_to_sunday)
+            candidate = self._market_time(sunday, (self.FOREX_ROLLOVER_HOUR, 0))
+            return candidate if candidate > now else candidate + pd.Timedelta(weeks=1)
+        
+        day = local.date()
+        for _ in range(8):
+            candidate = self._market_time(day, self.MARKET_OPEN)
+            if day.weekday() < 5 and candidate > now:
+                return candidate
+            day = day + timedelta(days=1)
+        return candidate
+    
+    def get_next_bar_close(self, interval, ticker, now=None):
+        """
+        Get the close time of the bar forming at ``now``
+        
+        Intraday stock bars are aligned to the 9:30 open and the last bar of
+        the day closes at 16:00; daily and longer stock bars close at the
+        session close. Crypto and forex bars are aligned to midnight UTC
+        (weekly bars to Monday). Outside the session the first bar close of
+        the next session is returned.
+        
+        Args:
+            interval: Bar interval ('15m', '1h', '1d', '1wk', ...)
+            ticker: Ticker symbol for asset type detection
+            now: Reference time (defaults to the current time)
+            
+        Returns:
+            pd.Timestamp: Bar close time in UTC
+        """
+        now = self._to_utc(now)
+        duration = self.BAR_DURATIONS.get(interval, pd.Timedelta(days=1))
+        asset_type = self.get_asset_type(ticker)
+        
+        if asset_type != 'stocks':
+            origin = pd.Timestamp('1970-01-05', tz='UTC') if interval == '1wk' else pd.Timestamp('1970-01-01', tz='UTC')
+            return origin + ((now - origin) // duration + 1) * duration
+        
+        local = now.tz_convert(self.MARKET_TIMEZONE)
+        session_open = self._market_time(local, self.MARKET_OPEN)
+        session_close = self._market_time(local, self.MARKET_CLOSE)
+        if local.weekday() >= 5 or now >= session_close:
+            session_open = self.get_next_session_open('stocks', now)
+            session_close = self._market_time(session_open.tz_convert(self.MARKET_TIMEZONE), self.MARKET_CLOSE)
+        
+        if duration >= pd.Timedelta(days=1):
+            return session_close
+        if now < session_open:
+            return min(session_open + duration, session_close)
+        return min(session_open + ((now - session_open) // duration + 1) * duration, session_close)
+    
+    def get_cache_expiry(self, interval, ticker, now=None, max_update_seconds=None):
+        """
+        Work out until when data for an interval can be served from cache
+        
+        While the session is active, results live until the forming bar of
+        the interval closes: a daily result until the session close, a 15m
+        one until the quarter hour. Once the close has passed, stock results
+        are refreshed at the end of the settle window, when the closing
+        prints are in, and outside the session nothing changes until the
+        next open.
+        
+        Args:
+            interval: Bar interval
+            ticker: Ticker symbol for asset type detection
+            now: Reference time (defaults to the current time)
+            max_update_seconds: Optional cap on the lifetime while bars are
+                forming, for callers that need to see the forming bar move
+            
+        Returns:
+            pd.Timestamp: Expiry time in UTC
+        """
+        now = self._to_utc(now)
+        asset_type = self.get_asset_type(ticker)
+        
+        if not self.is_session_active(asset_type, now):
+            return self.get_next_session_open(asset_type, now)
+        
+        expiry = self.get_next_bar_close(interval, ticker, now) + self.BAR_CLOSE_DELAY
+        if asset_type == 'stocks':
+            session_close = self._market_time(now.tz_convert(self.MARKET_TIMEZONE), self.MARKET_CLOSE)
+            if now >= session_close:
+                expiry = min(expiry, session_close + self.SESSION_SETTLE)
+        if max_update_seconds is not None:
+            expiry = min(expiry, now + pd.Timedelta(seconds=max_update_seconds))
+        return expiry
+    
     def aggregate_ohlcv(self, df, target_interval, ticker):
         """
         Aggregate OHLCV data to target interval
@@ -241,7 +425,7 @@ class TimeframeAggregator:
             df = self.align_timezone(df, asset_type)
             
             # Optional: Filter to trading hours for stocks (only for hourly aggregations)
-            if asset_type == 'stocks' and target_interval in ['3h', '6h']:
+            if asset_type == 'stocks' and self.AGGREGATION_RULES[target_interval]['align_to'] == 'hour':
                 df = self.filter_trading_hours(df, asset_type)
             
             # Get alignment parameters
@@ -269,13 +453,13 @@ class TimeframeAggregator:
             else:
                 resampled = df.resample(alignment['freq']).agg(agg_functions)
             
-            # Remove rows with all NaN values
-            resampled = resampled.dropna(how='all')
+            # Remove empty bins (outside sessions the summed volume is 0, not NaN)
+            resampled = resampled.dropna(subset=['Open', 'High', 'Low', 'Close'], how='all')
             
             # Fill any remaining NaN values in OHLC
             for col in ['Open', 'High', 'Low', 'Close']:
                 if col in resampled.columns:
-                    resampled[col] = resampled[col].fillna(method='ffill').fillna(method='bfill')
+                    resampled[col] = resampled[col].ffill().bfill()
             
             # Ensure Volume is not negative and fill NaN with 0
             if 'Volume' in resampled.columns:
@@ -405,6 +589,39 @@ def get_extended_period_for_aggregation(period, interval):
     aggregator = get_aggregator()
     return aggregator.get_extended_period_for_aggregation(period, interval)
 
+def get_next_bar_close(interval, ticker, now=None):
+    """
+    Get the close time of the bar currently forming for a ticker
+    
+    Args:
+        interval: Bar interval
+        ticker: Ticker symbol
+        now: Reference time (defaults to the current time)
+        
+    Returns:
+        pd.Timestamp: Bar close time in UTC
+    """
+    aggregator = get_aggregator()
+    return aggregator.get_next_bar_close(interval, ticker, now)
+
+def get_cache_ttl(interval, ticker, now=None, max_update_seconds=None):
+    """
+    Get the number of seconds data for an interval stays valid
+    
+    Args:
+        interval: Bar interval
+        ticker: Ticker symbol
+        now: Reference time (defaults to the current time)
+        max_update_seconds: Optional cap on the lifetime while bars are forming
+        
+    Returns:
+        float: Seconds until the cached data should be refreshed
+    """
+    aggregator = get_aggregator()
+    now = aggregator._to_utc(now)
+    expiry = aggregator.get_cache_expiry(interval, ticker, now, max_update_seconds)
+    return max((expiry - now).total_seconds(), 0.0)
+
 # Test function
 def test_aggregation():
     """Test the aggregation functionality"""